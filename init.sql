@@ -16,6 +16,14 @@ BEGIN
 END
 $$;
 
+-- ── schema_migrations ─────────────────────────────────────────────────────────
+-- Versiones aplicadas por la fase de arranque (src/collector/schema_migrations.py).
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     TEXT PRIMARY KEY,
+    checksum    TEXT NOT NULL,
+    applied_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- ── portfolio_snapshots ───────────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS portfolio_snapshots (
     snapshot_id      UUID        PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -85,6 +93,25 @@ BEGIN
 END
 $$;
 
+-- Ultimo precio por ticker y cobertura diaria; los mantiene save_market_prices.
+CREATE TABLE IF NOT EXISTS market_prices_latest (
+    ticker             TEXT        PRIMARY KEY,
+    asset_type         TEXT,
+    currency           TEXT,
+    last_price         NUMERIC(20,4),
+    change_pct_1d      NUMERIC(10,6),
+    ts                 TIMESTAMPTZ NOT NULL,
+    price_day          DATE        NOT NULL,
+    previous_close     NUMERIC(20,4),
+    updated_at         TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS market_prices_day_coverage (
+    market_date        DATE        NOT NULL,
+    ticker             TEXT        NOT NULL,
+    PRIMARY KEY (market_date, ticker)
+);
+
 -- ── market_candles (hypertable) ───────────────────────────────────────────────
 -- Velas OHLCV locales de Cocos/BYMA para ACCIONES y CEDEARS.
 CREATE TABLE IF NOT EXISTS market_candles (
@@ -120,6 +147,43 @@ BEGIN
 END
 $$;
 
+-- ── market_candles_canonical ──────────────────────────────────────────────────
+-- Una vela por ticker/dia/intervalo con la fuente ganadora
+-- (COCOS > TRADINGVIEW_BYMA > internal_snapshot). La mantiene save_market_candles;
+-- scripts/rebuild_canonical_candles.py la reconstruye despues de backfills.
+-- La clave ignora asset_type: en BYMA el ticker corto es unico entre tipos
+-- (el tipo/plazo vive en long_ticker) y el resto del esquema identifica el
+-- instrumento solo por ticker; asset_type queda para filtrar.
+CREATE TABLE IF NOT EXISTS market_candles_canonical (
+    ticker             TEXT        NOT NULL,
+    interval           TEXT        NOT NULL,
+    candle_day         DATE        NOT NULL,
+    ts                 TIMESTAMPTZ NOT NULL,
+    long_ticker        TEXT        NOT NULL,
+    asset_type         TEXT        NOT NULL,
+    currency           TEXT        NOT NULL,
+    venue              TEXT        NOT NULL,
+    open_price         NUMERIC(20,4),
+    high_price         NUMERIC(20,4),
+    low_price          NUMERIC(20,4),
+    close_price        NUMERIC(20,4),
+    volume             NUMERIC(20,4),
+    source             TEXT        NOT NULL,
+    source_priority    SMALLINT    NOT NULL,
+    source_scraped_at  TIMESTAMPTZ NOT NULL,
+    refreshed_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (ticker, interval, candle_day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_type_day
+    ON market_candles_canonical(ticker, interval, asset_type, candle_day DESC);
+
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_refreshed
+    ON market_candles_canonical(interval, refreshed_at);
+
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_day
+    ON market_candles_canonical(interval, candle_day);
+
 -- ── raw_snapshots (hypertable) ────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS raw_snapshots (
     snapshot_id UUID        NOT NULL REFERENCES portfolio_snapshots(snapshot_id) ON DELETE CASCADE,
@@ -414,6 +478,7 @@ CREATE TABLE IF NOT EXISTS broker_movements (
     balance              NUMERIC(20,4),
     raw_payload          JSONB,
     created_at           TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at           TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     UNIQUE (source, external_movement_id)
 );
 
@@ -477,6 +542,18 @@ CREATE INDEX IF NOT EXISTS idx_plan_execution_attribution_plans_decision
 CREATE INDEX IF NOT EXISTS idx_plan_execution_attribution_movements_attribution
     ON plan_execution_attribution_movements(attribution_id);
 
+-- Watermark del sync incremental: ids maximos de broker_movements y
+-- decision_log ya atribuidos con esta version/ventana.
+CREATE TABLE IF NOT EXISTS plan_execution_attribution_sync (
+    matching_version           TEXT PRIMARY KEY,
+    match_window_sessions      INTEGER NOT NULL,
+    movement_id_watermark      BIGINT NOT NULL,
+    decision_id_watermark      BIGINT NOT NULL,
+    changes_watermark          TIMESTAMPTZ,
+    full_rebuild_at            TIMESTAMPTZ,
+    synced_at                  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
 -- FEATURE: ML - feature store experimental para entrenamiento e inferencia.
 CREATE TABLE IF NOT EXISTS ml_decision_features (
     decision_log_id                  BIGINT PRIMARY KEY REFERENCES decision_log(id) ON DELETE CASCADE,
@@ -1773,6 +1850,21 @@ CREATE INDEX IF NOT EXISTS idx_decision_log_pending
     WHERE outcome_5d IS NULL
       AND COALESCE(outcome_basis, '') <> 'legacy_external';
 
+-- Watermarks del cache de respuestas del monitor (MAX por indice)
+CREATE INDEX IF NOT EXISTS idx_decision_log_outcome_filled_at
+    ON decision_log(outcome_filled_at)
+    WHERE outcome_filled_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_decision_log_closed_at
+    ON decision_log(closed_at)
+    WHERE closed_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_position_hold_updated_at
+    ON position_hold_observations(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_shadow_causal_analyzed_at
+    ON shadow_thesis_causal_analysis(analyzed_at);
+
 -- Índice para check_stop_activations (trades abiertos con stop definido)
 CREATE INDEX IF NOT EXISTS idx_decision_log_stops
     ON decision_log(decision, stop_loss_price, outcome_5d)
@@ -1817,6 +1909,9 @@ CREATE INDEX IF NOT EXISTS idx_broker_fills_owner_executed_at
 CREATE INDEX IF NOT EXISTS idx_broker_movements_executed_at
     ON broker_movements(executed_at DESC);
 
+CREATE INDEX IF NOT EXISTS idx_broker_movements_updated_at
+    ON broker_movements(updated_at);
+
 CREATE INDEX IF NOT EXISTS idx_broker_movements_ticker_type
     ON broker_movements(ticker, movement_type, executed_at DESC);
 
@@ -18,6 +18,7 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv(Path(__file__).resolve().parents[1] / ".env", override=False)
 
+from src.collector.candle_store import open_candle_reader
 from src.collector.data.models import AssetType, Currency, MarketCandle
 from src.collector.data.normalizer import is_market_ticker_candidate
 from src.collector.db import PortfolioDatabase
@@ -205,11 +206,21 @@ async def _targets(
         and (not wanted or str(item.get("ticker", "")).upper() in wanted)
     ]
 
+    ordered = sorted(assets, key=lambda row: (row.get("asset_type", ""), row.get("ticker", "")))
+    existing = await db.get_market_candle_rows_bulk(
+        [str(asset["ticker"]).upper() for asset in ordered],
+        {
+            str(asset["ticker"]).upper(): str(asset.get("asset_type") or "UNKNOWN").upper()
+            for asset in ordered
+        },
+        min_rows,
+        interval="1d",
+    )
     targets: list[BackfillTarget] = []
-    for asset in sorted(assets, key=lambda row: (row.get("asset_type", ""), row.get("ticker", ""))):
+    for asset in ordered:
         ticker = str(asset["ticker"]).upper()
         atype = str(asset.get("asset_type") or "UNKNOWN").upper()
-        rows = await db.get_market_candles(ticker, asset_type=atype, interval="1d", limit=min_rows)
+        rows = existing.get(ticker, [])
         if all_assets or len(rows) < min_rows:
             targets.append(BackfillTarget(ticker=ticker, asset_type=atype, existing_rows=len(rows)))
     return targets
@@ -238,8 +249,9 @@ async def _main() -> None:
     imported = errors = fetched = 0
     failed_tickers: list[str] = []
     try:
+        # Cobertura existente desde el cache columnar local (refrescado al abrir).
         targets = await _targets(
-            db,
+            await open_candle_reader(db),
             tickers=args.tickers,
             asset_type=args.asset_type,
             min_rows=args.min_rows,
@@ -21,6 +21,7 @@ from src.collector.portfolio_quality import (
     price_discrepancy_warnings,
 )
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 ART = ZoneInfo("America/Argentina/Buenos_Aires")
@@ -78,8 +79,7 @@ async def main() -> int:
 
     target_day = date.fromisoformat(args.date) if args.date else None
     dsn = get_config().database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         snap = await _load_snapshot(conn, target_day)
         if not snap:
             print("No hay snapshot para la fecha solicitada.")
@@ -109,8 +109,6 @@ async def main() -> int:
             tickers,
             snapshot_day,
         )
-    finally:
-        await conn.close()
 
     raw_positions = [dict(row) for row in positions]
     normalized = normalize_positions_with_fresh_market_prices(
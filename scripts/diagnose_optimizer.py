@@ -1,4 +1,4 @@
-"""Print the latest Black-Litterman OptimizationError diagnostic."""
+"""Print the latest optimizer diagnostic (solver stats and, if any, the BL failure)."""
 from __future__ import annotations
 
 import argparse
@@ -32,10 +32,16 @@ def render(payload: dict) -> str:
     if missing:
         raise ValueError(f"Diagnostic missing keys: {', '.join(missing)}")
 
+    solver = payload.get("solver") or {}
     lines = [
-        "BLACK-LITTERMAN DIAGNOSTIC",
+        "OPTIMIZER DIAGNOSTIC",
         f"generated_at: {payload.get('generated_at')}",
         f"error: {payload.get('error_type')}: {payload.get('error')}",
+        (
+            f"solver: {solver.get('engine')} iterations={solver.get('iterations')} "
+            f"objective={solver.get('objective')} elapsed_ms={solver.get('elapsed_ms')} "
+            f"converged={solver.get('converged')} warm_start={solver.get('warm_start')}"
+        ),
         f"universe: {', '.join(payload['universe'])}",
         f"sum(lower_bounds): {float(payload['sum_lower_bounds']):.4f}",
         f"sum(upper_bounds): {float(payload['sum_upper_bounds']):.4f}",
@@ -56,7 +62,7 @@ def render(payload: dict) -> str:
 
 def main() -> int:
     parser = argparse.ArgumentParser(
-        description="Print universe, scores, bounds and covariance from the latest BL failure."
+        description="Print solver stats, universe, scores, bounds and covariance from the latest optimizer run."
     )
     parser.add_argument("path", nargs="?", type=Path, default=DEFAULT_PATH)
     parser.add_argument("--json", action="store_true", help="Print raw JSON")
@@ -14,7 +14,6 @@ import sys
 from uuid import UUID
 from zoneinfo import ZoneInfo
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -25,8 +24,10 @@ from src.analysis.corporate_actions import (
     IngestionMethod,
     instrument_id_for,
 )
+from src.analysis.stats_cache import invalidate_analysis_stats
 from src.collector.db import PortfolioDatabase
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 ART_TZ = ZoneInfo("America/Argentina/Buenos_Aires")
@@ -99,6 +100,17 @@ def build_parser() -> argparse.ArgumentParser:
     list_parser = subparsers.add_parser("list", help="List active and recent effects")
     list_parser.add_argument("--ticker", action="append", default=[])
 
+    adjustments = subparsers.add_parser(
+        "adjustments",
+        help="Show the versioned adjusted-candle history of a ticker (audit)",
+    )
+    adjustments.add_argument("--ticker", required=True)
+    adjustments.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-resolve effects against current candles before listing",
+    )
+
     invalidate = subparsers.add_parser(
         "invalidate-run",
         help="Supersede an unexecuted ExecutionPlan run after a corporate-action incident",
@@ -167,6 +179,34 @@ def _upsert_payload(args: argparse.Namespace) -> dict:
     }
 
 
+def _adjustment_view(adjustment) -> dict:
+    return {
+        "version": adjustment.version,
+        "status": adjustment.status,
+        "reason": adjustment.reason,
+        "built_at": adjustment.built_at.isoformat() if adjustment.built_at else None,
+        "blocking_reason": adjustment.blocking_reason,
+        "candle_count": adjustment.candle_count,
+        "last_candle_day": (
+            adjustment.last_candle_day.isoformat() if adjustment.last_candle_day else None
+        ),
+        "steps": [
+            {
+                "effect_id": step.effect_id,
+                "event_id": step.event_id,
+                "effective_at": step.effective_at.isoformat(),
+                "status": step.application_status,
+                "transition_day": (
+                    step.transition_day.isoformat() if step.transition_day else None
+                ),
+                "price_factor": step.price_factor,
+                "volume_factor": step.volume_factor,
+            }
+            for step in adjustment.steps
+        ],
+    }
+
+
 def _serialize_payload(payload: dict) -> dict:
     return {
         key: value.isoformat() if isinstance(value, (datetime, date)) else value
@@ -181,8 +221,7 @@ async def run(args: argparse.Namespace) -> int:
     cfg = get_config()
 
     if args.command == "invalidate-run":
-        conn = await asyncpg.connect(cfg.database.url)
-        try:
+        async with connection(cfg.database.url) as conn:
             async with conn.transaction():
                 event_id = await conn.fetchval(
                     "SELECT id FROM corporate_events WHERE event_key = $1",
@@ -263,8 +302,6 @@ async def run(args: argparse.Namespace) -> int:
                 "decisions": [dict(row) for row in rows],
             }, ensure_ascii=False, default=str))
             return 0
-        finally:
-            await conn.close()
 
     db = PortfolioDatabase(cfg.database.url)
     await db.connect()
@@ -289,14 +326,40 @@ async def run(args: argparse.Namespace) -> int:
             ], indent=2, ensure_ascii=False))
             return 0
 
+        if args.command == "adjustments":
+            ticker = str(args.ticker).upper().strip()
+            rebuilt = {}
+            if args.rebuild:
+                rebuilt = await db.refresh_candle_adjustments(
+                    [ticker],
+                    reason="manage_corporate_action adjustments --rebuild",
+                )
+                if rebuilt:
+                    await db.recompute_outcomes(tickers=[ticker])
+                    await invalidate_analysis_stats(f"candle adjustment {ticker}")
+            history = await db.get_candle_adjustment_history(ticker)
+            print(json.dumps({
+                "ticker": ticker,
+                "rebuilt": bool(rebuilt),
+                "versions": [_adjustment_view(adjustment) for adjustment in history],
+            }, indent=2, ensure_ascii=False))
+            return 0
+
         payload = _upsert_payload(args)
         event_id, effect_id = await db.upsert_corporate_action(**payload)
+        await invalidate_analysis_stats(f"corporate_action {payload['ticker']}")
+        # upsert_corporate_action ya versiono la serie ajustada; los outcomes
+        # del ticker se recalculan en bloque contra esa version.
+        current = (await db.get_candle_adjustments([payload["ticker"]])).get(payload["ticker"])
+        recomputed = await db.recompute_outcomes(tickers=[payload["ticker"]])
         print(json.dumps({
             "event_id": event_id,
             "effect_id": effect_id,
             "event_key": payload["event_key"],
             "ticker": payload["ticker"],
             "status": payload["lifecycle_status"],
+            "adjustment_version": current.version if current else 0,
+            "outcomes_recomputed": recomputed,
         }, ensure_ascii=False))
         return 0
     finally:
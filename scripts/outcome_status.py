@@ -19,11 +19,11 @@ import sys
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 ART = ZoneInfo("America/Argentina/Buenos_Aires")
@@ -51,9 +51,7 @@ def _row(values: list[str], widths: list[int]) -> str:
 async def build_report(days: int, limit: int) -> str:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-
-    try:
+    async with connection(dsn) as conn:
         totals = await conn.fetchrow(
             """
             SELECT
@@ -139,8 +137,6 @@ async def build_report(days: int, limit: int) -> str:
             """,
             limit,
         )
-    finally:
-        await conn.close()
 
     lines: list[str] = []
     lines.append("OUTCOME STATUS")
@@ -0,0 +1,61 @@
+"""
+Reconstruye market_candles_canonical desde market_candles.
+
+La tabla canonica se mantiene sola en cada save_market_candles; este comando
+es para backfills masivos o correcciones manuales sobre market_candles.
+
+Uso:
+  python scripts/rebuild_canonical_candles.py
+  python scripts/rebuild_canonical_candles.py --tickers GGAL YPFD
+  python scripts/rebuild_canonical_candles.py --since 2026-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analysis.stats_cache import invalidate_analysis_stats
+from src.collector.db import PortfolioDatabase
+from src.core.config import get_config
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+async def main(tickers: list[str] | None = None, since: date | None = None) -> None:
+    cfg = get_config()
+    db = PortfolioDatabase(cfg.database.url)
+    scope = ", ".join(tickers) if tickers else "todo el universo"
+    if since is not None:
+        scope += f" desde {since.isoformat()}"
+
+    try:
+        await db.connect()
+        logger.info("Reconstruyendo velas canónicas para %s...", scope)
+        rebuilt = await db.rebuild_market_candles_canonical(tickers=tickers, since=since)
+        print(f"✅ {rebuilt} velas canónicas reconstruidas ({scope})")
+        await invalidate_analysis_stats("rebuild_canonical_candles")
+    except Exception as exc:
+        logger.error("Error reconstruyendo velas canónicas: %s", exc, exc_info=True)
+        print(f"❌ Error: {exc}")
+        raise
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye market_candles_canonical")
+    parser.add_argument("--tickers", nargs="*", default=[], help="Tickers puntuales. Default: todos")
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="Primer dia (YYYY-MM-DD) a reconstruir; por defecto todo el histórico",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(tickers=args.tickers or None, since=args.since))
@@ -49,11 +49,14 @@ from html import escape
 from types import SimpleNamespace
 from uuid import uuid4
 
+from src.core.compute_executor import run_cpu
 from src.core.config import get_config
+from src.core.db_pool import connection
 from src.core.logger import get_logger
+from src.core.optimizer_cache import cache_optimizer_weights, get_optimizer_warm_start
 from src.collector.db import PortfolioDatabase
 from src.collector.notifier import TelegramNotifier
-from src.collector.schema_migrations import ensure_execution_plan_persistence
+from src.collector.schema_migrations import apply_schema_migrations
 from src.analysis.technical import (
     analyze_portfolio_from_frames,
 )
@@ -62,6 +65,7 @@ from src.analysis.sentiment import fetch_sentiment
 from src.analysis.risk import build_portfolio_risk_report
 from src.analysis.synthesis import SynthesisResult, LayerScore, blend_scores, synthesize_with_llm_local
 from src.analysis.optimizer import run_optimizer
+from src.analysis.stats_cache import load_analysis_stats_cache, save_analysis_stats_cache
 from src.analysis.execution_planner import (
     derive_decision_intents,
     reconcile_funding,
@@ -118,7 +122,6 @@ from src.analysis.risk_levels import compute_risk_levels
 from src.analysis.audit_scope import (
     ART_TZ,
     classify_decision_audit_scope,
-    ensure_decision_audit_scope_columns,
     is_art_business_day,
     is_regular_market_session,
     run_id_to_db,
@@ -130,7 +133,6 @@ from src.analysis.position_hold_audit import (
     persist_position_holds,
 )
 from src.analysis.technical_shadow_v2 import build_technical_shadow_v2
-from src.collector.cocos_history import candles_to_frame
 from src.collector.portfolio_quality import (
     PRICE_STATUS_FRESH,
     is_position_operable,
@@ -1144,7 +1146,6 @@ async def _save_execution_plan_events(
     Importante:
       Esto mide el sistema operativo real, no el optimizer teórico.
     """
-    import asyncpg
     from datetime import datetime, timezone
 
     if not execution_plan:
@@ -1824,11 +1825,8 @@ async def _save_execution_plan_events(
             _json.dumps({"decision_override": getattr(order, "decision_override", None)}),
         )
 
-    conn = await asyncpg.connect(db_url)
-
-    try:
-        await ensure_decision_audit_scope_columns(conn)
-        await ensure_execution_plan_persistence(conn)
+    async with connection(db_url) as conn:
+        await apply_schema_migrations(conn)
         await _persist_execution_plan(conn)
         try:
             hold_saved = await _persist_hold_observations(conn)
@@ -1932,9 +1930,6 @@ async def _save_execution_plan_events(
             if row_id:
                 saved_ids.append(row_id)
 
-    finally:
-        await conn.close()
-
     if not saved_ids:
         logger.info("_save_execution_plan_events: no se guardaron eventos nuevos")
 
@@ -3745,36 +3740,33 @@ def _ensure_corporate_action_blocks_in_plan(
 
 async def _load_cocos_history_frames(cfg, positions: list[dict], limit: int = 260) -> dict:
     """Carga historia local de Cocos desde DB para los tickers disponibles."""
+    asset_types: dict[str, str | None] = {}
+    for position in positions:
+        ticker = str(position.get("ticker", "") or "").upper()
+        if not ticker:
+            continue
+        if not is_position_operable(position):
+            logger.warning(
+                "Ticker %s no operable para técnico: %s",
+                ticker,
+                position.get("market_data_reason", "precio no fresco"),
+            )
+            continue
+        asset_types.setdefault(ticker, position.get("asset_type"))
+    if not asset_types:
+        return {}
+
     frames: dict = {}
     db = PortfolioDatabase(cfg.database.url)
     await db.connect()
     try:
-        semaphore = asyncio.Semaphore(5)
-
-        async def _load_one(position: dict):
-            ticker = str(position.get("ticker", "") or "").upper()
-            if not ticker:
-                return None
-            if not is_position_operable(position):
-                logger.warning(
-                    "Ticker %s no operable para técnico: %s",
-                    ticker,
-                    position.get("market_data_reason", "precio no fresco"),
-                )
-                return None
-            async with semaphore:
-                rows = await db.get_market_candles(
-                    ticker,
-                    asset_type=position.get("asset_type"),
-                    limit=limit,
-                )
-            frame = candles_to_frame(rows)
-            return (ticker, frame) if len(frame) >= 60 else None
-
-        loaded = await asyncio.gather(*(_load_one(position) for position in positions))
-        for item in loaded:
-            if item is not None:
-                ticker, frame = item
+        # Version persistida del ajuste por corporate actions; el frame guard
+        # ve los effects en `attrs` y no los vuelve a aplicar.
+        loaded = await db.get_market_candles_bulk(
+            list(asset_types), asset_types, limit, adjusted=True,
+        )
+        for ticker, frame in loaded.items():
+            if len(frame) >= 60:
                 frames[ticker] = frame
     finally:
         await db.close()
@@ -3981,6 +3973,7 @@ async def main(
 
     # ── 4. Risk ────────────────────────────────────────────────────────────────
     logger.info("Calculando riesgo...")
+    stats_cache = await load_analysis_stats_cache()
     portfolio_risk = build_portfolio_risk_report(
         positions  = positions,
         prices_map = prices_map,
@@ -3988,6 +3981,7 @@ async def main(
         cash_ars   = cash_ars,
         history    = history,
         vix        = macro_snap.vix,
+        stats_cache = stats_cache,
     )
     risk_map = {p["ticker"]: p for p in portfolio_risk.positions}
 
@@ -4318,7 +4312,9 @@ async def main(
             if is_position_operable(p)
             and str(p.get("ticker", "") or "").upper() in tech_map
         ]
-        rebalance_report = run_optimizer(
+        rebalance_report = await run_cpu(
+            "optimizer",
+            run_optimizer,
             current_positions   = optimizer_positions,
             portfolio_value_ars = total_ars,
             cash_ars            = cash_ars,
@@ -4327,9 +4323,17 @@ async def main(
             synthesis_results   = results,
             market_assets       = cocos_universe_assets,
             history_frames       = cocos_frames,
+            warm_start           = await get_optimizer_warm_start(owner_chat_id=owner_chat_id),
+            stats_cache          = stats_cache,
         )
         if rebalance_report:
             opt = rebalance_report.optimization
+            if opt.weights:
+                await cache_optimizer_weights(
+                    opt.weights,
+                    method=opt.actual_engine or opt.method,
+                    owner_chat_id=owner_chat_id,
+                )
             logger.info(
                 f"Optimizer [{opt.method}] gate={rebalance_report.risk_gate_state}: "
                 f"{rebalance_report.n_trades} trades — "
@@ -4338,6 +4342,11 @@ async def main(
             )
     else:
         logger.info("Optimizer omitido")
+    saved_stats = await save_analysis_stats_cache(stats_cache)
+    logger.info(
+        "Stats cache g%d: %d hits, %d misses, %d campos nuevos",
+        stats_cache.generation, stats_cache.hits, stats_cache.misses, saved_stats,
+    )
 
     # ── 9. Execution Plan ──────────────────────────────────────────────────────
     # Convierte el target teórico del optimizer en órdenes ejecutables reales.
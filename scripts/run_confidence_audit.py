@@ -24,6 +24,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.collector.notifier import TelegramNotifier
 from src.core.config import get_config
+from src.core.db_pool import connection
 from src.core.market_calendar import is_trading_day, market_closed_reason
 
 
@@ -84,9 +85,7 @@ async def _table_exists(conn: asyncpg.Connection, table: str) -> bool:
 async def build_confidence_audit(days: int = 180) -> str:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-
-    try:
+    async with connection(dsn) as conn:
         latest_portfolio = await conn.fetchrow(
             """
             SELECT scraped_at, total_value_ars, cash_ars, confidence_score
@@ -120,9 +119,9 @@ async def build_confidence_audit(days: int = 180) -> str:
                 FROM market_prices
             ),
             latest_candle_day AS (
-                SELECT MAX((ts AT TIME ZONE 'UTC')::date) AS day
-                FROM market_candles
-                WHERE source = 'internal_snapshot'
+                SELECT MAX(candle_day) AS day
+                FROM market_candles_canonical
+                WHERE interval = '1d'
             ),
             price_assets AS (
                 SELECT COUNT(DISTINCT ticker) AS n
@@ -130,16 +129,16 @@ async def build_confidence_audit(days: int = 180) -> str:
                 WHERE (ts AT TIME ZONE 'America/Argentina/Buenos_Aires')::date = latest_price_day.day
             ),
             candle_assets AS (
-                SELECT COUNT(DISTINCT ticker) AS n
-                FROM market_candles, latest_price_day
-                WHERE (ts AT TIME ZONE 'UTC')::date = latest_price_day.day
-                  AND source = 'internal_snapshot'
+                SELECT COUNT(*) AS n
+                FROM market_candles_canonical, latest_price_day
+                WHERE interval = '1d'
+                  AND candle_day = latest_price_day.day
             ),
             latest_candle_assets AS (
-                SELECT COUNT(DISTINCT ticker) AS n
-                FROM market_candles, latest_candle_day
-                WHERE (ts AT TIME ZONE 'UTC')::date = latest_candle_day.day
-                  AND source = 'internal_snapshot'
+                SELECT COUNT(*) AS n
+                FROM market_candles_canonical, latest_candle_day
+                WHERE interval = '1d'
+                  AND candle_day = latest_candle_day.day
             )
             SELECT
                 latest_price_day.day AS business_day,
@@ -204,9 +203,6 @@ async def build_confidence_audit(days: int = 180) -> str:
                 "latest_executed_at": row["latest_executed_at"],
             }
 
-    finally:
-        await conn.close()
-
     now = datetime.now(tz=ART)
     trading_day = is_trading_day(now)
     closed_reason = market_closed_reason(now)
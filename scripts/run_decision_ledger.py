@@ -17,28 +17,25 @@ import asyncio
 import os
 import sys
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.analysis.decision_ledger import fetch_decision_ledger, render_decision_ledger
 from src.collector.notifier import TelegramNotifier
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 async def async_main(args: argparse.Namespace) -> int:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         data = await fetch_decision_ledger(
             conn,
             days=args.days,
             match_window_days=args.match_window_days,
             owner_chat_id=args.owner_chat_id,
         )
-    finally:
-        await conn.close()
 
     report = render_decision_ledger(data)
     print(report)
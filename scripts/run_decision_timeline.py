@@ -13,19 +13,18 @@ import json
 import os
 import sys
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.analysis.decision_timeline import fetch_decision_timeline, render_decision_timeline
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 async def async_main(args: argparse.Namespace) -> int:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         data = await fetch_decision_timeline(
             conn,
             days=args.days,
@@ -34,8 +33,6 @@ async def async_main(args: argparse.Namespace) -> int:
             owner_chat_id=args.owner_chat_id,
             limit=args.limit,
         )
-    finally:
-        await conn.close()
 
     if args.json:
         print(json.dumps(data, ensure_ascii=False, indent=2))
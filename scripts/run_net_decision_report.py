@@ -7,7 +7,6 @@ import asyncio
 import os
 import sys
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -19,20 +18,18 @@ from src.analysis.net_decision_report import (
 )
 from src.collector.notifier import TelegramNotifier
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 async def async_main(args: argparse.Namespace) -> int:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         data = await fetch_net_decision_report(
             conn,
             days=args.days,
             owner_chat_id=args.owner_chat_id,
         )
-    finally:
-        await conn.close()
 
     report = render_net_decision_report(data, limit_runs=args.limit_runs)
     print(report)
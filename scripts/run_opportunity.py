@@ -35,9 +35,10 @@ from src.core.config import get_config
 from src.core.logger import get_logger
 from src.core.market_calendar import is_trading_day
 from src.collector.db import PortfolioDatabase
+from src.collector.schema_migrations import apply_schema_migrations
 from src.collector.data.normalizer import is_market_ticker_candidate
 from src.collector.notifier import TelegramNotifier
-from src.collector.cocos_history import candles_to_frame, overlay_compatible_volume
+from src.collector.cocos_history import overlay_compatible_volume
 from src.collector.portfolio_quality import (
     normalize_positions_with_fresh_market_prices,
     price_discrepancy_warnings,
@@ -67,7 +68,6 @@ from src.analysis.manual_market_events import (
 from src.analysis.signal_aggregator import load_sentiment_contexts
 from src.analysis.audit_scope import (
     classify_decision_audit_scope,
-    ensure_decision_audit_scope_columns,
     is_regular_market_session,
     run_id_to_db,
 )
@@ -301,39 +301,38 @@ async def _load_cocos_history_frames(
     volume_overlay_max_close_difference: float = 0.05,
 ) -> dict:
     frames: dict = {}
+    tickers = [asset["ticker"] for asset in assets]
+    asset_types = {asset["ticker"]: asset.get("asset_type") for asset in assets}
     db = PortfolioDatabase(cfg.database.url)
     await db.connect()
     try:
-        semaphore = asyncio.Semaphore(5)
-
-        async def _load_one(asset: dict):
-            async with semaphore:
-                rows = await db.get_market_candles(
-                    asset["ticker"],
-                    asset_type=asset.get("asset_type"),
-                    limit=limit,
+        loaded = await db.get_market_candles_bulk(tickers, asset_types, limit, adjusted=True)
+        volume_frames: dict = {}
+        if volume_overlay_source:
+            overlay_tickers = [
+                ticker
+                for ticker, frame in loaded.items()
+                if not frame.empty
+            ]
+            if overlay_tickers:
+                volume_frames = await db.get_market_candles_bulk(
+                    overlay_tickers,
+                    asset_types,
+                    limit,
+                    source=volume_overlay_source,
                 )
-            frame = candles_to_frame(rows)
+        for ticker in tickers:
+            frame = loaded.get(str(ticker).upper())
+            if frame is None:
+                continue
             if volume_overlay_source and not frame.empty:
-                async with semaphore:
-                    volume_rows = await db.get_market_candles(
-                        asset["ticker"],
-                        asset_type=asset.get("asset_type"),
-                        source=volume_overlay_source,
-                        limit=limit,
-                    )
                 frame = overlay_compatible_volume(
                     frame,
-                    candles_to_frame(volume_rows),
+                    volume_frames.get(str(ticker).upper()),
                     source=volume_overlay_source,
                     max_close_difference=volume_overlay_max_close_difference,
                 )
-            return (asset["ticker"], frame) if len(frame) >= 60 else None
-
-        loaded = await asyncio.gather(*(_load_one(asset) for asset in assets))
-        for item in loaded:
-            if item is not None:
-                ticker, frame = item
+            if len(frame) >= 60:
                 frames[ticker] = frame
         if frames and hasattr(db, "get_market_price_samples"):
             samples = await db.get_market_price_samples(list(frames))
@@ -604,7 +603,7 @@ async def _save_radar_candidates(
     try:
         pool = await db.get_pool()
         async with pool.acquire() as conn:
-            await ensure_decision_audit_scope_columns(conn)
+            await apply_schema_migrations(conn)
             for candidate in candidates:
                 ticker = str(candidate.ticker or "").upper().strip()
                 if not ticker:
@@ -41,6 +41,7 @@ from src.analysis.plan_follow_reporting import (
 )
 from src.collector.notifier import TelegramNotifier
 from src.core.config import get_config
+from src.core.db_pool import connection
 from src.core.telegram_format import (
     header as tg_header,
     note as tg_note,
@@ -798,27 +799,43 @@ def render_report(
 async def async_main(args: argparse.Namespace) -> int:
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    activity_context = {}
-    inferred_activity = []
-    attribution_data = {}
-    try:
-        rows, manual_only = await _fetch_audit_rows(
-            conn,
-            days=args.days,
-            match_window_days=args.match_window_days,
-            owner_chat_id=args.owner_chat_id,
-        )
-        activity_context = await _fetch_activity_context(conn)
-        inferred_activity = await fetch_inferred_activity(conn, days=min(args.days, 7))
-        await mark_inferred_activity_types(conn, inferred_activity)
-        attribution_data = await fetch_plan_follow_reporting_data(
-            conn,
-            days=args.days,
-            owner_chat_id=args.owner_chat_id,
+
+    async def _audit_rows():
+        async with connection(dsn) as conn:
+            return await _fetch_audit_rows(
+                conn,
+                days=args.days,
+                match_window_days=args.match_window_days,
+                owner_chat_id=args.owner_chat_id,
+            )
+
+    async def _activity_context():
+        async with connection(dsn) as conn:
+            return await _fetch_activity_context(conn)
+
+    async def _inferred_activity():
+        async with connection(dsn) as conn:
+            inferred = await fetch_inferred_activity(conn, days=min(args.days, 7))
+            await mark_inferred_activity_types(conn, inferred)
+            return inferred
+
+    async def _attribution_data():
+        async with connection(dsn) as conn:
+            return await fetch_plan_follow_reporting_data(
+                conn,
+                days=args.days,
+                owner_chat_id=args.owner_chat_id,
+            )
+
+    # Lecturas independientes: cada una usa su propia conexión del pool.
+    (rows, manual_only), activity_context, inferred_activity, attribution_data = (
+        await asyncio.gather(
+            _audit_rows(),
+            _activity_context(),
+            _inferred_activity(),
+            _attribution_data(),
         )
-    finally:
-        await conn.close()
+    )
 
     report = render_report(
         rows,
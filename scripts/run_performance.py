@@ -371,7 +371,9 @@ async def _get_operational_context(db: PortfolioDatabase) -> dict:
         return {}
 
     async with pool.acquire() as conn:
-        latest_candle_day = await conn.fetchval("SELECT MAX(ts::date) FROM market_candles")
+        latest_candle_day = await conn.fetchval(
+            "SELECT MAX(candle_day) FROM market_candles_canonical WHERE interval = '1d'"
+        )
         latest_market_ts = await conn.fetchval("SELECT MAX(ts) FROM market_prices")
         latest_portfolio_ts = await conn.fetchval("SELECT MAX(scraped_at) FROM portfolio_snapshots")
         position_signatures_today = await conn.fetchval(
@@ -20,7 +20,6 @@ from zoneinfo import ZoneInfo
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.analysis.audit_scope import ensure_decision_audit_scope_columns
 from src.collector.db import PortfolioDatabase
 from src.core.config import get_config
 from src.core.telegram_format import validate_telegram_html
@@ -244,7 +243,6 @@ async def _fetch_latest_policy_rows(days: int, limit: int, owner_chat_id: int |
         if pool is None:
             return []
         async with pool.acquire() as conn:
-            await ensure_decision_audit_scope_columns(conn)
             latest_run_id = await conn.fetchval(
                 """
                 SELECT run_id
@@ -16,6 +16,8 @@ from src.analysis.nlp_scorer import DEFAULT_MODEL, DEFAULT_OLLAMA_URL, score_pen
 from src.analysis.sentiment_fetcher import (
     fetch_raw_sentiment_items,
     load_active_portfolio_tickers,
+    load_feed_states,
+    save_feed_states,
     save_raw_sentiment_items,
 )
 from src.analysis.signal_aggregator import aggregate_sentiment
@@ -63,12 +65,15 @@ async def main(
             if fetch:
                 active_tickers = await load_active_portfolio_tickers(conn)
                 result["yahoo_tickers"] = len(active_tickers)
+                feed_states = await load_feed_states()
                 items = await fetch_raw_sentiment_items(
                     tickers=active_tickers,
                     max_items_per_source=max_items_per_source,
+                    feed_states=feed_states,
                 )
                 result["raw_items"] = len(items)
                 result["raw_saved"] = await save_raw_sentiment_items(conn, items)
+                await save_feed_states(feed_states)
                 logger.info("sentiment fetch: %s items saved=%s", len(items), result["raw_saved"])
 
             if score:
@@ -37,6 +37,7 @@ from src.analysis.corporate_actions import (
 )
 from src.analysis.signal_aggregator import load_sentiment_contexts
 from src.analysis.thesis_shadow_store import ShadowThesisStore
+from src.collector.candle_store import open_candle_reader
 from src.collector.db import PortfolioDatabase
 from src.core.config import get_config
 from src.core.logger import get_logger
@@ -225,6 +226,7 @@ async def _build_theses(
             ticker,
             asset_type=metadata.get("asset_type") or None,
             limit=HISTORY_LIMIT,
+            adjusted=True,
         )
         effects = await db.get_corporate_action_effects(tickers=[ticker])
         rows = normalize_candle_rows(rows, effects)
@@ -292,7 +294,7 @@ async def _mature_pending_outcomes(
 
     filled = 0
     for ticker, forecasts in grouped.items():
-        candles = await db.get_market_candles(ticker, limit=OUTCOME_HISTORY_LIMIT)
+        candles = await db.get_market_candles(ticker, limit=OUTCOME_HISTORY_LIMIT, adjusted=True)
         effects = await db.get_corporate_action_effects(tickers=[ticker])
         candles = normalize_candle_rows(candles, effects)
         latest_ts = candles[-1]["ts"] if candles else datetime.now(timezone.utc)
@@ -357,17 +359,19 @@ async def main(args: argparse.Namespace) -> int:
         )
         positions = _current_position_tickers((snapshot or {}).get("positions", []))
         cash_ars = float((snapshot or {}).get("cash_ars", 0) or 0)
+        # Velas desde el cache columnar local; el resto de las lecturas va a la base.
+        candle_db = await open_candle_reader(db)
 
         matured = 0
         if not args.no_outcomes and not args.no_persist:
             matured = await _mature_pending_outcomes(
-                db,
+                candle_db,
                 store,
                 owner_chat_id=owner_chat_id,
             )
 
         theses, skipped = await _build_theses(
-            db,
+            candle_db,
             positions=positions,
             cash_ars=cash_ars,
             include_candidates=not args.positions_only,
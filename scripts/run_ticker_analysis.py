@@ -25,6 +25,7 @@ from src.analysis.ticker_technical_report import (
     render_ticker_telegram_report,
 )
 from src.collector.db import PortfolioDatabase
+from src.core.compute_executor import run_cpu
 from src.core.config import get_config
 from src.core.logger import get_logger
 
@@ -66,7 +67,13 @@ async def main_async() -> int:
         await db.close()
 
     if args.chart_out:
-        for chart_path in render_ticker_technical_charts(report, args.chart_out):
+        chart_paths = await run_cpu(
+            "ticker_charts",
+            render_ticker_technical_charts,
+            report,
+            args.chart_out,
+        )
+        for chart_path in chart_paths:
             print(f"[chart] {chart_path}")
 
     print(render_ticker_telegram_report(report))
@@ -16,7 +16,6 @@ import sys
 import tempfile
 from pathlib import Path
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -28,7 +27,9 @@ from src.analysis.viability_audit import (  # noqa: E402
 )
 from src.collector.notifier import TelegramNotifier  # noqa: E402
 from src.analysis.plan_follow_attribution import sync_plan_execution_attributions  # noqa: E402
+from src.core.compute_executor import run_cpu  # noqa: E402
 from src.core.config import get_config  # noqa: E402
+from src.core.db_pool import connection  # noqa: E402
 from src.core.logger import get_logger  # noqa: E402
 from src.core.telegram_format import validate_telegram_html  # noqa: E402
 
@@ -48,11 +49,8 @@ async def main() -> None:
 
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         await sync_plan_execution_attributions(conn, days=args.days)
-    finally:
-        await conn.close()
 
     report = await run_viability_audit(
         ViabilityAuditConfig(
@@ -67,11 +65,11 @@ async def main() -> None:
     chart_path: Path | None = None
     cleanup_chart = False
     if args.chart_out:
-        chart_path = render_viability_chart(report, args.chart_out)
+        chart_path = await run_cpu("viability_chart", render_viability_chart, report, args.chart_out)
     elif not args.no_telegram:
         tmp = tempfile.NamedTemporaryFile(prefix="cocos_viability_", suffix=".png", delete=False)
         tmp.close()
-        chart_path = render_viability_chart(report, tmp.name)
+        chart_path = await run_cpu("viability_chart", render_viability_chart, report, tmp.name)
         cleanup_chart = True
 
     validate_telegram_html(text)
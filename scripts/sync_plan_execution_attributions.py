@@ -7,37 +7,41 @@ import asyncio
 import os
 import sys
 
-import asyncpg
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.analysis.plan_follow_attribution import sync_plan_execution_attributions  # noqa: E402
 from src.core.config import get_config  # noqa: E402
+from src.core.db_pool import connection  # noqa: E402
 
 
 async def main() -> None:
     parser = argparse.ArgumentParser(description="Persist normalized followed-plan links")
     parser.add_argument("--days", type=int, default=180)
     parser.add_argument("--match-window-sessions", type=int, default=2)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-attribute ticker/side pairs touched since the last sync watermark",
+    )
     args = parser.parse_args()
 
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         summary = await sync_plan_execution_attributions(
             conn,
             days=args.days,
             match_window_sessions=args.match_window_sessions,
+            incremental=args.incremental,
         )
-    finally:
-        await conn.close()
 
     print(
         "Plan follow sync: "
         f"plans={summary['plans']} movements={summary['movements']} "
         f"attributions={summary['attributions']} eligible={summary['eligible']} "
-        f"ambiguous={summary['ambiguous']}"
+        f"ambiguous={summary['ambiguous']} incremental={summary['incremental']} "
+        f"outcomes_refreshed={summary['outcomes_refreshed']}"
     )
 
 
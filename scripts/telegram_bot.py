@@ -71,6 +71,7 @@ try:
         save_report_artifact,
     )
     from src.core.redis_client import client as redis_client
+    from src.core.script_worker import WarmScriptPool
     from src.collector.cocos_scraper import CocosCapitalScraper
     from src.collector.db import PortfolioDatabase
 except Exception:
@@ -86,6 +87,7 @@ except Exception:
     load_report_artifact = None
     save_report_artifact = None
     redis_client = None
+    WarmScriptPool = None
     CocosCapitalScraper = None
     PortfolioDatabase = None
 
@@ -120,6 +122,8 @@ RADAR_MANUAL_EXPLORATORY_ENABLED = os.getenv(
 
 MAX_MESSAGE_LENGTH = 3900
 COMMAND_TIMEOUT_SECONDS = 300
+# Workers que mantienen pandas/scipy/etc. importados; 0 vuelve a subprocess puro.
+WARM_SCRIPT_WORKERS = max(0, int(os.getenv("TELEGRAM_WARM_SCRIPT_WORKERS", "2")))
 
 REGRESSION_MODES = {"optimizer", "execution", "blocked", "signal", "all"}
 DEFAULT_REGRESSION_MODE = "execution"
@@ -541,12 +545,44 @@ async def _delete_incoming_message(update: Update) -> None:
 # Subprocess helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+_warm_script_pool = None
+
+
+def _get_warm_script_pool():
+    global _warm_script_pool
+    if WarmScriptPool is None or WARM_SCRIPT_WORKERS <= 0:
+        return None
+    if _warm_script_pool is None:
+        _warm_script_pool = WarmScriptPool(WARM_SCRIPT_WORKERS, cwd=PROJECT_ROOT)
+    return _warm_script_pool
+
+
+def _warm_script_invocation(args: list[str]) -> bool:
+    return len(args) >= 2 and args[0] == sys.executable and args[1].endswith(".py")
+
+
 async def run_cmd(
     args: list[str],
     timeout: int = COMMAND_TIMEOUT_SECONDS,
 ) -> tuple[int, str, str, float]:
     t0 = time.time()
     logger.info("[CMD] %s", " ".join(shlex.quote(a) for a in args))
+    pool = _get_warm_script_pool() if _warm_script_invocation(args) else None
+    if pool is not None:
+        run = await pool.run(args[1], args[2:], timeout=timeout)
+        if run is not None:
+            elapsed = time.time() - t0
+            if run.crashed:
+                # El script ya corrió (parcial o totalmente): repetirlo en
+                # subprocess duplicaría escrituras y mensajes.
+                logger.warning("[CMD] corrida en worker caliente terminó con crash; no se reintenta")
+            logger.info("[CMD] rc=%s en %.2fs (worker caliente)", run.returncode, elapsed)
+            if run.stderr and run.returncode != 0:
+                logger.warning("[CMD][stderr]\n%s", run.stderr[-2000:])
+            return run.returncode, run.stdout.strip()[-20_000:], run.stderr.strip()[-20_000:], elapsed
+        logger.warning("[CMD] worker caliente no aceptó el request; reintento aislado en subprocess")
+        timeout = max(1, int(timeout - (time.time() - t0)))
+
     proc = await asyncio.create_subprocess_exec(
         *args,
         cwd=str(PROJECT_ROOT),
@@ -3416,7 +3452,22 @@ async def bot_heartbeat_loop(_app: Application) -> None:
         await asyncio.sleep(30)
 
 
+async def _run_schema_migrations() -> None:
+    """Fase de arranque: los handlers del bot no emiten DDL despues de esto."""
+    db = PortfolioDatabase(get_config().database.url)
+    try:
+        await db.connect()
+        await db.run_schema_migrations()
+    except Exception as exc:
+        logger.warning("[BOT] Schema migrations no aplicadas al arranque: %s", exc)
+    finally:
+        await db.close()
+
+
 async def post_init(app: Application) -> None:
+    if get_config and PortfolioDatabase:
+        await _run_schema_migrations()
+
     try:
         from telegram import BotCommand, MenuButtonCommands
 
@@ -3431,12 +3482,20 @@ async def post_init(app: Application) -> None:
         bot_heartbeat_loop(app),
         name="bot_heartbeat",
     )
+    pool = _get_warm_script_pool()
+    if pool is not None:
+        app.bot_data["warm_script_pool_task"] = asyncio.create_task(
+            pool.start(),
+            name="warm_script_pool",
+        )
 
 
 async def post_shutdown(app: Application) -> None:
     task = app.bot_data.get("heartbeat_task")
     if task:
         task.cancel()
+    if _warm_script_pool is not None:
+        await _warm_script_pool.close()
 
 
 def build_app() -> Application:
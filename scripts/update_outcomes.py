@@ -130,11 +130,14 @@ async def main(
             try:
                 from src.analysis.radar_discovery import RadarDiscoveryStore
 
+                from src.collector.candle_store import open_candle_reader
+
                 pool = await db.get_pool()
                 discovery_store = RadarDiscoveryStore(pool)
-                discovery_updated = await discovery_store.resolve_pending_outcomes(db)
-                setup_events_updated = await discovery_store.resolve_pending_setup_events(db)
-                setup_outcomes_updated = await discovery_store.resolve_pending_setup_outcomes(db)
+                candle_db = await open_candle_reader(db)
+                discovery_updated = await discovery_store.resolve_pending_outcomes(candle_db)
+                setup_events_updated = await discovery_store.resolve_pending_setup_events(candle_db)
+                setup_outcomes_updated = await discovery_store.resolve_pending_setup_outcomes(candle_db)
                 logger.info("%s outcomes Radar Discovery actualizados", discovery_updated)
                 logger.info(
                     "%s eventos y %s outcomes Radar Setup actualizados",
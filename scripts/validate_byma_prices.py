@@ -28,6 +28,7 @@ from playwright.async_api import Browser, BrowserContext, Page, async_playwright
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.config import get_config
+from src.core.db_pool import connection
 
 
 ART = ZoneInfo("America/Argentina/Buenos_Aires")
@@ -302,11 +303,8 @@ async def run(
     cfg = get_config()
     dsn = cfg.database.url.replace("postgresql+asyncpg://", "postgresql://")
 
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         db_prices = await fetch_latest_prices(conn, asset_type, tickers, limit)
-    finally:
-        await conn.close()
 
     if not db_prices:
         print("No market_prices rows found for the selected filters.")
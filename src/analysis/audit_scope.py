@@ -5,6 +5,8 @@ from typing import Any
 from uuid import UUID
 from zoneinfo import ZoneInfo
 
+from src.collector.schema_migrations import MIGRATION_DECISION_AUDIT_SCOPE, schema_ready
+
 ART_TZ_NAME = "America/Argentina/Buenos_Aires"
 ART_TZ = ZoneInfo(ART_TZ_NAME)
 
@@ -231,7 +233,7 @@ def classify_decision_audit_scope(
 
 async def ensure_decision_audit_scope_columns(conn) -> None:
     global _MIGRATION_DONE
-    if _MIGRATION_DONE:
+    if _MIGRATION_DONE or schema_ready(MIGRATION_DECISION_AUDIT_SCOPE):
         return
     await conn.execute(DECISION_AUDIT_SCOPE_MIGRATION_SQL)
     _MIGRATION_DONE = True
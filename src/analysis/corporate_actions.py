@@ -6,6 +6,8 @@ It does not change model scores or trading thresholds.
 """
 from __future__ import annotations
 
+from collections import OrderedDict
+import copy
 from dataclasses import dataclass, field, replace
 from datetime import date, datetime, time, timedelta, timezone
 from enum import Enum
@@ -16,6 +18,8 @@ import math
 from typing import Any, Iterable, Mapping, Sequence
 from zoneinfo import ZoneInfo
 
+import numpy as np
+
 from src.core.market_calendar import is_trading_day
 
 
@@ -198,6 +202,43 @@ CREATE INDEX IF NOT EXISTS idx_price_quality_flags_active
 
 CREATE INDEX IF NOT EXISTS idx_corporate_applications_event
     ON corporate_event_applications (event_id, instrument_effect_id, component);
+
+-- Adjusted candles are persisted as versioned factor steps over
+-- market_candles_canonical: adjusted = raw * product(step factors whose
+-- transition_day is after the candle day). Version 0 is the raw series.
+CREATE TABLE IF NOT EXISTS corporate_adjustment_versions (
+    id              BIGSERIAL PRIMARY KEY,
+    ticker          TEXT NOT NULL,
+    interval        TEXT NOT NULL,
+    version         INTEGER NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'CURRENT',
+    signature       TEXT NOT NULL,
+    blocking_reason TEXT,
+    reason          TEXT NOT NULL,
+    candle_count    INTEGER NOT NULL DEFAULT 0,
+    last_candle_day DATE,
+    built_at        TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    superseded_at   TIMESTAMPTZ,
+    UNIQUE (ticker, interval, version),
+    CHECK (version > 0),
+    CHECK (status IN ('CURRENT', 'SUPERSEDED'))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_corporate_adjustment_versions_current
+    ON corporate_adjustment_versions (ticker, interval)
+    WHERE status = 'CURRENT';
+
+CREATE TABLE IF NOT EXISTS corporate_adjustment_steps (
+    version_id           BIGINT NOT NULL REFERENCES corporate_adjustment_versions(id) ON DELETE CASCADE,
+    instrument_effect_id BIGINT NOT NULL,
+    event_id             BIGINT NOT NULL,
+    effective_at         TIMESTAMPTZ NOT NULL,
+    application_status   TEXT NOT NULL,
+    transition_day       DATE,
+    price_factor         NUMERIC(24,12) NOT NULL,
+    volume_factor        NUMERIC(24,12) NOT NULL,
+    PRIMARY KEY (version_id, instrument_effect_id)
+);
 """
 
 
@@ -830,22 +871,78 @@ def _frame_date(value: Any) -> date:
     return parsed.date()
 
 
-def normalize_frame_for_effects(
+_EPOCH_DAY = date(1970, 1, 1)
+ADJUSTMENT_CACHE_SIZE = 2048
+# (ticker, effects, effect ids already applied, UTC days + closes) -> _FrameAdjustment
+_ADJUSTMENT_CACHE: "OrderedDict[tuple, _FrameAdjustment]" = OrderedDict()
+
+
+@dataclass(frozen=True)
+class _FrameAdjustment:
+    price_factors: np.ndarray
+    volume_factors: np.ndarray
+    applications: tuple[CorporateActionApplication, ...]
+    blocking_reason: str | None
+    applied_effect_ids: tuple[int, ...]
+
+
+def _frame_day_numbers(index: Any) -> np.ndarray:
+    """UTC session day of every row as days since epoch (same rule as `_frame_date`)."""
+    import pandas as pd
+
+    if isinstance(index, pd.DatetimeIndex):
+        utc = index.tz_convert("UTC") if index.tz is not None else index.tz_localize(ART_TZ).tz_convert("UTC")
+        return utc.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+    return np.array([(_frame_date(value) - _EPOCH_DAY).days for value in index], dtype=np.int64)
+
+
+def _day_from_number(value: int) -> date:
+    return _EPOCH_DAY + timedelta(days=int(value))
+
+
+def _effect_cache_signature(
+    effect: CorporateActionEffect,
+    observed_utc: datetime | None,
+) -> tuple:
+    return (
+        effect.effect_id,
+        effect.event_key,
+        effect.lifecycle_status,
+        effect.effective_at.isoformat(),
+        effect.quantity_factor,
+        effect.price_factor,
+        effect.cost_basis_factor,
+        # No observed_at is not the same as observing after the effect: effects
+        # past the last frame day are only skipped without observed_at.
+        observed_utc is None,
+        observed_utc is not None and effect.effective_at <= observed_utc,
+    )
+
+
+def _compute_frame_adjustment(
     ticker: str,
-    frame: Any,
+    days: np.ndarray,
+    closes: np.ndarray,
     effects: Sequence[CorporateActionEffect],
-    *,
-    observed_at: datetime | None = None,
-) -> tuple[Any, list[CorporateActionApplication], str | None]:
-    if frame is None or len(frame) < 2 or not effects:
-        return frame, [], None
-
-    normalized = frame.copy(deep=True)
-    normalized.attrs = dict(getattr(frame, "attrs", {}))
-    applied_effect_ids = set(normalized.attrs.get("corporate_action_effect_ids", ()))
+    applied_effect_ids: set[int],
+    observed_utc: datetime | None,
+) -> _FrameAdjustment:
+    """
+    Walk the confirmed effects once over the day/close arrays and return the
+    cumulative per-row factors plus the audit records. Closes seen by later
+    effects already include the factors of earlier ones.
+    """
+    rows = len(days)
+    price_factors = np.ones(rows)
+    volume_factors = np.ones(rows)
+    applied_effect_ids = set(applied_effect_ids)
     applications: list[CorporateActionApplication] = []
     blocking_reason = None
-    observed_utc = _as_utc(observed_at)
+    last_frame_day = int(days.max())
+    positions = np.arange(rows)
+
+    def adjusted_close(position: int) -> float:
+        return float(closes[position] * price_factors[position])
 
     for effect in sorted(effects, key=lambda item: (item.effective_at, item.effect_id)):
         if effect.lifecycle_status not in {
@@ -855,9 +952,8 @@ def normalize_frame_for_effects(
             continue
         if effect.effect_id in applied_effect_ids:
             continue
-        effective_day = effect.effective_at.astimezone(ART_TZ).date()
-        frame_days = [_frame_date(value) for value in normalized.index]
-        last_frame_day = max(frame_days)
+        effective_date = effect.effective_at.astimezone(ART_TZ).date()
+        effective_day = (effective_date - _EPOCH_DAY).days
         if (
             abs(effect.quantity_factor - 1.0) <= 1e-12
             and abs(effect.price_factor - 1.0) <= 1e-12
@@ -878,7 +974,7 @@ def normalize_frame_for_effects(
                         DETECTOR_VERSION,
                         effect.effect_id,
                         "MARKET_CANDLES_FRAME",
-                        effect.effective_at.astimezone(ART_TZ).date().isoformat(),
+                        effective_date.isoformat(),
                     ),
                     before_state={"identity_transform": True},
                     after_state={"rows_adjusted": 0},
@@ -891,24 +987,23 @@ def normalize_frame_for_effects(
             applied_effect_ids.add(effect.effect_id)
             continue
 
-        transition_candidates: list[tuple[int, int, float]] = []
-        for idx in range(1, len(normalized)):
-            if abs((frame_days[idx] - effective_day).days) > 3:
-                continue
-            previous_close = float(normalized.iloc[idx - 1]["Close"])
-            current_close = float(normalized.iloc[idx]["Close"])
-            observed = current_close / previous_close if previous_close > 0 else 0.0
-            error = _relative_error(observed, effect.price_factor)
-            if error <= OFFICIAL_RATIO_RELATIVE_TOLERANCE:
-                transition_candidates.append(
-                    (abs((frame_days[idx] - effective_day).days), idx, error)
-                )
-
+        # Candidate transitions: rows within 3 days of the effective day whose
+        # close/previous close matches the official factor.
+        window = positions[1:][np.abs(days[1:] - effective_day) <= 3]
         transition_position = None
-        if transition_candidates and (
-            observed_utc is None or effect.effective_at <= observed_utc
-        ):
-            transition_position = min(transition_candidates)[1]
+        if len(window) and (observed_utc is None or effect.effective_at <= observed_utc):
+            previous = closes[window - 1] * price_factors[window - 1]
+            current = closes[window] * price_factors[window]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                observed = np.where(previous > 0, current / previous, 0.0)
+            if effect.price_factor == 0:
+                errors = np.full(len(window), np.inf)
+            else:
+                errors = np.abs(observed / effect.price_factor - 1.0)
+            matches = errors <= OFFICIAL_RATIO_RELATIVE_TOLERANCE
+            if matches.any():
+                distance = np.abs(days[window] - effective_day)[matches]
+                transition_position = int(window[matches][np.lexsort((window[matches], distance))[0]])
 
         if transition_position is None and effective_day > last_frame_day:
             if observed_utc is not None and effect.effective_at <= observed_utc:
@@ -926,12 +1021,12 @@ def normalize_frame_for_effects(
                             DETECTOR_VERSION,
                             effect.effect_id,
                             "MARKET_CANDLES_FRAME_PENDING",
-                            effective_day.isoformat(),
+                            effective_date.isoformat(),
                         ),
                         before_state={
                             "ticker": ticker.upper(),
-                            "last_frame_day": last_frame_day.isoformat(),
-                            "effective_day": effective_day.isoformat(),
+                            "last_frame_day": _day_from_number(last_frame_day).isoformat(),
+                            "effective_day": effective_date.isoformat(),
                         },
                         after_state={"rows_adjusted": 0},
                         invariant_checks={
@@ -944,22 +1039,22 @@ def normalize_frame_for_effects(
                 break
             continue
 
-        post_positions = [idx for idx, day in enumerate(frame_days) if day >= effective_day]
-        if not post_positions or post_positions[0] == 0:
+        post_positions = np.flatnonzero(days >= effective_day)
+        if not len(post_positions) or post_positions[0] == 0:
             if transition_position is None:
                 continue
 
-        post_position = transition_position or post_positions[0]
+        post_position = transition_position or int(post_positions[0])
         pre_position = post_position - 1
-        transition_day = frame_days[post_position]
-        pre_close = float(normalized.iloc[pre_position]["Close"])
-        post_close = float(normalized.iloc[post_position]["Close"])
+        transition_day = int(days[post_position])
+        pre_close = adjusted_close(pre_position)
+        post_close = adjusted_close(post_position)
         observed_factor = post_close / pre_close if pre_close > 0 else 0.0
         ratio_error = _relative_error(observed_factor, effect.price_factor)
         before_state = {
             "ticker": ticker.upper(),
-            "effective_day": effective_day.isoformat(),
-            "transition_day": transition_day.isoformat(),
+            "effective_day": effective_date.isoformat(),
+            "transition_day": _day_from_number(transition_day).isoformat(),
             "pre_close": pre_close,
             "post_close": post_close,
             "observed_price_factor": observed_factor,
@@ -967,17 +1062,11 @@ def normalize_frame_for_effects(
         }
 
         if ratio_error <= OFFICIAL_RATIO_RELATIVE_TOLERANCE:
-            pre_mask = [day < transition_day for day in frame_days]
-            for column in ("Open", "High", "Low", "Close"):
-                normalized.loc[pre_mask, column] = (
-                    normalized.loc[pre_mask, column].astype(float) * effect.price_factor
-                )
-            if "Volume" in normalized.columns:
-                normalized.loc[pre_mask, "Volume"] = (
-                    normalized.loc[pre_mask, "Volume"].astype(float) * effect.quantity_factor
-                )
+            pre_mask = days < transition_day
+            price_factors[pre_mask] *= effect.price_factor
+            volume_factors[pre_mask] *= effect.quantity_factor
             status = CorporateApplicationStatus.APPLIED.value
-            after_pre_close = float(normalized.iloc[pre_position]["Close"])
+            after_pre_close = adjusted_close(pre_position)
             normalized_gap = (post_close / after_pre_close) - 1.0 if after_pre_close > 0 else None
             invariant_checks = {
                 "normalized_gap": normalized_gap,
@@ -987,7 +1076,7 @@ def normalize_frame_for_effects(
             after_state = {
                 "normalized_pre_close": after_pre_close,
                 "post_close": post_close,
-                "rows_adjusted": int(sum(pre_mask)),
+                "rows_adjusted": int(pre_mask.sum()),
             }
         elif abs(observed_factor - 1.0) < MIN_ANOMALY_RETURN:
             status = CorporateApplicationStatus.ALREADY_ADJUSTED.value
@@ -1021,7 +1110,7 @@ def normalize_frame_for_effects(
                     DETECTOR_VERSION,
                     effect.effect_id,
                     "MARKET_CANDLES_FRAME",
-                    effective_day.isoformat(),
+                    effective_date.isoformat(),
                 ),
                 before_state=before_state,
                 after_state=after_state,
@@ -1035,11 +1124,284 @@ def normalize_frame_for_effects(
         }:
             applied_effect_ids.add(effect.effect_id)
 
-    normalized.attrs["corporate_action_effect_ids"] = tuple(sorted(applied_effect_ids))
+    return _FrameAdjustment(
+        price_factors=price_factors,
+        volume_factors=volume_factors,
+        applications=tuple(applications),
+        blocking_reason=blocking_reason,
+        applied_effect_ids=tuple(sorted(applied_effect_ids)),
+    )
+
+
+def normalize_frame_for_effects(
+    ticker: str,
+    frame: Any,
+    effects: Sequence[CorporateActionEffect],
+    *,
+    observed_at: datetime | None = None,
+) -> tuple[Any, list[CorporateActionApplication], str | None]:
+    if frame is None or len(frame) < 2 or not effects:
+        return frame, [], None
+
+    observed_utc = _as_utc(observed_at)
+    previously_applied = tuple(sorted(frame.attrs.get("corporate_action_effect_ids", ())))
+    days = _frame_day_numbers(frame.index)
+    closes = frame["Close"].to_numpy(dtype=float)
+
+    # The adjustment only depends on these inputs, so it is memoized per
+    # (ticker, effects, candle days + closes) across guard calls.
+    cache_key = (
+        ticker.upper(),
+        tuple(sorted(_effect_cache_signature(effect, observed_utc) for effect in effects)),
+        previously_applied,
+        hashlib.sha1(days.tobytes() + closes.tobytes()).hexdigest(),
+    )
+    adjustment = _ADJUSTMENT_CACHE.get(cache_key)
+    if adjustment is None:
+        adjustment = _compute_frame_adjustment(
+            ticker, days, closes, effects, set(previously_applied), observed_utc,
+        )
+        _ADJUSTMENT_CACHE[cache_key] = adjustment
+        if len(_ADJUSTMENT_CACHE) > ADJUSTMENT_CACHE_SIZE:
+            _ADJUSTMENT_CACHE.popitem(last=False)
+    else:
+        _ADJUSTMENT_CACHE.move_to_end(cache_key)
+
+    normalized = frame.copy(deep=True)
+    normalized.attrs = dict(getattr(frame, "attrs", {}))
+    if (adjustment.price_factors != 1.0).any():
+        price_columns = ["Open", "High", "Low", "Close"]
+        normalized[price_columns] = (
+            normalized[price_columns].to_numpy(dtype=float) * adjustment.price_factors[:, None]
+        )
+    if "Volume" in normalized.columns and (adjustment.volume_factors != 1.0).any():
+        normalized["Volume"] = normalized["Volume"].astype(float) * adjustment.volume_factors
+
+    normalized.attrs["corporate_action_effect_ids"] = adjustment.applied_effect_ids
     normalized.attrs["price_basis"] = (
-        "corporate_action_adjusted" if applied_effect_ids else normalized.attrs.get("price_basis", "raw")
+        "corporate_action_adjusted"
+        if adjustment.applied_effect_ids
+        else normalized.attrs.get("price_basis", "raw")
+    )
+    # Callers get their own copies; the cached records' state dicts stay intact.
+    applications = [copy.deepcopy(application) for application in adjustment.applications]
+    return normalized, applications, adjustment.blocking_reason
+
+
+CANDLE_ADJUSTMENT_COMPONENT = "MARKET_CANDLES_ADJUSTED"
+_RESOLVED_APPLICATION_STATUSES = {
+    CorporateApplicationStatus.APPLIED.value,
+    CorporateApplicationStatus.ALREADY_ADJUSTED.value,
+}
+
+
+@dataclass(frozen=True)
+class CandleAdjustmentStep:
+    """One confirmed effect inside a persisted candle adjustment version.
+
+    Only APPLIED steps carry a `transition_day` and rescale candles; every
+    step (already-adjusted vendor data included) rebases reference prices.
+    """
+
+    effect_id: int
+    event_id: int
+    effective_at: datetime
+    application_status: str
+    price_factor: float
+    volume_factor: float
+    transition_day: date | None = None
+
+    def to_record(self) -> tuple:
+        return (
+            self.effect_id,
+            self.event_id,
+            self.effective_at.isoformat(),
+            self.application_status,
+            self.transition_day.isoformat() if self.transition_day else None,
+            round(self.price_factor, 12),
+            round(self.volume_factor, 12),
+        )
+
+
+@dataclass(frozen=True)
+class CandleAdjustment:
+    """Versioned adjustment of one ticker's canonical candles (version 0 = raw)."""
+
+    ticker: str
+    steps: tuple[CandleAdjustmentStep, ...] = ()
+    version: int = 0
+    signature: str = ""
+    status: str = "CURRENT"
+    blocking_reason: str | None = None
+    reason: str = ""
+    built_at: datetime | None = None
+    candle_count: int = 0
+    last_candle_day: date | None = None
+    applications: tuple[CorporateActionApplication, ...] = ()
+
+    @property
+    def applied_effect_ids(self) -> tuple[int, ...]:
+        return tuple(sorted(
+            step.effect_id
+            for step in self.steps
+            if step.application_status in _RESOLVED_APPLICATION_STATUSES
+        ))
+
+    def factor_arrays(self, days: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Per-row (price, volume) factors for UTC day numbers since epoch."""
+        moving = sorted(
+            (step for step in self.steps if step.transition_day is not None),
+            key=lambda step: step.transition_day,
+        )
+        if not moving:
+            return np.ones(len(days)), np.ones(len(days))
+        transitions = np.array([(step.transition_day - _EPOCH_DAY).days for step in moving])
+        # suffix[i] = product of the factors of steps i..n; a candle picks the
+        # steps whose transition_day is after its own day.
+        price_suffix = np.append(np.cumprod([s.price_factor for s in moving][::-1])[::-1], 1.0)
+        volume_suffix = np.append(np.cumprod([s.volume_factor for s in moving][::-1])[::-1], 1.0)
+        position = np.searchsorted(transitions, np.asarray(days, dtype=np.int64), side="right")
+        return price_suffix[position], volume_suffix[position]
+
+    def rebase_factor(self, reference_at: datetime, as_of: datetime) -> float:
+        """Same window rule as `rebase_reference_price`, over the persisted steps."""
+        reference_utc = _as_utc(reference_at)
+        as_of_utc = _as_utc(as_of)
+        if reference_utc is None or as_of_utc is None:
+            return 1.0
+        factor = 1.0
+        for step in self.steps:
+            if reference_utc < step.effective_at <= as_of_utc:
+                factor *= step.price_factor
+        return factor
+
+    def apply_to_rows(self, candles: Sequence[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """Adjusted copies of candle rows; rows without a moving step are untouched."""
+        rows = [dict(candle) for candle in candles]
+        if not rows or not any(step.transition_day is not None for step in self.steps):
+            return rows
+        days = np.array([(_frame_date(row.get("ts")) - _EPOCH_DAY).days for row in rows])
+        price_factors, volume_factors = self.factor_arrays(days)
+        for row, price_factor, volume_factor in zip(rows, price_factors, volume_factors):
+            if price_factor != 1.0:
+                for key in ("open_price", "high_price", "low_price", "close_price"):
+                    value = _safe_float(row.get(key))
+                    if value is not None:
+                        row[key] = value * float(price_factor)
+            if volume_factor != 1.0:
+                volume = _safe_float(row.get("volume"))
+                if volume is not None:
+                    row["volume"] = volume * float(volume_factor)
+        return rows
+
+    def versioned_applications(self, version: int) -> list[CorporateActionApplication]:
+        """Audit rows of the guard run, re-keyed to the persisted version."""
+        return [
+            replace(
+                application,
+                component=CANDLE_ADJUSTMENT_COMPONENT,
+                adjustment_version=f"{DETECTOR_VERSION}:v{int(version)}",
+                idempotency_key=_stable_key(
+                    DETECTOR_VERSION,
+                    application.instrument_effect_id,
+                    CANDLE_ADJUSTMENT_COMPONENT,
+                    self.ticker,
+                    int(version),
+                ),
+            )
+            for application in self.applications
+        ]
+
+    def annotate_frame(self, frame: Any) -> Any:
+        """Frame attrs consumed by `normalize_frame_for_effects` (skips applied ids)."""
+        if frame is None:
+            return frame
+        applied = self.applied_effect_ids
+        frame.attrs["corporate_action_effect_ids"] = applied
+        frame.attrs["corporate_adjustment_version"] = self.version
+        frame.attrs["price_basis"] = "corporate_action_adjusted" if applied else "raw"
+        return frame
+
+
+def plan_candle_adjustment(
+    ticker: str,
+    candles: Sequence[Mapping[str, Any]],
+    effects: Sequence[CorporateActionEffect],
+    *,
+    observed_at: datetime | None = None,
+) -> CandleAdjustment:
+    """
+    Resolve the confirmed effects of `ticker` against its full raw candle
+    history with the same rules as the frame guard, and return the unsaved
+    (version 0) adjustment whose `signature` identifies the resulting steps.
+    """
+    ticker = str(ticker or "").upper()
+    confirmed = sorted(
+        (
+            effect
+            for effect in effects
+            if effect.lifecycle_status in {
+                CorporateEventStatus.CONFIRMED.value,
+                CorporateEventStatus.EFFECTIVE.value,
+            }
+        ),
+        key=lambda item: (item.effective_at, item.effect_id),
+    )
+    rows = sorted(
+        (
+            row for row in candles
+            if row.get("ts") is not None and _safe_float(row.get("close_price")) is not None
+        ),
+        key=lambda row: _frame_date(row.get("ts")),
+    )
+    applications: tuple[CorporateActionApplication, ...] = ()
+    blocking_reason = None
+    if rows and confirmed:
+        days = np.array([(_frame_date(row["ts"]) - _EPOCH_DAY).days for row in rows], dtype=np.int64)
+        closes = np.array([_safe_float(row["close_price"]) for row in rows], dtype=float)
+        frame_adjustment = _compute_frame_adjustment(
+            ticker, days, closes, confirmed, set(), _as_utc(observed_at),
+        )
+        applications = frame_adjustment.applications
+        blocking_reason = frame_adjustment.blocking_reason
+
+    application_by_effect = {
+        application.instrument_effect_id: application for application in applications
+    }
+    steps = []
+    for effect in confirmed:
+        application = application_by_effect.get(effect.effect_id)
+        status = (
+            application.application_status
+            if application is not None
+            else CorporateApplicationStatus.PENDING.value
+        )
+        transition_day = None
+        if status == CorporateApplicationStatus.APPLIED.value:
+            transition_day = date.fromisoformat(application.before_state["transition_day"])
+        steps.append(
+            CandleAdjustmentStep(
+                effect_id=effect.effect_id,
+                event_id=effect.event_id,
+                effective_at=effect.effective_at,
+                application_status=status,
+                price_factor=float(effect.price_factor),
+                volume_factor=float(effect.quantity_factor),
+                transition_day=transition_day,
+            )
+        )
+    signature = hashlib.sha1(
+        json.dumps([step.to_record() for step in steps]).encode("utf-8")
+    ).hexdigest()
+    return CandleAdjustment(
+        ticker=ticker,
+        steps=tuple(steps),
+        signature=signature,
+        blocking_reason=blocking_reason,
+        candle_count=len(rows),
+        last_candle_day=_frame_date(rows[-1]["ts"]) if rows else None,
+        applications=applications,
     )
-    return normalized, applications, blocking_reason
 
 
 def _latest_quantity_pair(
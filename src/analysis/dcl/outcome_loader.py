@@ -8,6 +8,8 @@ from typing import Any, Optional
 import asyncpg
 import pandas as pd
 
+from src.core.db_pool import connection
+
 # ---------------------------------------------------------------------------
 # Intento importar normalize_decision_frame; si no existe, usamos identidad.
 # ---------------------------------------------------------------------------
@@ -424,8 +426,7 @@ class OutcomeLoader:
         since: str | None = None,
         owner_chat_id: int | None = None,
     ) -> pd.DataFrame:
-        conn = await asyncpg.connect(self.database_url)
-        try:
+        async with connection(self.database_url) as conn:
             cols = await self._existing_columns(conn)
             selected = [c for c in self._WANTED_COLS if c in cols]
             if not selected:
@@ -463,8 +464,6 @@ class OutcomeLoader:
                 """,
                 *args,
             )
-        finally:
-            await conn.close()
 
         if not rows:
             return pd.DataFrame(columns=selected)
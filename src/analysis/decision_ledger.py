@@ -7,7 +7,6 @@ from zoneinfo import ZoneInfo
 
 import asyncpg
 
-from src.analysis.audit_scope import ensure_decision_audit_scope_columns
 from src.analysis.override_classification import (
     classify_override,
     override_opposite_ratio as _opposite_ratio,
@@ -189,7 +188,6 @@ async def fetch_decision_ledger(
     match_window_days: int = 2,
     owner_chat_id: int | None = None,
 ) -> dict:
-    await ensure_decision_audit_scope_columns(conn)
 
     real_rows = await conn.fetch(
         """
@@ -493,16 +491,16 @@ async def fetch_decision_ledger(
         LEFT JOIN LATERAL (
             WITH candles AS (
                 SELECT
-                    ts::date AS day,
+                    candle_day AS day,
                     close_price::float AS close_price,
                     high_price::float AS high_price,
                     low_price::float AS low_price
-                FROM market_candles
+                FROM market_candles_canonical
                 WHERE ticker = r.ticker
-                  AND ts::date >= r.audit_start_day
-                  AND ts::date <= r.audit_start_day + 20
+                  AND interval = '1d'
+                  AND candle_day BETWEEN r.audit_start_day AND r.audit_start_day + 20
                   AND close_price IS NOT NULL
-                ORDER BY ts ASC
+                ORDER BY candle_day ASC
             )
             SELECT
                 (SELECT close_price FROM candles WHERE day >= r.audit_start_day + 2 LIMIT 1) AS price_2d,
@@ -522,13 +520,13 @@ async def fetch_decision_ledger(
         ) path ON TRUE
         LEFT JOIN LATERAL (
             WITH candles AS (
-                SELECT ts::date AS day, close_price::float AS close_price
-                FROM market_candles
+                SELECT candle_day AS day, close_price::float AS close_price
+                FROM market_candles_canonical
                 WHERE ticker = r.edge_vs
-                  AND ts::date >= r.audit_start_day
-                  AND ts::date <= r.audit_start_day + 20
+                  AND interval = '1d'
+                  AND candle_day BETWEEN r.audit_start_day AND r.audit_start_day + 20
                   AND close_price IS NOT NULL
-                ORDER BY ts ASC
+                ORDER BY candle_day ASC
             )
             SELECT
                 (SELECT close_price FROM candles WHERE day >= r.audit_start_day LIMIT 1) AS entry_price,
@@ -0,0 +1,174 @@
+"""
+src/analysis/indicator_panel.py — Primitivas vectorizadas sobre un panel
+(sesión x ticker) para calcular indicadores de todo el universo en una pasada.
+
+Cada columna es la serie propia de un ticker alineada al final (la última fila
+es la última vela de cada ticker) y con NaN de relleno arriba. Alinear por
+sesión propia y no por fecha calendario mantiene exactamente la semántica de
+los rolling/ewm por ticker de technical.py y opportunity_screener.py: CEDEARs
+y acciones con huecos distintos no se contaminan entre sí.
+
+Las funciones replican la semántica de pandas usada en los cálculos por
+ticker (rolling con min_periods=window, ewm adjust=False, max con skipna).
+Series con NaN internos no entran al panel: el caller las calcula con el
+camino por ticker.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Sequence
+
+try:
+    import numpy as np
+    import pandas as pd
+    from numpy.lib.stride_tricks import sliding_window_view
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+
+@dataclass(frozen=True)
+class PricePanel:
+    tickers: tuple[str, ...]
+    columns: dict[str, "np.ndarray"]
+    lengths: "np.ndarray"
+
+    def __getitem__(self, column: str) -> "np.ndarray":
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def padding(self) -> "np.ndarray":
+        """True en las filas de relleno (antes de la primera vela de cada ticker)."""
+        rows = next(iter(self.columns.values())).shape[0] if self.columns else 0
+        return np.arange(rows)[:, None] < (rows - self.lengths)[None, :]
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Mapping[str, "pd.DataFrame"],
+        columns: Sequence[str],
+    ) -> "PricePanel":
+        tickers = tuple(frames)
+        lengths = np.asarray([len(frames[ticker]) for ticker in tickers], dtype=int)
+        rows = int(lengths.max()) if len(lengths) else 0
+        arrays: dict[str, np.ndarray] = {}
+        for column in columns:
+            values = np.full((rows, len(tickers)), np.nan, dtype=float)
+            for j, ticker in enumerate(tickers):
+                n = lengths[j]
+                if n:
+                    values[rows - n:, j] = frames[ticker][column].to_numpy(dtype=float)
+            arrays[column] = values
+        return cls(tickers=tickers, columns=arrays, lengths=lengths)
+
+
+def split_panel_frames(
+    frames: Mapping[str, "pd.DataFrame"],
+    columns: Sequence[str],
+    *,
+    min_rows: int = 0,
+) -> tuple[dict[str, "pd.DataFrame"], dict[str, "pd.DataFrame"]]:
+    """
+    Separa frames aptos para el panel (columnas presentes, numéricas y sin
+    NaN) de los que deben seguir el camino por ticker.
+    """
+    panel: dict[str, pd.DataFrame] = {}
+    fallback: dict[str, pd.DataFrame] = {}
+    for ticker, frame in frames.items():
+        if frame is None or len(frame) < min_rows:
+            fallback[ticker] = frame
+            continue
+        try:
+            values = frame[list(columns)].to_numpy(dtype=float)
+        except (KeyError, TypeError, ValueError):
+            fallback[ticker] = frame
+            continue
+        if values.ndim != 2 or values.shape[1] != len(columns) or np.isnan(values).any():
+            fallback[ticker] = frame
+            continue
+        panel[ticker] = frame
+    return panel, fallback
+
+
+def shift(values: "np.ndarray", periods: int = 1) -> "np.ndarray":
+    out = np.full_like(values, np.nan)
+    if periods < len(values):
+        out[periods:] = values[:-periods]
+    return out
+
+
+def _rolling(values: "np.ndarray", window: int, reducer, **kwargs) -> "np.ndarray":
+    out = np.full_like(values, np.nan)
+    if 0 < window <= len(values):
+        windows = sliding_window_view(values, window, axis=0)
+        out[window - 1:] = reducer(windows, axis=-1, **kwargs)
+    return out
+
+
+def rolling_mean(values: "np.ndarray", window: int) -> "np.ndarray":
+    return _rolling(values, window, np.mean)
+
+
+def rolling_std(values: "np.ndarray", window: int) -> "np.ndarray":
+    return _rolling(values, window, np.std, ddof=1)
+
+
+def rolling_min(values: "np.ndarray", window: int) -> "np.ndarray":
+    return _rolling(values, window, np.min)
+
+
+def rolling_max(values: "np.ndarray", window: int) -> "np.ndarray":
+    return _rolling(values, window, np.max)
+
+
+def ewm_mean(values: "np.ndarray", alpha: float) -> "np.ndarray":
+    """`Series.ewm(alpha=alpha, adjust=False).mean()` por columna."""
+    out = np.full_like(values, np.nan)
+    if not len(values):
+        return out
+    old_weight = 1.0 - alpha
+    norm = old_weight + alpha
+    state = np.full(values.shape[1], np.nan)
+    for t in range(len(values)):
+        x = values[t]
+        state = np.where(np.isnan(state), x, (old_weight * state + alpha * x) / norm)
+        out[t] = state
+    return out
+
+
+def ewm_span(values: "np.ndarray", span: int) -> "np.ndarray":
+    return ewm_mean(values, 2.0 / (span + 1.0))
+
+
+def true_range(high: "np.ndarray", low: "np.ndarray", close: "np.ndarray") -> "np.ndarray":
+    prev_close = shift(close)
+    return np.fmax(
+        np.fmax(np.abs(high - low), np.abs(high - prev_close)),
+        np.abs(low - prev_close),
+    )
+
+
+def last_valid(values: "np.ndarray", default: float = 0.0) -> "np.ndarray":
+    """Último valor no NaN por columna (equivale a `_last` de technical.py)."""
+    if not len(values):
+        return np.full(values.shape[1:], default)
+    valid = ~np.isnan(values)
+    idx = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    picked = values[idx, np.arange(values.shape[1])]
+    return np.where(valid.any(axis=0), picked, default)
+
+
+def prev_valid(values: "np.ndarray", default: float = 0.0) -> "np.ndarray":
+    """Anteúltimo valor no NaN por columna (equivale a `_prev` de technical.py)."""
+    if not len(values):
+        return np.full(values.shape[1:], default)
+    valid = ~np.isnan(values)
+    cols = np.arange(values.shape[1])
+    last_idx = len(values) - 1 - np.argmax(valid[::-1], axis=0)
+    trimmed = valid.copy()
+    trimmed[last_idx, cols] = False
+    idx = len(values) - 1 - np.argmax(trimmed[::-1], axis=0)
+    return np.where(valid.sum(axis=0) >= 2, values[idx, cols], default)
@@ -247,34 +247,18 @@ WITH blocked AS (
 ), relevant_tickers AS (
     SELECT DISTINCT ticker FROM blocked
     UNION SELECT 'SPY'
-), ranked_candles AS (
-    SELECT
-        mc.ticker,
-        (mc.ts AT TIME ZONE 'UTC')::date AS day,
-        mc.open_price::float AS open_price,
-        mc.high_price::float AS high_price,
-        mc.low_price::float AS low_price,
-        mc.close_price::float AS close_price,
-        ROW_NUMBER() OVER (
-            PARTITION BY mc.ticker, (mc.ts AT TIME ZONE 'UTC')::date
-            ORDER BY
-                CASE
-                    WHEN mc.source = 'COCOS' THEN 0
-                    WHEN mc.source = 'TRADINGVIEW_BYMA' THEN 1
-                    WHEN mc.source = 'internal_snapshot' THEN 2
-                    ELSE 3
-                END,
-                mc.scraped_at DESC,
-                mc.ts DESC
-        ) AS source_rank
-    FROM market_candles mc
-    JOIN relevant_tickers rt ON rt.ticker = mc.ticker
-    WHERE mc.interval = '1d'
-      AND mc.ts >= NOW() - (($2::int + 60) * INTERVAL '1 day')
 ), daily_candles AS (
-    SELECT ticker, day, open_price, high_price, low_price, close_price
-    FROM ranked_candles
-    WHERE source_rank = 1
+    SELECT
+        mcc.ticker,
+        mcc.candle_day AS day,
+        mcc.open_price::float AS open_price,
+        mcc.high_price::float AS high_price,
+        mcc.low_price::float AS low_price,
+        mcc.close_price::float AS close_price
+    FROM market_candles_canonical mcc
+    JOIN relevant_tickers rt ON rt.ticker = mcc.ticker
+    WHERE mcc.interval = '1d'
+      AND mcc.candle_day >= (NOW() - (($2::int + 60) * INTERVAL '1 day'))::date
 ), controls AS (
     SELECT
         dl.id,
@@ -511,7 +495,7 @@ class LearningShadowStore:
                     len(case_list),
                     json.dumps({
                         "input_tables": [
-                            "decision_log", "market_candles",
+                            "decision_log", "market_candles_canonical",
                             "shadow_thesis_forecasts", "shadow_thesis_outcomes",
                         ],
                         "write_tables": [
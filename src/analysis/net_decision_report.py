@@ -10,7 +10,6 @@ from zoneinfo import ZoneInfo
 
 import asyncpg
 
-from src.analysis.audit_scope import ensure_decision_audit_scope_columns
 from src.analysis.execution_planner import FEE_PCT, SLIPPAGE_PCT
 from src.core.telegram_format import header as tg_header
 from src.core.telegram_format import html_text, note as tg_note, section as tg_section
@@ -189,7 +188,6 @@ async def fetch_net_decision_report(
     days: int = 180,
     owner_chat_id: int | None = None,
 ) -> dict:
-    await ensure_decision_audit_scope_columns(conn)
     records = await conn.fetch(
         """
         WITH fill_totals AS (
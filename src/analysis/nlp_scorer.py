@@ -2,16 +2,25 @@
 
 The scorer is intentionally non-blocking for trading: failures keep rows in
 PENDING_SCORE and do not affect analysis/planner execution.
+
+`score_pending_items` drains the backlog with one pooled httpx client and
+up to SENTIMENT_SCORE_CONCURRENCY requests in flight. Rows with the same
+normalized headline/snippet (syndicated copies) are scored once, optionally
+several headlines share one prompt (SENTIMENT_SCORE_BATCH_SIZE), and the
+results are written with bulk statements once all requests finished.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
 import os
 import re
+from collections import OrderedDict
 from html import unescape
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, replace
+from typing import Any, Iterable
 
 import httpx
 
@@ -26,6 +35,11 @@ HEURISTIC_FALLBACK_ENABLED = os.getenv("SENTIMENT_HEURISTIC_FALLBACK", "true").l
     "yes",
     "y",
 }
+SCORE_CONCURRENCY = max(1, int(os.getenv("SENTIMENT_SCORE_CONCURRENCY", "4")))
+SCORE_BATCH_SIZE = max(1, int(os.getenv("SENTIMENT_SCORE_BATCH_SIZE", "1")))
+# Scores por hash de contenido, compartidos entre ciclos del mismo proceso.
+CONTENT_CACHE_MAX_ITEMS = 2048
+_CONTENT_CACHE: "OrderedDict[tuple[str, str], SentimentScore]" = OrderedDict()
 
 VALID_IMPACT = {"low", "mid", "high"}
 VALID_SCOPE = {"ticker", "sector", "macro", "unknown"}
@@ -223,6 +237,42 @@ def build_prompt(row: dict[str, Any]) -> str:
     )
 
 
+def build_batch_prompt(rows: list[dict[str, Any]]) -> str:
+    items = "\n\n".join(
+        f"[id={int(row['id'])}]\n"
+        f"Fuente: {row.get('source')}\n"
+        f"Fecha: {row.get('published_at') or row.get('fetched_at')}\n"
+        f"Titulo: {row.get('headline')}\n"
+        f"Texto: {row.get('body_snippet') or ''}"
+        for row in rows
+    )
+    return (
+        "Analiza cada noticia financiera para Argentina/CEDEARs.\n"
+        "Devuelve SOLO JSON valido, sin markdown ni explicaciones, con la forma\n"
+        '{"items":[{"id":int, ...campos}]} y un elemento por noticia.\n'
+        "Campos obligatorios por elemento:\n"
+        "{"
+        '"id":int,'
+        '"ticker":"YPFD|GGAL|MELI|TSM|QCOM|MACRO|null",'
+        '"asset_scope":"ticker|sector|macro|unknown",'
+        '"score":float(-1 to 1),'
+        '"impact":"low|mid|high",'
+        '"confidence":float(0 to 1),'
+        '"horizon":"intraday|2d|5d|10d|20d|unknown",'
+        '"event_type":"earnings|regulation|macro|fx|company|commodity|rumor|unknown",'
+        '"summary":"max 15 words"'
+        "}\n\n"
+        f"{items}"
+    )
+
+
+def content_key(row: dict[str, Any]) -> str:
+    """Hash del titular + snippet normalizados: copias sindicadas comparten clave."""
+    text = " ".join(str(row.get(key) or "") for key in ("headline", "body_snippet"))
+    normalized = re.sub(r"\s+", " ", unescape(text)).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
 def score_with_heuristic(row: dict[str, Any]) -> SentimentScore:
     """Low-confidence deterministic fallback when the local LLM is unavailable."""
     raw_text = " ".join(
@@ -297,39 +347,98 @@ def _is_scorer_unavailable(exc: Exception) -> bool:
     )
 
 
+async def _ollama_chat(
+    client: httpx.AsyncClient,
+    prompt: str,
+    *,
+    model: str,
+    ollama_url: str,
+    num_predict: int,
+) -> dict[str, Any]:
+    resp = await client.post(
+        f"{ollama_url.rstrip('/')}/api/chat",
+        json={
+            "model": model,
+            "stream": False,
+            "format": "json",
+            "options": {"temperature": 0.0, "num_predict": num_predict},
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "Eres un clasificador financiero. Respondes solo JSON valido.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+        },
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return _extract_json(data.get("message", {}).get("content", ""))
+
+
 async def score_with_ollama(
     row: dict[str, Any],
     *,
     model: str = DEFAULT_MODEL,
     ollama_url: str = DEFAULT_OLLAMA_URL,
     timeout_seconds: float = 5.0,
+    client: httpx.AsyncClient | None = None,
 ) -> SentimentScore:
-    prompt = build_prompt(row)
-    url = ollama_url.rstrip("/")
-    async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-        resp = await client.post(
-            f"{url}/api/chat",
-            json={
-                "model": model,
-                "stream": False,
-                "format": "json",
-                "options": {"temperature": 0.0, "num_predict": 220},
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "Eres un clasificador financiero. Respondes solo JSON valido.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            },
-        )
-        resp.raise_for_status()
-        data = resp.json()
-    content = data.get("message", {}).get("content", "")
-    payload = _extract_json(content)
+    """Score one row. Pass `client` to reuse a pooled connection."""
+    if client is None:
+        async with httpx.AsyncClient(timeout=timeout_seconds) as own_client:
+            return await score_with_ollama(
+                row, model=model, ollama_url=ollama_url, client=own_client,
+            )
+    payload = await _ollama_chat(
+        client, build_prompt(row), model=model, ollama_url=ollama_url, num_predict=220,
+    )
     return _normalize_score(int(row["id"]), payload)
 
 
+async def score_batch_with_ollama(
+    rows: list[dict[str, Any]],
+    *,
+    client: httpx.AsyncClient,
+    model: str = DEFAULT_MODEL,
+    ollama_url: str = DEFAULT_OLLAMA_URL,
+) -> dict[int, SentimentScore]:
+    """
+    Several headlines in one prompt. Items the model drops or mangles are
+    re-asked one by one, so every row comes back scored or raises.
+    """
+    if len(rows) == 1:
+        row = rows[0]
+        return {int(row["id"]): await score_with_ollama(
+            row, model=model, ollama_url=ollama_url, client=client,
+        )}
+    payload = await _ollama_chat(
+        client,
+        build_batch_prompt(rows),
+        model=model,
+        ollama_url=ollama_url,
+        num_predict=220 * len(rows),
+    )
+    wanted = {int(row["id"]) for row in rows}
+    scores: dict[int, SentimentScore] = {}
+    for item in payload.get("items") or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            raw_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if raw_id in wanted and raw_id not in scores:
+            scores[raw_id] = _normalize_score(raw_id, {k: v for k, v in item.items() if k != "id"})
+    for row in rows:
+        raw_id = int(row["id"])
+        if raw_id not in scores:
+            scores[raw_id] = await score_with_ollama(
+                row, model=model, ollama_url=ollama_url, client=client,
+            )
+    return scores
+
+
 async def load_pending_raw_items(conn, *, limit: int = 25, max_attempts: int = 3) -> list[dict]:
     rows = await conn.fetch(
         """
@@ -364,15 +473,7 @@ async def mark_score_attempt(conn, raw_id: int, *, error: str | None = None) ->
         logger.debug("sentiment raw_id=%s pending after scorer error: %s", raw_id, error)
 
 
-async def save_sentiment_score(
-    conn,
-    item: SentimentScore,
-    *,
-    model: str = DEFAULT_MODEL,
-    scorer: str = "ollama",
-) -> int | None:
-    row = await conn.fetchrow(
-        """
+_SCORED_UPSERT_SQL = """
         INSERT INTO sentiment_scored (
             raw_id, scorer, model, ticker, asset_scope, score, impact, confidence,
             horizon, event_type, summary, raw_response, status
@@ -394,8 +495,11 @@ async def save_sentiment_score(
             raw_response = EXCLUDED.raw_response,
             status = 'SCORED',
             error = NULL
-        RETURNING id
-        """,
+"""
+
+
+def _scored_args(item: SentimentScore, *, model: str, scorer: str) -> tuple:
+    return (
         item.raw_id,
         model,
         item.ticker,
@@ -409,6 +513,19 @@ async def save_sentiment_score(
         json.dumps(item.raw_response),
         scorer,
     )
+
+
+async def save_sentiment_score(
+    conn,
+    item: SentimentScore,
+    *,
+    model: str = DEFAULT_MODEL,
+    scorer: str = "ollama",
+) -> int | None:
+    row = await conn.fetchrow(
+        _SCORED_UPSERT_SQL + "        RETURNING id\n",
+        *_scored_args(item, model=model, scorer=scorer),
+    )
     await conn.execute(
         """
         UPDATE sentiment_raw
@@ -421,6 +538,62 @@ async def save_sentiment_score(
     return int(row["id"]) if row else None
 
 
+async def save_sentiment_scores(
+    conn,
+    items: Iterable[SentimentScore],
+    *,
+    model: str = DEFAULT_MODEL,
+    scorer: str = "ollama",
+) -> int:
+    """Bulk version of `save_sentiment_score`: one executemany + one UPDATE."""
+    items = list(items)
+    if not items:
+        return 0
+    await conn.executemany(
+        _SCORED_UPSERT_SQL,
+        [_scored_args(item, model=model, scorer=scorer) for item in items],
+    )
+    await conn.execute(
+        """
+        UPDATE sentiment_raw
+        SET score_status = 'SCORED',
+            last_score_attempt_at = NOW()
+        WHERE id = ANY($1::bigint[])
+        """,
+        [item.raw_id for item in items],
+    )
+    return len(items)
+
+
+async def mark_score_attempts(conn, raw_ids: Iterable[int]) -> None:
+    ids = [int(raw_id) for raw_id in raw_ids]
+    if not ids:
+        return
+    await conn.execute(
+        """
+        UPDATE sentiment_raw
+        SET score_attempts = score_attempts + 1,
+            last_score_attempt_at = NOW()
+        WHERE id = ANY($1::bigint[])
+        """,
+        ids,
+    )
+
+
+def _cache_get(model: str, key: str) -> SentimentScore | None:
+    cached = _CONTENT_CACHE.get((model, key))
+    if cached is not None:
+        _CONTENT_CACHE.move_to_end((model, key))
+    return cached
+
+
+def _cache_put(model: str, key: str, item: SentimentScore) -> None:
+    _CONTENT_CACHE[(model, key)] = item
+    _CONTENT_CACHE.move_to_end((model, key))
+    while len(_CONTENT_CACHE) > CONTENT_CACHE_MAX_ITEMS:
+        _CONTENT_CACHE.popitem(last=False)
+
+
 async def score_pending_items(
     conn,
     *,
@@ -429,43 +602,100 @@ async def score_pending_items(
     ollama_url: str = DEFAULT_OLLAMA_URL,
     timeout_seconds: float = 5.0,
     max_attempts: int = 3,
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+    client: httpx.AsyncClient | None = None,
 ) -> dict[str, int]:
     pending = await load_pending_raw_items(conn, limit=limit, max_attempts=max_attempts)
-    stats = {"pending": len(pending), "scored": 0, "failed": 0}
-    use_heuristic_only = False
+    stats = {"pending": len(pending), "scored": 0, "failed": 0, "deduplicated": 0, "cached": 0}
+    if not pending:
+        return stats
+    concurrency = max(1, int(concurrency or SCORE_CONCURRENCY))
+    batch_size = max(1, int(batch_size or SCORE_BATCH_SIZE))
+
+    # Una fila representante por contenido; las copias heredan su score.
+    groups: dict[str, list[dict[str, Any]]] = {}
     for row in pending:
-        raw_id = int(row["id"])
-        try:
-            if use_heuristic_only:
-                scored = score_with_heuristic(row)
-                await save_sentiment_score(conn, scored, model=HEURISTIC_MODEL, scorer="heuristic")
-            else:
-                scored = await score_with_ollama(
-                    row,
-                    model=model,
-                    ollama_url=ollama_url,
-                    timeout_seconds=timeout_seconds,
+        groups.setdefault(content_key(row), []).append(row)
+    stats["deduplicated"] = len(pending) - len(groups)
+
+    llm_scores: dict[str, SentimentScore] = {}
+    to_score: list[tuple[str, dict[str, Any]]] = []
+    for key, rows in groups.items():
+        cached = _cache_get(model, key)
+        if cached is not None:
+            llm_scores[key] = cached
+            stats["cached"] += len(rows)
+        else:
+            to_score.append((key, rows[0]))
+
+    errors: dict[str, Exception] = {}
+    degraded = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_chunk(http: httpx.AsyncClient, chunk: list[tuple[str, dict[str, Any]]]) -> None:
+        async with semaphore:
+            if degraded.is_set():
+                return
+            try:
+                scores = await score_batch_with_ollama(
+                    [row for _, row in chunk], client=http, model=model, ollama_url=ollama_url,
                 )
-                await save_sentiment_score(conn, scored, model=model)
-            stats["scored"] += 1
-        except Exception as exc:
-            if HEURISTIC_FALLBACK_ENABLED:
-                if _is_scorer_unavailable(exc) or isinstance(exc, ValueError):
-                    use_heuristic_only = True
-                fallback = score_with_heuristic(row)
-                await save_sentiment_score(conn, fallback, model=HEURISTIC_MODEL, scorer="heuristic")
-                stats["scored"] += 1
-                logger.debug("sentiment raw_id=%s scored by heuristic fallback: %s", raw_id, str(exc)[:220])
-                continue
-            await mark_score_attempt(conn, raw_id, error=str(exc)[:300])
-            stats["failed"] += 1
-            if _is_scorer_unavailable(exc):
-                remaining = max(0, len(pending) - stats["scored"] - stats["failed"])
-                logger.warning(
-                    "sentiment scorer unavailable; leaving %s pending items for next cycle",
-                    remaining,
+            except Exception as exc:
+                for key, _ in chunk:
+                    errors[key] = exc
+                if _is_scorer_unavailable(exc) or (
+                    HEURISTIC_FALLBACK_ENABLED and isinstance(exc, ValueError)
+                ):
+                    degraded.set()
+                return
+        for key, row in chunk:
+            item = scores[int(row["id"])]
+            llm_scores[key] = item
+            _cache_put(model, key, item)
+
+    if to_score:
+        chunks = [to_score[i:i + batch_size] for i in range(0, len(to_score), batch_size)]
+        http = client or httpx.AsyncClient(
+            timeout=timeout_seconds,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        try:
+            await asyncio.gather(*(run_chunk(http, chunk) for chunk in chunks))
+        finally:
+            if client is None:
+                await http.aclose()
+
+    scored: list[SentimentScore] = []
+    heuristic: list[SentimentScore] = []
+    failed_ids: list[int] = []
+    for key, rows in groups.items():
+        item = llm_scores.get(key)
+        if item is not None:
+            scored.extend(replace(item, raw_id=int(row["id"])) for row in rows)
+        elif HEURISTIC_FALLBACK_ENABLED:
+            heuristic.extend(score_with_heuristic(row) for row in rows)
+            if key in errors:
+                logger.debug(
+                    "sentiment raw_id=%s scored by heuristic fallback: %s",
+                    rows[0]["id"], str(errors[key])[:220],
                 )
-                break
+        elif key in errors:
+            failed_ids.extend(int(row["id"]) for row in rows)
+            logger.debug("sentiment raw_id=%s pending after scorer error: %s", rows[0]["id"], str(errors[key])[:300])
+
+    stats["scored"] += await save_sentiment_scores(conn, scored, model=model)
+    stats["scored"] += await save_sentiment_scores(
+        conn, heuristic, model=HEURISTIC_MODEL, scorer="heuristic",
+    )
+    await mark_score_attempts(conn, failed_ids)
+    stats["failed"] = len(failed_ids)
+    if degraded.is_set() and not HEURISTIC_FALLBACK_ENABLED:
+        remaining = len(pending) - stats["scored"] - stats["failed"]
+        logger.warning(
+            "sentiment scorer unavailable; leaving %s pending items for next cycle",
+            remaining,
+        )
     return stats
 
 
@@ -498,14 +728,10 @@ async def rescore_recent_heuristic_items(
         int(limit),
     )
     stats = {"candidates": len(rows), "rescored": 0}
-    for row in rows:
-        payload = dict(row)
-        scored = score_with_heuristic(payload)
-        await save_sentiment_score(
-            conn,
-            scored,
-            model=HEURISTIC_MODEL,
-            scorer="heuristic",
-        )
-        stats["rescored"] += 1
+    stats["rescored"] = await save_sentiment_scores(
+        conn,
+        [score_with_heuristic(dict(row)) for row in rows],
+        model=HEURISTIC_MODEL,
+        scorer="heuristic",
+    )
     return stats
@@ -27,7 +27,9 @@ from enum import Enum
 from types import SimpleNamespace
 from typing import Optional
 
+from src.analysis import indicator_panel as panel_ops
 from src.analysis.execution_planner import MIN_TRADE_ARS
+from src.analysis.parallel_universe import map_universe
 from src.analysis.technical_buy_shadow_v3 import build_technical_buy_shadow_v3
 from src.core.telegram_format import (
     header as tg_header,
@@ -356,16 +358,7 @@ def _compute_screener_metrics(
     if len(close) >= 61:
         m.momentum_60d = float(close.iloc[-1] / close.iloc[-61] - 1)
 
-    if qqq_ret_20d is not None:
-        m.rs_vs_qqq_20d = m.momentum_20d - qqq_ret_20d
-
-    if m.asset_type != "ACCION":
-        if spy_ret_20d is not None:
-            m.rs_benchmark_ticker = SPY_TICKER
-            m.rs_vs_spy_20d = m.momentum_20d - spy_ret_20d
-        elif qqq_ret_20d is not None:
-            m.rs_benchmark_ticker = QQQ_TICKER
-            m.rs_vs_spy_20d = m.momentum_20d - qqq_ret_20d
+    _apply_relative_strength(m, spy_ret_20d, qqq_ret_20d)
 
     if len(rets) >= 14:
         gains  = rets.clip(lower=0).tail(14).mean()
@@ -377,6 +370,10 @@ def _compute_screener_metrics(
     if len(close) >= 50:
         m.above_sma50  = m.price > float(close.tail(50).mean())
 
+    return _apply_screen_filters(m)
+
+
+def _apply_screen_filters(m: ScreenerMetrics) -> ScreenerMetrics:
     if m.price < MIN_PRICE_USD:
         m.fail_reason = f"precio bajo (${m.price:.2f})"
         return m
@@ -403,6 +400,98 @@ def _compute_screener_metrics(
     return m
 
 
+def _apply_relative_strength(
+    m: ScreenerMetrics,
+    spy_ret_20d: Optional[float],
+    qqq_ret_20d: Optional[float],
+) -> None:
+    if qqq_ret_20d is not None:
+        m.rs_vs_qqq_20d = m.momentum_20d - qqq_ret_20d
+
+    if m.asset_type != "ACCION":
+        if spy_ret_20d is not None:
+            m.rs_benchmark_ticker = SPY_TICKER
+            m.rs_vs_spy_20d = m.momentum_20d - spy_ret_20d
+        elif qqq_ret_20d is not None:
+            m.rs_benchmark_ticker = QQQ_TICKER
+            m.rs_vs_spy_20d = m.momentum_20d - qqq_ret_20d
+
+
+def _compute_screener_metrics_panel(
+    frames: dict[str, "pd.DataFrame"],
+    spy_ret_20d: Optional[float],
+    qqq_ret_20d: Optional[float],
+    asset_types: Optional[dict[str, str]] = None,
+) -> dict[str, ScreenerMetrics]:
+    """
+    `_compute_screener_metrics` para todo el universo en una pasada sobre un
+    panel sesión x ticker. Frames con NaN o sin Volume siguen por ticker.
+    """
+    usable, fallback = panel_ops.split_panel_frames(frames, ("Close", "Volume"), min_rows=40)
+    results = {
+        ticker: _compute_screener_metrics(
+            ticker,
+            frame,
+            spy_ret_20d,
+            qqq_ret_20d,
+            asset_type=(asset_types or {}).get(ticker, "UNKNOWN"),
+        )
+        for ticker, frame in fallback.items()
+    }
+    if not usable:
+        return results
+
+    panel = panel_ops.PricePanel.from_frames(usable, ("Close", "Volume"))
+    close, volume = panel["Close"], panel["Volume"]
+    lengths = panel.lengths
+    rows = len(close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = close[-1]
+        avg_volume = volume[-20:].mean(axis=0)
+        avg_close = close[-20:].mean(axis=0)
+        rets = close / panel_ops.shift(close) - 1.0
+        annual_vol = np.nanstd(rets, axis=0, ddof=1) * np.sqrt(252)
+        high_6m = np.nanmax(close[-126:], axis=0)
+        low_6m = np.nanmin(close[-126:], axis=0)
+        momentum_20d = price / close[rows - 21] - 1 if rows >= 21 else np.zeros_like(price)
+        momentum_60d = price / close[rows - 61] - 1 if rows >= 61 else np.zeros_like(price)
+        recent = rets[-14:]
+        gains = np.maximum(recent, 0.0).mean(axis=0)
+        losses = (-np.minimum(recent, 0.0)).mean(axis=0)
+        rsi = np.where(losses > 0, 100 - 100 / (1 + gains / losses), 100.0)
+        sma200 = close[-200:].mean(axis=0) if rows >= 200 else np.full_like(price, np.nan)
+        sma50 = close[-50:].mean(axis=0)
+
+    for j, ticker in enumerate(panel.tickers):
+        n = int(lengths[j])
+        m = ScreenerMetrics(
+            ticker=ticker,
+            asset_type=((asset_types or {}).get(ticker, "UNKNOWN") or "UNKNOWN").upper(),
+        )
+        m.price = float(price[j])
+        m.avg_volume = float(avg_volume[j])
+        m.avg_turnover_ars = m.avg_volume * float(avg_close[j])
+        if n - 1 > 20:
+            m.annual_vol = float(annual_vol[j])
+        if high_6m[j] > 0:
+            m.dist_from_high_6m = (m.price - float(high_6m[j])) / float(high_6m[j])
+        if low_6m[j] > 0:
+            m.dist_from_low_6m = (m.price - float(low_6m[j])) / float(low_6m[j])
+        if n >= 21:
+            m.momentum_20d = float(momentum_20d[j])
+        if n >= 61:
+            m.momentum_60d = float(momentum_60d[j])
+        _apply_relative_strength(m, spy_ret_20d, qqq_ret_20d)
+        if n - 1 >= 14:
+            m.rsi = float(rsi[j])
+        if n >= 200:
+            m.above_sma200 = m.price > float(sma200[j])
+        if n >= 50:
+            m.above_sma50 = m.price > float(sma50[j])
+        results[ticker] = _apply_screen_filters(m)
+    return results
+
+
 def screen_universe(
     tickers: list[str],
     period: str = "1y",
@@ -432,13 +521,26 @@ def screen_universe(
         _fmt_ref(qqq_ret_20d),
     )
 
+    screened = map_universe(
+        _compute_screener_metrics_panel,
+        {
+            ticker: (history_frames or {})[ticker]
+            for ticker in tickers
+            if ticker not in (SPY_TICKER, QQQ_TICKER)
+            and (history_frames or {}).get(ticker) is not None
+        },
+        per_ticker={"asset_types": asset_types or {}},
+        spy_ret_20d=spy_ret_20d,
+        qqq_ret_20d=qqq_ret_20d,
+    )
+
     results = []
     passed  = 0
     for ticker in tickers:
         if ticker in (SPY_TICKER, QQQ_TICKER):
             continue
-        df = (history_frames or {}).get(ticker)
-        if df is None:
+        m = screened.get(ticker)
+        if m is None:
             m = ScreenerMetrics(
                 ticker=ticker,
                 passes_screen=False,
@@ -447,13 +549,6 @@ def screen_universe(
             results.append(m)
             logger.debug(f"Screener FAIL {ticker}: {m.fail_reason}")
             continue
-        m  = _compute_screener_metrics(
-            ticker,
-            df,
-            spy_ret_20d,
-            qqq_ret_20d,
-            asset_type=(asset_types or {}).get(ticker, "UNKNOWN"),
-        )
         results.append(m)
         if m.passes_screen:
             passed += 1
@@ -1139,7 +1234,8 @@ def run_opportunity_analysis(
     technical_tickers = [m.ticker for m in technical_metrics]
     frame_tickers = [ticker for ticker in technical_tickers if ticker in (history_frames or {})]
     tech_signals   = analyze_portfolio_from_frames(
-        {ticker: history_frames[ticker] for ticker in frame_tickers}
+        {ticker: history_frames[ticker] for ticker in frame_tickers},
+        parallel=True,
     )
     tech_map       = {s.ticker: s for s in tech_signals}
     if capture_discovery:
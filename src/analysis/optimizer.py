@@ -15,12 +15,21 @@ from __future__ import annotations
 
 import logging
 import json
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 from .macro import MacroSnapshot, score_macro_for_ticker
+from .rolling_moments import WINDOW_ROWS
+from .optimizer_solver import (
+    SolverStats,
+    minimize_bounded_simplex,
+    negative_sharpe,
+    risk_parity_gap,
+    variance,
+)
 
 import numpy as np
 
@@ -58,6 +67,7 @@ class OptimizationResult:
     actual_engine: str = ""
     engine_note: str = ""
     cash_weight: float = 0.0
+    solver: dict = field(default_factory=dict)
 
 
 @dataclass
@@ -289,7 +299,17 @@ def _apply_risk_gate_to_trades(
 
 # ── Carga de datos ────────────────────────────────────────────────────────────
 
-def _fetch_returns(tickers: list[str], history_frames: Optional[dict[str, object]] = None):
+def _fetch_returns(
+    tickers: list[str],
+    history_frames: Optional[dict[str, object]] = None,
+    stats_cache=None,
+):
+    if stats_cache is not None:
+        return stats_cache.returns_matrix(
+            tickers,
+            history_frames or {},
+            lambda: _fetch_returns(tickers, history_frames=history_frames),
+        )
     try:
         import pandas as pd
 
@@ -316,13 +336,34 @@ def _fetch_returns(tickers: list[str], history_frames: Optional[dict[str, object
 
         import pandas as pd
         returns = pd.DataFrame(data).dropna(how="all").fillna(0)
-        return returns
+        # Grilla fija: las ventanas móviles del scheduler avanzan sobre la misma.
+        return returns.tail(WINDOW_ROWS)
     except Exception as e:
         logger.error(f"Error descargando retornos: {e}")
         import pandas as pd
         return pd.DataFrame()
 
 
+def _annual_covariance(returns, method: str = "sample", stats_cache=None):
+    """
+    Covarianza anualizada; con `stats_cache` se reusa mientras no cambien las
+    velas y la muestral sale de la ventana móvil del universo (rank-one).
+    """
+    def build():
+        if method == "ledoit_wolf":
+            from pypfopt import risk_models
+
+            return risk_models.CovarianceShrinkage(
+                returns, returns_data=True, frequency=252).ledoit_wolf()
+        if stats_cache is not None:
+            return stats_cache.moments_for(returns).cov_frame()
+        return returns.cov() * 252
+
+    if stats_cache is None:
+        return build()
+    return stats_cache.covariance(method, returns, build)
+
+
 # ── Utilidades ────────────────────────────────────────────────────────────────
 
 def _portfolio_stats(weights, mu, cov, cash_weight: float = 0.0):
@@ -333,29 +374,6 @@ def _portfolio_stats(weights, mu, cov, cash_weight: float = 0.0):
     return ret, vol, sharpe
 
 
-def _project_simplex_bounds(w: np.ndarray, w_min: float = W_MIN,
-                             w_max_arr: np.ndarray = None) -> np.ndarray:
-    n = len(w)
-    wmax = w_max_arr if w_max_arr is not None else np.full(n, W_MAX)
-    w = np.clip(w, w_min, wmax)
-    for _ in range(300):
-        diff = w.sum() - 1.0
-        if abs(diff) < 1e-10:
-            break
-        if diff > 0:
-            red = w - w_min
-            tot = red.sum()
-            if tot > 1e-10:
-                w -= red * (diff / tot)
-        else:
-            aum = wmax - w
-            tot = aum.sum()
-            if tot > 1e-10:
-                w += aum * (-diff / tot)
-        w = np.clip(w, w_min, wmax)
-    return w
-
-
 def _dynamic_w_max(
     score: float,
     w_current: float,
@@ -400,12 +418,14 @@ def _dynamic_w_max(
 
 def _optimizer_diagnostic_payload(
     *, universe, score_map, lower_bounds, upper_bounds, covariance, error=None,
+    solver: Optional[dict] = None,
 ) -> dict:
     cov_values = np.asarray(covariance, dtype=float)
     return {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "error_type": type(error).__name__ if error is not None else None,
         "error": str(error) if error is not None else None,
+        "solver": dict(solver or {}),
         "universe": list(universe),
         "scores": {ticker: float(score_map.get(ticker, 0.0)) for ticker in universe},
         "lower_bounds": {
@@ -438,24 +458,29 @@ def _write_optimizer_diagnostic(payload: dict, path: str | Path | None = None) -
 
 
 def _optimize_black_litterman(returns, universe, score_map, tau=TAU,
-                               risk_aversion=RISK_AVERSION, w_max_arr=None):
+                               risk_aversion=RISK_AVERSION, w_max_arr=None, w0=None,
+                               stats_cache=None):
+    """
+    Devuelve (pesos, engine, nota, SolverStats, diagnóstico). El diagnóstico
+    solo viene cuando PyPortfolioOpt tiró OptimizationError; run_optimizer lo
+    escribe junto con las stats del fallback.
+    """
     lower_bounds = np.full(len(universe), W_MIN)
     upper_bounds = (
         w_max_arr.astype(float)
         if w_max_arr is not None
         else np.full(len(universe), W_MAX)
     )
-    cov_bl = returns.cov() * 252
+    cov_bl = _annual_covariance(returns, "sample", stats_cache)
     try:
         import pandas as pd
-        from pypfopt import expected_returns, risk_models
+        from pypfopt import expected_returns
         from pypfopt.black_litterman import BlackLittermanModel
         from pypfopt.efficient_frontier import EfficientFrontier
 
         expected_returns.mean_historical_return(
             returns, returns_data=True, compounding=True, frequency=252)
-        cov_bl = risk_models.CovarianceShrinkage(
-            returns, returns_data=True, frequency=252).ledoit_wolf()
+        cov_bl = _annual_covariance(returns, "ledoit_wolf", stats_cache)
 
         viewdict = {}
         view_conf = {}
@@ -516,7 +541,21 @@ def _optimize_black_litterman(returns, universe, score_map, tau=TAU,
                 "BL bounds: %s",
                 {t: f"{lo:.0%}-{hi:.0%}" for t, lo, hi in zip(universe, lower_bounds, upper_bounds)},
             )
+        started = time.perf_counter()
         ef.max_sharpe(risk_free_rate=RF_ANNUAL)
+        problem = getattr(ef, "_opt", None)
+        solver_stats = getattr(problem, "solver_stats", None)
+        stats = SolverStats(
+            engine="pypfopt_max_sharpe",
+            iterations=int(getattr(solver_stats, "num_iters", None) or 0),
+            objective=(
+                float(problem.value)
+                if getattr(problem, "value", None) is not None
+                else None
+            ),
+            elapsed_ms=(time.perf_counter() - started) * 1000.0,
+            converged=str(getattr(problem, "status", "optimal")).startswith("optimal"),
+        )
         raw = dict(zip(ef.tickers, np.asarray(ef.weights, dtype=float)))
         weights = np.array([raw.get(t, W_MIN) for t in universe], dtype=float)
         weights = np.clip(weights, W_MIN, upper_bounds)
@@ -525,8 +564,9 @@ def _optimize_black_litterman(returns, universe, score_map, tau=TAU,
         note = "PyPortfolioOpt BL; equal prior + score views; max_sharpe"
         if cash_weight > 1e-9:
             note += f"; cash {cash_weight:.1%} from caps"
-        return weights, "BLACK_LITTERMAN", note
+        return weights, "BLACK_LITTERMAN", note, stats, None
     except Exception as e:
+        payload = None
         if type(e).__name__ == "OptimizationError":
             payload = _optimizer_diagnostic_payload(
                 universe=universe,
@@ -536,68 +576,61 @@ def _optimize_black_litterman(returns, universe, score_map, tau=TAU,
                 covariance=cov_bl,
                 error=e,
             )
-            try:
-                diagnostic_path = _write_optimizer_diagnostic(payload)
-                logger.error("BL diagnostic saved to %s", diagnostic_path)
-            except Exception as diagnostic_error:
-                logger.error("Could not save BL diagnostic: %s", diagnostic_error)
             logger.error("BL diagnostic: %s", json.dumps(payload, ensure_ascii=False))
         logger.warning(f"Black-Litterman falló ({type(e).__name__}: {e}) — usando fallback")
         mu = returns.mean().values * 252
-        cov = returns.cov().values * 252
+        cov = _annual_covariance(returns, "sample", stats_cache).values
+        weights, stats = _optimize_max_sharpe_np(mu, cov, universe, w_max_arr, w0=w0)
         return (
-            _optimize_max_sharpe_np(mu, cov, universe, w_max_arr),
+            weights,
             "FALLBACK_MAX_SHARPE",
             f"BL no disponible ({type(e).__name__}); fallback numpy max-sharpe",
+            stats,
+            payload,
         )
 
 
 # ── Optimizadores numpy (fallback) ────────────────────────────────────────────
+# Devuelven (pesos, SolverStats). `w0` es el warm start (pesos de la corrida
+# anterior o actuales); sin él se arranca de pesos iguales.
 
-def _optimize_max_sharpe_np(mu, cov, tickers, w_max_arr=None):
-    n = len(tickers)
-    wmax = w_max_arr if w_max_arr is not None else np.full(n, W_MAX)
-    w = np.clip(np.ones(n) / n, W_MIN, wmax); w /= w.sum()
-    best_w, best_sr, lr = w.copy(), -np.inf, 0.01
-    for i in range(6000):
-        sigma = np.sqrt(max(w @ cov @ w, 1e-12))
-        sr = (float(w @ mu) - RF_ANNUAL) / sigma
-        grad = (mu - sr * (cov @ w) / sigma) / sigma
-        w = _project_simplex_bounds(w + lr * grad, w_max_arr=wmax)
-        if i % 1000 == 999: lr *= 0.7
-        sr_new = (float(w @ mu) - RF_ANNUAL) / max(np.sqrt(w @ cov @ w), 1e-12)
-        if sr_new > best_sr: best_sr, best_w = sr_new, w.copy()
-    return best_w
-
-
-def _optimize_min_variance_np(mu, cov, tickers, w_max_arr=None):
-    n = len(tickers)
+def _np_bounds(n: int, w_max_arr) -> tuple[np.ndarray, np.ndarray]:
     wmax = w_max_arr if w_max_arr is not None else np.full(n, W_MAX)
-    w = np.clip(np.ones(n) / n, W_MIN, wmax); w /= w.sum()
-    best_w, best_var, lr = w.copy(), np.inf, 0.005
-    for i in range(6000):
-        w = _project_simplex_bounds(w - lr * 2.0 * (cov @ w), w_max_arr=wmax)
-        if i % 1000 == 999: lr *= 0.8
-        v = float(w @ cov @ w)
-        if v < best_var: best_var, best_w = v, w.copy()
-    return best_w
+    return np.full(n, W_MIN), np.asarray(wmax, dtype=float)
+
+
+def _np_start(n: int, w0) -> tuple[np.ndarray, bool]:
+    if w0 is None:
+        return np.ones(n) / n, False
+    return np.asarray(w0, dtype=float), True
 
 
-def _optimize_risk_parity_np(mu, cov, tickers, w_max_arr=None):
+def _optimize_max_sharpe_np(mu, cov, tickers, w_max_arr=None, w0=None):
+    lo, hi = _np_bounds(len(tickers), w_max_arr)
+    start, warm = _np_start(len(tickers), w0)
+    return minimize_bounded_simplex(
+        negative_sharpe(np.asarray(mu, dtype=float), np.asarray(cov, dtype=float), RF_ANNUAL),
+        start, lo, hi, engine="numpy_max_sharpe", warm_start=warm,
+    )
+
+
+def _optimize_min_variance_np(mu, cov, tickers, w_max_arr=None, w0=None):
+    lo, hi = _np_bounds(len(tickers), w_max_arr)
+    start, warm = _np_start(len(tickers), w0)
+    return minimize_bounded_simplex(
+        variance(np.asarray(cov, dtype=float)),
+        start, lo, hi, engine="numpy_min_variance", warm_start=warm,
+    )
+
+
+def _optimize_risk_parity_np(mu, cov, tickers, w_max_arr=None, w0=None):
     n = len(tickers)
-    wmax = w_max_arr if w_max_arr is not None else np.full(n, W_MAX)
-    w = np.clip(np.ones(n) / n, W_MIN, wmax); w /= w.sum()
-    target = np.ones(n) / n
-    best_w, best_obj, lr = w.copy(), np.inf, 0.005
-    for i in range(10000):
-        w = np.maximum(w, 1e-8)
-        sigma = max(np.sqrt(w @ cov @ w), 1e-12)
-        mrc = cov @ w / sigma; rc = w * mrc / sigma
-        w = _project_simplex_bounds(w - lr * 2.0 * (rc - target) * mrc / sigma, w_max_arr=wmax)
-        if i % 2000 == 1999: lr *= 0.8
-        obj = float(np.sum((rc - target) ** 2))
-        if obj < best_obj: best_obj, best_w = obj, w.copy()
-    return best_w
+    lo, hi = _np_bounds(n, w_max_arr)
+    start, warm = _np_start(n, w0)
+    return minimize_bounded_simplex(
+        risk_parity_gap(np.asarray(cov, dtype=float), np.ones(n) / n),
+        start, lo, hi, engine="numpy_risk_parity", warm_start=warm,
+    )
 
 
 # ── Selección de método (ahora informativa — no controla comportamiento) ──────
@@ -637,6 +670,39 @@ def _build_universe(current_positions, synthesis_results, market_assets) -> list
 
 # ── Pipeline principal ────────────────────────────────────────────────────────
 
+def _warm_start_vector(universe: list[str], weights: Optional[dict[str, float]]):
+    if not weights:
+        return None
+    vector = np.array([float(weights.get(t, 0.0) or 0.0) for t in universe])
+    return vector if vector.sum() > 0 else None
+
+
+def _save_solver_diagnostic(
+    bl_diagnostic: Optional[dict],
+    solver_stats: SolverStats,
+    *,
+    universe: list[str],
+    score_map: dict,
+    upper_bounds,
+    covariance,
+) -> None:
+    """Escribe el diagnóstico de cada corrida: fallo BL (si hubo) + stats del solver."""
+    payload = bl_diagnostic or _optimizer_diagnostic_payload(
+        universe=universe,
+        score_map=score_map,
+        lower_bounds=np.full(len(universe), W_MIN),
+        upper_bounds=upper_bounds,
+        covariance=covariance,
+    )
+    payload["solver"] = solver_stats.as_dict()
+    try:
+        diagnostic_path = _write_optimizer_diagnostic(payload)
+        if bl_diagnostic is not None:
+            logger.error("BL diagnostic saved to %s", diagnostic_path)
+    except Exception as diagnostic_error:
+        logger.error("Could not save optimizer diagnostic: %s", diagnostic_error)
+
+
 def run_optimizer(
     current_positions: list[dict],
     portfolio_value_ars: float,
@@ -648,7 +714,15 @@ def run_optimizer(
     threshold: float = REBALANCE_THRESH,
     portfolio_drawdown: float = 0.0,
     history_frames: Optional[dict[str, object]] = None,
+    warm_start: Optional[dict[str, float]] = None,
+    stats_cache=None,
 ) -> Optional[RebalanceReport]:
+    """
+    `warm_start` son los pesos óptimos de la corrida anterior del mismo
+    owner; sin ellos el solver arranca de los pesos actuales.
+    `stats_cache` (AnalysisStatsCache) evita recalcular retornos y
+    covarianzas si las velas no cambiaron desde la última corrida.
+    """
     try:
         import pandas as pd
 
@@ -688,7 +762,7 @@ def run_optimizer(
             return None
 
         # ── PASO 2: Retornos históricos ───────────────────────────────────────
-        returns = _fetch_returns(universe, history_frames=history_frames)
+        returns = _fetch_returns(universe, history_frames=history_frames, stats_cache=stats_cache)
         if returns.empty or len(returns.columns) < 2:
             logger.warning("Optimizer: datos históricos insuficientes")
             return None
@@ -696,8 +770,12 @@ def run_optimizer(
         n = len(universe)
 
         # ── PASO 3: Estadísticas base ─────────────────────────────────────────
+        # La media es O(N·T): la ventana móvil solo hace falta para la
+        # covarianza, y con el cache de stats en hit ni se toca.
         mu_daily = returns.mean().values
-        cov = returns.cov().values * 252
+        cov = _annual_covariance(returns, "sample", stats_cache).values
+        if stats_cache is not None:
+            stats_cache.touch_moments(returns)
         mu_ann = mu_daily * 252
 
         # ── PASO 4: Scores y pesos actuales ──────────────────────────────────
@@ -727,19 +805,39 @@ def run_optimizer(
         method, reason = _select_method(macro_regime, vix, gate_state)
         actual_engine = method
         engine_note = ""
+        bl_diagnostic = None
+        w0 = _warm_start_vector(universe, warm_start or current_w_map)
 
         if method == "BLACK_LITTERMAN":
             tau = TAU * 0.5 if macro_regime.get("market") == "risk_off" else TAU
-            raw_weights, actual_engine, engine_note = _optimize_black_litterman(
-                returns, universe, score_map, tau=tau,
-                risk_aversion=RISK_AVERSION, w_max_arr=w_max_arr,
+            raw_weights, actual_engine, engine_note, solver_stats, bl_diagnostic = (
+                _optimize_black_litterman(
+                    returns, universe, score_map, tau=tau,
+                    risk_aversion=RISK_AVERSION, w_max_arr=w_max_arr, w0=w0,
+                    stats_cache=stats_cache,
+                )
             )
         elif method == "MIN_VARIANCE":
-            raw_weights = _optimize_min_variance_np(mu_ann, cov, universe, w_max_arr)
+            raw_weights, solver_stats = _optimize_min_variance_np(
+                mu_ann, cov, universe, w_max_arr, w0=w0,
+            )
         elif method == "RISK_PARITY":
-            raw_weights = _optimize_risk_parity_np(mu_ann, cov, universe, w_max_arr)
+            raw_weights, solver_stats = _optimize_risk_parity_np(
+                mu_ann, cov, universe, w_max_arr, w0=w0,
+            )
         else:
-            raw_weights = _optimize_max_sharpe_np(mu_ann, cov, universe, w_max_arr)
+            raw_weights, solver_stats = _optimize_max_sharpe_np(
+                mu_ann, cov, universe, w_max_arr, w0=w0,
+            )
+        logger.info("Optimizer solver: %s", solver_stats.as_dict())
+        _save_solver_diagnostic(
+            bl_diagnostic,
+            solver_stats,
+            universe=universe,
+            score_map=score_map,
+            upper_bounds=w_max_arr,
+            covariance=cov,
+        )
 
         weights_optimal = dict(zip(universe, raw_weights))
         cash_weight = max(0.0, 1.0 - float(np.sum(raw_weights)))
@@ -761,6 +859,7 @@ def run_optimizer(
             actual_engine=actual_engine,
             engine_note=engine_note,
             cash_weight=round(cash_weight, 6),
+            solver=solver_stats.as_dict(),
         )
 
         # ── PASO 8: Calcular trades ───────────────────────────────────────────
@@ -0,0 +1,159 @@
+"""
+src/analysis/optimizer_solver.py — Solver del fallback numpy del optimizer.
+
+Los tres objetivos (max-Sharpe, mínima varianza, risk parity) se resuelven
+sobre el mismo conjunto factible: pesos entre `lo` y `hi` que suman 1 (o
+todos en `hi` si los caps no llegan a 1; el resto queda en cash).
+
+`minimize_bounded_simplex` es gradiente proyectado acelerado (FISTA) con
+line search por backtracking y reinicio adaptativo: cada iterado mejora el
+objetivo y el loop corta cuando los pesos dejan de moverse (`tol`), no tras
+un número fijo de pasos. La proyección es exacta (bisección sobre el
+multiplicador de la suma) y vectorizada.
+"""
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+import numpy as np
+
+DEFAULT_TOL = 1e-8
+DEFAULT_MAX_ITER = 5000
+_PROJECTION_BISECTIONS = 60
+
+Objective = Callable[[np.ndarray], tuple[float, np.ndarray]]
+
+
+@dataclass
+class SolverStats:
+    engine: str
+    iterations: int = 0
+    objective: Optional[float] = None
+    elapsed_ms: float = 0.0
+    converged: bool = True
+    warm_start: bool = False
+
+    def as_dict(self) -> dict:
+        payload = asdict(self)
+        payload["elapsed_ms"] = round(self.elapsed_ms, 3)
+        return payload
+
+
+def project_bounded_simplex(v: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Proyección euclídea sobre {lo <= w <= hi, sum(w) = 1}."""
+    v = np.asarray(v, dtype=float)
+    if float(hi.sum()) <= 1.0:
+        return hi.astype(float, copy=True)
+    if float(lo.sum()) >= 1.0:
+        return lo.astype(float, copy=True)
+
+    # sum(clip(v - tau, lo, hi)) es no creciente en tau.
+    left = float(np.min(v - hi))
+    right = float(np.max(v - lo))
+    for _ in range(_PROJECTION_BISECTIONS):
+        tau = 0.5 * (left + right)
+        if float(np.clip(v - tau, lo, hi).sum()) > 1.0:
+            left = tau
+        else:
+            right = tau
+    tau = 0.5 * (left + right)
+    w = np.clip(v - tau, lo, hi)
+    free = (v - tau > lo) & (v - tau < hi)
+    if free.any():
+        # Ajuste exacto del tramo lineal: los libres absorben el residuo.
+        w[free] = np.clip(w[free] - (float(w.sum()) - 1.0) / int(free.sum()), lo[free], hi[free])
+    return w
+
+
+def minimize_bounded_simplex(
+    fun: Objective,
+    w0: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    *,
+    engine: str,
+    tol: float = DEFAULT_TOL,
+    max_iter: int = DEFAULT_MAX_ITER,
+    warm_start: bool = False,
+) -> tuple[np.ndarray, SolverStats]:
+    started = time.perf_counter()
+    x = project_bounded_simplex(w0, lo, hi)
+    fx, gx = fun(x)
+    y, fy, gy = x, fx, gx
+    momentum = 1.0
+    lipschitz = 1.0
+    converged = False
+    iterations = 0
+
+    for iterations in range(1, max_iter + 1):
+        while True:
+            z = project_bounded_simplex(y - gy / lipschitz, lo, hi)
+            fz, gz = fun(z)
+            d = z - y
+            if fz <= fy + float(gy @ d) + 0.5 * lipschitz * float(d @ d) + 1e-15 or lipschitz > 1e16:
+                break
+            lipschitz *= 2.0
+
+        if fz > fx:
+            if y is x:
+                converged = True
+                break
+            # Reinicio adaptativo: el momentum empeoró el objetivo.
+            y, fy, gy, momentum = x, fx, gx, 1.0
+            continue
+
+        moved = float(np.max(np.abs(z - x)))
+        next_momentum = 0.5 * (1.0 + math.sqrt(1.0 + 4.0 * momentum * momentum))
+        y = z + ((momentum - 1.0) / next_momentum) * (z - x)
+        x, fx, gx, momentum = z, fz, gz, next_momentum
+        if moved < tol:
+            converged = True
+            break
+        fy, gy = fun(y)
+        lipschitz *= 0.9
+
+    return x, SolverStats(
+        engine=engine,
+        iterations=iterations,
+        objective=float(fx),
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+        converged=converged,
+        warm_start=warm_start,
+    )
+
+
+# ── Objetivos (valor, gradiente) ─────────────────────────────────────────────
+
+def negative_sharpe(mu: np.ndarray, cov: np.ndarray, rf: float) -> Objective:
+    def fun(w: np.ndarray) -> tuple[float, np.ndarray]:
+        cov_w = cov @ w
+        sigma = math.sqrt(max(float(w @ cov_w), 1e-12))
+        sharpe = (float(w @ mu) - rf) / sigma
+        return -sharpe, -(mu - sharpe * cov_w / sigma) / sigma
+
+    return fun
+
+
+def variance(cov: np.ndarray) -> Objective:
+    def fun(w: np.ndarray) -> tuple[float, np.ndarray]:
+        cov_w = cov @ w
+        return float(w @ cov_w), 2.0 * cov_w
+
+    return fun
+
+
+def risk_parity_gap(cov: np.ndarray, target: np.ndarray) -> Objective:
+    """Σ (rc_i - target_i)², con rc_i = w_i (Σw)_i / w'Σw."""
+
+    def fun(w: np.ndarray) -> tuple[float, np.ndarray]:
+        cov_w = cov @ w
+        total = max(float(w @ cov_w), 1e-12)
+        rc = w * cov_w / total
+        err = 2.0 * (rc - target)
+        grad = (err * cov_w + cov @ (err * w)) / total - 2.0 * float(err @ (w * cov_w)) * cov_w / total ** 2
+        return float(np.sum((rc - target) ** 2)), grad
+
+    return fun
@@ -0,0 +1,376 @@
+"""
+Motor batch de outcomes para decision_log.
+
+Agrupa las decisiones pendientes por ticker y calcula outcomes direccionales y
+ejecutables (5/10/20/40d) para todas las decisiones de un ticker contra una
+sola serie canonica, con lookups vectorizados (`np.searchsorted`) en lugar de
+recorrer las velas decision por decision.
+
+Reglas (identicas a las de PortfolioDatabase previas al motor batch):
+  - dia de decision en hora ART; dia de vela en UTC (como market_candles_canonical);
+  - precio al horizonte = primer close con dia >= decided_day + N;
+  - decisiones luego de las 17:00 ART ejecutan en el open (o close) de la
+    siguiente vela;
+  - la base canonica exige que el primer close >= decided_day este en el rango
+    compatible con price_at_decision (mas amplio para CEDEARs);
+  - con una version persistida de ajuste por corporate actions la serie se
+    ajusta una sola vez por ticker y cada entrada se rebasa con los pasos
+    efectivos entre decided_at y now;
+  - sin version, si la serie tiene saltos >= MIN_ANOMALY_RETURN se normaliza
+    con los corporate actions efectivos desde decided_at - 7d.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Mapping, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from src.analysis.corporate_actions import (
+    MIN_ANOMALY_RETURN,
+    CandleAdjustment,
+    CorporateActionEffect,
+    normalize_candle_rows,
+    rebase_reference_price,
+)
+
+ART_TZ = ZoneInfo("America/Argentina/Buenos_Aires")
+
+OUTCOME_HORIZONS = (5, 10, 20, 40)
+OUTCOME_CANDLE_LIMIT = 260
+CORPORATE_EFFECT_LOOKBACK = timedelta(days=7)
+EXECUTABLE_AFTER_HOUR_ART = 17
+
+CANONICAL_OUTCOME_BASIS = "canonical_cocos"
+LEGACY_EXTERNAL_OUTCOME_BASIS = "legacy_external"
+MIN_COMPATIBLE_PRICE_RATIO = 0.5
+MAX_COMPATIBLE_PRICE_RATIO = 2.0
+CEDEAR_MIN_COMPATIBLE_PRICE_RATIO = 0.25
+CEDEAR_MAX_COMPATIBLE_PRICE_RATIO = 4.0
+
+
+@dataclass(frozen=True)
+class PendingOutcome:
+    decision_id: int
+    ticker: str
+    entry_price: float
+    decided_at: datetime
+    direction: str
+
+
+@dataclass
+class DecisionOutcome:
+    decision_id: int
+    ticker: str
+    outcome_basis: str
+    outcome_basis_ratio: Optional[float] = None
+    outcomes: dict[str, float] = field(default_factory=dict)
+    executable_outcomes: dict[str, float] = field(default_factory=dict)
+    next_executable_at: Optional[datetime] = None
+    next_executable_price: Optional[float] = None
+    corporate_adjustment_factor: float = 1.0
+    has_candles: bool = True
+
+    @property
+    def is_canonical(self) -> bool:
+        return self.outcome_basis == CANONICAL_OUTCOME_BASIS
+
+    @property
+    def was_correct(self) -> Optional[bool]:
+        primary = self.outcomes.get("outcome_5d", self.outcomes.get("outcome_10d"))
+        return primary > 0 if primary is not None else None
+
+    @property
+    def executable_was_correct(self) -> Optional[bool]:
+        primary = self.executable_outcomes.get(
+            "executable_outcome_5d",
+            self.executable_outcomes.get("executable_outcome_10d"),
+        )
+        return primary > 0 if primary is not None else None
+
+
+def has_price_discontinuity(candles: Sequence[Mapping[str, Any]]) -> bool:
+    """True si algun close consecutivo salta >= MIN_ANOMALY_RETURN."""
+    closes = []
+    for candle in candles:
+        try:
+            close = float(candle.get("close_price"))
+        except (TypeError, ValueError):
+            continue
+        if close > 0:
+            closes.append(close)
+    if len(closes) < 2:
+        return False
+    values = np.asarray(closes, dtype=float)
+    return bool(np.any(np.abs(values[1:] / values[:-1] - 1.0) >= MIN_ANOMALY_RETURN))
+
+
+def compute_ticker_outcomes(
+    decisions: Sequence[PendingOutcome],
+    candles: Sequence[Mapping[str, Any]],
+    *,
+    now: datetime,
+    effects: Sequence[CorporateActionEffect] = (),
+    adjustment: Optional[CandleAdjustment] = None,
+) -> list[DecisionOutcome]:
+    """
+    Calcula outcomes para todas las decisiones de un ticker en una pasada.
+
+    `adjustment` es la version persistida del ajuste de `candles` (crudas):
+    todas las decisiones comparten la serie ajustada. Sin version, `effects`
+    son los corporate actions del ticker (ya cargados una vez); solo se usan
+    si la serie tiene una discontinuidad de precio.
+    """
+    if not decisions:
+        return []
+    if not candles:
+        return [
+            DecisionOutcome(
+                decision_id=decision.decision_id,
+                ticker=decision.ticker,
+                outcome_basis=LEGACY_EXTERNAL_OUTCOME_BASIS,
+                has_candles=False,
+            )
+            for decision in decisions
+        ]
+
+    if adjustment is not None:
+        factors = [adjustment.rebase_factor(decision.decided_at, now) for decision in decisions]
+        return _compute_series_outcomes(
+            decisions,
+            _CandleArrays.from_rows(adjustment.apply_to_rows(candles)),
+            entry_prices=[
+                float(decision.entry_price) * factor
+                for decision, factor in zip(decisions, factors)
+            ],
+            factors=factors,
+            now=now,
+        )
+
+    if not effects or not has_price_discontinuity(candles):
+        return _compute_series_outcomes(
+            decisions,
+            _CandleArrays.from_rows(candles),
+            entry_prices=[float(decision.entry_price) for decision in decisions],
+            factors=[1.0] * len(decisions),
+            now=now,
+        )
+
+    # Cada decision ve solo los effects desde decided_at - 7d; las que comparten
+    # el mismo set de effects comparten la serie normalizada.
+    groups: dict[tuple, list[int]] = {}
+    for index, decision in enumerate(decisions):
+        since = decision.decided_at - CORPORATE_EFFECT_LOOKBACK
+        key = tuple(
+            effect.effect_id
+            for effect in effects
+            if since <= effect.effective_at <= now
+        )
+        groups.setdefault(key, []).append(index)
+
+    effects_by_id = {effect.effect_id: effect for effect in effects}
+    results: list[Optional[DecisionOutcome]] = [None] * len(decisions)
+    for effect_ids, indexes in groups.items():
+        scoped_effects = [effects_by_id[effect_id] for effect_id in effect_ids]
+        group = [decisions[index] for index in indexes]
+        if scoped_effects:
+            series = normalize_candle_rows(candles, scoped_effects)
+            entries: list[float] = []
+            factors: list[float] = []
+            for decision in group:
+                adjusted, factor = rebase_reference_price(
+                    float(decision.entry_price),
+                    reference_at=decision.decided_at,
+                    as_of=now,
+                    effects=scoped_effects,
+                )
+                entries.append(float(adjusted or decision.entry_price))
+                factors.append(float(factor))
+        else:
+            series = list(candles)
+            entries = [float(decision.entry_price) for decision in group]
+            factors = [1.0] * len(group)
+        computed = _compute_series_outcomes(
+            group,
+            _CandleArrays.from_rows(series),
+            entry_prices=entries,
+            factors=factors,
+            now=now,
+        )
+        for index, outcome in zip(indexes, computed):
+            results[index] = outcome
+    return [outcome for outcome in results if outcome is not None]
+
+
+@dataclass(frozen=True)
+class _CandleArrays:
+    close_days: np.ndarray
+    closes: np.ndarray
+    close_asset_types: tuple[str, ...]
+    exec_days: np.ndarray
+    exec_prices: np.ndarray
+    exec_ts: tuple[datetime, ...]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]]) -> "_CandleArrays":
+        ordered = sorted(rows, key=lambda row: _as_utc(row["ts"]))
+        close_days: list[date] = []
+        closes: list[float] = []
+        close_asset_types: list[str] = []
+        exec_days: list[date] = []
+        exec_prices: list[float] = []
+        exec_ts: list[datetime] = []
+        for row in ordered:
+            ts = _as_utc(row["ts"])
+            day = ts.date()
+            close = _optional_float(row.get("close_price"))
+            open_ = _optional_float(row.get("open_price"))
+            if close is not None:
+                close_days.append(day)
+                closes.append(close)
+                close_asset_types.append(str(row.get("asset_type") or "").upper())
+            if open_ is not None or close is not None:
+                price = open_ if open_ is not None and open_ > 0 else close
+                exec_days.append(day)
+                exec_prices.append(price if price is not None else np.nan)
+                exec_ts.append(row["ts"])
+        return cls(
+            close_days=np.asarray(close_days, dtype="datetime64[D]"),
+            closes=np.asarray(closes, dtype=float),
+            close_asset_types=tuple(close_asset_types),
+            exec_days=np.asarray(exec_days, dtype="datetime64[D]"),
+            exec_prices=np.asarray(exec_prices, dtype=float),
+            exec_ts=tuple(exec_ts),
+        )
+
+
+def _compute_series_outcomes(
+    decisions: Sequence[PendingOutcome],
+    series: _CandleArrays,
+    *,
+    entry_prices: Sequence[float],
+    factors: Sequence[float],
+    now: datetime,
+) -> list[DecisionOutcome]:
+    today = np.datetime64(now.astimezone(ART_TZ).date(), "D")
+    horizons = np.asarray(OUTCOME_HORIZONS, dtype="timedelta64[D]")
+    decided_local = [decision.decided_at.astimezone(ART_TZ) for decision in decisions]
+    decided_days = np.asarray([value.date() for value in decided_local], dtype="datetime64[D]")
+    entries = np.asarray(entry_prices, dtype=float)
+    signs = np.asarray(
+        [-1.0 if str(decision.direction).upper() == "SELL" else 1.0 for decision in decisions]
+    )
+
+    # Base canonica: primer close >= decided_day.
+    basis_idx = np.searchsorted(series.close_days, decided_days, side="left")
+    has_basis = (basis_idx < len(series.closes)) & (entries > 0)
+    basis_close = _take(series.closes, basis_idx)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = np.where(has_basis, basis_close / entries, np.nan)
+
+    # Outcome direccional desde price_at_decision.
+    directional = _horizon_returns(series, decided_days[:, None] + horizons, entries, signs, today)
+
+    # Referencia ejecutable: intradia usa la decision; post-cierre la vela siguiente.
+    after_close = np.asarray(
+        [value.hour >= EXECUTABLE_AFTER_HOUR_ART for value in decided_local],
+        dtype=bool,
+    )
+    next_idx = np.searchsorted(series.exec_days, decided_days, side="right")
+    next_price = _take(series.exec_prices, next_idx)
+    next_valid = (next_idx < len(series.exec_prices)) & (next_price > 0)
+    exec_entries = np.where(after_close, np.where(next_valid, next_price, np.nan), entries)
+    exec_start = np.where(after_close, _take(series.exec_days, next_idx), decided_days)
+    has_exec = ~after_close | next_valid
+    executable = _horizon_returns(
+        series,
+        exec_start[:, None] + horizons,
+        np.where(has_exec, exec_entries, np.nan),
+        signs,
+        today,
+    )
+
+    results: list[DecisionOutcome] = []
+    for i, decision in enumerate(decisions):
+        outcome = DecisionOutcome(
+            decision_id=decision.decision_id,
+            ticker=decision.ticker,
+            outcome_basis=LEGACY_EXTERNAL_OUTCOME_BASIS,
+            corporate_adjustment_factor=float(factors[i]),
+        )
+        if has_basis[i]:
+            ratio = float(ratios[i])
+            outcome.outcome_basis_ratio = ratio
+            low, high = _compatible_ratio_bounds(series.close_asset_types[int(basis_idx[i])])
+            if low <= ratio <= high:
+                outcome.outcome_basis = CANONICAL_OUTCOME_BASIS
+        if outcome.is_canonical:
+            outcome.outcomes = _horizon_dict("outcome", directional[i])
+            if has_exec[i]:
+                if after_close[i]:
+                    outcome.next_executable_at = series.exec_ts[int(next_idx[i])]
+                    outcome.next_executable_price = float(next_price[i])
+                else:
+                    outcome.next_executable_at = decision.decided_at
+                    outcome.next_executable_price = float(entries[i])
+                outcome.executable_outcomes = _horizon_dict(
+                    "executable_outcome",
+                    executable[i],
+                )
+        results.append(outcome)
+    return results
+
+
+def _horizon_returns(
+    series: _CandleArrays,
+    targets: np.ndarray,
+    entries: np.ndarray,
+    signs: np.ndarray,
+    today: np.datetime64,
+) -> np.ndarray:
+    idx = np.searchsorted(series.close_days, targets, side="left")
+    valid = (idx < len(series.closes)) & (targets <= today) & (entries[:, None] > 0)
+    prices = _take(series.closes, idx)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = (prices - entries[:, None]) / entries[:, None] * signs[:, None]
+    return np.where(valid, returns, np.nan)
+
+
+def _horizon_dict(prefix: str, values: np.ndarray) -> dict[str, float]:
+    return {
+        f"{prefix}_{horizon}d": float(value)
+        for horizon, value in zip(OUTCOME_HORIZONS, values)
+        if np.isfinite(value)
+    }
+
+
+def _take(values: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    if len(values) == 0:
+        if np.issubdtype(values.dtype, np.datetime64):
+            return np.full(np.shape(idx), np.datetime64("NaT"), dtype=values.dtype)
+        return np.full(np.shape(idx), np.nan)
+    return values[np.minimum(idx, len(values) - 1)]
+
+
+def _compatible_ratio_bounds(asset_type: str) -> tuple[float, float]:
+    if asset_type == "CEDEAR":
+        return CEDEAR_MIN_COMPATIBLE_PRICE_RATIO, CEDEAR_MAX_COMPATIBLE_PRICE_RATIO
+    return MIN_COMPATIBLE_PRICE_RATIO, MAX_COMPATIBLE_PRICE_RATIO
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        parsed = float(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if np.isfinite(parsed) else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
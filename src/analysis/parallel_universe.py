@@ -0,0 +1,311 @@
+"""
+src/analysis/parallel_universe.py — Reparto del universo del radar entre
+procesos.
+
+El screening, los indicadores técnicos y las features del setup shadow son
+cálculos por ticker sin estado compartido. `map_universe` parte los frames en
+shards contiguos, los publica una sola vez en memoria compartida (columnas
+numéricas float64, índice int64 y códigos para columnas de texto como
+Source) y cada proceso reconstruye solo sus tickers, sin pickle de
+DataFrames. Los resultados se mergean en el orden original de tickers, así
+la salida es la misma que en serie.
+
+Universos chicos, `RADAR_WORKERS=1` o un pool roto (memoria compartida no
+disponible, worker caído) corren la misma tarea en serie.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing as mp
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+from src.core.config import get_config
+
+try:
+    import numpy as np
+    import pandas as pd
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+logger = logging.getLogger(__name__)
+
+MAX_AUTO_WORKERS = 4
+# Módulos que el forkserver importa una vez; cada worker nace con ellos cargados.
+WORKER_PRELOAD = (
+    "numpy",
+    "pandas",
+    "src.analysis.opportunity_screener",
+    "src.analysis.radar_setup_shadow",
+    "src.analysis.technical",
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+
+@dataclass(frozen=True)
+class _FrameLayout:
+    rows: int
+    columns: tuple[str, ...]
+    value_offset: int = 0                 # en elementos float64
+    index_offset: int = 0                 # en elementos int64
+    index_tz: Optional[str] = None
+    index_unit: str = "ns"
+    index_name: Optional[str] = None
+    dtypes: dict[str, str] = field(default_factory=dict)
+    categories: dict[str, tuple[Any, ...]] = field(default_factory=dict)
+    attrs: dict[str, Any] = field(default_factory=dict)
+    packed: bool = True
+    frame: Any = None                     # frames no empaquetables: viajan tal cual
+
+
+def resolve_workers(requested: Optional[int] = None) -> int:
+    workers = get_config().analysis.radar_workers if requested is None else int(requested)
+    if workers <= 0:
+        workers = min(MAX_AUTO_WORKERS, (os.cpu_count() or 1) - 1)
+    return max(1, workers)
+
+
+def _shardable(frame: Any) -> bool:
+    return (
+        isinstance(frame, pd.DataFrame)
+        and isinstance(frame.index, pd.DatetimeIndex)
+        and frame.columns.is_unique
+        and all(isinstance(column, str) for column in frame.columns)
+        and all(isinstance(dtype, np.dtype) for dtype in frame.dtypes)
+    )
+
+
+def _pack_frames(
+    frames: Mapping[str, Any],
+) -> tuple[SharedMemory, dict[str, _FrameLayout]]:
+    """Copia todos los frames a un único segmento de memoria compartida."""
+    shardable = {ticker: frame for ticker, frame in frames.items() if _shardable(frame)}
+    total_values = sum(frame.shape[0] * frame.shape[1] for frame in shardable.values())
+    total_rows = sum(frame.shape[0] for frame in shardable.values())
+    shm = SharedMemory(create=True, size=max(8, 8 * (total_values + total_rows)))
+    try:
+        values = np.ndarray((total_values,), dtype=np.float64, buffer=shm.buf)
+        index = np.ndarray(
+            (total_rows,),
+            dtype=np.int64,
+            buffer=shm.buf,
+            offset=8 * total_values,
+        )
+        layouts: dict[str, _FrameLayout] = {}
+        value_offset = index_offset = 0
+        for ticker, frame in frames.items():
+            if ticker not in shardable:
+                layouts[ticker] = _FrameLayout(rows=0, columns=(), packed=False, frame=frame)
+                continue
+            rows, width = frame.shape
+            block = values[value_offset:value_offset + rows * width].reshape(rows, width)
+            dtypes: dict[str, str] = {}
+            categories: dict[str, tuple[Any, ...]] = {}
+            for j, column in enumerate(frame.columns):
+                series = frame[column]
+                if pd.api.types.is_numeric_dtype(series.dtype):
+                    block[:, j] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                    if series.dtype != np.float64:
+                        dtypes[column] = str(series.dtype)
+                else:
+                    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                    block[:, j] = codes
+                    categories[column] = tuple(uniques)
+            index[index_offset:index_offset + rows] = frame.index.as_unit("ns").asi8
+            layouts[ticker] = _FrameLayout(
+                rows=rows,
+                columns=tuple(frame.columns),
+                value_offset=value_offset,
+                index_offset=index_offset,
+                index_tz=str(frame.index.tz) if frame.index.tz is not None else None,
+                index_unit=frame.index.unit,
+                index_name=frame.index.name,
+                dtypes=dtypes,
+                categories=categories,
+                attrs=dict(frame.attrs),
+            )
+            value_offset += rows * width
+            index_offset += rows
+        return shm, layouts
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+
+
+def _unpack_frame(buf, layout: _FrameLayout, total_values: int) -> Any:
+    if not layout.packed:
+        return layout.frame
+    width = len(layout.columns)
+    values = np.ndarray(
+        (layout.rows, width),
+        dtype=np.float64,
+        buffer=buf,
+        offset=8 * layout.value_offset,
+    ).copy()
+    stamps = np.ndarray(
+        (layout.rows,),
+        dtype=np.int64,
+        buffer=buf,
+        offset=8 * (total_values + layout.index_offset),
+    ).copy()
+    index = pd.DatetimeIndex(stamps.view("M8[ns]"), name=layout.index_name)
+    if layout.index_tz is not None:
+        index = index.tz_localize("UTC").tz_convert(layout.index_tz)
+    index = index.as_unit(layout.index_unit)
+    data: dict[str, Any] = {}
+    for j, column in enumerate(layout.columns):
+        if column in layout.categories:
+            codes = values[:, j].astype(np.int64)
+            uniques = np.asarray(layout.categories[column] + (None,), dtype=object)
+            data[column] = uniques[codes]
+        elif column in layout.dtypes:
+            data[column] = values[:, j].astype(layout.dtypes[column])
+        else:
+            data[column] = values[:, j]
+    frame = pd.DataFrame(data, index=index, columns=list(layout.columns))
+    frame.attrs.update(layout.attrs)
+    return frame
+
+
+def _run_shard(
+    task: Callable[..., Mapping[str, Any]],
+    shm_name: str,
+    total_values: int,
+    layouts: Mapping[str, _FrameLayout],
+    kwargs: Mapping[str, Any],
+) -> dict[str, Any]:
+    shm = SharedMemory(name=shm_name)
+    try:
+        frames = {
+            ticker: _unpack_frame(shm.buf, layout, total_values)
+            for ticker, layout in layouts.items()
+        }
+    finally:
+        shm.close()
+    return dict(task(frames, **kwargs))
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    if _executor is not None and _executor_workers == workers:
+        return _executor
+    shutdown_executor()
+    if "forkserver" in mp.get_all_start_methods():
+        context = mp.get_context("forkserver")
+        context.set_forkserver_preload(list(WORKER_PRELOAD))
+    else:
+        context = mp.get_context("spawn")
+    _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    _executor_workers = workers
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor, _executor_workers
+    executor, _executor, _executor_workers = _executor, None, 0
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_executor)
+
+
+def _split(tickers: Sequence[str], shards: int) -> list[list[str]]:
+    size, extra = divmod(len(tickers), shards)
+    out: list[list[str]] = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            out.append(list(tickers[start:end]))
+        start = end
+    return out
+
+
+def _shard_kwargs(
+    shard: Sequence[str],
+    per_ticker: Mapping[str, Mapping[str, Any]],
+    common: Mapping[str, Any],
+) -> dict[str, Any]:
+    kwargs = dict(common)
+    for name, mapping in per_ticker.items():
+        kwargs[name] = {ticker: mapping[ticker] for ticker in shard if ticker in mapping}
+    return kwargs
+
+
+def map_universe(
+    task: Callable[..., Mapping[str, Any]],
+    frames: Mapping[str, Any],
+    *,
+    workers: Optional[int] = None,
+    min_tickers: Optional[int] = None,
+    per_ticker: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    **common: Any,
+) -> dict[str, Any]:
+    """
+    Ejecuta `task(frames, **kwargs)` repartiendo `frames` entre procesos.
+
+    `task` debe ser una función de módulo que devuelva un dict por ticker.
+    Los mappings de `per_ticker` se recortan a los tickers de cada shard;
+    `common` viaja igual a todos. El resultado respeta el orden de `frames`.
+    """
+    per_ticker = dict(per_ticker or {})
+    tickers = list(frames)
+    workers = resolve_workers(workers)
+    if min_tickers is None:
+        min_tickers = get_config().analysis.radar_parallel_min_tickers
+    if not HAS_DEPS or workers <= 1 or len(tickers) < max(int(min_tickers), 2):
+        return dict(task(dict(frames), **_shard_kwargs(tickers, per_ticker, common)))
+
+    shards = _split(tickers, min(workers, len(tickers)))
+    try:
+        shm, layouts = _pack_frames(frames)
+    except (OSError, ValueError) as exc:
+        logger.warning("Screening paralelo sin memoria compartida, sigo en serie: %s", exc)
+        return dict(task(dict(frames), **_shard_kwargs(tickers, per_ticker, common)))
+
+    total_values = sum(layout.rows * len(layout.columns) for layout in layouts.values())
+    try:
+        executor = _get_executor(workers)
+        futures = [
+            executor.submit(
+                _run_shard,
+                task,
+                shm.name,
+                total_values,
+                {ticker: layouts[ticker] for ticker in shard},
+                _shard_kwargs(shard, per_ticker, common),
+            )
+            for shard in shards
+        ]
+        parts = [future.result() for future in futures]
+    except (BrokenProcessPool, pickle.PicklingError) as exc:
+        logger.warning("Pool del radar no disponible, sigo en serie: %s", exc)
+        shutdown_executor()
+        return dict(task(dict(frames), **_shard_kwargs(tickers, per_ticker, common)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    merged: dict[str, Any] = {}
+    for part in parts:
+        merged.update(part)
+    ordered = {ticker: merged.pop(ticker) for ticker in tickers if ticker in merged}
+    ordered.update(merged)
+    logger.info(
+        "Screening paralelo: %d tickers en %d shards (%d procesos)",
+        len(tickers),
+        len(shards),
+        workers,
+    )
+    return ordered
@@ -8,12 +8,18 @@ from __future__ import annotations
 
 import hashlib
 import json
+from bisect import bisect_left
 from datetime import date, datetime, timedelta
-from typing import Any, Iterable, Mapping
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Sequence
 from zoneinfo import ZoneInfo
 
 from src.analysis.decision_engine import directional_return
-from src.collector.schema_migrations import PLAN_EXECUTION_ATTRIBUTION_SQL
+from src.collector.schema_migrations import (
+    MIGRATION_PLAN_EXECUTION_ATTRIBUTION,
+    PLAN_EXECUTION_ATTRIBUTION_SQL,
+    schema_ready,
+)
 from src.core.market_calendar import is_trading_day
 
 
@@ -23,6 +29,11 @@ OUTCOME_VERSION = "execution-sessions-v1"
 OUTCOME_BASIS = "canonical_cocos"
 OUTCOME_HORIZONS = (5, 10, 20, 40)
 FOLLOW_STATUSES = {"PARTIAL", "FOLLOWED", "OVERFOLLOWED"}
+# Margen hacia atras sobre el watermark de cambios: cubre transacciones que
+# escribieron updated_at/decided_at antes del sync pero commitearon despues.
+SYNC_CHANGES_OVERLAP = timedelta(minutes=15)
+# Cada cuanto el sync incremental cae a un rebuild completo de todos los pares.
+SYNC_FULL_REBUILD_INTERVAL = timedelta(hours=24)
 
 
 def _as_float(value: Any, default: float = 0.0) -> float:
@@ -199,6 +210,50 @@ def canonicalize_movements(rows: Iterable[Mapping[str, Any]]) -> list[dict[str,
     return canonical
 
 
+@lru_cache(maxsize=4096)
+def _session_after(start: date, sessions: int) -> date:
+    """Trading day `sessions` sessions after `start` (same count as _sessions_between)."""
+    cursor = start
+    while sessions > 0:
+        cursor += timedelta(days=1)
+        if is_trading_day(cursor):
+            sessions -= 1
+    return cursor
+
+
+class _MovementIndex:
+    """
+    Movements bucketed by (ticker, side) and sorted by ART execution day, so a
+    plan only looks at the slice inside its session window (bisect) instead of
+    scanning every movement.
+    """
+
+    def __init__(self, movements: Sequence[Mapping[str, Any]]):
+        buckets: dict[tuple[str, str], list[tuple[date, int, Mapping[str, Any]]]] = {}
+        for position, movement in enumerate(movements):
+            executed_at = _as_datetime(movement.get("executed_at"))
+            if executed_at is None:
+                continue
+            key = (
+                str(movement.get("ticker") or "").upper(),
+                str(movement.get("movement_type") or movement.get("side") or "").upper(),
+            )
+            buckets.setdefault(key, []).append(
+                (executed_at.astimezone(ART).date(), position, movement)
+            )
+        self._entries = {key: sorted(rows, key=lambda row: row[:2]) for key, rows in buckets.items()}
+        self._days = {key: [row[0] for row in rows] for key, rows in self._entries.items()}
+
+    def window(self, ticker: str, side: str, start: date, end: date) -> list[Mapping[str, Any]]:
+        """Movements executed on [start, end), in their original input order."""
+        key = (ticker, side)
+        days = self._days.get(key)
+        if not days:
+            return []
+        selected = self._entries[key][bisect_left(days, start):bisect_left(days, end)]
+        return [row[2] for row in sorted(selected, key=lambda row: row[1])]
+
+
 def _movement_matches_plan(
     plan: Mapping[str, Any],
     movement: Mapping[str, Any],
@@ -250,6 +305,7 @@ def _candidate_for_plan(
     movements: list[dict[str, Any]],
     *,
     match_window_sessions: int,
+    movement_index: _MovementIndex | None = None,
 ) -> dict[str, Any] | None:
     target = abs(_as_float(plan.get("target_amount_ars")))
     if target <= 0:
@@ -257,6 +313,13 @@ def _candidate_for_plan(
 
     ticker = str(plan.get("ticker") or "").upper()
     side = str(plan.get("decision") or "").upper()
+    if movement_index is not None:
+        match_start = _as_datetime(plan.get("match_start_at"))
+        if match_start is None:
+            return None
+        match_day = _as_date(plan.get("match_day")) or match_start.astimezone(ART).date()
+        window_end = _session_after(match_day, max(1, int(match_window_sessions)) + 1)
+        movements = movement_index.window(ticker, side, match_day, window_end)
     matched = [
         movement
         for movement in movements
@@ -308,14 +371,15 @@ def _candidate_components(candidates: list[dict[str, Any]]) -> list[list[dict[st
         if left_root != right_root:
             parent[right_root] = left_root
 
-    for left in range(len(candidates)):
-        for right in range(left + 1, len(candidates)):
-            same_owner = (
-                candidates[left]["plan"].get("owner_chat_id")
-                == candidates[right]["plan"].get("owner_chat_id")
-            )
-            if same_owner and candidates[left]["movement_ids"] & candidates[right]["movement_ids"]:
-                union(left, right)
+    # Inverted index (owner, movement id) -> first candidate that used it:
+    # every later candidate sharing the movement joins that component.
+    first_by_movement: dict[tuple[Any, int], int] = {}
+    for index, candidate in enumerate(candidates):
+        owner = candidate["plan"].get("owner_chat_id")
+        for movement_id in candidate["movement_ids"]:
+            first = first_by_movement.setdefault((owner, movement_id), index)
+            if first != index:
+                union(first, index)
 
     groups: dict[int, list[dict[str, Any]]] = {}
     for index, candidate in enumerate(candidates):
@@ -332,6 +396,7 @@ def normalize_plan_execution_attributions(
 ) -> list[dict[str, Any]]:
     movement_input = [dict(row) for row in movements]
     canonical_movements = canonicalize_movements(movement_input)
+    movement_index = _MovementIndex(canonical_movements)
     candidates = [
         candidate
         for plan in plans
@@ -340,6 +405,7 @@ def normalize_plan_execution_attributions(
                 plan,
                 canonical_movements,
                 match_window_sessions=match_window_sessions,
+                movement_index=movement_index,
             )
         ]
         if candidate is not None
@@ -432,6 +498,8 @@ def normalize_plan_execution_attributions(
 
 
 async def ensure_plan_execution_attribution_schema(conn) -> None:
+    if schema_ready(MIGRATION_PLAN_EXECUTION_ATTRIBUTION):
+        return
     await conn.execute(PLAN_EXECUTION_ATTRIBUTION_SQL)
 
 
@@ -446,32 +514,14 @@ async def fetch_canonical_outcome_candles(
         return {}
     rows = await conn.fetch(
         """
-        WITH ranked AS (
-            SELECT
-                ts, ticker, close_price, source,
-                ROW_NUMBER() OVER (
-                    PARTITION BY UPPER(ticker), (ts AT TIME ZONE 'UTC')::date
-                    ORDER BY
-                        CASE
-                            WHEN source = 'COCOS' THEN 0
-                            WHEN source = 'TRADINGVIEW_BYMA' THEN 1
-                            WHEN source = 'internal_snapshot' THEN 2
-                            ELSE 3
-                        END,
-                        scraped_at DESC,
-                        ts DESC
-                ) AS source_rank
-            FROM market_candles
-            WHERE UPPER(ticker) = ANY($1::text[])
-              AND ts >= $2::date
-              AND interval = '1d'
-              AND close_price IS NOT NULL
-              AND close_price > 0
-        )
-        SELECT ts, UPPER(ticker) AS ticker, close_price, source
-        FROM ranked
-        WHERE source_rank = 1
-        ORDER BY ticker, ts
+        SELECT ts, ticker, close_price, source
+        FROM market_candles_canonical
+        WHERE ticker = ANY($1::text[])
+          AND interval = '1d'
+          AND candle_day >= $2::date
+          AND close_price IS NOT NULL
+          AND close_price > 0
+        ORDER BY ticker, candle_day
         """,
         clean_tickers,
         since,
@@ -522,7 +572,12 @@ async def fetch_outcome_corporate_effects(
     return grouped
 
 
-async def _fetch_plans(conn, *, cutoff: datetime) -> list[dict[str, Any]]:
+async def _fetch_plans(
+    conn,
+    *,
+    cutoff: datetime,
+    pairs: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
     rows = await conn.fetch(
         """
         WITH decision_base AS (
@@ -554,6 +609,7 @@ async def _fetch_plans(conn, *, cutoff: datetime) -> list[dict[str, Any]]:
               AND decision_type = 'executable'
               AND decision IN ('BUY', 'SELL')
               AND price_at_decision IS NOT NULL
+              AND ($2::text[] IS NULL OR (UPPER(ticker) || '|' || decision) = ANY($2::text[]))
         )
         SELECT
             d.*,
@@ -584,11 +640,17 @@ async def _fetch_plans(conn, *, cutoff: datetime) -> list[dict[str, Any]]:
         ORDER BY d.decided_at
         """,
         cutoff,
+        list(pairs) if pairs is not None else None,
     )
     return [dict(row) for row in rows]
 
 
-async def _fetch_movements(conn, *, cutoff: datetime) -> list[dict[str, Any]]:
+async def _fetch_movements(
+    conn,
+    *,
+    cutoff: datetime,
+    pairs: Sequence[str] | None = None,
+) -> list[dict[str, Any]]:
     rows = await conn.fetch(
         """
         SELECT
@@ -611,56 +673,265 @@ async def _fetch_movements(conn, *, cutoff: datetime) -> list[dict[str, Any]]:
           AND bm.quantity IS NOT NULL
           AND bm.price IS NOT NULL
           AND NOT (COALESCE(bm.raw_payload, '{}'::jsonb) ? 'superseded_by_real')
+          AND ($2::text[] IS NULL OR (UPPER(bm.ticker) || '|' || bm.movement_type) = ANY($2::text[]))
         ORDER BY bm.executed_at, bm.id
         """,
         cutoff,
+        list(pairs) if pairs is not None else None,
     )
     return [dict(row) for row in rows]
 
 
-async def sync_plan_execution_attributions(
+def _outcome_sources(outcomes: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        str(horizon): outcomes.get(f"outcome_source_{horizon}d")
+        for horizon in OUTCOME_HORIZONS
+        if outcomes.get(f"outcome_source_{horizon}d")
+    }
+
+
+async def _attach_execution_outcomes(
     conn,
+    rows: list[dict[str, Any]],
     *,
-    days: int = 180,
-    match_window_sessions: int = 2,
-) -> dict[str, int]:
-    await ensure_plan_execution_attribution_schema(conn)
-    cutoff = datetime.now(tz=ART) - timedelta(days=max(1, int(days)))
-    plans = await _fetch_plans(conn, cutoff=cutoff)
-    movements = await _fetch_movements(conn, cutoff=cutoff)
-    attributions = normalize_plan_execution_attributions(
-        plans,
-        movements,
-        match_window_sessions=match_window_sessions,
-    )
+    cutoff: datetime,
+) -> None:
+    """Calcula los outcomes por sesiones de cada atribucion (in place)."""
     outcome_since = min(
-        row["executed_at"].astimezone(ART).date() for row in attributions
-    ) if attributions else cutoff.astimezone(ART).date()
+        row["executed_at"].astimezone(ART).date() for row in rows
+    ) if rows else cutoff.astimezone(ART).date()
     candles_by_ticker = await fetch_canonical_outcome_candles(
         conn,
-        (row["ticker"] for row in attributions),
+        (row["ticker"] for row in rows),
         since=outcome_since,
     )
     effects_by_ticker = await fetch_outcome_corporate_effects(
         conn,
-        (row["ticker"] for row in attributions),
+        (row["ticker"] for row in rows),
         since=outcome_since,
     )
-    for row in attributions:
-        outcomes = compute_execution_session_outcomes(
+    for row in rows:
+        row["outcomes"] = compute_execution_session_outcomes(
             execution_price=float(row["execution_price"]),
             executed_at=row["executed_at"],
             side=row["side"],
             candles=candles_by_ticker.get(row["ticker"], ()),
             corporate_effects=effects_by_ticker.get(row["ticker"], ()),
         )
-        row["outcomes"] = outcomes
-        row["metadata"]["outcome_sources"] = {
-            str(horizon): outcomes.get(f"outcome_source_{horizon}d")
-            for horizon in OUTCOME_HORIZONS
-            if outcomes.get(f"outcome_source_{horizon}d")
-        }
+
+
+async def _write_outcomes(conn, attribution_id: int, outcomes: Mapping[str, Any]) -> None:
+    has_outcome = any(
+        outcomes.get(f"outcome_{horizon}d") is not None
+        for horizon in OUTCOME_HORIZONS
+    )
+    await conn.execute(
+        """
+        UPDATE plan_execution_attributions SET
+            outcome_5d = $2,
+            outcome_10d = $3,
+            outcome_20d = $4,
+            outcome_40d = $5,
+            outcome_date_5d = $6,
+            outcome_date_10d = $7,
+            outcome_date_20d = $8,
+            outcome_date_40d = $9,
+            outcome_price_5d = $10,
+            outcome_price_10d = $11,
+            outcome_price_20d = $12,
+            outcome_price_40d = $13,
+            outcome_basis = $14,
+            outcome_version = $15,
+            metadata = jsonb_set(COALESCE(metadata, '{}'::jsonb), '{outcome_sources}', $17::jsonb),
+            outcome_filled_at = CASE
+                WHEN $16 THEN COALESCE(outcome_filled_at, NOW())
+                ELSE NULL
+            END,
+            updated_at = NOW()
+        WHERE id = $1
+        """,
+        attribution_id,
+        outcomes.get("outcome_5d"),
+        outcomes.get("outcome_10d"),
+        outcomes.get("outcome_20d"),
+        outcomes.get("outcome_40d"),
+        outcomes.get("outcome_date_5d"),
+        outcomes.get("outcome_date_10d"),
+        outcomes.get("outcome_date_20d"),
+        outcomes.get("outcome_date_40d"),
+        outcomes.get("outcome_price_5d"),
+        outcomes.get("outcome_price_10d"),
+        outcomes.get("outcome_price_20d"),
+        outcomes.get("outcome_price_40d"),
+        OUTCOME_BASIS,
+        OUTCOME_VERSION,
+        has_outcome,
+        json.dumps(_outcome_sources(outcomes)),
+    )
+
+
+async def _read_sync_watermark(conn, *, match_window_sessions: int) -> dict[str, Any] | None:
+    row = await conn.fetchrow(
+        """
+        SELECT movement_id_watermark, decision_id_watermark,
+               changes_watermark, full_rebuild_at
+        FROM plan_execution_attribution_sync
+        WHERE matching_version = $1 AND match_window_sessions = $2
+        """,
+        MATCHING_VERSION,
+        int(match_window_sessions),
+    )
+    if row is None:
+        return None
+    return dict(row)
+
+
+def _incremental_watermark(
+    watermark: Mapping[str, Any] | None,
+    *,
+    now: datetime,
+) -> datetime | None:
+    """Instante desde el que buscar cambios, o None si toca un sync completo."""
+    if watermark is None:
+        return None
+    changes_at = _as_datetime(watermark.get("changes_watermark"))
+    rebuilt_at = _as_datetime(watermark.get("full_rebuild_at"))
+    if changes_at is None or rebuilt_at is None:
+        return None
+    if now - rebuilt_at >= SYNC_FULL_REBUILD_INTERVAL:
+        return None
+    return changes_at - SYNC_CHANGES_OVERLAP
+
+
+async def _touched_pairs(
+    conn,
+    *,
+    cutoff: datetime,
+    since: datetime,
+    decision_id: int,
+) -> list[str]:
+    """Pares ticker|side con movimientos o planes nuevos o editados desde `since`.
+
+    Los movimientos se detectan por updated_at (los upserts del broker
+    reescriben precio/fecha/ticker sin cambiar el id) e incluyen el par al que
+    estaba atribuido un movimiento editado, por si cambio de ticker o lado.
+    Las atribuciones nunca mezclan pares distintos, asi que re-atribuir solo
+    estos pares produce el mismo resultado que un sync completo.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT DISTINCT UPPER(ticker) || '|' || movement_type AS pair
+        FROM broker_movements
+        WHERE updated_at >= $2
+          AND executed_at >= $1
+          AND movement_type IN ('BUY', 'SELL')
+          AND ticker IS NOT NULL
+        UNION
+        SELECT DISTINCT pea.ticker || '|' || pea.side AS pair
+        FROM plan_execution_attribution_movements peam
+        JOIN plan_execution_attributions pea ON pea.id = peam.attribution_id
+        JOIN broker_movements bm ON bm.id = peam.broker_movement_id
+        WHERE bm.updated_at >= $2
+          AND pea.matching_version = $4
+        UNION
+        SELECT DISTINCT UPPER(ticker) || '|' || decision AS pair
+        FROM decision_log
+        WHERE (id > $3 OR decided_at >= $2)
+          AND decided_at >= $1
+          AND COALESCE(source, layers->>'source') = 'execution_plan'
+          AND decision IN ('BUY', 'SELL')
+          AND ticker IS NOT NULL
+        """,
+        cutoff,
+        since,
+        int(decision_id),
+        MATCHING_VERSION,
+    )
+    return sorted(str(row["pair"]) for row in rows if row["pair"])
+
+
+async def _pending_outcome_rows(
+    conn,
+    *,
+    cutoff: datetime,
+    skip_pairs: Sequence[str],
+) -> list[dict[str, Any]]:
+    """Atribuciones fuera de los pares tocados con algun horizonte sin madurar."""
+    rows = await conn.fetch(
+        """
+        SELECT id, ticker, side, executed_at, execution_price
+        FROM plan_execution_attributions
+        WHERE matching_version = $1
+          AND plan_decided_at >= $2
+          AND outcome_40d IS NULL
+          AND execution_price IS NOT NULL
+          AND execution_price > 0
+          AND NOT ((ticker || '|' || side) = ANY($3::text[]))
+        """,
+        MATCHING_VERSION,
+        cutoff,
+        list(skip_pairs),
+    )
+    return [dict(row) for row in rows]
+
+
+async def sync_plan_execution_attributions(
+    conn,
+    *,
+    days: int = 180,
+    match_window_sessions: int = 2,
+    incremental: bool = False,
+) -> dict[str, int]:
+    """Recalcula y persiste las atribuciones plan -> ejecucion de `days`.
+
+    Con `incremental=True` y un watermark previo de la misma version/ventana
+    solo se re-atribuyen los pares ticker|side con movimientos nuevos o
+    editados (updated_at) o planes nuevos; del resto solo se refrescan los
+    outcomes que aun no maduraron. Cada SYNC_FULL_REBUILD_INTERVAL se hace un
+    sync completo igualmente.
+    """
+    await ensure_plan_execution_attribution_schema(conn)
+    cutoff = datetime.now(tz=ART) - timedelta(days=max(1, int(days)))
+    high_water = await conn.fetchrow(
+        """
+        SELECT
+            (SELECT COALESCE(MAX(id), 0) FROM broker_movements) AS movement_id,
+            (SELECT COALESCE(MAX(id), 0) FROM decision_log) AS decision_id,
+            clock_timestamp() AS changes_at
+        """
+    )
+    changes_at = _as_datetime(high_water["changes_at"]) or datetime.now(tz=ART)
+    pairs: list[str] | None = None
+    full_rebuild_at: datetime | None = changes_at
+    if incremental:
+        watermark = await _read_sync_watermark(conn, match_window_sessions=match_window_sessions)
+        since = _incremental_watermark(watermark, now=changes_at)
+        if since is not None:
+            full_rebuild_at = _as_datetime(watermark["full_rebuild_at"])
+            pairs = await _touched_pairs(
+                conn,
+                cutoff=cutoff,
+                since=since,
+                decision_id=int(watermark["decision_id_watermark"]),
+            )
+    if pairs == []:
+        plans, movements = [], []
+    else:
+        plans = await _fetch_plans(conn, cutoff=cutoff, pairs=pairs)
+        movements = await _fetch_movements(conn, cutoff=cutoff, pairs=pairs)
+    attributions = normalize_plan_execution_attributions(
+        plans,
+        movements,
+        match_window_sessions=match_window_sessions,
+    )
+    await _attach_execution_outcomes(conn, attributions, cutoff=cutoff)
+    for row in attributions:
+        row["metadata"]["outcome_sources"] = _outcome_sources(row["outcomes"])
     keys = [row["attribution_key"] for row in attributions]
+    pending: list[dict[str, Any]] = []
+    if pairs is not None:
+        pending = await _pending_outcome_rows(conn, cutoff=cutoff, skip_pairs=pairs)
+        await _attach_execution_outcomes(conn, pending, cutoff=cutoff)
 
     async with conn.transaction():
         for row in attributions:
@@ -725,52 +996,7 @@ async def sync_plan_execution_attributions(
                 row["execution_notional_ars"],
                 json.dumps(row["metadata"]),
             )
-            outcomes = row["outcomes"]
-            has_outcome = any(
-                outcomes.get(f"outcome_{horizon}d") is not None
-                for horizon in OUTCOME_HORIZONS
-            )
-            await conn.execute(
-                """
-                UPDATE plan_execution_attributions SET
-                    outcome_5d = $2,
-                    outcome_10d = $3,
-                    outcome_20d = $4,
-                    outcome_40d = $5,
-                    outcome_date_5d = $6,
-                    outcome_date_10d = $7,
-                    outcome_date_20d = $8,
-                    outcome_date_40d = $9,
-                    outcome_price_5d = $10,
-                    outcome_price_10d = $11,
-                    outcome_price_20d = $12,
-                    outcome_price_40d = $13,
-                    outcome_basis = $14,
-                    outcome_version = $15,
-                    outcome_filled_at = CASE
-                        WHEN $16 THEN COALESCE(outcome_filled_at, NOW())
-                        ELSE NULL
-                    END,
-                    updated_at = NOW()
-                WHERE id = $1
-                """,
-                attribution_id,
-                outcomes.get("outcome_5d"),
-                outcomes.get("outcome_10d"),
-                outcomes.get("outcome_20d"),
-                outcomes.get("outcome_40d"),
-                outcomes.get("outcome_date_5d"),
-                outcomes.get("outcome_date_10d"),
-                outcomes.get("outcome_date_20d"),
-                outcomes.get("outcome_date_40d"),
-                outcomes.get("outcome_price_5d"),
-                outcomes.get("outcome_price_10d"),
-                outcomes.get("outcome_price_20d"),
-                outcomes.get("outcome_price_40d"),
-                OUTCOME_BASIS,
-                OUTCOME_VERSION,
-                has_outcome,
-            )
+            await _write_outcomes(conn, attribution_id, row["outcomes"])
             await conn.execute(
                 "DELETE FROM plan_execution_attribution_plans WHERE attribution_id = $1",
                 attribution_id,
@@ -820,27 +1046,45 @@ async def sync_plan_execution_attributions(
                     _movement_amount(movement),
                 )
 
-        if keys:
+        for row in pending:
+            await _write_outcomes(conn, int(row["id"]), row["outcomes"])
+
+        if pairs is None or pairs:
             await conn.execute(
                 """
                 DELETE FROM plan_execution_attributions
                 WHERE matching_version = $1
                   AND plan_decided_at >= $2
                   AND NOT (attribution_key = ANY($3::text[]))
+                  AND ($4::text[] IS NULL OR (ticker || '|' || side) = ANY($4::text[]))
                 """,
                 MATCHING_VERSION,
                 cutoff,
                 keys,
+                pairs,
             )
-        else:
-            await conn.execute(
-                """
-                DELETE FROM plan_execution_attributions
-                WHERE matching_version = $1 AND plan_decided_at >= $2
-                """,
-                MATCHING_VERSION,
-                cutoff,
-            )
+        await conn.execute(
+            """
+            INSERT INTO plan_execution_attribution_sync (
+                matching_version, match_window_sessions,
+                movement_id_watermark, decision_id_watermark,
+                changes_watermark, full_rebuild_at, synced_at
+            ) VALUES ($1,$2,$3,$4,$5,$6,NOW())
+            ON CONFLICT (matching_version) DO UPDATE SET
+                match_window_sessions = EXCLUDED.match_window_sessions,
+                movement_id_watermark = EXCLUDED.movement_id_watermark,
+                decision_id_watermark = EXCLUDED.decision_id_watermark,
+                changes_watermark = EXCLUDED.changes_watermark,
+                full_rebuild_at = EXCLUDED.full_rebuild_at,
+                synced_at = NOW()
+            """,
+            MATCHING_VERSION,
+            int(match_window_sessions),
+            int(high_water["movement_id"]),
+            int(high_water["decision_id"]),
+            changes_at,
+            full_rebuild_at,
+        )
 
     return {
         "plans": len(plans),
@@ -848,6 +1092,8 @@ async def sync_plan_execution_attributions(
         "attributions": len(attributions),
         "eligible": sum(bool(row["eligible_for_viability"]) for row in attributions),
         "ambiguous": sum(not bool(row["eligible_for_viability"]) for row in attributions),
+        "incremental": int(pairs is not None),
+        "outcomes_refreshed": len(pending),
     }
 
 
@@ -12,6 +12,7 @@ from src.analysis.plan_follow_attribution import (
     fetch_canonical_outcome_candles,
     fetch_outcome_corporate_effects,
 )
+from src.collector.schema_migrations import MIGRATION_POSITION_HOLD_AUDIT, schema_ready
 
 
 POSITION_HOLD_AUDIT_VERSION = "position-hold-sessions-v1"
@@ -72,6 +73,8 @@ CREATE INDEX IF NOT EXISTS idx_position_hold_pending
 
 
 async def ensure_position_hold_audit_schema(conn: Any) -> None:
+    if schema_ready(MIGRATION_POSITION_HOLD_AUDIT):
+        return
     await conn.execute(POSITION_HOLD_AUDIT_SCHEMA_SQL)
 
 
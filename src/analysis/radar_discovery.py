@@ -763,6 +763,13 @@ class RadarDiscoveryStore:
             ticker = str(getattr(effect, "ticker", "") or "").upper()
             if ticker:
                 effects_by_ticker.setdefault(ticker, []).append(effect)
+        raw_by_instrument = await _load_instrument_candles(
+            db,
+            {
+                (str(row["ticker"]).upper(), str(row.get("asset_type") or "UNKNOWN").upper())
+                for row in rows
+            },
+        )
         candles_by_instrument: dict[tuple[str, str], list[dict[str, Any]]] = {}
         affected: set[tuple[UUID, int]] = set()
         measurements: list[tuple[dict[str, Any], dict[str, Any], float]] = []
@@ -779,13 +786,8 @@ class RadarDiscoveryStore:
                 or str(getattr(effect, "asset_type", "") or "").upper() == asset_type
             ]
             if instrument_key not in candles_by_instrument:
-                candles = await db.get_market_candles(
-                    ticker,
-                    asset_type=asset_type if asset_type != "UNKNOWN" else None,
-                    limit=520,
-                )
                 candles_by_instrument[instrument_key] = normalize_candle_rows(
-                    candles,
+                    raw_by_instrument.get(instrument_key, []),
                     effects,
                 )
             candles = candles_by_instrument[instrument_key]
@@ -888,6 +890,13 @@ class RadarDiscoveryStore:
             ticker = str(getattr(effect, "ticker", "") or "").upper()
             if ticker:
                 effects_by_ticker.setdefault(ticker, []).append(effect)
+        raw_by_instrument = await _load_instrument_candles(
+            db,
+            {
+                (str(row["ticker"]).upper(), str(row.get("asset_type") or "UNKNOWN").upper())
+                for row in rows
+            },
+        )
         candle_cache: dict[tuple[str, str], list[dict[str, Any]]] = {}
         resolutions: list[tuple[dict[str, Any], dict[str, Any], float, datetime]] = []
 
@@ -902,12 +911,10 @@ class RadarDiscoveryStore:
                 or str(getattr(effect, "asset_type", "") or "").upper() == asset_type
             ]
             if key not in candle_cache:
-                candles = await db.get_market_candles(
-                    ticker,
-                    asset_type=asset_type if asset_type != "UNKNOWN" else None,
-                    limit=520,
+                candle_cache[key] = normalize_candle_rows(
+                    raw_by_instrument.get(key, []),
+                    effects,
                 )
-                candle_cache[key] = normalize_candle_rows(candles, effects)
             candles = candle_cache[key]
             basis_as_of = candles[-1]["ts"] if candles else row["reference_ts"]
             adjusted_reference, factor = rebase_reference_price(
@@ -1030,18 +1037,24 @@ class RadarDiscoveryStore:
             ticker = str(getattr(effect, "ticker", "") or "").upper()
             if ticker:
                 effects_by_ticker.setdefault(ticker, []).append(effect)
+        raw_by_instrument = await _load_instrument_candles(
+            db,
+            {
+                (str(row["ticker"]).upper(), str(row.get("asset_type") or "UNKNOWN").upper())
+                for row in rows
+            }
+            | {(benchmark, "UNKNOWN") for benchmark in BENCHMARK_TICKERS},
+        )
         candle_cache: dict[tuple[str, str], list[dict[str, Any]]] = {}
 
         async def _candles(ticker: str, asset_type: str = "UNKNOWN"):
             key = (ticker, asset_type)
             if key not in candle_cache:
                 effects = effects_by_ticker.get(ticker, [])
-                raw_candles = await db.get_market_candles(
-                    ticker,
-                    asset_type=asset_type if asset_type != "UNKNOWN" else None,
-                    limit=520,
+                candle_cache[key] = normalize_candle_rows(
+                    raw_by_instrument.get(key, []),
+                    effects,
                 )
-                candle_cache[key] = normalize_candle_rows(raw_candles, effects)
             return candle_cache[key]
 
         measurements: list[tuple[dict[str, Any], dict[str, Any], dict[str, Any]]] = []
@@ -1510,6 +1523,33 @@ def measure_discovery_outcome(
     }
 
 
+async def _load_instrument_candles(
+    db: Any,
+    instruments: set[tuple[str, str]],
+    *,
+    limit: int = 520,
+) -> dict[tuple[str, str], list[dict[str, Any]]]:
+    """Load candles for many (ticker, asset_type) keys, one query per asset type.
+
+    Rows come with the persisted corporate-action adjustment applied; the
+    callers' `normalize_candle_rows` only finds effects not yet versioned.
+    """
+    tickers_by_type: dict[str, list[str]] = {}
+    for ticker, asset_type in sorted(instruments):
+        tickers_by_type.setdefault(asset_type, []).append(ticker)
+    loaded: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    for asset_type, tickers in tickers_by_type.items():
+        grouped = await db.get_market_candle_rows_bulk(
+            tickers,
+            asset_type if asset_type != "UNKNOWN" else None,
+            limit,
+            adjusted=True,
+        )
+        for ticker in tickers:
+            loaded[(ticker, asset_type)] = grouped.get(ticker, [])
+    return loaded
+
+
 def _measure_benchmark_from_event(
     *,
     candles: Sequence[Mapping[str, Any]],
@@ -11,6 +11,8 @@ import math
 from statistics import median
 from typing import Any, Mapping, Sequence
 
+from src.analysis.parallel_universe import map_universe
+
 try:
     import pandas as pd
 except ImportError:  # pragma: no cover - scheduler image includes pandas
@@ -79,17 +81,19 @@ def build_radar_setup_shadow_universe(
     candidate_map = {str(key).upper(): value
                      for key, value in dict(candidates or {}).items()}
 
-    raw: dict[str, dict[str, Any]] = {}
-    for ticker in normalized_tickers:
-        if ticker in RADAR_SETUP_CONTROL_TICKERS:
-            continue
-        raw[ticker] = _extract_point_in_time_features(
-            ticker=ticker,
-            frame=history_frames.get(ticker),
-            asset_type=types.get(ticker, "UNKNOWN"),
-            screen=screens.get(ticker),
-            candidate=candidate_map.get(ticker),
-        )
+    feature_tickers = [
+        ticker for ticker in normalized_tickers
+        if ticker not in RADAR_SETUP_CONTROL_TICKERS
+    ]
+    raw: dict[str, dict[str, Any]] = map_universe(
+        _extract_universe_features,
+        {ticker: history_frames.get(ticker) for ticker in feature_tickers},
+        per_ticker={
+            "asset_types": types,
+            "screens": screens,
+            "candidates": candidate_map,
+        },
+    )
 
     benchmark_returns = {
         benchmark: _return_features(history_frames.get(benchmark))
@@ -232,6 +236,25 @@ def resolve_setup_event(
     return None
 
 
+def _extract_universe_features(
+    frames: Mapping[str, Any],
+    *,
+    asset_types: Mapping[str, str],
+    screens: Mapping[str, Any],
+    candidates: Mapping[str, Any],
+) -> dict[str, dict[str, Any]]:
+    return {
+        ticker: _extract_point_in_time_features(
+            ticker=ticker,
+            frame=frame,
+            asset_type=asset_types.get(ticker, "UNKNOWN"),
+            screen=screens.get(ticker),
+            candidate=candidates.get(ticker),
+        )
+        for ticker, frame in frames.items()
+    }
+
+
 def _extract_point_in_time_features(
     *,
     ticker: str,
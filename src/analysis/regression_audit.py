@@ -47,10 +47,12 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
-import asyncpg
 import numpy as np
 import pandas as pd
 
+from src.core.compute_executor import run_cpu
+from src.core.db_pool import connection
+
 try:
     import statsmodels.api as sm
     HAS_STATSMODELS = True
@@ -189,9 +191,7 @@ async def load_decision_log(
     Usa los resultados ya calculados por update_outcomes / decision_log.
     """
     dsn = database_url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-
-    try:
+    async with connection(dsn) as conn:
         cols = await _get_existing_columns(conn, "decision_log")
 
         wanted = [
@@ -267,9 +267,6 @@ async def load_decision_log(
 
         df = pd.DataFrame([dict(r) for r in rows])
 
-    finally:
-        await conn.close()
-
     return normalize_decision_frame(df)
 
 
@@ -1708,4 +1705,4 @@ async def run_regression_audit(
         since=getattr(config, "since", None),
     )
 
-    return run_regression_audit_sync(df, config)
+    return await run_cpu("regression_audit", run_regression_audit_sync, df, config)
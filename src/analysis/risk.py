@@ -105,7 +105,37 @@ class PortfolioRisk:
         return "\n".join(lines)
 
 
-def compute_asset_risk(ticker, prices, current_value, portfolio_total, vix=None, portfolio_drawdown=0.0):
+def _price_risk_stats(prices) -> dict:
+    """Métricas que solo dependen de la serie de precios (cacheables por vela)."""
+    returns = prices.pct_change().dropna()
+    vol_d = float(returns.std())
+    vol_a = vol_d * (252 ** 0.5)
+    rm = prices.cummax()
+    stats = {
+        "vol_annual_raw":    vol_a,
+        "volatility_annual": round(vol_a, 4),
+        "volatility_20d":    round(float(returns.tail(20).std()) * (252 ** 0.5), 4),
+        "avg_daily_return":  round(float(returns.mean()), 6),
+        "sharpe_approx":     round((float(returns.mean()) / vol_d) * (252 ** 0.5), 3) if vol_d > 0 else 0.0,
+        "max_drawdown_6m":   round(float(((prices - rm) / rm).min()), 4),
+    }
+
+    # ── Kelly fraccionario ─────────────────────────────────────────────────
+    wins   = returns[returns > 0]
+    losses = returns[returns < 0]
+    if len(wins) > 10 and len(losses) > 10:
+        wr = len(wins) / len(returns)
+        aw = float(wins.mean())
+        al = abs(float(losses.mean()))
+        raw_kelly = max(0.0, (wr * aw - (1 - wr) * al) / aw) if al > 0 else 0.20
+        stats["kelly_fraction"] = round(raw_kelly * KELLY_FRAC, 4)
+    else:
+        stats["kelly_fraction"] = 0.10  # default conservador
+    return stats
+
+
+def compute_asset_risk(ticker, prices, current_value, portfolio_total, vix=None, portfolio_drawdown=0.0,
+                       stats_cache=None):
     m = RiskMetrics(ticker=ticker)
     if not HAS_DEPS or prices is None or len(prices) < 20:
         current_pct = current_value / portfolio_total if portfolio_total > 0 else 0.0
@@ -116,28 +146,17 @@ def compute_asset_risk(ticker, prices, current_value, portfolio_total, vix=None,
         return m
 
     try:
-        returns = prices.pct_change().dropna()
-        vol_d = float(returns.std())
-        vol_a = vol_d * (252 ** 0.5)
-        m.volatility_annual = round(vol_a, 4)
-        m.volatility_20d    = round(float(returns.tail(20).std()) * (252 ** 0.5), 4)
-        m.avg_daily_return  = round(float(returns.mean()), 6)
-        m.sharpe_approx     = round((float(returns.mean()) / vol_d) * (252 ** 0.5), 3) if vol_d > 0 else 0.0
-
-        rm = prices.cummax()
-        m.max_drawdown_6m = round(float(((prices - rm) / rm).min()), 4)
-
-        # ── Kelly fraccionario ─────────────────────────────────────────────
-        wins   = returns[returns > 0]
-        losses = returns[returns < 0]
-        if len(wins) > 10 and len(losses) > 10:
-            wr = len(wins) / len(returns)
-            aw = float(wins.mean())
-            al = abs(float(losses.mean()))
-            raw_kelly = max(0.0, (wr * aw - (1 - wr) * al) / aw) if al > 0 else 0.20
-            m.kelly_fraction = round(raw_kelly * KELLY_FRAC, 4)
+        if stats_cache is not None:
+            stats = stats_cache.asset_stats(ticker, prices, lambda: _price_risk_stats(prices))
         else:
-            m.kelly_fraction = 0.10  # default conservador
+            stats = _price_risk_stats(prices)
+        vol_a = stats["vol_annual_raw"]
+        m.volatility_annual = stats["volatility_annual"]
+        m.volatility_20d    = stats["volatility_20d"]
+        m.avg_daily_return  = stats["avg_daily_return"]
+        m.sharpe_approx     = stats["sharpe_approx"]
+        m.max_drawdown_6m   = stats["max_drawdown_6m"]
+        m.kelly_fraction    = stats["kelly_fraction"]
 
         # ── Position sizing base ───────────────────────────────────────────
         # VOL_TARGET / asset_vol da el sizing para alcanzar la vol objetivo
@@ -220,7 +239,8 @@ def _portfolio_equity_total_for_risk(positions, total_ars, cash_ars) -> float:
     return max(supplied_total, invested + cash)
 
 
-def build_portfolio_risk_report(positions, prices_map, total_ars, cash_ars, history, vix=None):
+def build_portfolio_risk_report(positions, prices_map, total_ars, cash_ars, history, vix=None,
+                                stats_cache=None):
     drawdown  = compute_portfolio_drawdown(history)
     equity_total = _portfolio_equity_total_for_risk(positions, total_ars, cash_ars)
     cash = max(float(cash_ars or 0.0), 0.0)
@@ -249,7 +269,7 @@ def build_portfolio_risk_report(positions, prices_map, total_ars, cash_ars, hist
         ticker = pos.get("ticker", "")
         prices = prices_map.get(ticker)
         mv     = float(pos.get("market_value", 0) or 0)
-        m      = compute_asset_risk(ticker, prices, mv, equity_total, vix, drawdown)
+        m      = compute_asset_risk(ticker, prices, mv, equity_total, vix, drawdown, stats_cache)
 
         current_pct = mv / equity_total if equity_total > 0 else 0.0
         delta       = m.suggested_pct_adj - current_pct
@@ -268,6 +288,14 @@ def build_portfolio_risk_report(positions, prices_map, total_ars, cash_ars, hist
             "action":           action,
             "warnings":         m.warnings,
         })
+        # Vol EWMA de la ventana móvil del optimizer, si ya llegó a la última vela.
+        rolling = (
+            stats_cache.rolling_vol(ticker, prices.index[-1])
+            if stats_cache is not None and prices is not None and len(prices)
+            else None
+        )
+        if rolling:
+            pr.positions[-1]["volatility_ewma"] = round(rolling["ewma"], 4)
         logger.info(
             f"Risk {ticker}: vol={m.volatility_annual:.0%} sharpe={m.sharpe_approx:.2f} "
             f"sizing={m.suggested_pct_adj:.1%} ({action})"
@@ -0,0 +1,228 @@
+"""
+src/analysis/rolling_moments.py — Media/covarianza de una ventana móvil de retornos.
+
+Cada día entra una fila de retornos por universo y sale la más vieja, así
+que la covarianza de la ventana se mantiene con dos updates de rango uno
+sobre Σr y Σrrᵀ en vez de recalcular O(N²·T). La ventana guarda las filas
+(hacen falta para sacar la más vieja y para re-sumar cada `REBASE_EVERY`
+updates y cortar el drift de punto flotante).
+
+Las filas replican la grilla de `optimizer._fetch_returns`: unión de
+fechas recortada a las últimas `WINDOW_ROWS`, retorno de cada ticker contra
+su cierre anterior y 0 si ese día no operó. Con velas de 260 sesiones por
+ticker la grilla arranca después del primer retorno de cada serie completa,
+así que un hueco de un ticker no cambia el borde de la ventana y el estado
+avanzado por el scheduler sigue coincidiendo con la matriz del optimizer.
+Además se lleva la variante EWMA (RiskMetrics, λ=0.94) con la recursión de
+West, que no necesita ventana.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+EWMA_LAMBDA = 0.94
+REBASE_EVERY = 64
+ANNUALIZATION = 252
+# Filas de la grilla de retornos (un año de ruedas).
+WINDOW_ROWS = 252
+EWMA_SEED_BLOCK = 64
+
+
+def _ewma_seed(rows: np.ndarray, lam: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Recursión de West desde cero sobre todas las filas, sin el loop de
+    productos externos: cov_T = Σ (1-λ)·λ^(T-t+1)·δ_t·δ_tᵀ con
+    δ_t = r_t - m_(t-1), así que alcanza con un solo `Dᵀ·diag(w)·D`.
+    """
+    t, n = rows.shape
+    if t == 0:
+        return np.zeros(n), np.zeros((n, n))
+    # m_t = λ·m_(t-1) + (1-λ)·r_t en bloques: dentro de cada uno es un cumsum
+    # reescalado por λ^-j (acotado por bloque para no perder precisión).
+    means = np.empty_like(rows)
+    carry = np.zeros(n)
+    for start in range(0, t, EWMA_SEED_BLOCK):
+        block = rows[start:start + EWMA_SEED_BLOCK]
+        decay = lam ** np.arange(len(block), dtype=float)
+        scaled = np.cumsum(block / decay[:, None], axis=0)
+        means[start:start + len(block)] = (
+            (lam * decay)[:, None] * carry + (1.0 - lam) * decay[:, None] * scaled
+        )
+        carry = means[start + len(block) - 1]
+    previous = np.vstack([np.zeros((1, n)), means[:-1]])
+    deltas = rows - previous
+    weights = (1.0 - lam) * lam ** np.arange(t, 0, -1, dtype=float)
+    return means[-1], (deltas * weights[:, None]).T @ deltas
+
+
+@dataclass
+class RollingMoments:
+    tickers: list[str]
+    window: int
+    dates: list[str] = field(default_factory=list)
+    rows: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    total: np.ndarray = field(default_factory=lambda: np.empty(0))
+    cross: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    ewma_lambda: float = EWMA_LAMBDA
+    ewma_mean: np.ndarray = field(default_factory=lambda: np.empty(0))
+    ewma_cov: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+    updates_since_rebase: int = 0
+    last_used: str = ""
+
+    # ── Construcción ─────────────────────────────────────────────────────
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, *, ewma_lambda: float = EWMA_LAMBDA) -> "RollingMoments":
+        """Estado inicial desde la matriz alineada (mismo costo que un `cov()`)."""
+        rows = returns.to_numpy(dtype=float, copy=True)
+        state = cls(
+            tickers=[str(c) for c in returns.columns],
+            # Una ventana todavía corta crece hasta la grilla completa.
+            window=max(len(rows), WINDOW_ROWS),
+            dates=[str(ts) for ts in returns.index],
+            rows=rows,
+            ewma_lambda=ewma_lambda,
+        )
+        state._rebase()
+        state.ewma_mean, state.ewma_cov = _ewma_seed(rows, ewma_lambda)
+        return state
+
+    def _rebase(self) -> None:
+        self.total = self.rows.sum(axis=0)
+        self.cross = self.rows.T @ self.rows
+        self.updates_since_rebase = 0
+
+    def _ewma_update(self, row: np.ndarray) -> None:
+        # Misma recursión que `_ewma_seed`, una fila por vez.
+        lam = self.ewma_lambda
+        delta = row - self.ewma_mean
+        self.ewma_mean = self.ewma_mean + (1.0 - lam) * delta
+        self.ewma_cov = lam * (self.ewma_cov + (1.0 - lam) * np.outer(delta, delta))
+
+    # ── Updates ──────────────────────────────────────────────────────────
+
+    def push(self, date: str, row: np.ndarray) -> None:
+        """Agrega la fila más nueva y, si la ventana está llena, saca la más vieja."""
+        row = np.asarray(row, dtype=float)
+        self.rows = np.vstack([self.rows, row])
+        self.dates.append(str(date))
+        self.total = self.total + row
+        self.cross = self.cross + np.outer(row, row)
+        if len(self.rows) > self.window:
+            oldest = self.rows[0]
+            self.rows = self.rows[1:]
+            self.dates = self.dates[1:]
+            self.total = self.total - oldest
+            self.cross = self.cross - np.outer(oldest, oldest)
+        self._ewma_update(row)
+        self.updates_since_rebase += 1
+        if self.updates_since_rebase >= REBASE_EVERY:
+            self._rebase()
+
+    def advance_from_frames(self, frames: Mapping[str, Any]) -> Optional[int]:
+        """
+        Empuja las fechas posteriores a la ventana presentes en `frames`
+        (velas diarias por ticker). Devuelve cuántas filas entraron, o None
+        si a algún ticker le falta el cierre previo y el estado no puede
+        seguir (se reconstruye en la próxima corrida del optimizer).
+        """
+        if not self.dates:
+            return None
+        last = pd.Timestamp(self.dates[-1])
+        closes: dict[str, pd.Series] = {}
+        for ticker in self.tickers:
+            df = frames.get(ticker)
+            if df is None or "Close" not in getattr(df, "columns", ()) or df.empty:
+                continue
+            closes[ticker] = df["Close"].astype(float)
+
+        new_dates = sorted({ts for series in closes.values() for ts in series.index if ts > last})
+        if not new_dates:
+            return 0
+
+        for ts in new_dates:
+            row = np.zeros(len(self.tickers))
+            for i, ticker in enumerate(self.tickers):
+                series = closes.get(ticker)
+                if series is None or ts not in series.index:
+                    continue
+                position = series.index.get_loc(ts)
+                if position == 0:
+                    return None
+                row[i] = series.iloc[position] / series.iloc[position - 1] - 1.0
+            self.push(str(ts), row)
+        return len(new_dates)
+
+    # ── Lecturas ─────────────────────────────────────────────────────────
+
+    def matches(self, returns: pd.DataFrame) -> bool:
+        """La ventana es exactamente esta matriz de retornos (mismo orden)."""
+        return (
+            list(map(str, returns.columns)) == self.tickers
+            and len(returns) == len(self.rows)
+            and [str(ts) for ts in returns.index] == self.dates
+            and np.array_equal(returns.to_numpy(dtype=float), self.rows)
+        )
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / max(len(self.rows), 1)
+
+    def cov(self) -> np.ndarray:
+        """Covarianza muestral diaria (ddof=1)."""
+        n = len(self.rows)
+        if n < 2:
+            return np.full((len(self.tickers),) * 2, np.nan)
+        return (self.cross - np.outer(self.total, self.total) / n) / (n - 1)
+
+    def cov_frame(self, annualize: bool = True) -> pd.DataFrame:
+        scale = ANNUALIZATION if annualize else 1
+        return pd.DataFrame(self.cov() * scale, index=self.tickers, columns=self.tickers)
+
+    def vol(self) -> dict[str, float]:
+        """Volatilidad anual por activo de la ventana."""
+        variances = np.clip(np.diag(self.cov()), 0.0, None)
+        return dict(zip(self.tickers, np.sqrt(variances * ANNUALIZATION).tolist()))
+
+    def ewma_vol(self) -> dict[str, float]:
+        variances = np.clip(np.diag(self.ewma_cov), 0.0, None)
+        return dict(zip(self.tickers, np.sqrt(variances * ANNUALIZATION).tolist()))
+
+    # ── Serialización ────────────────────────────────────────────────────
+
+    def to_payload(self) -> dict:
+        return {
+            "tickers": self.tickers,
+            "window": self.window,
+            "dates": self.dates,
+            "rows": self.rows.tolist(),
+            "total": self.total.tolist(),
+            "cross": self.cross.tolist(),
+            "updates_since_rebase": self.updates_since_rebase,
+            "ewma_lambda": self.ewma_lambda,
+            "ewma_mean": self.ewma_mean.tolist(),
+            "ewma_cov": self.ewma_cov.tolist(),
+            "last_used": self.last_used,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Any]) -> "RollingMoments":
+        tickers = list(payload["tickers"])
+        n = len(tickers)
+        return cls(
+            tickers=tickers,
+            window=int(payload["window"]),
+            dates=list(payload["dates"]),
+            rows=np.asarray(payload["rows"], dtype=float).reshape(-1, n),
+            total=np.asarray(payload["total"], dtype=float).reshape(n),
+            cross=np.asarray(payload["cross"], dtype=float).reshape(n, n),
+            ewma_lambda=float(payload.get("ewma_lambda", EWMA_LAMBDA)),
+            ewma_mean=np.asarray(payload["ewma_mean"], dtype=float).reshape(n),
+            ewma_cov=np.asarray(payload["ewma_cov"], dtype=float).reshape(n, n),
+            updates_since_rebase=int(payload.get("updates_since_rebase") or 0),
+            last_used=str(payload.get("last_used") or ""),
+        )
@@ -2,6 +2,11 @@
 
 This module only captures raw news/events. It does not score, trade or modify
 planner decisions.
+
+Intraday cycles pass a per-source `FeedState` (ETag, Last-Modified and the
+hashes of the items already captured), persisted in Redis between runs:
+quiet feeds answer 304 and items already seen are not rebuilt. The DB
+upsert only touches rows whose content actually changed.
 """
 from __future__ import annotations
 
@@ -11,17 +16,26 @@ import json
 import logging
 import os
 import warnings
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
-from typing import Iterable
+from typing import Iterable, Mapping
 from urllib.parse import urlencode
 
 import httpx
 from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 
+from src.core.redis_client import client as redis_client
+
 logger = logging.getLogger(__name__)
 
+FEED_STATE_KEY = "cocos:sentiment:feed_state"
+FEED_STATE_TTL_SECONDS = 7 * 24 * 3600
+FEED_STATE_MAX_SEEN = 200
+# Items ya vistos seguidos antes de cortar el parseo: los feeds vienen
+# mayormente del más nuevo al más viejo, pero los agregadores no siempre.
+FEED_SEEN_STOP_RUN = 3
+
 
 @dataclass(frozen=True)
 class SentimentRawItem:
@@ -37,6 +51,70 @@ class SentimentRawItem:
         return hashlib.sha256(self.url.encode("utf-8")).hexdigest()
 
 
+def item_seen_hash(url: str, headline: str) -> str:
+    """Identidad de un item del feed: un titular editado cuenta como nuevo."""
+    return hashlib.sha1(f"{url}\n{headline}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FeedState:
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    seen: list[str] = field(default_factory=list)
+    checked_at: str | None = None
+    not_modified: int = 0
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        if url != self.url:
+            return {}
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def remember(self, url: str, response_headers: Mapping[str, str], hashes: Iterable[str]) -> None:
+        if url != self.url:
+            self.url, self.seen = url, []
+        self.etag = response_headers.get("etag") or None
+        self.last_modified = response_headers.get("last-modified") or None
+        merged = list(dict.fromkeys([*hashes, *self.seen]))
+        self.seen = merged[:FEED_STATE_MAX_SEEN]
+        self.checked_at = datetime.now(timezone.utc).isoformat()
+        self.not_modified = 0
+
+
+async def load_feed_states() -> dict[str, FeedState]:
+    try:
+        raw = await redis_client.hgetall(FEED_STATE_KEY) or {}
+    except Exception as exc:
+        logger.debug("Redis feed state get ignorado: %s", exc)
+        return {}
+    states: dict[str, FeedState] = {}
+    for name, value in raw.items():
+        try:
+            states[str(name)] = FeedState(**json.loads(value))
+        except (TypeError, ValueError):
+            continue
+    return states
+
+
+async def save_feed_states(states: Mapping[str, FeedState]) -> None:
+    """Persistir solo después de guardar los items: si no, quedarían como vistos."""
+    if not states:
+        return
+    try:
+        await redis_client.hset(
+            FEED_STATE_KEY,
+            mapping={name: json.dumps(asdict(state)) for name, state in states.items()},
+        )
+        await redis_client.expire(FEED_STATE_KEY, FEED_STATE_TTL_SECONDS)
+    except Exception as exc:
+        logger.debug("Redis feed state set ignorado: %s", exc)
+
+
 @dataclass(frozen=True)
 class NewsSource:
     name: str
@@ -309,7 +387,19 @@ def _link(node) -> str:
     return ""
 
 
-def _parse_rss(source: NewsSource, content: bytes, max_items: int) -> list[SentimentRawItem]:
+def _parse_rss(
+    source: NewsSource,
+    content: bytes,
+    max_items: int,
+    *,
+    seen: Iterable[str] = (),
+    hashes_out: list[str] | None = None,
+) -> list[SentimentRawItem]:
+    """
+    Items nuevos del feed. Los que están en `seen` se saltean y, tras
+    `FEED_SEEN_STOP_RUN` vistos seguidos, se deja de recorrer el feed.
+    `hashes_out` recibe el hash de cada item recorrido.
+    """
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
         soup = BeautifulSoup(content, "html.parser")
@@ -317,12 +407,23 @@ def _parse_rss(source: NewsSource, content: bytes, max_items: int) -> list[Senti
     if not items:
         items = soup.find_all("entry")
 
+    seen = set(seen)
+    seen_run = 0
     parsed: list[SentimentRawItem] = []
     for item in items[:max_items]:
         headline = _text(item, "title")
         url = _link(item)
         if not headline or not url:
             continue
+        item_hash = item_seen_hash(url, headline[:500])
+        if hashes_out is not None:
+            hashes_out.append(item_hash)
+        if item_hash in seen:
+            seen_run += 1
+            if seen_run >= FEED_SEEN_STOP_RUN:
+                break
+            continue
+        seen_run = 0
         if (
             source.publisher == "Reuters"
             and source.delivery == "google_news_rss_publisher_filter"
@@ -360,8 +461,15 @@ async def fetch_raw_sentiment_items(
     tickers: Iterable[str] | None = None,
     max_items_per_source: int = 25,
     timeout_seconds: float = 8.0,
+    feed_states: dict[str, FeedState] | None = None,
 ) -> list[SentimentRawItem]:
-    """Fetch configured news feeds and return raw items."""
+    """
+    Fetch configured news feeds and return raw items.
+
+    With `feed_states` the requests are conditional and only unseen items
+    come back; the dict is updated in place and the caller persists it
+    (`save_feed_states`) once the items are saved.
+    """
     selected = list(sources or _env_sources(tickers))
     if not selected:
         return []
@@ -375,13 +483,34 @@ async def fetch_raw_sentiment_items(
         concurrency = 6
     semaphore = asyncio.Semaphore(concurrency)
 
+    not_modified: list[str] = []
+
     async def _fetch_source(client, source: NewsSource) -> list[SentimentRawItem]:
+        state = feed_states.get(source.name) if feed_states is not None else None
         async with semaphore:
             try:
-                resp = await client.get(source.url, headers=headers)
+                request_headers = dict(headers)
+                if state is not None:
+                    request_headers.update(state.conditional_headers(source.url))
+                resp = await client.get(source.url, headers=request_headers)
+                if resp.status_code == 304 and state is not None:
+                    state.not_modified += 1
+                    not_modified.append(source.name)
+                    return []
                 resp.raise_for_status()
                 if source.kind == "rss":
-                    return _parse_rss(source, resp.content, max_items_per_source)
+                    hashes: list[str] = []
+                    parsed = _parse_rss(
+                        source,
+                        resp.content,
+                        max_items_per_source,
+                        seen=state.seen if state is not None and state.url == source.url else (),
+                        hashes_out=hashes,
+                    )
+                    if feed_states is not None:
+                        state = feed_states.setdefault(source.name, FeedState(url=source.url))
+                        state.remember(source.url, resp.headers, hashes)
+                    return parsed
             except Exception as exc:
                 logger.warning("sentiment fetch failed source=%s: %s", source.name, exc)
             return []
@@ -391,6 +520,8 @@ async def fetch_raw_sentiment_items(
         batches = await asyncio.gather(*(_fetch_source(client, source) for source in selected))
         for batch in batches:
             items.extend(batch)
+    if not_modified:
+        logger.info("sentiment feeds sin cambios (304): %d/%d", len(not_modified), len(selected))
 
     # Dedupe within the batch before DB upsert.
     unique: dict[str, SentimentRawItem] = {}
@@ -400,73 +531,56 @@ async def fetch_raw_sentiment_items(
 
 
 async def save_raw_sentiment_items(conn, items: Iterable[SentimentRawItem]) -> int:
-    """Persist raw sentiment items. Returns inserted/updated row count."""
-    rows = list(items or [])
-    if not rows:
-        return 0
+    """
+    Persist raw sentiment items. Returns inserted/updated row count.
 
-    existing_rows = await conn.fetch(
-        """
-        SELECT source, url_hash, headline, body_snippet, published_at, raw_payload
-        FROM sentiment_raw
-        WHERE url_hash = ANY($1::text[])
-        """,
-        [item.url_hash for item in rows],
-    )
-    existing = {str(row["url_hash"]): dict(row) for row in existing_rows}
-
-    def _json_key(value) -> str:
-        if isinstance(value, str):
-            try:
-                value = json.loads(value)
-            except Exception:
-                pass
-        return json.dumps(value or {}, sort_keys=True, separators=(",", ":"), default=str)
-
-    def _changed(item: SentimentRawItem) -> bool:
-        current = existing.get(item.url_hash)
-        if current is None:
-            return True
-        effective_published_at = item.published_at or current.get("published_at")
-        return any(
-            (
-                str(current.get("source") or "") != str(item.source or ""),
-                str(current.get("headline") or "") != str(item.headline or ""),
-                str(current.get("body_snippet") or "") != str(item.body_snippet or ""),
-                current.get("published_at") != effective_published_at,
-                _json_key(current.get("raw_payload")) != _json_key(item.raw_payload),
-            )
-        )
-
-    rows = [item for item in rows if _changed(item)]
+    Unchanged rows are filtered by Postgres (`IS DISTINCT FROM` in the
+    conflict clause), so a quiet cycle writes nothing.
+    """
+    unique: dict[str, SentimentRawItem] = {}
+    for item in items or []:
+        unique[item.url_hash] = item
+    rows = list(unique.values())
     if not rows:
         return 0
 
-    values = [
-        (
-            item.source,
-            item.url,
-            item.url_hash,
-            item.headline,
-            item.body_snippet,
-            item.published_at,
-            json.dumps(item.raw_payload or {}),
-        )
-        for item in rows
-    ]
-    await conn.executemany(
+    written = await conn.fetch(
         """
         INSERT INTO sentiment_raw (
             source, url, url_hash, headline, body_snippet, published_at, raw_payload
         )
-        VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb)
+        SELECT source, url, url_hash, headline, body_snippet, published_at, raw_payload::jsonb
+        FROM unnest(
+            $1::text[], $2::text[], $3::text[], $4::text[], $5::text[],
+            $6::timestamptz[], $7::text[]
+        ) AS incoming(source, url, url_hash, headline, body_snippet, published_at, raw_payload)
         ON CONFLICT (url_hash) DO UPDATE SET
             source = EXCLUDED.source,
             headline = EXCLUDED.headline,
             body_snippet = EXCLUDED.body_snippet,
             published_at = COALESCE(EXCLUDED.published_at, sentiment_raw.published_at),
             raw_payload = EXCLUDED.raw_payload
+        WHERE (
+            sentiment_raw.source,
+            sentiment_raw.headline,
+            sentiment_raw.body_snippet,
+            sentiment_raw.published_at,
+            sentiment_raw.raw_payload
+        ) IS DISTINCT FROM (
+            EXCLUDED.source,
+            EXCLUDED.headline,
+            EXCLUDED.body_snippet,
+            COALESCE(EXCLUDED.published_at, sentiment_raw.published_at),
+            EXCLUDED.raw_payload
+        )
+        RETURNING id
         """,
-        values,
+        [item.source for item in rows],
+        [item.url for item in rows],
+        [item.url_hash for item in rows],
+        [item.headline for item in rows],
+        [item.body_snippet for item in rows],
+        [item.published_at for item in rows],
+        [json.dumps(item.raw_payload or {}) for item in rows],
     )
-    return len(rows)
+    return len(written)
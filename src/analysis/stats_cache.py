@@ -0,0 +1,313 @@
+"""
+src/analysis/stats_cache.py — Cache de estadísticas derivadas de velas diarias.
+
+Entre dos corridas de /analisis las velas canónicas no cambian hasta el
+próximo build diario, así que la matriz de retornos alineada, las
+covarianzas (muestral y Ledoit-Wolf) y las métricas base de riesgo por
+activo se recalculaban idénticas. Acá se guardan en un hash de Redis por
+generación:
+
+- el campo lleva la última fecha de vela (watermark) y un digest del
+  contenido (universo ordenado + índice + cierres), así que un frame
+  ajustado en proceso por `guard_history_frames` nunca lee stats viejas;
+- `invalidate_analysis_stats()` incrementa la generación: lo llaman el
+  build diario de velas, el rebuild canónico y la carga de corporate
+  actions. El hash de la generación anterior expira solo.
+
+El optimizer y el risk engine son sync (corren vía `run_cpu`), por eso el
+cache se carga antes (`load_analysis_stats_cache`), se consulta en memoria y
+los campos nuevos se escriben al final (`save_analysis_stats_cache`).
+
+Aparte, cada universo del optimizer tiene un `RollingMoments` en
+`cocos:analysis:rolling` que no se invalida: el build diario de velas lo
+avanza una fila (`advance_rolling_moments`), así la primera corrida después
+del cierre ya encuentra la covarianza de la ventana nueva.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.rolling_moments import RollingMoments
+from src.core.redis_client import client as redis_client
+
+logger = logging.getLogger(__name__)
+
+STATS_GENERATION_KEY = "cocos:analysis:stats:generation"
+STATS_HASH_PREFIX = "cocos:analysis:stats:g"
+STATS_TTL_SECONDS = 3 * 24 * 3600
+ROLLING_HASH_KEY = "cocos:analysis:rolling"
+ROLLING_STALE_DAYS = 14
+# Velas por ticker que lee el scheduler para avanzar: alcanza para cubrir
+# algunos días sin build; si el hueco es mayor el estado se descarta. Son
+# ajustadas, igual que las que lee /analisis.
+ROLLING_ADVANCE_CANDLES = 10
+
+
+def _stats_hash_key(generation: int) -> str:
+    return f"{STATS_HASH_PREFIX}{int(generation)}"
+
+
+def _series_digest(hasher, name: str, prices: pd.Series) -> None:
+    hasher.update(name.encode())
+    hasher.update(pd.util.hash_pandas_object(prices.astype(float), index=True).to_numpy().tobytes())
+
+
+def _watermark(index) -> str:
+    if len(index) == 0:
+        return "-"
+    last = index[-1]
+    return last.date().isoformat() if hasattr(last, "date") else str(last)
+
+
+def _frame_to_payload(frame: pd.DataFrame) -> dict:
+    return {
+        "index": [str(value) for value in frame.index],
+        "columns": [str(column) for column in frame.columns],
+        "values": frame.to_numpy(dtype=float).tolist(),
+    }
+
+
+def _frame_from_payload(payload: Mapping[str, Any], *, datetime_index: bool = True) -> pd.DataFrame:
+    index = pd.to_datetime(payload["index"]) if datetime_index else list(payload["index"])
+    return pd.DataFrame(
+        np.asarray(payload["values"], dtype=float).reshape(len(payload["index"]), len(payload["columns"])),
+        index=index,
+        columns=list(payload["columns"]),
+    )
+
+
+@dataclass
+class AnalysisStatsCache:
+    """Vista en memoria del hash de la generación vigente."""
+
+    generation: int = 0
+    entries: dict[str, Any] = field(default_factory=dict)
+    pending: dict[str, Any] = field(default_factory=dict)
+    rolling: dict[str, RollingMoments] = field(default_factory=dict)
+    rolling_pending: set[str] = field(default_factory=set)
+    hits: int = 0
+    misses: int = 0
+
+    def _lookup(self, key: str, build: Callable[[], Any]) -> Any:
+        if key in self.entries:
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        payload = build()
+        if payload is not None:
+            self.entries[key] = payload
+            self.pending[key] = payload
+        return payload
+
+    def returns_matrix(
+        self,
+        universe: Iterable[str],
+        history_frames: Mapping[str, Any],
+        build: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Retornos alineados de `universe`; clave = universo ordenado + velas."""
+        hasher = hashlib.sha1()
+        last_dates = []
+        for ticker in sorted(set(universe)):
+            df = history_frames.get(ticker)
+            if df is None or "Close" not in getattr(df, "columns", ()):
+                hasher.update(f"{ticker}:-".encode())
+                continue
+            prices = df["Close"].squeeze()
+            _series_digest(hasher, ticker, prices)
+            last_dates.append(_watermark(prices.index))
+        key = f"returns:{max(last_dates, default='-')}:{hasher.hexdigest()}"
+
+        def _build():
+            frame = build()
+            return None if frame.empty else _frame_to_payload(frame)
+
+        payload = self._lookup(key, _build)
+        if payload is None:
+            return pd.DataFrame()
+        return _frame_from_payload(payload)
+
+    def covariance(
+        self,
+        method: str,
+        returns: pd.DataFrame,
+        build: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Covarianza anualizada (`sample`, `ledoit_wolf`) de una matriz de retornos."""
+        hasher = hashlib.sha1()
+        hasher.update(",".join(map(str, returns.columns)).encode())
+        hasher.update(np.ascontiguousarray(returns.to_numpy(dtype=float)).tobytes())
+        key = f"cov:{method}:{_watermark(returns.index)}:{hasher.hexdigest()}"
+        payload = self._lookup(key, lambda: _frame_to_payload(build()))
+        return _frame_from_payload(payload, datetime_index=False)
+
+    def moments_for(self, returns: pd.DataFrame) -> RollingMoments:
+        """
+        Ventana móvil de este universo. Si el estado persistido es
+        exactamente `returns` se usa tal cual (O(N·T) para verificarlo);
+        si no, se reconstruye y queda para que el scheduler lo avance.
+        """
+        key = ",".join(map(str, returns.columns))
+        state = self.rolling.get(key)
+        if state is None or not state.matches(returns):
+            state = RollingMoments.from_returns(returns)
+            self.rolling[key] = state
+        self._mark_used(key, state)
+        return state
+
+    def touch_moments(self, returns: pd.DataFrame) -> None:
+        """Marca en uso la ventana del universo sin verificarla (covarianza en hit)."""
+        key = ",".join(map(str, returns.columns))
+        state = self.rolling.get(key)
+        if state is not None:
+            self._mark_used(key, state)
+
+    def _mark_used(self, key: str, state: RollingMoments) -> None:
+        today = date.today().isoformat()
+        if state.last_used != today:
+            state.last_used = today
+            self.rolling_pending.add(key)
+
+    def rolling_vol(self, ticker: str, last_ts) -> Optional[dict[str, float]]:
+        """Vol anual de ventana y EWMA de `ticker` si algún estado llega a `last_ts`."""
+        for state in self.rolling.values():
+            if ticker in state.tickers and state.dates and state.dates[-1] == str(last_ts):
+                return {"window": state.vol()[ticker], "ewma": state.ewma_vol()[ticker]}
+        return None
+
+    def asset_stats(
+        self,
+        ticker: str,
+        prices: pd.Series,
+        build: Callable[[], dict],
+    ) -> dict:
+        """Métricas de riesgo que solo dependen de la serie de precios."""
+        hasher = hashlib.sha1()
+        _series_digest(hasher, ticker, prices)
+        key = f"risk:{ticker}:{_watermark(prices.index)}:{hasher.hexdigest()}"
+        return dict(self._lookup(key, build))
+
+
+async def load_analysis_stats_cache() -> AnalysisStatsCache:
+    try:
+        generation = int(await redis_client.get(STATS_GENERATION_KEY) or 0)
+        raw = await redis_client.hgetall(_stats_hash_key(generation)) or {}
+        raw_rolling = await redis_client.hgetall(ROLLING_HASH_KEY) or {}
+    except Exception as exc:
+        logger.debug("Redis analysis stats get ignorado: %s", exc)
+        return AnalysisStatsCache()
+    entries = {}
+    for key, value in raw.items():
+        try:
+            entries[str(key)] = json.loads(value)
+        except (TypeError, ValueError):
+            continue
+    return AnalysisStatsCache(
+        generation=generation,
+        entries=entries,
+        rolling=_decode_rolling(raw_rolling),
+    )
+
+
+def _decode_rolling(raw: Mapping[str, str]) -> dict[str, RollingMoments]:
+    states = {}
+    for key, value in raw.items():
+        try:
+            states[str(key)] = RollingMoments.from_payload(json.loads(value))
+        except (TypeError, ValueError, KeyError):
+            continue
+    return states
+
+
+async def save_analysis_stats_cache(cache: Optional[AnalysisStatsCache]) -> int:
+    """Persiste los campos calculados en esta corrida. Devuelve cuántos."""
+    if cache is None or not (cache.pending or cache.rolling_pending):
+        return 0
+    key = _stats_hash_key(cache.generation)
+    try:
+        if cache.pending:
+            await redis_client.hset(
+                key,
+                mapping={name: json.dumps(payload) for name, payload in cache.pending.items()},
+            )
+            await redis_client.expire(key, STATS_TTL_SECONDS)
+        if cache.rolling_pending:
+            await redis_client.hset(
+                ROLLING_HASH_KEY,
+                mapping={
+                    name: json.dumps(cache.rolling[name].to_payload())
+                    for name in cache.rolling_pending
+                },
+            )
+    except Exception as exc:
+        logger.debug("Redis analysis stats set ignorado: %s", exc)
+        return 0
+    saved = len(cache.pending) + len(cache.rolling_pending)
+    cache.pending.clear()
+    cache.rolling_pending.clear()
+    return saved
+
+
+async def advance_rolling_moments(db, *, today: Optional[date] = None) -> int:
+    """
+    Empuja las velas nuevas en cada ventana persistida. Los estados sin uso
+    en `ROLLING_STALE_DAYS` o que no pueden avanzar se borran.
+    Devuelve cuántos universos avanzaron.
+    """
+    try:
+        states = _decode_rolling(await redis_client.hgetall(ROLLING_HASH_KEY) or {})
+    except Exception as exc:
+        logger.debug("Redis rolling moments get ignorado: %s", exc)
+        return 0
+    if not states:
+        return 0
+
+    cutoff = ((today or date.today()) - timedelta(days=ROLLING_STALE_DAYS)).isoformat()
+    tickers = sorted({ticker for state in states.values() for ticker in state.tickers})
+    try:
+        frames = await db.get_market_candles_bulk(
+            tickers, None, ROLLING_ADVANCE_CANDLES, adjusted=True,
+        )
+    except Exception as exc:
+        logger.warning("No se pudieron leer velas para ventanas de covarianza: %s", exc)
+        return 0
+    advanced: dict[str, str] = {}
+    dropped: list[str] = []
+    for key, state in states.items():
+        added = state.advance_from_frames(frames) if state.last_used >= cutoff else None
+        if added is None:
+            dropped.append(key)
+        elif added:
+            advanced[key] = json.dumps(state.to_payload())
+    try:
+        if advanced:
+            await redis_client.hset(ROLLING_HASH_KEY, mapping=advanced)
+        if dropped:
+            await redis_client.hdel(ROLLING_HASH_KEY, *dropped)
+    except Exception as exc:
+        logger.warning("No se pudieron guardar ventanas de covarianza: %s", exc)
+        return 0
+    logger.info(
+        "Rolling moments: %d universos avanzados, %d descartados",
+        len(advanced), len(dropped),
+    )
+    return len(advanced)
+
+
+async def invalidate_analysis_stats(reason: str) -> Optional[int]:
+    """Nueva generación: las corridas siguientes recalculan todo."""
+    try:
+        generation = int(await redis_client.incr(STATS_GENERATION_KEY))
+    except Exception as exc:
+        logger.warning("No se pudo invalidar cache de stats (%s): %s", reason, exc)
+        return None
+    logger.info("Cache de stats de análisis invalidado (%s): generación %d", reason, generation)
+    return generation
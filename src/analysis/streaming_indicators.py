@@ -0,0 +1,490 @@
+"""
+src/analysis/streaming_indicators.py — Estado incremental de indicadores para
+refrescar señales intradía con cada precio nuevo de market_prices.
+
+`StreamingIndicatorState` se siembra una vez por sesión con las velas
+canónicas cerradas (todas las anteriores a la fecha de sesión) y guarda solo
+acumuladores: estados EMA/Wilder, sumas de las ventanas rolling, min/max de
+14 ruedas, OBV y los últimos valores que `_last`/`_prev` necesitan. Cada tick
+arma la vela provisional del día igual que `_overlay_latest_market_price`
+(Open/High/Low/Volume de la vela del día si ya existe, Close = último precio)
+y calcula el `IndicatorSnapshot` en O(1), sin reconstruir el frame de 260
+velas. El resultado coincide con `compute_indicators(frame_con_overlay)`.
+
+`StreamingIndicatorBook` mantiene los estados del portfolio, los persiste en
+Redis por sesión para que un reinicio no vuelva a leer ni recalcular velas, y
+re-siembra desde DB cuando cambia el día.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, datetime, timezone
+from typing import Mapping, Optional
+from zoneinfo import ZoneInfo
+
+from src.analysis import indicator_panel as panel_ops
+from src.analysis.technical import (
+    IndicatorSnapshot,
+    _PANEL_COLUMNS,
+    _compute_indicator_snapshots,
+)
+from src.core.redis_client import client as redis_client
+
+try:
+    import numpy as np
+    import pandas as pd
+    HAS_DEPS = True
+except ImportError:
+    HAS_DEPS = False
+
+logger = logging.getLogger(__name__)
+
+STREAM_STATE_VERSION = 1
+STREAM_STATE_KEY_PREFIX = "cocos:indicators:stream"
+STREAM_STATE_TTL_SECONDS = 20 * 3600
+STREAM_SEED_CANDLES = 260
+MIN_SNAPSHOT_CANDLES = 60
+ART_TZ = ZoneInfo("America/Argentina/Buenos_Aires")
+
+_A12 = 2.0 / 13.0
+_A26 = 2.0 / 27.0
+_A9 = 2.0 / 10.0
+_AW = 1.0 / 14.0
+
+
+def _ewm_step(state: float, value: float, alpha: float) -> float:
+    """Un paso de `ewm(alpha=alpha, adjust=False)`, con la misma normalización."""
+    old_weight = 1.0 - alpha
+    return (old_weight * state + alpha * value) / (old_weight + alpha)
+
+
+def _tail_sum(values: "np.ndarray", size: int) -> float:
+    return float(values[-size:].sum()) if size > 0 else 0.0
+
+
+def _last_finite(values: "np.ndarray", default: float = 0.0) -> float:
+    return float(panel_ops.last_valid(values[:, None], default)[0])
+
+
+@dataclass
+class StreamingIndicatorState:
+    ticker: str
+    session: str                 # fecha (UTC) de la vela provisional
+    watermark: str               # ts de la última vela cerrada
+    count: int                   # velas cerradas
+    last_close: float
+    last_high: float
+    last_low: float
+    # EMA / MACD
+    ema_12: float
+    ema_26: float
+    macd_signal: float
+    macd_hist: float
+    # Wilder (ADX / DI)
+    atr_w: float
+    dm_plus_w: float
+    dm_minus_w: float
+    adx: float
+    # Sumas de las últimas (w-1) velas cerradas
+    close_sum_19: float
+    close_sum_49: float
+    close_sum_199: float
+    close_dev_sum_19: float      # Σ(c - last_close) para la varianza Bollinger
+    close_dev_sq_19: float       # Σ(c - last_close)²
+    gain_sum_13: float
+    loss_sum_13: float
+    tr_sum_13: float
+    volume_sum_19: float
+    obv: float
+    obv_sum_19: float
+    high_max_13: float
+    low_min_13: float
+    stoch_k_tail: list[float]    # dos últimos %K cerrados
+    rsi_last: float              # último RSI válido (fallback de `_last`)
+    base_bar: Optional[dict] = None   # vela del día ya persistida (Open/High/Low/Close/Volume)
+    closed_snapshot: Optional[dict] = None
+    version: int = STREAM_STATE_VERSION
+
+    # ── Siembra ────────────────────────────────────────────────────────────
+
+    @classmethod
+    def seed(
+        cls,
+        ticker: str,
+        frame: "pd.DataFrame",
+        session: date,
+    ) -> Optional["StreamingIndicatorState"]:
+        """
+        Siembra desde velas canónicas. Devuelve None si el frame no alcanza o
+        tiene huecos (NaN): esos tickers siguen con el recálculo completo.
+        """
+        if frame is None or getattr(frame, "empty", True):
+            return None
+        try:
+            index = pd.DatetimeIndex(pd.to_datetime(frame.index, utc=True))
+            values = frame[list(_PANEL_COLUMNS)].to_numpy(dtype=float)
+        except (KeyError, TypeError, ValueError):
+            return None
+        if np.isnan(values).any():
+            return None
+        days = np.asarray(index.date)
+        closed = days < session
+        today = days == session
+        base_bar = None
+        if today.any():
+            pos = int(np.flatnonzero(today)[-1])
+            row = frame.iloc[pos]
+            base_bar = {
+                name: float(row[name])
+                for name in ("Open", "High", "Low", "Close", "Volume")
+            }
+        closed_frame = frame.loc[closed]
+        if len(closed_frame) < MIN_SNAPSHOT_CANDLES - 1:
+            return None
+        high, low, close, volume = (values[closed, i] for i in range(4))
+        return cls._from_arrays(
+            ticker,
+            session=session,
+            watermark=index[closed][-1].isoformat(),
+            high=high,
+            low=low,
+            close=close,
+            volume=volume,
+            closed_frame=closed_frame,
+            base_bar=base_bar,
+        )
+
+    @classmethod
+    def _from_arrays(
+        cls,
+        ticker: str,
+        *,
+        session: date,
+        watermark: str,
+        high: "np.ndarray",
+        low: "np.ndarray",
+        close: "np.ndarray",
+        volume: "np.ndarray",
+        closed_frame: "pd.DataFrame",
+        base_bar: Optional[dict],
+    ) -> "StreamingIndicatorState":
+        col = lambda arr: arr[:, None]  # noqa: E731 - panel de una columna
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ema12 = panel_ops.ewm_span(col(close), 12)[:, 0]
+            ema26 = panel_ops.ewm_span(col(close), 26)[:, 0]
+            macd_l = ema12 - ema26
+            macd_s = panel_ops.ewm_span(col(macd_l), 9)[:, 0]
+
+            tr = panel_ops.true_range(col(high), col(low), col(close))[:, 0]
+            up = high - panel_ops.shift(col(high))[:, 0]
+            dn = panel_ops.shift(col(low))[:, 0] - low
+            dm_plus = np.where((up > dn) & (up > 0), up, 0.0)
+            dm_minus = np.where((dn > up) & (dn > 0), dn, 0.0)
+            atr_w = panel_ops.ewm_mean(col(tr), _AW)[:, 0]
+            dmp_w = panel_ops.ewm_mean(col(dm_plus), _AW)[:, 0]
+            dmm_w = panel_ops.ewm_mean(col(dm_minus), _AW)[:, 0]
+            di_p = 100 * dmp_w / (atr_w + 1e-9)
+            di_m = 100 * dmm_w / (atr_w + 1e-9)
+            dx = 100 * np.abs(di_p - di_m) / (di_p + di_m + 1e-9)
+            adx = panel_ops.ewm_mean(col(dx), _AW)[:, 0]
+
+            delta = np.diff(close, prepend=np.nan)
+            gains = np.maximum(delta, 0.0)
+            losses = -np.minimum(delta, 0.0)
+            gain = panel_ops.rolling_mean(col(gains), 14)[:, 0]
+            loss = panel_ops.rolling_mean(col(losses), 14)[:, 0]
+            rsi = 100 - (100 / (1 + gain / np.where(loss == 0, np.nan, loss)))
+            lo14 = panel_ops.rolling_min(col(low), 14)[:, 0]
+            hi14 = panel_ops.rolling_max(col(high), 14)[:, 0]
+            stoch_k = 100 * (close - lo14) / (hi14 - lo14 + 1e-9)
+
+            direction = np.where(np.isnan(delta), 0.0, np.sign(delta))
+            obv = np.cumsum(direction * volume)
+
+        closed_snapshot = None
+        if len(close) >= MIN_SNAPSHOT_CANDLES:
+            panel = panel_ops.PricePanel.from_frames({ticker: closed_frame}, _PANEL_COLUMNS)
+            closed_snapshot = asdict(_compute_indicator_snapshots(panel)[ticker])
+
+        dev = close[-19:] - close[-1]
+        return cls(
+            ticker=ticker,
+            session=session.isoformat(),
+            watermark=watermark,
+            count=int(len(close)),
+            last_close=float(close[-1]),
+            last_high=float(high[-1]),
+            last_low=float(low[-1]),
+            ema_12=float(ema12[-1]),
+            ema_26=float(ema26[-1]),
+            macd_signal=float(macd_s[-1]),
+            macd_hist=float(macd_l[-1] - macd_s[-1]),
+            atr_w=float(atr_w[-1]),
+            dm_plus_w=float(dmp_w[-1]),
+            dm_minus_w=float(dmm_w[-1]),
+            adx=float(adx[-1]),
+            close_sum_19=_tail_sum(close, 19),
+            close_sum_49=_tail_sum(close, 49),
+            close_sum_199=_tail_sum(close, 199),
+            close_dev_sum_19=float(dev.sum()),
+            close_dev_sq_19=float((dev * dev).sum()),
+            gain_sum_13=_tail_sum(gains, 13),
+            loss_sum_13=_tail_sum(losses, 13),
+            tr_sum_13=_tail_sum(tr, 13),
+            volume_sum_19=_tail_sum(volume, 19),
+            obv=float(obv[-1]),
+            obv_sum_19=_tail_sum(obv, 19),
+            high_max_13=float(high[-13:].max()),
+            low_min_13=float(low[-13:].min()),
+            stoch_k_tail=[float(v) for v in stoch_k[-2:]],
+            rsi_last=_last_finite(rsi),
+            base_bar=base_bar,
+            closed_snapshot=closed_snapshot,
+        )
+
+    # ── Tick ───────────────────────────────────────────────────────────────
+
+    def snapshot(self, price: Optional[float] = None) -> Optional[IndicatorSnapshot]:
+        """
+        Indicadores con la vela del día armada con `price` (último
+        market_prices). Sin precio fresco usa la vela del día persistida o,
+        si no hay, los indicadores de la última vela cerrada.
+        """
+        base = self.base_bar
+        if price is not None and price > 0:
+            x = float(price)
+            if base is None:
+                h = l = x
+                v = 0.0
+            else:
+                h = max(base["High"], x)
+                l = min(base["Low"], x)
+                v = base["Volume"]
+        elif base is not None:
+            x, h, l, v = base["Close"], base["High"], base["Low"], base["Volume"]
+        else:
+            if self.closed_snapshot is None:
+                return None
+            return IndicatorSnapshot(**self.closed_snapshot)
+
+        n = self.count + 1
+        if n < MIN_SNAPSHOT_CANDLES:
+            return None
+
+        ema12 = _ewm_step(self.ema_12, x, _A12)
+        ema26 = _ewm_step(self.ema_26, x, _A26)
+        macd_l = ema12 - ema26
+        macd_s = _ewm_step(self.macd_signal, macd_l, _A9)
+        macd_h = macd_l - macd_s
+
+        pc = self.last_close
+        tr = max(abs(h - l), abs(h - pc), abs(l - pc))
+        up = h - self.last_high
+        dn = self.last_low - l
+        dm_plus = up if (up > dn and up > 0) else 0.0
+        dm_minus = dn if (dn > up and dn > 0) else 0.0
+        atr_w = _ewm_step(self.atr_w, tr, _AW)
+        di_p = 100 * _ewm_step(self.dm_plus_w, dm_plus, _AW) / (atr_w + 1e-9)
+        di_m = 100 * _ewm_step(self.dm_minus_w, dm_minus, _AW) / (atr_w + 1e-9)
+        dx = 100 * abs(di_p - di_m) / (di_p + di_m + 1e-9)
+        adx = _ewm_step(self.adx, dx, _AW)
+
+        delta = x - pc
+        gain = (self.gain_sum_13 + max(delta, 0.0)) / 14
+        loss = (self.loss_sum_13 + max(-delta, 0.0)) / 14
+        rsi = 100 - (100 / (1 + gain / loss)) if loss != 0 else self.rsi_last
+
+        lo14 = min(self.low_min_13, l)
+        hi14 = max(self.high_max_13, h)
+        stoch_k = 100 * (x - lo14) / (hi14 - lo14 + 1e-9)
+        stoch_d = (sum(self.stoch_k_tail) + stoch_k) / 3
+        williams = -100 * (hi14 - x) / (hi14 - lo14 + 1e-9)
+
+        sma20 = (self.close_sum_19 + x) / 20
+        sma50 = (self.close_sum_49 + x) / 50
+        sma200 = (self.close_sum_199 + x) / 200 if n >= 200 else 0.0
+        d = x - pc
+        dev_sum = self.close_dev_sum_19 + d
+        dev_sq = self.close_dev_sq_19 + d * d
+        bb_std = math.sqrt(max(dev_sq - dev_sum * dev_sum / 20, 0.0) / 19)
+        bb_u = sma20 + 2.0 * bb_std
+        bb_l = sma20 - 2.0 * bb_std
+
+        atr = (self.tr_sum_13 + tr) / 14
+        direction = 1.0 if delta > 0 else (-1.0 if delta < 0 else 0.0)
+        obv = self.obv + direction * v
+        obv_sma20 = (self.obv_sum_19 + obv) / 20
+        v_sma = (self.volume_sum_19 + v) / 20
+
+        return IndicatorSnapshot(
+            ticker=self.ticker, close=x,
+            sma_20=sma20, sma_50=sma50, sma_200=sma200,
+            ema_12=ema12, ema_26=ema26,
+            adx_14=adx, di_plus=di_p, di_minus=di_m,
+            rsi_14=rsi,
+            stoch_k=stoch_k, stoch_d=stoch_d,
+            williams_r=williams,
+            macd_line=macd_l, macd_signal=macd_s,
+            macd_hist=macd_h, macd_hist_prev=self.macd_hist,
+            bb_upper=bb_u, bb_middle=sma20, bb_lower=bb_l,
+            bb_width=(bb_u - bb_l) / (sma20 + 1e-9),
+            atr_14=atr,
+            obv=obv, obv_sma20=obv_sma20,
+            vol_ratio=v / v_sma if v_sma > 0 else 1.0,
+        )
+
+    # ── Checkpoint ─────────────────────────────────────────────────────────
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str | bytes | None) -> Optional["StreamingIndicatorState"]:
+        if not raw:
+            return None
+        try:
+            payload = json.loads(raw)
+            if int(payload.get("version") or 0) != STREAM_STATE_VERSION:
+                return None
+            names = {f.name for f in fields(cls)}
+            return cls(**{key: value for key, value in payload.items() if key in names})
+        except (TypeError, ValueError):
+            return None
+
+
+def _state_key(ticker: str, session: date) -> str:
+    return f"{STREAM_STATE_KEY_PREFIX}:{session.isoformat()}:{ticker}"
+
+
+def _tick_price(row: Optional[Mapping], session: date) -> Optional[float]:
+    """Mismo filtro que `_overlay_latest_market_price`: precio > 0 del día."""
+    if not row:
+        return None
+    try:
+        price = float(row.get("last_price"))
+    except (TypeError, ValueError):
+        return None
+    raw_ts = row.get("ts")
+    if not math.isfinite(price) or price <= 0 or raw_ts is None:
+        return None
+    try:
+        ts = pd.Timestamp(raw_ts)
+    except (TypeError, ValueError):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    if ts.tz_convert(ART_TZ).date() != session:
+        return None
+    return price
+
+
+@dataclass
+class StreamingIndicatorBook:
+    """Estados incrementales por ticker para la sesión actual."""
+
+    ttl_seconds: int = STREAM_STATE_TTL_SECONDS
+    seed_candles: int = STREAM_SEED_CANDLES
+    states: dict[str, StreamingIndicatorState] = field(default_factory=dict)
+    session: Optional[date] = None
+    # Tickers sin estado posible hoy (pocas velas o huecos): no se reintenta.
+    unseedable: set[str] = field(default_factory=set)
+
+    async def refresh(
+        self,
+        db,
+        asset_types: Mapping[str, Optional[str]],
+        latest_prices: list[dict],
+        *,
+        session: Optional[date] = None,
+    ) -> dict[str, IndicatorSnapshot]:
+        """
+        Devuelve el snapshot intradía de cada ticker. Solo los tickers sin
+        estado para la sesión pasan por Redis y, si tampoco está ahí, por DB.
+        """
+        session = session or datetime.now(timezone.utc).astimezone(ART_TZ).date()
+        if session != self.session:
+            self.states.clear()
+            self.unseedable.clear()
+            self.session = session
+        tickers = sorted(
+            {str(t or "").upper() for t in asset_types if str(t or "").strip()}
+        )
+        missing = [t for t in tickers if t not in self.states and t not in self.unseedable]
+        if missing:
+            missing = await self._restore(missing, session)
+        if missing:
+            await self._seed(db, missing, asset_types, session)
+
+        prices = {
+            str(row.get("ticker") or "").upper(): row for row in latest_prices or []
+        }
+        snapshots: dict[str, IndicatorSnapshot] = {}
+        for ticker in tickers:
+            state = self.states.get(ticker)
+            if state is None:
+                continue
+            snapshot = state.snapshot(_tick_price(prices.get(ticker), session))
+            if snapshot is not None:
+                snapshots[ticker] = snapshot
+        return snapshots
+
+    async def _restore(self, tickers: list[str], session: date) -> list[str]:
+        try:
+            raws = await redis_client.mget([_state_key(t, session) for t in tickers])
+        except Exception as exc:
+            logger.debug("Redis indicator state get ignorado: %s", exc)
+            return tickers
+        pending = []
+        for ticker, raw in zip(tickers, raws or [None] * len(tickers)):
+            state = StreamingIndicatorState.from_json(raw)
+            if state is None or state.session != session.isoformat():
+                pending.append(ticker)
+                continue
+            self.states[ticker] = state
+        return pending
+
+    async def _seed(
+        self,
+        db,
+        tickers: list[str],
+        asset_types: Mapping[str, Optional[str]],
+        session: date,
+    ) -> None:
+        frames = await db.get_market_candles_bulk(
+            tickers,
+            {t: asset_types.get(t) for t in tickers},
+            self.seed_candles,
+        )
+        seeded = []
+        for ticker in tickers:
+            state = StreamingIndicatorState.seed(ticker, frames.get(ticker), session)
+            if state is None:
+                self.unseedable.add(ticker)
+                continue
+            self.states[ticker] = state
+            seeded.append(state)
+        if seeded:
+            await self._checkpoint(seeded, session)
+        logger.info(
+            "Indicadores intradía sembrados: %d/%d tickers (sesión %s)",
+            len(seeded),
+            len(tickers),
+            session.isoformat(),
+        )
+
+    async def _checkpoint(self, states: list[StreamingIndicatorState], session: date) -> None:
+        async def _set(state: StreamingIndicatorState) -> None:
+            await redis_client.set(
+                _state_key(state.ticker, session),
+                state.to_json(),
+                ex=self.ttl_seconds,
+            )
+
+        try:
+            await asyncio.gather(*(_set(state) for state in states))
+        except Exception as exc:
+            logger.debug("Redis indicator state set ignorado: %s", exc)
@@ -27,6 +27,7 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Optional
 
+from src.analysis import indicator_panel as panel_ops
 from src.analysis.trend_regime import TrendRegime, assess_trend
 from src.analysis.technical_buy_shadow_v3 import build_technical_buy_shadow_v3
 from src.analysis.technical_shadow_v2 import build_technical_shadow_v2
@@ -297,6 +298,117 @@ def compute_indicators(df: "pd.DataFrame", ticker: str) -> Optional[IndicatorSna
         return None
 
 
+_PANEL_COLUMNS = ("High", "Low", "Close", "Volume")
+
+
+def compute_indicators_panel(
+    frames: dict[str, "pd.DataFrame"],
+) -> dict[str, Optional[IndicatorSnapshot]]:
+    """
+    Igual que `compute_indicators` pero para todo el universo en una pasada
+    vectorizada sobre un panel sesión x ticker. Los frames que no entran al
+    panel (columnas faltantes, NaN, < 60 velas) usan el camino por ticker.
+    """
+    usable, fallback = panel_ops.split_panel_frames(frames, _PANEL_COLUMNS, min_rows=60)
+    results: dict[str, Optional[IndicatorSnapshot]] = {
+        ticker: compute_indicators(frame, ticker) for ticker, frame in fallback.items()
+    }
+    if not usable:
+        return results
+    try:
+        results.update(_compute_indicator_snapshots(panel_ops.PricePanel.from_frames(usable, _PANEL_COLUMNS)))
+    except Exception as e:
+        logger.error(f"Error calculando panel de indicadores: {e}", exc_info=True)
+        results.update({ticker: compute_indicators(frame, ticker) for ticker, frame in usable.items()})
+    return results
+
+
+def _compute_indicator_snapshots(panel: "panel_ops.PricePanel") -> dict[str, IndicatorSnapshot]:
+    high, low, close, volume = (panel[c] for c in _PANEL_COLUMNS)
+    padding = panel.padding
+    last, prev = panel_ops.last_valid, panel_ops.prev_valid
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Tendencia
+        sma20 = panel_ops.rolling_mean(close, 20)
+        sma50 = panel_ops.rolling_mean(close, 50)
+        sma200 = panel_ops.rolling_mean(close, 200)
+        ema12 = panel_ops.ewm_span(close, 12)
+        ema26 = panel_ops.ewm_span(close, 26)
+
+        # ADX (Wilder)
+        tr = panel_ops.true_range(high, low, close)
+        up = high - panel_ops.shift(high)
+        dn = panel_ops.shift(low) - low
+        dm_plus = np.where((up > dn) & (up > 0), up, 0.0)
+        dm_minus = np.where((dn > up) & (dn > 0), dn, 0.0)
+        dm_plus[padding] = np.nan
+        dm_minus[padding] = np.nan
+        atr_w = panel_ops.ewm_mean(tr, 1 / 14)
+        di_p = 100 * panel_ops.ewm_mean(dm_plus, 1 / 14) / (atr_w + 1e-9)
+        di_m = 100 * panel_ops.ewm_mean(dm_minus, 1 / 14) / (atr_w + 1e-9)
+        dx = 100 * np.abs(di_p - di_m) / (di_p + di_m + 1e-9)
+        adx = panel_ops.ewm_mean(dx, 1 / 14)
+
+        # Momentum
+        delta = close - panel_ops.shift(close)
+        gain = panel_ops.rolling_mean(np.maximum(delta, 0.0), 14)
+        loss = panel_ops.rolling_mean(-np.minimum(delta, 0.0), 14)
+        rsi = 100 - (100 / (1 + gain / np.where(loss == 0, np.nan, loss)))
+        lo14 = panel_ops.rolling_min(low, 14)
+        hi14 = panel_ops.rolling_max(high, 14)
+        stoch_k = 100 * (close - lo14) / (hi14 - lo14 + 1e-9)
+        stoch_d = panel_ops.rolling_mean(stoch_k, 3)
+        williams = -100 * (hi14 - close) / (hi14 - lo14 + 1e-9)
+
+        # MACD
+        macd_l = ema12 - ema26
+        macd_s = panel_ops.ewm_span(macd_l, 9)
+        macd_h = macd_l - macd_s
+
+        # Bollinger
+        bb_std = panel_ops.rolling_std(close, 20)
+        bb_u = sma20 + 2.0 * bb_std
+        bb_l = sma20 - 2.0 * bb_std
+        bb_w = (bb_u - bb_l) / (sma20 + 1e-9)
+
+        # ATR
+        atr = panel_ops.rolling_mean(tr, 14)
+
+        # Volumen / OBV
+        direction = np.where(np.isnan(delta), 0.0, np.sign(delta))
+        obv = np.cumsum(np.where(padding, 0.0, direction * volume), axis=0)
+        obv[padding] = np.nan
+        obv_ma = panel_ops.rolling_mean(obv, 20)
+        last_vol = last(volume)
+        v_sma = last(panel_ops.rolling_mean(volume, 20))
+        v_ratio = np.where(v_sma > 0, last_vol / v_sma, 1.0)
+
+    columns = {
+        "close": last(close),
+        "sma_20": last(sma20), "sma_50": last(sma50), "sma_200": last(sma200),
+        "ema_12": last(ema12), "ema_26": last(ema26),
+        "adx_14": last(adx), "di_plus": last(di_p), "di_minus": last(di_m),
+        "rsi_14": last(rsi),
+        "stoch_k": last(stoch_k), "stoch_d": last(stoch_d),
+        "williams_r": last(williams),
+        "macd_line": last(macd_l), "macd_signal": last(macd_s),
+        "macd_hist": last(macd_h), "macd_hist_prev": prev(macd_h),
+        "bb_upper": last(bb_u), "bb_middle": last(sma20), "bb_lower": last(bb_l),
+        "bb_width": last(bb_w),
+        "atr_14": last(atr),
+        "obv": last(obv), "obv_sma20": last(obv_ma),
+        "vol_ratio": v_ratio,
+    }
+    return {
+        ticker: IndicatorSnapshot(
+            ticker=ticker,
+            **{name: float(values[j]) for name, values in columns.items()},
+        )
+        for j, ticker in enumerate(panel.tickers)
+    }
+
+
 # ── Generación de señales ──────────────────────────────────────────────────────
 
 def generate_signals(ind: IndicatorSnapshot) -> Signal:
@@ -544,8 +656,12 @@ def analyze_ticker(ticker: str, period: str = "1y") -> Optional[Signal]:
     return signal
 
 
-def analyze_ticker_from_frame(ticker: str, frame: "pd.DataFrame") -> Optional[Signal]:
-    ind = compute_indicators(frame, ticker)
+def analyze_ticker_from_frame(
+    ticker: str,
+    frame: "pd.DataFrame",
+    indicators: Optional[IndicatorSnapshot] = None,
+) -> Optional[Signal]:
+    ind = indicators if indicators is not None else compute_indicators(frame, ticker)
     if ind is None:
         return None
     signal = generate_signals(ind)
@@ -597,17 +713,37 @@ def analyze_portfolio(tickers: list[str], period: str = "1y") -> list[Signal]:
     return sorted(signals, key=lambda s: (priority.get(s.signal, 3), -s.strength))
 
 
-def analyze_portfolio_from_frames(frames: dict[str, "pd.DataFrame"]) -> list[Signal]:
-    signals = []
+def analyze_frames(frames: dict[str, "pd.DataFrame"]) -> dict[str, Signal]:
+    """Señal por ticker, sin ordenar (tarea unitaria de `map_universe`)."""
+    # Indicadores de todo el universo en una pasada; el scoring sigue por ticker.
+    snapshots = compute_indicators_panel(frames)
+    signals: dict[str, Signal] = {}
     for ticker, frame in frames.items():
+        ind = snapshots.get(ticker)
+        if ind is None:
+            continue
         try:
-            sig = analyze_ticker_from_frame(ticker, frame)
+            sig = analyze_ticker_from_frame(ticker, frame, ind)
             if sig:
-                signals.append(sig)
+                signals[ticker] = sig
         except Exception as e:
             logger.error(f"Error analizando {ticker}: {e}")
+    return signals
+
+
+def analyze_portfolio_from_frames(
+    frames: dict[str, "pd.DataFrame"],
+    *,
+    parallel: bool = False,
+) -> list[Signal]:
+    if parallel:
+        from src.analysis.parallel_universe import map_universe
+
+        by_ticker = map_universe(analyze_frames, frames)
+    else:
+        by_ticker = analyze_frames(frames)
     priority = {"BUY": 0, "SELL": 1, "HOLD": 2}
-    return sorted(signals, key=lambda s: (priority.get(s.signal, 3), -s.strength))
+    return sorted(by_ticker.values(), key=lambda s: (priority.get(s.signal, 3), -s.strength))
 
 
 def _macro_is_clearly_risk_on(macro_snapshot) -> bool:
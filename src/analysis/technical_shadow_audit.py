@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-import asyncpg
+from src.core.db_pool import connection
 
 
 HORIZONS = (5, 10, 20, 40)
@@ -120,8 +120,7 @@ async def load_technical_shadow_rows(
     days: int = 365,
 ) -> list[dict[str, Any]]:
     dsn = database_url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-    try:
+    async with connection(dsn) as conn:
         rows = await conn.fetch(
             """
             SELECT
@@ -147,8 +146,6 @@ async def load_technical_shadow_rows(
             max(1, int(days)),
         )
         return [dict(row) for row in rows]
-    finally:
-        await conn.close()
 
 
 def render_technical_shadow_audit(report: TechnicalShadowAudit) -> str:
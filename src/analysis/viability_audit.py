@@ -17,11 +17,11 @@ from html import escape
 from pathlib import Path
 from typing import Optional
 
-import asyncpg
 import numpy as np
 import pandas as pd
 
 from src.analysis.regression_audit import DEFAULT_HORIZONS, normalize_decision_frame
+from src.core.db_pool import connection
 
 
 ACTIVE_ACTIONS = ("BUY", "SELL", "SELL_PARTIAL", "SELL_FULL")
@@ -86,9 +86,7 @@ class ViabilityAuditReport:
 
 async def load_viability_decision_log(config: ViabilityAuditConfig) -> pd.DataFrame:
     dsn = config.database_url.replace("postgresql+asyncpg://", "postgresql://")
-    conn = await asyncpg.connect(dsn)
-
-    try:
+    async with connection(dsn) as conn:
         rows = await conn.fetch(
             """
             SELECT column_name
@@ -302,8 +300,6 @@ async def load_viability_decision_log(config: ViabilityAuditConfig) -> pd.DataFr
                 row["duplicate_movement"] = bool(external_ids) and external_ids.issubset(
                     duplicate_synthetic_ids
                 )
-    finally:
-        await conn.close()
 
     if not rows and not followed_rows:
         frame = pd.DataFrame(columns=selected)
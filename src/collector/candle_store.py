@@ -0,0 +1,475 @@
+"""
+src/collector/candle_store.py — Copia local columnar de market_candles_canonical.
+
+Los scripts offline (shadow de tesis, outcomes de radar, backfills) leían
+meses de velas por ticker como Records de asyncpg y las pasaban por el loop
+fila a fila de `candles_to_frame`. Acá cada ticker vive en un `.npy`
+estructurado (ts + OHLCV + códigos de fuente/tipo) que se abre con
+`np.load(mmap_mode="c")`:
+
+- `CandleStore.frame()` arma el DataFrame sobre el mmap sin copiar: el
+  bloque OHLCV del frame es la misma memoria del archivo (copy-on-write, así
+  que un `.loc[...] = ` del caller no toca el disco).
+- `CandleStore.refresh(db)` trae solo las filas canónicas con
+  `refreshed_at` posterior al watermark guardado en `meta.json` (con un
+  solapamiento de `WATERMARK_OVERLAP` para transacciones que commitean
+  tarde) y reescribe los tickers tocados con `os.replace`. Después compara
+  cantidad de velas y último ts por ticker contra la base: un ticker cuyo
+  conteo no coincide o cuyo último ts en la base es anterior al del cache
+  (velas borradas o reemplazadas en la canónica) se descarta y se recarga
+  completo.
+- `open_candle_reader(db)` refresca con timeout y devuelve un
+  `CachedCandleReader` que responde `get_market_candles*` desde disco y
+  delega el resto en la base; si la base está ocupada se sirve el cache tal
+  cual, y si no hay cache se usa la base directamente.
+
+Las velas se guardan crudas (sin corporate actions). Con `adjusted=True`
+(shadow) el reader aplica sobre el cache la versión vigente del ajuste
+persistido (`get_candle_adjustments`); `adjustment_version=N` (auditoría) va
+directo a la base.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.collector.cocos_history import candles_to_frame
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+CANDLE_STORE_ENABLED = os.getenv("CANDLE_STORE_ENABLED", "true").lower() == "true"
+CANDLE_STORE_DIR = Path(os.getenv("CANDLE_STORE_DIR") or PROJECT_ROOT / "cache" / "candles")
+CANDLE_STORE_REFRESH_TIMEOUT_SECONDS = float(
+    os.getenv("CANDLE_STORE_REFRESH_TIMEOUT_SECONDS", "30")
+)
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+META_VERSION = 2
+OHLCV_COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+_PRICE_FIELDS = ("open_price", "high_price", "low_price", "close_price", "volume")
+CANDLE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),  # ns UTC
+        ("ohlcv", "<f8", (len(OHLCV_COLUMNS),)),
+        ("source", "u1"),
+        ("asset_type", "u1"),
+    ]
+)
+_DAY_NS = 86_400 * 10**9
+
+
+def _empty_meta() -> dict:
+    return {"version": META_VERSION, "watermark": None, "sources": [], "asset_types": [], "tickers": {}}
+
+
+def _code(table: list[str], value: Any) -> int:
+    label = str(value or "UNKNOWN")
+    if label not in table:
+        if len(table) >= 255:
+            raise ValueError(f"candle_store: demasiados valores distintos ({label})")
+        table.append(label)
+    return table.index(label)
+
+
+def _labels(table: Sequence[str], codes: np.ndarray) -> np.ndarray:
+    # Un lector con meta.json viejo puede ver un código nuevo del archivo.
+    lookup = np.asarray(list(table) + ["UNKNOWN"] * (256 - len(table)), dtype=object)
+    return lookup[codes]
+
+
+def _float(value: Any) -> float:
+    return float(value) if value is not None else np.nan
+
+
+def _frame_attrs(frame: pd.DataFrame) -> pd.DataFrame:
+    counts = frame["Source"].value_counts().sort_index()
+    sources = tuple(str(source) for source in counts.index)
+    frame.attrs["candle_sources"] = sources
+    frame.attrs["candle_source_counts"] = {str(source): int(count) for source, count in counts.items()}
+    frame.attrs["has_reconstructed_candles"] = "internal_snapshot" in sources
+    return frame
+
+
+class CandleStore:
+    """Velas canónicas de un intervalo, un `.npy` por ticker."""
+
+    def __init__(self, root: Path | str | None = None, *, interval: str = "1d"):
+        self.interval = interval
+        self.path = Path(root or CANDLE_STORE_DIR) / interval
+        self._meta: Optional[dict] = None
+
+    # ── Metadata ─────────────────────────────────────────────────────────
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            try:
+                meta = json.loads((self.path / "meta.json").read_text())
+            except (OSError, ValueError):
+                meta = _empty_meta()
+            self._meta = meta if meta.get("version") == META_VERSION else _empty_meta()
+        return self._meta
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        raw = self.meta.get("watermark")
+        return datetime.fromisoformat(raw) if raw else None
+
+    def tickers(self) -> list[str]:
+        return sorted(self.meta["tickers"])
+
+    def _file(self, ticker: str) -> Path:
+        return self.path / f"{ticker.upper()}.npy"
+
+    def _write_atomic(self, target: Path, write) -> None:
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as handle:
+            write(handle)
+        os.replace(tmp, target)
+
+    # ── Refresh ──────────────────────────────────────────────────────────
+
+    async def refresh(self, db) -> int:
+        """Aplica las velas canónicas nuevas o corregidas. Devuelve cuántas filas."""
+        since = self.watermark
+        rows = await db.get_market_candles_refreshed_since(
+            since - WATERMARK_OVERLAP if since else None,
+            interval=self.interval,
+        )
+        applied = self.apply_rows(rows) if rows else 0
+        summary = await db.get_market_candles_canonical_summary(interval=self.interval)
+        stale = self.stale_tickers(summary)
+        if stale:
+            logger.info("Candle store %s: recargando %s", self.path, ", ".join(stale))
+            present = [ticker for ticker in stale if ticker in summary]
+            reloaded = await db.get_market_candles_refreshed_since(
+                None,
+                interval=self.interval,
+                tickers=present,
+            ) if present else []
+            # Sin awaits entre el descarte y la recarga: un timeout del refresh
+            # nunca deja un ticker vacío en disco.
+            self.invalidate(stale)
+            applied += self.apply_rows(reloaded) if reloaded else 0
+        return applied
+
+    def stale_tickers(self, summary: Mapping[str, Mapping[str, Any]]) -> list[str]:
+        """Tickers cuyo archivo ya no refleja la canónica (ver docstring del módulo)."""
+        stale = []
+        for ticker in sorted(set(self.meta["tickers"]) | set(summary)):
+            cached = self.meta["tickers"].get(ticker, {})
+            current = summary.get(ticker)
+            if current is None:
+                stale.append(ticker)
+                continue
+            last_ts = pd.to_datetime(current["last_ts"], utc=True).value if current.get("last_ts") else None
+            if cached.get("rows") != int(current["rows"]) or (
+                last_ts is not None and cached.get("last_ts", last_ts) > last_ts
+            ):
+                stale.append(ticker)
+        return stale
+
+    def invalidate(self, tickers: Iterable[str]) -> None:
+        meta = self.meta
+        for ticker in tickers:
+            self._file(ticker).unlink(missing_ok=True)
+            meta["tickers"].pop(ticker.upper(), None)
+        self.path.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(meta, sort_keys=True).encode()
+        self._write_atomic(self.path / "meta.json", lambda handle: handle.write(payload))
+
+    def apply_rows(self, rows: Sequence[Mapping[str, Any]]) -> int:
+        meta = self.meta
+        self.path.mkdir(parents=True, exist_ok=True)
+        grouped: dict[str, list[Mapping[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault(str(row["ticker"]).upper(), []).append(row)
+
+        watermark = self.watermark
+        for ticker, ticker_rows in grouped.items():
+            fresh = np.empty(len(ticker_rows), dtype=CANDLE_DTYPE)
+            fresh["ts"] = pd.to_datetime([row["ts"] for row in ticker_rows], utc=True).asi8
+            fresh["ohlcv"] = [[_float(row.get(name)) for name in _PRICE_FIELDS] for row in ticker_rows]
+            fresh["source"] = [_code(meta["sources"], row.get("source")) for row in ticker_rows]
+            fresh["asset_type"] = [_code(meta["asset_types"], row.get("asset_type")) for row in ticker_rows]
+
+            merged = np.concatenate([self._load(ticker), fresh])
+            days = merged["ts"] // _DAY_NS
+            order = np.argsort(days, kind="stable")
+            merged, days = merged[order], days[order]
+            # Una vela por día UTC; a igualdad gana la más nueva (va al final).
+            keep = np.append(days[1:] != days[:-1], True)
+            merged = np.ascontiguousarray(merged[keep])
+            self._write_atomic(self._file(ticker), lambda handle: np.save(handle, merged))
+
+            last = ticker_rows[-1]
+            meta["tickers"][ticker] = {
+                "rows": int(len(merged)),
+                "last_ts": int(merged["ts"][-1]),
+                "long_ticker": str(last.get("long_ticker") or ticker),
+                "currency": str(last.get("currency") or ""),
+                "venue": str(last.get("venue") or ""),
+            }
+            for row in ticker_rows:
+                refreshed = row.get("refreshed_at")
+                if refreshed is not None and (watermark is None or refreshed > watermark):
+                    watermark = refreshed
+
+        meta["watermark"] = watermark.isoformat() if watermark else None
+        payload = json.dumps(meta, sort_keys=True).encode()
+        self._write_atomic(self.path / "meta.json", lambda handle: handle.write(payload))
+        return len(rows)
+
+    # ── Lecturas ─────────────────────────────────────────────────────────
+
+    def _load(self, ticker: str, *, mmap: bool = False) -> np.ndarray:
+        path = self._file(ticker)
+        if not path.exists():
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.load(path, mmap_mode="c" if mmap else None)
+
+    def _select(self, ticker: str, asset_type: Optional[str], limit: Optional[int]) -> np.ndarray:
+        data = self._load(ticker, mmap=True)
+        if asset_type and len(data):
+            table = self.meta["asset_types"]
+            wanted = asset_type.upper()
+            mask = data["asset_type"] == (table.index(wanted) if wanted in table else 255)
+            if not mask.all():
+                data = data[mask]
+        if limit is not None:
+            data = data[-int(limit):] if int(limit) > 0 else data[:0]
+        return data
+
+    def holds_other_types(self, ticker: str, asset_type: Optional[str]) -> bool:
+        """True si hay dias canonicos del ticker ganados por otro asset_type."""
+        if not asset_type:
+            return False
+        data = self._load(ticker.upper(), mmap=True)
+        if not len(data):
+            return False
+        table = self.meta["asset_types"]
+        wanted = asset_type.upper()
+        return bool((data["asset_type"] != (table.index(wanted) if wanted in table else 255)).any())
+
+    def frame(
+        self,
+        ticker: str,
+        *,
+        asset_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Mismo frame que `candles_to_frame`, con OHLCV sobre el mmap."""
+        data = self._select(ticker, asset_type, limit)
+        if not len(data):
+            return candles_to_frame([])
+        index = pd.DatetimeIndex(data["ts"].view("M8[ns]"), name="ts").tz_localize("UTC")
+        frame = pd.DataFrame(data["ohlcv"], index=index, columns=list(OHLCV_COLUMNS), copy=False)
+        frame["Source"] = _labels(self.meta["sources"], data["source"])
+        return _frame_attrs(frame)
+
+    def rows(
+        self,
+        ticker: str,
+        *,
+        asset_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """Filas con la forma de `PortfolioDatabase.get_market_candles`."""
+        ticker = ticker.upper()
+        data = self._select(ticker, asset_type, limit)
+        if not len(data):
+            return []
+        info = self.meta["tickers"].get(ticker, {})
+        stamps = pd.DatetimeIndex(data["ts"].view("M8[ns]")).tz_localize("UTC").to_pydatetime()
+        prices = data["ohlcv"].tolist()
+        sources = _labels(self.meta["sources"], data["source"])
+        types = _labels(self.meta["asset_types"], data["asset_type"])
+        return [
+            {
+                "ts": stamps[i],
+                "ticker": ticker,
+                "long_ticker": info.get("long_ticker", ticker),
+                "asset_type": types[i],
+                "currency": info.get("currency", ""),
+                "venue": info.get("venue", ""),
+                "interval": self.interval,
+                **dict(zip(_PRICE_FIELDS, prices[i])),
+                "source": sources[i],
+            }
+            for i in range(len(data))
+        ]
+
+
+class CachedCandleReader:
+    """
+    Fachada sobre `PortfolioDatabase` que resuelve las lecturas de velas
+    canónicas desde un `CandleStore`. Las lecturas por fuente cruda
+    (`source=...`), los tickers con días ganados por otro asset_type que el
+    pedido (el filtro perdería esos días) y cualquier otro método van a la
+    base.
+    """
+
+    def __init__(self, db, store: CandleStore):
+        self._db = db
+        self.store = store
+
+    def __getattr__(self, name: str):
+        return getattr(self._db, name)
+
+    def _serves(self, source: Optional[str], interval: str, adjustment: Mapping[str, Any]) -> bool:
+        return (
+            not source
+            and interval == self.store.interval
+            and not adjustment.get("adjustment_version")
+        )
+
+    async def _current_adjustments(self, tickers: Iterable[str], adjustment: Mapping[str, Any]) -> dict:
+        if not adjustment.get("adjusted") or adjustment.get("adjustment_version") is not None:
+            return {}
+        return await self._db.get_candle_adjustments(list(tickers), interval=self.store.interval)
+
+    async def get_market_candles(
+        self,
+        ticker: str,
+        *,
+        asset_type: Optional[str] = None,
+        source: Optional[str] = None,
+        interval: str = "1d",
+        limit: Optional[int] = None,
+        **adjustment,
+    ) -> list[dict]:
+        if (
+            not self._serves(source, interval, adjustment)
+            or self.store.holds_other_types(ticker, asset_type)
+        ):
+            return await self._db.get_market_candles(
+                ticker, asset_type=asset_type, source=source, interval=interval, limit=limit,
+                **adjustment,
+            )
+        rows = self.store.rows(ticker, asset_type=asset_type, limit=limit)
+        current = (await self._current_adjustments([ticker.upper()], adjustment)).get(ticker.upper())
+        return current.apply_to_rows(rows) if current is not None else rows
+
+    def _requested(self, tickers: Iterable[str], asset_types) -> list[tuple[str, Optional[str]]]:
+        clean = list(dict.fromkeys(
+            str(ticker).upper().strip() for ticker in tickers or [] if str(ticker or "").strip()
+        ))
+        if isinstance(asset_types, str):
+            return [(ticker, asset_types.upper().strip() or None) for ticker in clean]
+        type_map = {str(k).upper(): (str(v).upper().strip() or None) if v else None
+                    for k, v in (asset_types or {}).items()}
+        return [(ticker, type_map.get(ticker)) for ticker in clean]
+
+    def _split_mixed(self, requested):
+        """(servidos desde disco, {ticker: asset_type} que van a la base)."""
+        local, remote = [], {}
+        for ticker, asset_type in requested:
+            if self.store.holds_other_types(ticker, asset_type):
+                remote[ticker] = asset_type
+            else:
+                local.append((ticker, asset_type))
+        return local, remote
+
+    async def get_market_candle_rows_bulk(
+        self,
+        tickers: Sequence[str],
+        asset_types: Mapping[str, Optional[str]] | str | None = None,
+        limit: Optional[int] = None,
+        source: Optional[str] = None,
+        *,
+        interval: str = "1d",
+        **adjustment,
+    ) -> dict[str, list[dict]]:
+        if not self._serves(source, interval, adjustment):
+            return await self._db.get_market_candle_rows_bulk(
+                tickers, asset_types, limit, source, interval=interval, **adjustment,
+            )
+        requested = self._requested(tickers, asset_types)
+        local, remote = self._split_mixed(requested)
+        grouped = {
+            ticker: self.store.rows(ticker, asset_type=asset_type, limit=limit)
+            for ticker, asset_type in local
+        }
+        for ticker, current in (await self._current_adjustments(grouped, adjustment)).items():
+            if grouped.get(ticker):
+                grouped[ticker] = current.apply_to_rows(grouped[ticker])
+        if remote:
+            grouped.update(await self._db.get_market_candle_rows_bulk(
+                list(remote), remote, limit, source, interval=interval, **adjustment,
+            ))
+        return {ticker: grouped.get(ticker, []) for ticker, _ in requested}
+
+    async def get_market_candles_bulk(
+        self,
+        tickers: Sequence[str],
+        asset_types: Mapping[str, Optional[str]] | str | None = None,
+        limit: Optional[int] = None,
+        source: Optional[str] = None,
+        *,
+        interval: str = "1d",
+        **adjustment,
+    ) -> dict:
+        if not self._serves(source, interval, adjustment):
+            return await self._db.get_market_candles_bulk(
+                tickers, asset_types, limit, source, interval=interval, **adjustment,
+            )
+        requested = self._requested(tickers, asset_types)
+        local, remote = self._split_mixed(requested)
+        frames = {
+            ticker: self.store.frame(ticker, asset_type=asset_type, limit=limit)
+            for ticker, asset_type in local
+        }
+        asset_type_of = dict(local)
+        for ticker, current in (await self._current_adjustments(frames, adjustment)).items():
+            if ticker not in frames:
+                continue
+            if len(frames[ticker]) and any(step.transition_day is not None for step in current.steps):
+                # Solo los tickers con un split aplicado dejan el mmap.
+                rows = self.store.rows(ticker, asset_type=asset_type_of[ticker], limit=limit)
+                frames[ticker] = candles_to_frame(current.apply_to_rows(rows))
+            current.annotate_frame(frames[ticker])
+        if remote:
+            frames.update(await self._db.get_market_candles_bulk(
+                list(remote), remote, limit, source, interval=interval, **adjustment,
+            ))
+        return {ticker: frames[ticker] for ticker, _ in requested if ticker in frames}
+
+
+async def open_candle_reader(
+    db,
+    *,
+    root: Path | str | None = None,
+    timeout: Optional[float] = None,
+):
+    """
+    Refresca el cache local y devuelve un `CachedCandleReader`. Si el refresh
+    falla o vence el timeout se usa lo que ya hay en disco; sin cache (o con
+    `CANDLE_STORE_ENABLED=false`) devuelve `db` tal cual.
+    """
+    if not CANDLE_STORE_ENABLED:
+        return db
+    store = CandleStore(root)
+    try:
+        applied = await asyncio.wait_for(
+            store.refresh(db),
+            timeout=CANDLE_STORE_REFRESH_TIMEOUT_SECONDS if timeout is None else timeout,
+        )
+        logger.info("Candle store %s: %d filas nuevas", store.path, applied)
+    except Exception as exc:
+        if not store.tickers():
+            logger.warning("Candle store sin refrescar y vacío, se lee la base: %s", exc)
+            return db
+        logger.warning(
+            "Candle store sin refrescar (%s); se usa el cache con watermark %s",
+            exc or type(exc).__name__, store.meta.get("watermark"),
+        )
+    return CachedCandleReader(db, store)
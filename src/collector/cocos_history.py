@@ -101,12 +101,43 @@ def currency_from_long_ticker(long_ticker: str) -> Currency:
         return Currency.ARS
 
 
+_CANDLE_PRICE_COLUMNS = (
+    ("Open", "open_price"),
+    ("High", "high_price"),
+    ("Low", "low_price"),
+    ("Close", "close_price"),
+    ("Volume", "volume"),
+)
+_CANDLE_SOURCE_PRIORITY = {"COCOS": 0, "TRADINGVIEW_BYMA": 1, "internal_snapshot": 2}
+
+
+def _candle_column(candles, name: str) -> list:
+    first = candles[0]
+    if isinstance(first, dict) or hasattr(first, "keys"):  # dict o asyncpg.Record
+        return [candle.get(name) for candle in candles]
+    return [getattr(candle, name, None) for candle in candles]
+
+
+def _session_days(index):
+    """Dia calendario de cada timestamp en la zona del propio indice (como `.date()`)."""
+    import numpy as np
+    import pandas as pd
+
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
 def candles_to_frame(candles):
     try:
+        import numpy as np
         import pandas as pd
     except ImportError as exc:
         raise ImportError("pandas requerido para convertir velas") from exc
 
+    if candles is not None and not isinstance(candles, (list, tuple)):
+        candles = list(candles)
     if not candles:
         frame = pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume", "Source"])
         frame.attrs["candle_sources"] = ()
@@ -114,46 +145,37 @@ def candles_to_frame(candles):
         frame.attrs["has_reconstructed_candles"] = False
         return frame
 
-    rows = []
-    for candle in candles:
-        if isinstance(candle, dict):
-            get = candle.get
-        else:
-            get = lambda name: getattr(candle, name)
-        rows.append(
-            {
-                "ts": get("ts"),
-                "Open": float(get("open_price")),
-                "High": float(get("high_price")),
-                "Low": float(get("low_price")),
-                "Close": float(get("close_price")),
-                "Volume": float(get("volume")),
-                "Source": str(get("source") or "UNKNOWN"),
-            }
-        )
-
-    frame = pd.DataFrame(rows)
-    frame["ts"] = pd.to_datetime(frame["ts"], utc=True)
-    frame["candle_day"] = frame["ts"].dt.date
-    frame["source_priority"] = frame["Source"].map(
-        {
-            "COCOS": 0,
-            "TRADINGVIEW_BYMA": 1,
-            "internal_snapshot": 2,
-        }
-    ).fillna(3)
-    frame = (
-        frame.sort_values(["candle_day", "source_priority", "ts"])
-        .drop_duplicates(subset=["candle_day"], keep="first")
-        .drop(columns=["candle_day", "source_priority"])
-        .set_index("ts")
-        .sort_index()
+    # Una columna por campo, sin dict intermedio por vela. `float()` explicito:
+    # np.array sobre Decimals de asyncpg cae en el camino generico (~10x).
+    columns = {
+        label: np.fromiter(map(float, _candle_column(candles, field)), dtype=float, count=len(candles))
+        for label, field in _CANDLE_PRICE_COLUMNS
+    }
+    columns["Source"] = np.array(
+        [str(value or "UNKNOWN") for value in _candle_column(candles, "source")],
+        dtype=object,
     )
-    sources = tuple(sorted(set(frame["Source"])))
+    index = pd.DatetimeIndex(pd.to_datetime(_candle_column(candles, "ts"), utc=True), name="ts")
+    frame = pd.DataFrame(columns, index=index, copy=False)
+
+    days = _session_days(index)
+    if pd.Index(days).is_unique:
+        # Filas de market_candles_canonical: la fuente ya viene resuelta por dia.
+        if not index.is_monotonic_increasing:
+            frame = frame.sort_index(kind="stable")
+    else:
+        priority = frame["Source"].map(_CANDLE_SOURCE_PRIORITY).fillna(3).to_numpy()
+        order = np.lexsort((index.asi8, priority, days))
+        sorted_days = days[order]
+        first_of_day = np.ones(len(order), dtype=bool)
+        first_of_day[1:] = sorted_days[1:] != sorted_days[:-1]
+        frame = frame.iloc[order[first_of_day]].sort_index(kind="stable")
+
     source_counts = {
         str(source): int(count)
         for source, count in frame["Source"].value_counts().sort_index().items()
     }
+    sources = tuple(source_counts)
     frame.attrs["candle_sources"] = sources
     frame.attrs["candle_source_counts"] = source_counts
     frame.attrs["has_reconstructed_candles"] = "internal_snapshot" in sources
@@ -176,46 +198,78 @@ def overlay_compatible_volume(
     if primary_frame is None or primary_frame.empty:
         return primary_frame
 
+    import numpy as np
+    import pandas as pd
+
     result = primary_frame.copy()
     result.attrs = dict(getattr(primary_frame, "attrs", {}) or {})
-    primary_sources = result.get("Source")
-    volume_source_by_day = {
-        index.date(): str(primary_sources.loc[index] if primary_sources is not None else "UNKNOWN")
-        for index in result.index
-    }
+    days = _session_days(result.index)
+    if "Source" in result:
+        volume_sources = result["Source"].astype(str).to_numpy(dtype=object)
+    else:
+        volume_sources = np.full(len(result), "UNKNOWN", dtype=object)
+
+    def _numeric(frame, column):
+        if column not in frame:
+            return np.zeros(len(frame))
+        return pd.to_numeric(frame[column], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
     accepted = 0
     rejected_price_mismatch = 0
     rejected_missing_match = 0
 
     if volume_frame is not None and not volume_frame.empty:
-        volume_by_day = {
-            index.date(): row
-            for index, row in volume_frame.sort_index().iterrows()
-        }
-        for index, row in result.iterrows():
-            current_volume = float(row.get("Volume") or 0.0)
-            if current_volume > 0:
-                continue
-            fallback = volume_by_day.get(index.date())
-            if fallback is None:
-                rejected_missing_match += 1
-                continue
-            fallback_volume = float(fallback.get("Volume") or 0.0)
-            primary_close = float(row.get("Close") or 0.0)
-            fallback_close = float(fallback.get("Close") or 0.0)
-            if fallback_volume <= 0 or primary_close <= 0 or fallback_close <= 0:
-                rejected_missing_match += 1
-                continue
-            close_difference = abs((fallback_close / primary_close) - 1.0)
-            if close_difference > float(max_close_difference):
-                rejected_price_mismatch += 1
-                continue
-            result.at[index, "Volume"] = fallback_volume
-            volume_source_by_day[index.date()] = source
-            accepted += 1
+        fallback = volume_frame.sort_index()
+        fallback_days = _session_days(fallback.index)
+        # Ante dias repetidos gana la ultima vela del dia.
+        last_of_day = ~pd.Index(fallback_days).duplicated(keep="last")
+        fallback_by_day = pd.DataFrame(
+            {
+                "Volume": _numeric(fallback, "Volume")[last_of_day],
+                "Close": _numeric(fallback, "Close")[last_of_day],
+            },
+            index=pd.Index(fallback_days[last_of_day]),
+        )
+        matched = fallback_by_day.reindex(pd.Index(days))
+        has_match = matched["Volume"].notna().to_numpy()
+        fallback_volume = matched["Volume"].fillna(0.0).to_numpy()
+        fallback_close = matched["Close"].fillna(0.0).to_numpy()
+        primary_close = _numeric(result, "Close")
+
+        current_volume = (
+            pd.to_numeric(result["Volume"], errors="coerce").to_numpy(dtype=float)
+            if "Volume" in result
+            else np.zeros(len(result))
+        )
+        # NaN cuenta como volumen faltante, igual que `float(nan) > 0`.
+        needs_volume = ~(current_volume > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            missing = needs_volume & (
+                ~has_match
+                | (fallback_volume <= 0)
+                | (primary_close <= 0)
+                | (fallback_close <= 0)
+            )
+            candidates = needs_volume & ~missing
+            mismatch = candidates & (
+                np.abs(fallback_close / primary_close - 1.0) > float(max_close_difference)
+            )
+        accept = candidates & ~mismatch
+
+        rejected_missing_match = int(missing.sum())
+        rejected_price_mismatch = int(mismatch.sum())
+        accepted = int(accept.sum())
+        if accepted:
+            if "Volume" not in result:
+                result["Volume"] = np.nan
+            position = result.columns.get_loc("Volume")
+            result.iloc[np.flatnonzero(accept), position] = fallback_volume[accept]
+            volume_sources[accept] = source
 
+    # Un conteo por dia de sesion; con dias repetidos vale la ultima vela.
+    last_of_session = ~pd.Index(days).duplicated(keep="last")
     source_counts: dict[str, int] = {}
-    for value in volume_source_by_day.values():
+    for value in volume_sources[last_of_session]:
         source_counts[value] = source_counts.get(value, 0) + 1
     result.attrs["volume_source_counts"] = source_counts
     result.attrs["volume_overlay_source"] = source
@@ -32,13 +32,14 @@ from src.analysis.audit_scope import (
 )
 from src.analysis.corporate_actions import (
     CORPORATE_ACTIONS_SCHEMA_SQL,
+    CandleAdjustment,
+    CandleAdjustmentStep,
     CorporateActionApplication,
     CorporateActionEffect,
-    MIN_ANOMALY_RETURN,
     PriceQualityFlag,
     corporate_action_effect_from_row,
-    normalize_candle_rows,
-    rebase_reference_price,
+    effects_by_ticker,
+    plan_candle_adjustment,
 )
 from src.analysis.issuer_events import (
     ISSUER_EVENTS_SCHEMA_SQL,
@@ -47,8 +48,16 @@ from src.analysis.issuer_events import (
     IssuerRegistryEntry,
 )
 from src.analysis.decision_context import build_decision_run_context
-from src.analysis.decision_engine import directional_return
 from src.analysis.fill_reconciliation import ExecutionCandidate, choose_execution_candidate
+from src.analysis.outcome_engine import (
+    CORPORATE_EFFECT_LOOKBACK,
+    OUTCOME_CANDLE_LIMIT,
+    OUTCOME_HORIZONS,
+    DecisionOutcome,
+    PendingOutcome,
+    compute_ticker_outcomes,
+    has_price_discontinuity,
+)
 from src.analysis.manual_market_events import (
     MANUAL_MARKET_EVENTS_SCHEMA_SQL,
     ManualMarketEvent,
@@ -63,15 +72,38 @@ from src.collector.broker_movements import (
     BrokerMovement,
     serialize_raw_payload as serialize_movement_raw_payload,
 )
+from src.collector.cocos_history import candles_to_frame
 from src.collector.data.models import AssetType, Currency, MarketCandle
 from src.collector.schema_migrations import (
     EXECUTION_TIMESTAMP_META_SQL,
+    MARKET_CANDLES_CANONICAL_READ_SQL,
+    MARKET_CANDLES_CANONICAL_REBUILD_SQL,
+    MARKET_CANDLES_CANONICAL_REFRESH_SQL,
+    MARKET_CANDLES_CANONICAL_SQL,
+    MARKET_CANDLES_TYPED_RANKED_SQL,
+    MARKET_PRICES_DAY_COVERAGE_SQL,
+    MARKET_PRICES_LATEST_SQL,
+    MARKET_PRICES_LATEST_UPSERT_SQL,
+    MIGRATION_CORPORATE_ACTIONS,
+    MIGRATION_EXECUTION_TIMESTAMP_META,
+    MIGRATION_ISSUER_EVENTS,
+    MIGRATION_MANUAL_MARKET_EVENTS,
+    MIGRATION_MARKET_CANDLES_CANONICAL,
+    MIGRATION_MARKET_PRICES_LATEST,
+    MIGRATION_OUTCOME_HORIZON,
+    MIGRATION_PRECLOSE_ALERTS,
     OUTCOME_HORIZON_SQL,
+    apply_schema_migrations,
+    mark_recorded_schema_ready,
+    schema_ready,
 )
 from src.analysis.plan_follow_attribution import (
     sync_plan_execution_attributions as sync_plan_execution_attributions_derived,
 )
 from src.core.credentials import CredentialCipher, UserCredentials
+from src.core.db_pool import create_private_pool, get_pool
+from src.core.market_price_cache import cache_latest_market_prices
+from src.core.metrics import DB_QUERY_SECONDS, instrument_methods
 
 try:
     import asyncpg
@@ -82,12 +114,6 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 ART_TZ = ZoneInfo("America/Argentina/Buenos_Aires")
-CANONICAL_OUTCOME_BASIS = "canonical_cocos"
-LEGACY_EXTERNAL_OUTCOME_BASIS = "legacy_external"
-MIN_COMPATIBLE_PRICE_RATIO = 0.5
-MAX_COMPATIBLE_PRICE_RATIO = 2.0
-CEDEAR_MIN_COMPATIBLE_PRICE_RATIO = 0.25
-CEDEAR_MAX_COMPATIBLE_PRICE_RATIO = 4.0
 MARKET_FRESHNESS_MIN_TICKERS = 50
 MANUAL_DECISION_STRATEGY_ID = "manual"
 NO_MANUAL_DECISION_COMPONENT_VERSION = "none"
@@ -96,11 +122,53 @@ SUPERSEDED_BROKER_FILL_REASON = "cocos_ticket_replaced_provisional_movement"
 
 SCHEMA_PATH = Path(__file__).resolve().parents[2] / "init.sql"
 
+# Canal NOTIFY que emiten save_market_prices/save_snapshot al commitear. El
+# payload son tickers separados por coma; "*" pide recalcular todo (snapshot
+# nuevo: cambian las posiciones activas).
+PRICE_CHANGES_CHANNEL = "market_price_changes"
+PRICE_CHANGES_ALL = "*"
+_NOTIFY_PAYLOAD_MAX_BYTES = 7000  # Postgres corta en 8000 bytes.
+
+# pg_advisory_xact_lock(clase, hashtext(ticker:interval)): refreshes de ajuste
+# concurrentes (upsert de effects + job diario) se serializan por ticker.
+CANDLE_ADJUSTMENT_LOCK_CLASS = 7_420_019
+
 
 def _schema_sql() -> str:
     return SCHEMA_PATH.read_text(encoding="utf-8")
 
 
+def price_change_payloads(tickers: Sequence[str]) -> list[str]:
+    """Parte los tickers en payloads NOTIFY que entran en el limite de Postgres."""
+    clean = sorted({str(t or "").upper().strip() for t in tickers if str(t or "").strip()})
+    payloads: list[str] = []
+    current: list[str] = []
+    size = 0
+    for ticker in clean:
+        if current and size + len(ticker) + 1 > _NOTIFY_PAYLOAD_MAX_BYTES:
+            payloads.append(",".join(current))
+            current, size = [], 0
+        current.append(ticker)
+        size += len(ticker) + 1
+    if current:
+        payloads.append(",".join(current))
+    return payloads
+
+
+def parse_price_change_payload(payload: str | None) -> set[str] | None:
+    """Tickers de un NOTIFY; None significa "todos"."""
+    text = str(payload or "").strip()
+    if not text or text == PRICE_CHANGES_ALL:
+        return None
+    return {part.strip().upper() for part in text.split(",") if part.strip()}
+
+
+async def _notify_price_changes(conn, tickers: Sequence[str] | None) -> None:
+    payloads = [PRICE_CHANGES_ALL] if tickers is None else price_change_payloads(tickers)
+    for payload in payloads:
+        await conn.execute("SELECT pg_notify($1, $2)", PRICE_CHANGES_CHANNEL, payload)
+
+
 def _manual_broker_decided_at(fill_date: date) -> datetime:
     return datetime.combine(fill_date, time(15, 0), tzinfo=ART_TZ)
 
@@ -286,6 +354,18 @@ def _manual_broker_layer_patch(
     }
 
 
+def _outcome_columns(
+    outcomes: Sequence[DecisionOutcome],
+    prefix: str,
+) -> list[list[Optional[float]]]:
+    """Columnas <prefix>_{5,10,20,40}d alineadas para UPDATE ... FROM unnest(...)."""
+    source = "outcomes" if prefix == "outcome" else "executable_outcomes"
+    return [
+        [getattr(outcome, source).get(f"{prefix}_{horizon}d") for outcome in outcomes]
+        for horizon in OUTCOME_HORIZONS
+    ]
+
+
 def _json_payload(value) -> dict:
     if value is None:
         return {}
@@ -515,7 +595,8 @@ async def _mark_superseded_broker_movements_for_saved_rows(conn, rows: list[tupl
                         'external_movement_id', real_movement.external_movement_id,
                         'reason', $3::text
                     )
-                )
+                ),
+                updated_at = NOW()
             FROM real_movement, synthetic_group
             WHERE synthetic.id = ANY(synthetic_group.synthetic_ids)
             RETURNING synthetic.id
@@ -531,10 +612,12 @@ async def _mark_superseded_broker_movements_for_saved_rows(conn, rows: list[tupl
 # ── Migration SQL para decision_log (idempotente) ─────────────────────────────
 # Se corre en init_schema() además del DDL base.
 # Seguro de correr múltiples veces (IF NOT EXISTS / IF NOT EXISTS).
+@instrument_methods(DB_QUERY_SECONDS, exclude=("connect", "close", "get_pool"))
 class PortfolioDatabase:
-    def __init__(self, dsn: str):
+    def __init__(self, dsn: str, *, shared_pool: bool = True):
         self._dsn = dsn.replace("postgresql+asyncpg://", "postgresql://")
         self._pool: Optional[asyncpg.Pool] = None
+        self._shared_pool = shared_pool
         self._execution_timestamp_meta_ready = False
         self._decision_audit_scope_ready = False
         self._manual_market_events_ready = False
@@ -542,17 +625,39 @@ class PortfolioDatabase:
         self._issuer_events_ready = False
         self._preclose_alerts_ready = False
         self._outcome_horizon_ready = False
+        self._market_candles_canonical_ready = False
+        self._market_prices_latest_ready = False
 
     async def connect(self):
         if not HAS_ASYNCPG:
             raise ImportError("asyncpg no instalado: pip install asyncpg")
-        self._pool = await asyncpg.create_pool(self._dsn, min_size=1, max_size=5)
+        # Pool compartido por proceso/event loop: varias instancias (jobs del
+        # scheduler, handlers del bot) reusan las mismas conexiones calientes.
+        # Con shared_pool=False la instancia es dueña de su pool y lo cierra.
+        if self._shared_pool:
+            self._pool = await get_pool(self._dsn)
+        elif self._pool is None:
+            self._pool = await create_private_pool(self._dsn)
         logger.info("Conexion a base de datos establecida")
+        # Sin fase de arranque (scripts sueltos) los ensure_* repetirian DDL
+        # por proceso: las versiones ya registradas se dan por aplicadas.
+        try:
+            async with self._pool.acquire() as conn:
+                await mark_recorded_schema_ready(conn)
+        except Exception as exc:
+            logger.warning("No se pudo leer schema_migrations: %s", exc)
 
     async def close(self):
-        if self._pool:
-            await self._pool.close()
+        # El pool compartido se cierra al terminar el event loop (db_pool);
+        # uno propio se cierra acá mismo.
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        if not self._shared_pool:
+            await pool.close()
             logger.info("Conexion a base de datos cerrada")
+        else:
+            logger.info("Conexion a base de datos liberada")
 
     async def init_schema(self):
         if not self._pool:
@@ -567,9 +672,17 @@ class PortfolioDatabase:
                 raise
 
         logger.info("Schema inicializado desde init.sql")
+        await self.run_schema_migrations()
+
+    async def run_schema_migrations(self) -> list[str]:
+        """Fase de arranque: versiones pendientes de schema_migrations."""
+        if not self._pool:
+            raise RuntimeError("Llamar connect() primero")
+        async with self._pool.acquire() as conn:
+            return await apply_schema_migrations(conn)
 
     async def _ensure_execution_timestamp_meta_columns(self, conn) -> None:
-        if self._execution_timestamp_meta_ready:
+        if self._execution_timestamp_meta_ready or schema_ready(MIGRATION_EXECUTION_TIMESTAMP_META):
             return
         await conn.execute(EXECUTION_TIMESTAMP_META_SQL)
         self._execution_timestamp_meta_ready = True
@@ -581,7 +694,7 @@ class PortfolioDatabase:
         self._decision_audit_scope_ready = True
 
     async def _ensure_manual_market_events_schema(self, conn) -> None:
-        if self._manual_market_events_ready:
+        if self._manual_market_events_ready or schema_ready(MIGRATION_MANUAL_MARKET_EVENTS):
             return
         await conn.execute(MANUAL_MARKET_EVENTS_SCHEMA_SQL)
         self._manual_market_events_ready = True
@@ -597,6 +710,7 @@ class PortfolioDatabase:
         *,
         days: int = 180,
         match_window_sessions: int = 2,
+        incremental: bool = False,
     ) -> dict[str, int]:
         if not self._pool:
             raise RuntimeError("Llamar connect() primero")
@@ -605,10 +719,11 @@ class PortfolioDatabase:
                 conn,
                 days=days,
                 match_window_sessions=match_window_sessions,
+                incremental=incremental,
             )
 
     async def _ensure_corporate_actions_schema(self, conn) -> None:
-        if self._corporate_actions_ready:
+        if self._corporate_actions_ready or schema_ready(MIGRATION_CORPORATE_ACTIONS):
             return
         await conn.execute(CORPORATE_ACTIONS_SCHEMA_SQL)
         self._corporate_actions_ready = True
@@ -620,7 +735,7 @@ class PortfolioDatabase:
             await self._ensure_corporate_actions_schema(conn)
 
     async def _ensure_issuer_events_schema(self, conn) -> None:
-        if self._issuer_events_ready:
+        if self._issuer_events_ready or schema_ready(MIGRATION_ISSUER_EVENTS):
             return
         await conn.execute(ISSUER_EVENTS_SCHEMA_SQL)
         self._issuer_events_ready = True
@@ -632,17 +747,29 @@ class PortfolioDatabase:
             await self._ensure_issuer_events_schema(conn)
 
     async def _ensure_preclose_alerts_schema(self, conn) -> None:
-        if self._preclose_alerts_ready:
+        if self._preclose_alerts_ready or schema_ready(MIGRATION_PRECLOSE_ALERTS):
             return
         await conn.execute(PRE_CLOSE_ALERTS_SCHEMA_SQL)
         self._preclose_alerts_ready = True
 
     async def _ensure_outcome_horizon_columns(self, conn) -> None:
-        if self._outcome_horizon_ready:
+        if self._outcome_horizon_ready or schema_ready(MIGRATION_OUTCOME_HORIZON):
             return
         await conn.execute(OUTCOME_HORIZON_SQL)
         self._outcome_horizon_ready = True
 
+    async def _ensure_market_candles_canonical_schema(self, conn) -> None:
+        if self._market_candles_canonical_ready or schema_ready(MIGRATION_MARKET_CANDLES_CANONICAL):
+            return
+        await conn.execute(MARKET_CANDLES_CANONICAL_SQL)
+        self._market_candles_canonical_ready = True
+
+    async def _ensure_market_prices_latest_schema(self, conn) -> None:
+        if self._market_prices_latest_ready or schema_ready(MIGRATION_MARKET_PRICES_LATEST):
+            return
+        await conn.execute(MARKET_PRICES_LATEST_SQL)
+        self._market_prices_latest_ready = True
+
     async def save_preclose_alerts(
         self,
         alerts: list[PrecloseAlert],
@@ -1008,6 +1135,19 @@ class PortfolioDatabase:
                     str(depositary_ratio_after or "").strip(),
                     json.dumps(dict(metadata or {}), ensure_ascii=False),
                 )
+        # La serie ajustada persistida sigue al effect (confirmado, cancelado
+        # o con factores corregidos); un fallo acá no deshace el evento.
+        try:
+            await self.refresh_candle_adjustments(
+                [ticker],
+                reason=f"corporate_action {str(event_key).strip()}",
+            )
+        except Exception as exc:
+            logger.warning(
+                "No se pudo versionar el ajuste de velas de %s: %s",
+                str(ticker).upper().strip(),
+                exc,
+            )
         return int(event_id), int(effect_id)
 
     async def get_corporate_action_effects(
@@ -1073,6 +1213,318 @@ class PortfolioDatabase:
             )
         return [corporate_action_effect_from_row(dict(row)) for row in rows]
 
+    async def _fetch_candle_adjustments(
+        self,
+        conn,
+        tickers: Sequence[str],
+        *,
+        interval: str,
+        version: Optional[int] = None,
+        history: bool = False,
+    ) -> list[CandleAdjustment]:
+        rows = await conn.fetch(
+            """
+            SELECT
+                v.id, v.ticker, v.version, v.status, v.signature, v.blocking_reason,
+                v.reason, v.built_at, v.candle_count, v.last_candle_day,
+                s.instrument_effect_id, s.event_id, s.effective_at,
+                s.application_status, s.transition_day, s.price_factor, s.volume_factor
+            FROM corporate_adjustment_versions v
+            LEFT JOIN corporate_adjustment_steps s ON s.version_id = v.id
+            WHERE v.ticker = ANY($1::text[])
+              AND v.interval = $2
+              AND CASE
+                    WHEN $3::int IS NOT NULL THEN v.version = $3::int
+                    WHEN $4::bool THEN TRUE
+                    ELSE v.status = 'CURRENT'
+                  END
+            ORDER BY v.ticker, v.version, s.effective_at, s.instrument_effect_id
+            """,
+            list(tickers),
+            interval,
+            version,
+            history,
+        )
+        headers: dict[int, Mapping[str, Any]] = {}
+        steps: dict[int, list[CandleAdjustmentStep]] = {}
+        for row in rows:
+            version_id = int(row["id"])
+            headers.setdefault(version_id, row)
+            bucket = steps.setdefault(version_id, [])
+            if row["instrument_effect_id"] is None:
+                continue
+            bucket.append(
+                CandleAdjustmentStep(
+                    effect_id=int(row["instrument_effect_id"]),
+                    event_id=int(row["event_id"]),
+                    effective_at=row["effective_at"],
+                    application_status=str(row["application_status"]),
+                    price_factor=float(row["price_factor"]),
+                    volume_factor=float(row["volume_factor"]),
+                    transition_day=row["transition_day"],
+                )
+            )
+        return [
+            CandleAdjustment(
+                ticker=str(header["ticker"]).upper(),
+                steps=tuple(steps[version_id]),
+                version=int(header["version"]),
+                signature=str(header["signature"]),
+                status=str(header["status"]),
+                blocking_reason=header["blocking_reason"],
+                reason=str(header["reason"] or ""),
+                built_at=header["built_at"],
+                candle_count=int(header["candle_count"] or 0),
+                last_candle_day=header["last_candle_day"],
+            )
+            for version_id, header in headers.items()
+        ]
+
+    async def get_candle_adjustments(
+        self,
+        tickers: Sequence[str],
+        *,
+        interval: str = "1d",
+        version: Optional[int] = None,
+    ) -> dict[str, CandleAdjustment]:
+        """
+        Pasos de ajuste por corporate actions persistidos, por ticker: la
+        versión vigente o, con `version`, esa versión puntual (auditoría).
+        Los tickers sin versión no aparecen (su serie ajustada es la cruda).
+        """
+        clean = sorted({
+            str(ticker or "").upper().strip()
+            for ticker in tickers or []
+            if str(ticker or "").strip()
+        })
+        if not self._pool or not clean or version == 0:
+            return {}
+        async with self._pool.acquire() as conn:
+            await self._ensure_corporate_actions_schema(conn)
+            adjustments = await self._fetch_candle_adjustments(
+                conn, clean, interval=interval, version=version,
+            )
+        return {adjustment.ticker: adjustment for adjustment in adjustments}
+
+    async def get_candle_adjustment_history(
+        self,
+        ticker: str,
+        *,
+        interval: str = "1d",
+    ) -> list[CandleAdjustment]:
+        """Todas las versiones de ajuste de `ticker`, de la más vieja a la vigente."""
+        if not self._pool:
+            return []
+        async with self._pool.acquire() as conn:
+            await self._ensure_corporate_actions_schema(conn)
+            return await self._fetch_candle_adjustments(
+                conn, [str(ticker).upper().strip()], interval=interval, history=True,
+            )
+
+    async def refresh_candle_adjustments(
+        self,
+        tickers: Optional[Sequence[str]] = None,
+        *,
+        reason: str,
+        interval: str = "1d",
+        observed_at: Optional[datetime] = None,
+    ) -> dict[str, int]:
+        """
+        Recalcula los pasos de ajuste de cada ticker contra su historia canónica
+        completa y guarda una versión nueva (la anterior queda SUPERSEDED) solo
+        si cambió la firma: effect confirmado, cancelado, o vela post-evento que
+        recién llegó. Sin `tickers` revisa, de los que tienen effects
+        confirmados o una versión vigente, solo los que no tienen versión o
+        cambiaron desde `built_at`: effects/eventos editados, o velas canónicas
+        refrescadas que pueden mover un paso (cualquiera si hay pasos sin
+        resolver, si no solo hasta la última transición). Cada ticker se
+        escribe en su propia transacción bajo un advisory lock, así dos
+        corridas concurrentes no chocan en la versión CURRENT.
+
+        Devuelve {ticker: versión nueva} de los tickers que cambiaron.
+        """
+        if not self._pool:
+            return {}
+        clean = sorted({
+            str(ticker or "").upper().strip()
+            for ticker in tickers or []
+            if str(ticker or "").strip()
+        })
+        async with self._pool.acquire() as conn:
+            await self._ensure_corporate_actions_schema(conn)
+            if tickers is None:
+                await self._ensure_market_candles_canonical_schema(conn)
+                rows = await conn.fetch(
+                    """
+                    WITH candidates AS (
+                        SELECT UPPER(effect.ticker) AS ticker
+                        FROM corporate_event_instrument_effects effect
+                        JOIN corporate_events e ON e.id = effect.event_id
+                        WHERE effect.is_active = TRUE
+                          AND e.lifecycle_status IN ('CONFIRMED', 'EFFECTIVE')
+                        UNION
+                        SELECT ticker
+                        FROM corporate_adjustment_versions
+                        WHERE interval = $1
+                          AND status = 'CURRENT'
+                    )
+                    SELECT c.ticker
+                    FROM candidates c
+                    LEFT JOIN corporate_adjustment_versions v
+                      ON v.ticker = c.ticker
+                     AND v.interval = $1
+                     AND v.status = 'CURRENT'
+                    LEFT JOIN LATERAL (
+                        SELECT
+                            BOOL_OR(s.application_status NOT IN ('APPLIED', 'ALREADY_ADJUSTED'))
+                                AS unresolved,
+                            GREATEST(
+                                MAX(s.transition_day),
+                                MAX((s.effective_at AT TIME ZONE 'America/Argentina/Buenos_Aires')::date)
+                            ) + 7 AS relevant_until
+                        FROM corporate_adjustment_steps s
+                        WHERE s.version_id = v.id
+                    ) steps ON TRUE
+                    WHERE v.id IS NULL
+                       OR EXISTS (
+                            SELECT 1
+                            FROM corporate_event_instrument_effects effect
+                            JOIN corporate_events e ON e.id = effect.event_id
+                            WHERE UPPER(effect.ticker) = c.ticker
+                              AND GREATEST(effect.updated_at, e.updated_at) > v.built_at
+                       )
+                       OR EXISTS (
+                            SELECT 1
+                            FROM market_candles_canonical mcc
+                            WHERE mcc.ticker = c.ticker
+                              AND mcc.interval = $1
+                              AND mcc.refreshed_at > v.built_at
+                              AND (
+                                    COALESCE(steps.unresolved, FALSE)
+                                    OR mcc.candle_day <= steps.relevant_until
+                              )
+                       )
+                    """,
+                    interval,
+                )
+                clean = sorted({str(row["ticker"]).upper() for row in rows})
+            if not clean:
+                return {}
+            current = {
+                adjustment.ticker: adjustment
+                for adjustment in await self._fetch_candle_adjustments(
+                    conn, clean, interval=interval,
+                )
+            }
+
+        grouped_effects = effects_by_ticker(
+            await self.get_corporate_action_effects(
+                tickers=clean,
+                since=datetime(1970, 1, 1, tzinfo=timezone.utc),
+            )
+        )
+        candles = await self.get_market_candle_rows_bulk(clean, None, None, interval=interval)
+        observed_at = observed_at or datetime.now(timezone.utc)
+
+        changed: dict[str, int] = {}
+        applications: list[CorporateActionApplication] = []
+        async with self._pool.acquire() as conn:
+            for ticker in clean:
+                plan = plan_candle_adjustment(
+                    ticker,
+                    candles.get(ticker, []),
+                    grouped_effects.get(ticker, ()),
+                    observed_at=observed_at,
+                )
+                previous = current.get(ticker)
+                if previous is None and not plan.steps:
+                    continue
+                if previous is not None and previous.signature == plan.signature:
+                    continue
+                # Una transaccion por ticker bajo su lock: otro refresh pudo
+                # crear la version entre la lectura de arriba y MAX(version).
+                async with conn.transaction():
+                    await conn.execute(
+                        "SELECT pg_advisory_xact_lock($1, hashtext($2))",
+                        CANDLE_ADJUSTMENT_LOCK_CLASS,
+                        f"{ticker}:{interval}",
+                    )
+                    current_signature = await conn.fetchval(
+                        """
+                        SELECT signature
+                        FROM corporate_adjustment_versions
+                        WHERE ticker = $1 AND interval = $2 AND status = 'CURRENT'
+                        """,
+                        ticker,
+                        interval,
+                    )
+                    if current_signature is None and not plan.steps:
+                        continue
+                    if current_signature == plan.signature:
+                        continue
+                    await conn.execute(
+                        """
+                        UPDATE corporate_adjustment_versions
+                        SET status = 'SUPERSEDED', superseded_at = NOW()
+                        WHERE ticker = $1 AND interval = $2 AND status = 'CURRENT'
+                        """,
+                        ticker,
+                        interval,
+                    )
+                    created = await conn.fetchrow(
+                        """
+                        INSERT INTO corporate_adjustment_versions (
+                            ticker, interval, version, signature, blocking_reason,
+                            reason, candle_count, last_candle_day
+                        )
+                        SELECT $1, $2, COALESCE(MAX(version), 0) + 1, $3, $4, $5, $6, $7
+                        FROM corporate_adjustment_versions
+                        WHERE ticker = $1 AND interval = $2
+                        RETURNING id, version
+                        """,
+                        ticker,
+                        interval,
+                        plan.signature,
+                        plan.blocking_reason,
+                        str(reason),
+                        plan.candle_count,
+                        plan.last_candle_day,
+                    )
+                    if plan.steps:
+                        await conn.executemany(
+                            """
+                            INSERT INTO corporate_adjustment_steps (
+                                version_id, instrument_effect_id, event_id, effective_at,
+                                application_status, transition_day, price_factor, volume_factor
+                            ) VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
+                            """,
+                            [
+                                (
+                                    int(created["id"]),
+                                    step.effect_id,
+                                    step.event_id,
+                                    step.effective_at,
+                                    step.application_status,
+                                    step.transition_day,
+                                    step.price_factor,
+                                    step.volume_factor,
+                                )
+                                for step in plan.steps
+                            ],
+                        )
+                    changed[ticker] = int(created["version"])
+                    applications.extend(plan.versioned_applications(changed[ticker]))
+                    logger.info(
+                        "Ajuste de velas %s v%d (%s): %d pasos, bloqueo=%s",
+                        ticker,
+                        changed[ticker],
+                        reason,
+                        len(plan.steps),
+                        plan.blocking_reason or "-",
+                    )
+        await self.record_corporate_action_applications(applications)
+        return changed
+
     async def get_latest_portfolio_instrument_seeds(
         self,
         *,
@@ -1807,6 +2259,7 @@ class PortfolioDatabase:
                         self._snapshot_payload_with_asset_types(snapshot, asset_type_map)
                     ),
                 )
+                await _notify_price_changes(conn, None)
 
         logger.info(f"Snapshot {sid} guardado ({len(snapshot.positions)} posiciones)")
         return sid
@@ -1865,22 +2318,38 @@ class PortfolioDatabase:
             for a in assets
         ]
 
+        columns = list(zip(*rows))
         async with self._pool.acquire() as conn:
-            await conn.executemany(
-                """
-                INSERT INTO market_prices
-                    (ts, ticker, asset_type, currency, last_price, change_pct_1d, volume)
-                VALUES ($1,$2,$3,$4,$5,$6,$7)
-                ON CONFLICT (ts, ticker) DO UPDATE SET
-                    asset_type    = EXCLUDED.asset_type,
-                    currency      = EXCLUDED.currency,
-                    last_price    = EXCLUDED.last_price,
-                    change_pct_1d = EXCLUDED.change_pct_1d,
-                    volume        = EXCLUDED.volume
-                """,
-                rows,
-            )
+            await self._ensure_market_prices_latest_schema(conn)
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    INSERT INTO market_prices
+                        (ts, ticker, asset_type, currency, last_price, change_pct_1d, volume)
+                    VALUES ($1,$2,$3,$4,$5,$6,$7)
+                    ON CONFLICT (ts, ticker) DO UPDATE SET
+                        asset_type    = EXCLUDED.asset_type,
+                        currency      = EXCLUDED.currency,
+                        last_price    = EXCLUDED.last_price,
+                        change_pct_1d = EXCLUDED.change_pct_1d,
+                        volume        = EXCLUDED.volume
+                    """,
+                    rows,
+                )
+                latest = await conn.fetch(
+                    MARKET_PRICES_LATEST_UPSERT_SQL,
+                    *(list(column) for column in columns[:6]),
+                )
+                await conn.execute(
+                    MARKET_PRICES_DAY_COVERAGE_SQL,
+                    list(columns[0]),
+                    list(columns[1]),
+                    list(columns[4]),
+                )
+                # NOTIFY se entrega recien al commit: el risk guard lee precios ya visibles.
+                await _notify_price_changes(conn, [row[1] for row in rows])
 
+        await cache_latest_market_prices(dict(row) for row in latest)
         logger.info(f"{len(rows)} precios de mercado guardados")
         return len(rows)
 
@@ -1909,27 +2378,92 @@ class PortfolioDatabase:
             for c in candles
         ]
 
+        canonical_keys = sorted({
+            (
+                c.ticker,
+                c.interval,
+                (c.ts.astimezone(timezone.utc) if c.ts.tzinfo else c.ts).date(),
+            )
+            for c in candles
+        })
+
         async with self._pool.acquire() as conn:
-            await conn.executemany(
-                """
-                INSERT INTO market_candles (
-                    ts, ticker, long_ticker, asset_type, currency, venue, interval,
-                    open_price, high_price, low_price, close_price, volume, source
-                ) VALUES (
-                    $1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13
+            await self._ensure_market_candles_canonical_schema(conn)
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    INSERT INTO market_candles (
+                        ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                        open_price, high_price, low_price, close_price, volume, source
+                    ) VALUES (
+                        $1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13
+                    )
+                    ON CONFLICT (ts, long_ticker, interval) DO UPDATE SET
+                        open_price  = EXCLUDED.open_price,
+                        high_price  = EXCLUDED.high_price,
+                        low_price   = EXCLUDED.low_price,
+                        close_price = EXCLUDED.close_price,
+                        volume      = EXCLUDED.volume,
+                        scraped_at  = NOW()
+                    """,
+                    rows,
+                )
+                # Re-elige la fuente ganadora solo para los dias tocados.
+                await conn.execute(
+                    MARKET_CANDLES_CANONICAL_REFRESH_SQL,
+                    [key[0] for key in canonical_keys],
+                    [key[1] for key in canonical_keys],
+                    [key[2] for key in canonical_keys],
                 )
-                ON CONFLICT (ts, long_ticker, interval) DO UPDATE SET
-                    open_price  = EXCLUDED.open_price,
-                    high_price  = EXCLUDED.high_price,
-                    low_price   = EXCLUDED.low_price,
-                    close_price = EXCLUDED.close_price,
-                    volume      = EXCLUDED.volume,
-                    scraped_at  = NOW()
-                """,
-                rows,
-            )
         return len(rows)
 
+    async def rebuild_market_candles_canonical(
+        self,
+        *,
+        tickers: Optional[Sequence[str]] = None,
+        since: Optional[date] = None,
+    ) -> int:
+        """
+        Reconstruye market_candles_canonical desde market_candles.
+
+        Pensado para backfills: borra el tramo pedido (tickers y/o dias desde
+        `since`) y lo vuelve a resolver con la prioridad de fuentes.
+        """
+        if not self._pool:
+            raise RuntimeError("Llamar connect() primero")
+
+        clean = sorted({
+            str(ticker).upper().strip()
+            for ticker in tickers or []
+            if str(ticker or "").strip()
+        }) or None
+
+        async with self._pool.acquire() as conn:
+            await self._ensure_market_candles_canonical_schema(conn)
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    DELETE FROM market_candles_canonical
+                    WHERE ($1::text[] IS NULL OR ticker = ANY($1::text[]))
+                      AND ($2::date IS NULL OR candle_day >= $2::date)
+                    """,
+                    clean,
+                    since,
+                )
+                result = await conn.execute(
+                    MARKET_CANDLES_CANONICAL_REBUILD_SQL,
+                    clean,
+                    since,
+                )
+        rebuilt = int(str(result).split()[-1])
+        logger.info(
+            "market_candles_canonical reconstruida: %d velas (tickers=%s desde=%s)",
+            rebuilt,
+            len(clean) if clean else "todos",
+            since.isoformat() if since else "inicio",
+        )
+        return rebuilt
+
     async def build_daily_candles_from_market_prices(
         self,
         business_day: Optional[date] = None,
@@ -2128,7 +2662,19 @@ class PortfolioDatabase:
         source: Optional[str] = None,
         interval: str = "1d",
         limit: Optional[int] = None,
+        adjusted: bool = False,
+        adjustment_version: Optional[int] = None,
     ) -> list[dict]:
+        """
+        Velas diarias de un ticker en orden cronologico ascendente.
+
+        Sin `source` lee market_candles_canonical (una vela por dia con la
+        fuente ganadora ya resuelta). Con `source` lee la serie cruda de esa
+        fuente en market_candles.
+
+        `adjusted=True` aplica la version vigente del ajuste por corporate
+        actions; `adjustment_version=N` reproduce esa version (0 = crudo).
+        """
         if not self._pool:
             return []
 
@@ -2149,77 +2695,352 @@ class PortfolioDatabase:
             limit_sql = f"LIMIT ${len(params)}"
 
         async with self._pool.acquire() as conn:
-            rows = await conn.fetch(
-                f"""
-                WITH ranked AS (
+            if not source and asset_type:
+                grouped = await self._fetch_canonical_candle_rows(
+                    conn, [ticker.upper()], [asset_type.upper()], interval, limit,
+                )
+                rows = list(reversed(grouped[ticker.upper()]))
+            elif not source:
+                await self._ensure_market_candles_canonical_schema(conn)
+                rows = await conn.fetch(
+                    f"""
                     SELECT
                         ts, ticker, long_ticker, asset_type, currency, venue, interval,
-                        open_price, high_price, low_price, close_price, volume, source,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY (ts AT TIME ZONE 'UTC')::date
-                            ORDER BY
-                                CASE
-                                    WHEN source = 'COCOS' THEN 0
-                                    WHEN source = 'TRADINGVIEW_BYMA' THEN 1
-                                    WHEN source = 'internal_snapshot' THEN 2
-                                    ELSE 3
-                                END,
-                                scraped_at DESC,
-                                ts DESC
-                        ) AS source_rank
-                    FROM market_candles
+                        open_price, high_price, low_price, close_price, volume, source
+                    FROM market_candles_canonical
                     WHERE {' AND '.join(filters)}
+                    ORDER BY candle_day DESC
+                    {limit_sql}
+                    """,
+                    *params,
+                )
+            else:
+                rows = await conn.fetch(
+                    f"""
+                    WITH ranked AS (
+                        SELECT
+                            ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                            open_price, high_price, low_price, close_price, volume, source,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY (ts AT TIME ZONE 'UTC')::date
+                                ORDER BY scraped_at DESC, ts DESC
+                            ) AS day_rank
+                        FROM market_candles
+                        WHERE {' AND '.join(filters)}
+                    )
+                    SELECT
+                        ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                        open_price, high_price, low_price, close_price, volume, source
+                    FROM ranked
+                    WHERE day_rank = 1
+                    ORDER BY ts DESC
+                    {limit_sql}
+                    """,
+                    *params,
                 )
-                SELECT
-                    ts, ticker, long_ticker, asset_type, currency, venue, interval,
-                    open_price, high_price, low_price, close_price, volume, source
-                FROM ranked
-                WHERE source_rank = 1
-                ORDER BY ts DESC
-                {limit_sql}
-                """,
-                *params,
-            )
 
-        return [dict(row) for row in reversed(rows)]
+        candles = [dict(row) for row in reversed(rows)]
+        if not adjusted and adjustment_version is None:
+            return candles
+        grouped = {ticker.upper(): candles}
+        adjustments = await self._adjust_candle_groups(
+            grouped, interval=interval, version=adjustment_version,
+        )
+        if adjustment_version and ticker.upper() not in adjustments:
+            raise ValueError(f"{ticker.upper()} no tiene version de ajuste {adjustment_version}")
+        return grouped[ticker.upper()]
 
-    async def get_portfolio_history(
+    async def get_market_candle_rows_bulk(
         self,
-        limit: int = 60,
-        owner_chat_id: Optional[int] = None,
-    ) -> list[dict]:
+        tickers: Sequence[str],
+        asset_types: Mapping[str, Optional[str]] | str | None = None,
+        limit: Optional[int] = None,
+        source: Optional[str] = None,
+        *,
+        interval: str = "1d",
+        adjusted: bool = False,
+        adjustment_version: Optional[int] = None,
+    ) -> dict[str, list[dict]]:
         """
-        Retorna snapshots recientes con posiciones incluidas, leídos desde raw_snapshots.
-        Devuelve en orden cronológico ascendente (el más antiguo primero).
+        Version set-based de get_market_candles para muchos tickers.
+
+        Resuelve el limite por ticker para todo el universo en una sola query
+        (range scan por ticker sobre market_candles_canonical, o la serie de
+        una fuente puntual si se pasa `source`); solo los tickers con dias
+        ganados por otro asset_type suman una segunda lectura sobre
+        market_candles. Devuelve las filas en orden
+        cronologico ascendente, agrupadas por ticker. `adjusted` y
+        `adjustment_version` como en get_market_candles.
         """
         if not self._pool:
-            return []
+            return {}
+
+        clean = list(dict.fromkeys(
+            str(ticker).upper().strip()
+            for ticker in tickers or []
+            if str(ticker or "").strip()
+        ))
+        if not clean:
+            return {}
+
+        if isinstance(asset_types, str):
+            shared_type = asset_types.upper().strip() or None
+            requested_types = [shared_type for _ in clean]
+        else:
+            type_map = {
+                str(key).upper(): (str(value).upper().strip() or None) if value else None
+                for key, value in (asset_types or {}).items()
+            }
+            requested_types = [type_map.get(ticker) for ticker in clean]
+
+        params: list[Any] = [clean, requested_types, interval]
         async with self._pool.acquire() as conn:
-            if owner_chat_id is None:
-                rows = await conn.fetch(
-                    """
-                    SELECT payload
-                    FROM raw_snapshots
-                    ORDER BY scraped_at DESC
-                    LIMIT $1
-                    """,
-                    limit,
+            if not source:
+                grouped = await self._fetch_canonical_candle_rows(
+                    conn, clean, requested_types, interval, limit,
                 )
             else:
+                params.append(source.strip())
+                params.append(int(limit) if limit is not None else None)
                 rows = await conn.fetch(
                     """
-                    SELECT r.payload
-                    FROM raw_snapshots r
-                    JOIN portfolio_snapshots p USING (snapshot_id)
-                    WHERE p.owner_chat_id = $1
-                    ORDER BY r.scraped_at DESC
-                    LIMIT $2
+                    WITH requested AS (
+                        SELECT *
+                        FROM unnest($1::text[], $2::text[]) AS r(ticker, asset_type)
+                    ),
+                    ranked AS (
+                        SELECT
+                            mc.ts, mc.ticker, mc.long_ticker, mc.asset_type, mc.currency,
+                            mc.venue, mc.interval, mc.open_price, mc.high_price,
+                            mc.low_price, mc.close_price, mc.volume, mc.source,
+                            ROW_NUMBER() OVER (
+                                PARTITION BY mc.ticker, (mc.ts AT TIME ZONE 'UTC')::date
+                                ORDER BY mc.scraped_at DESC, mc.ts DESC
+                            ) AS day_rank
+                        FROM market_candles mc
+                        JOIN requested r
+                          ON r.ticker = mc.ticker
+                         AND (r.asset_type IS NULL OR mc.asset_type = r.asset_type)
+                        WHERE mc.interval = $3
+                          AND mc.source = $4
+                    ),
+                    recent AS (
+                        SELECT
+                            ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                            open_price, high_price, low_price, close_price, volume, source,
+                            ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY ts DESC) AS recency_rank
+                        FROM ranked
+                        WHERE day_rank = 1
+                    )
+                    SELECT
+                        ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                        open_price, high_price, low_price, close_price, volume, source
+                    FROM recent
+                    WHERE $5::int IS NULL OR recency_rank <= $5::int
+                    ORDER BY ticker, ts
                     """,
-                    owner_chat_id,
-                    limit,
+                    *params,
                 )
-        result = []
-        for r in reversed(rows):
+                grouped = {ticker: [] for ticker in clean}
+                for row in rows:
+                    item = dict(row)
+                    grouped.setdefault(str(item["ticker"]).upper(), []).append(item)
+        if adjusted or adjustment_version is not None:
+            await self._adjust_candle_groups(grouped, interval=interval, version=adjustment_version)
+        return grouped
+
+    async def _fetch_canonical_candle_rows(
+        self,
+        conn,
+        tickers: list[str],
+        asset_types: list[Optional[str]],
+        interval: str,
+        limit: Optional[int],
+    ) -> dict[str, list[dict]]:
+        """
+        Velas canonicas por ticker en orden ascendente. Los tickers con dias
+        ganados por otro asset_type que el pedido se rankean desde
+        market_candles: filtrar la canonica perderia esos dias.
+        """
+        await self._ensure_market_candles_canonical_schema(conn)
+        limit_value = int(limit) if limit is not None else None
+        rows = await conn.fetch(
+            MARKET_CANDLES_CANONICAL_READ_SQL, tickers, asset_types, interval, limit_value,
+        )
+        grouped: dict[str, list[dict]] = {ticker: [] for ticker in tickers}
+        mixed: list[str] = []
+        for row in rows:
+            item = dict(row)
+            ticker = str(item["ticker"]).upper()
+            if item.pop("mixed_types", False):
+                mixed.append(ticker)
+            elif item["ts"] is not None:
+                grouped.setdefault(ticker, []).append(item)
+        if mixed:
+            type_of = dict(zip(tickers, asset_types))
+            logger.debug("Velas por tipo desde market_candles: %s", ", ".join(mixed))
+            typed = await conn.fetch(
+                MARKET_CANDLES_TYPED_RANKED_SQL,
+                mixed,
+                [type_of[ticker] for ticker in mixed],
+                interval,
+                limit_value,
+            )
+            for row in typed:
+                grouped[str(row["ticker"]).upper()].append(dict(row))
+        return grouped
+
+    async def _adjust_candle_groups(
+        self,
+        grouped: dict[str, list[dict]],
+        *,
+        interval: str,
+        version: Optional[int] = None,
+    ) -> dict[str, CandleAdjustment]:
+        """Aplica en el lugar los pasos persistidos; devuelve las versiones usadas."""
+        adjustments = await self.get_candle_adjustments(
+            list(grouped), interval=interval, version=version,
+        )
+        for ticker, adjustment in adjustments.items():
+            if grouped.get(ticker):
+                grouped[ticker] = adjustment.apply_to_rows(grouped[ticker])
+        return adjustments
+
+    async def get_market_candles_refreshed_since(
+        self,
+        since: Optional[datetime],
+        *,
+        interval: str = "1d",
+        tickers: Optional[Sequence[str]] = None,
+    ) -> list[dict]:
+        """
+        Filas de market_candles_canonical refrescadas despues de `since`
+        (None = tabla completa), con `refreshed_at` para avanzar el watermark
+        de caches locales. `tickers` acota la lectura (recarga de tickers
+        invalidados).
+        """
+        if not self._pool:
+            return []
+        async with self._pool.acquire() as conn:
+            await self._ensure_market_candles_canonical_schema(conn)
+            rows = await conn.fetch(
+                """
+                SELECT
+                    ts, ticker, long_ticker, asset_type, currency, venue, interval,
+                    open_price, high_price, low_price, close_price, volume, source,
+                    refreshed_at
+                FROM market_candles_canonical
+                WHERE interval = $1
+                  AND ($2::timestamptz IS NULL OR refreshed_at > $2)
+                  AND ($3::text[] IS NULL OR ticker = ANY($3::text[]))
+                ORDER BY ticker, candle_day
+                """,
+                interval,
+                since,
+                sorted({str(ticker).upper().strip() for ticker in tickers}) if tickers is not None else None,
+            )
+        return [dict(row) for row in rows]
+
+    async def get_market_candles_canonical_summary(
+        self,
+        *,
+        interval: str = "1d",
+    ) -> dict[str, dict]:
+        """
+        Cantidad de velas y ultimo ts por ticker en market_candles_canonical.
+        Los caches locales lo comparan contra su copia para detectar filas
+        borradas o reemplazadas, que el watermark de refreshed_at no ve.
+        """
+        if not self._pool:
+            return {}
+        async with self._pool.acquire() as conn:
+            await self._ensure_market_candles_canonical_schema(conn)
+            rows = await conn.fetch(
+                """
+                SELECT ticker, COUNT(*) AS rows, MAX(ts) AS last_ts
+                FROM market_candles_canonical
+                WHERE interval = $1
+                GROUP BY ticker
+                """,
+                interval,
+            )
+        return {
+            str(row["ticker"]).upper(): {"rows": int(row["rows"]), "last_ts": row["last_ts"]}
+            for row in rows
+        }
+
+    async def get_market_candles_bulk(
+        self,
+        tickers: Sequence[str],
+        asset_types: Mapping[str, Optional[str]] | str | None = None,
+        limit: Optional[int] = None,
+        source: Optional[str] = None,
+        *,
+        interval: str = "1d",
+        adjusted: bool = False,
+        adjustment_version: Optional[int] = None,
+    ) -> dict:
+        """
+        Carga velas canonicas de muchos tickers y devuelve frames OHLCV por ticker.
+
+        Los frames ajustados llevan en `attrs` los effects ya aplicados, asi que
+        `guard_history_frames` no los vuelve a normalizar.
+        """
+        grouped = await self.get_market_candle_rows_bulk(
+            tickers,
+            asset_types,
+            limit,
+            source,
+            interval=interval,
+        )
+        adjustments: dict[str, CandleAdjustment] = {}
+        if adjusted or adjustment_version is not None:
+            adjustments = await self._adjust_candle_groups(
+                grouped, interval=interval, version=adjustment_version,
+            )
+        frames = {ticker: candles_to_frame(rows) for ticker, rows in grouped.items()}
+        for ticker, adjustment in adjustments.items():
+            if ticker in frames:
+                adjustment.annotate_frame(frames[ticker])
+        return frames
+
+    async def get_portfolio_history(
+        self,
+        limit: int = 60,
+        owner_chat_id: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Retorna snapshots recientes con posiciones incluidas, leídos desde raw_snapshots.
+        Devuelve en orden cronológico ascendente (el más antiguo primero).
+        """
+        if not self._pool:
+            return []
+        async with self._pool.acquire() as conn:
+            if owner_chat_id is None:
+                rows = await conn.fetch(
+                    """
+                    SELECT payload
+                    FROM raw_snapshots
+                    ORDER BY scraped_at DESC
+                    LIMIT $1
+                    """,
+                    limit,
+                )
+            else:
+                rows = await conn.fetch(
+                    """
+                    SELECT r.payload
+                    FROM raw_snapshots r
+                    JOIN portfolio_snapshots p USING (snapshot_id)
+                    WHERE p.owner_chat_id = $1
+                    ORDER BY r.scraped_at DESC
+                    LIMIT $2
+                    """,
+                    owner_chat_id,
+                    limit,
+                )
+        result = []
+        for r in reversed(rows):
             try:
                 result.append(json.loads(r["payload"]))
             except Exception as e:
@@ -2235,18 +3056,15 @@ class PortfolioDatabase:
         if not self._pool:
             return []
         async with self._pool.acquire() as conn:
+            await self._ensure_market_prices_latest_schema(conn)
             if fresh_only:
                 latest_day = await conn.fetchrow(
                     """
-                    SELECT
-                        ts::date AS market_date,
-                        COUNT(DISTINCT ticker) AS ticker_count
-                    FROM market_prices
-                    WHERE last_price IS NOT NULL
-                      AND last_price > 0
-                      AND ts >= NOW() - INTERVAL '14 days'
-                    GROUP BY ts::date
-                    HAVING COUNT(DISTINCT ticker) >= $1
+                    SELECT market_date, COUNT(*) AS ticker_count
+                    FROM market_prices_day_coverage
+                    WHERE market_date >= (NOW() - INTERVAL '14 days')::date
+                    GROUP BY market_date
+                    HAVING COUNT(*) >= $1
                     ORDER BY market_date DESC
                     LIMIT 1
                     """,
@@ -2255,14 +3073,10 @@ class PortfolioDatabase:
                 if not latest_day:
                     latest_day = await conn.fetchrow(
                         """
-                        SELECT
-                            ts::date AS market_date,
-                            COUNT(DISTINCT ticker) AS ticker_count
-                        FROM market_prices
-                        WHERE last_price IS NOT NULL
-                          AND last_price > 0
-                        GROUP BY ts::date
-                        HAVING COUNT(DISTINCT ticker) >= $1
+                        SELECT market_date, COUNT(*) AS ticker_count
+                        FROM market_prices_day_coverage
+                        GROUP BY market_date
+                        HAVING COUNT(*) >= $1
                         ORDER BY market_date DESC
                         LIMIT 1
                         """,
@@ -2279,18 +3093,19 @@ class PortfolioDatabase:
                 market_date = latest_day["market_date"]
                 rows = await conn.fetch(
                     """
-                    SELECT DISTINCT ON (ticker)
+                    SELECT
                         ticker,
                         asset_type,
                         currency,
                         last_price,
                         change_pct_1d,
-                        ts
-                    FROM market_prices
+                        ts,
+                        previous_close
+                    FROM market_prices_latest
                     WHERE last_price IS NOT NULL
                       AND last_price > 0
                       AND ts >= $1::date
-                    ORDER BY ticker, ts DESC
+                    ORDER BY ticker
                     """,
                     market_date,
                 )
@@ -2305,10 +3120,11 @@ class PortfolioDatabase:
 
             rows = await conn.fetch(
                 """
-                SELECT DISTINCT ON (ticker)
-                    ticker, asset_type, currency, last_price, change_pct_1d, ts
-                FROM market_prices
-                ORDER BY ticker, ts DESC
+                SELECT
+                    ticker, asset_type, currency, last_price, change_pct_1d, ts,
+                    previous_close
+                FROM market_prices_latest
+                ORDER BY ticker
                 """
             )
         return [dict(r) for r in rows]
@@ -2326,16 +3142,18 @@ class PortfolioDatabase:
             return {}
         before_day = before_day or datetime.now(ART_TZ).date()
         async with self._pool.acquire() as conn:
+            await self._ensure_market_candles_canonical_schema(conn)
             rows = await conn.fetch(
                 """
                 SELECT DISTINCT ON (ticker)
                     ticker, close_price
-                FROM market_candles
+                FROM market_candles_canonical
                 WHERE ticker = ANY($1::text[])
+                  AND interval = '1d'
+                  AND candle_day < $2::date
                   AND close_price IS NOT NULL
                   AND close_price > 0
-                  AND ts::date < $2::date
-                ORDER BY ticker, ts DESC
+                ORDER BY ticker, candle_day DESC
                 """,
                 clean,
                 before_day,
@@ -2397,25 +3215,18 @@ class PortfolioDatabase:
         if not clean_ticker:
             return None
         async with self._pool.acquire() as conn:
+            await self._ensure_market_candles_canonical_schema(conn)
             row = await conn.fetchrow(
                 """
                 WITH previous_close AS (
                     SELECT close_price::float AS price
-                    FROM market_candles
+                    FROM market_candles_canonical
                     WHERE ticker = $1
                       AND interval = '1d'
                       AND close_price IS NOT NULL
                       AND close_price > 0
-                      AND ts::date < $2::date
-                    ORDER BY
-                        ts DESC,
-                        CASE
-                            WHEN source = 'COCOS' THEN 0
-                            WHEN source = 'TRADINGVIEW_BYMA' THEN 1
-                            WHEN source = 'internal_snapshot' THEN 2
-                            ELSE 3
-                        END,
-                        scraped_at DESC
+                      AND candle_day < $2::date
+                    ORDER BY candle_day DESC
                     LIMIT 1
                 ), first_sample AS (
                     SELECT last_price::float AS price, ts
@@ -2698,6 +3509,26 @@ class PortfolioDatabase:
     async def get_pool(self):
         return self._pool
 
+    async def listen_price_changes(self, callback):
+        """
+        Abre una conexion dedicada (fuera del pool) suscripta a
+        PRICE_CHANGES_CHANNEL. `callback` recibe el set de tickers o None
+        (recalcular todo). El caller cierra la conexion devuelta.
+        """
+        if not HAS_ASYNCPG:
+            raise ImportError("asyncpg no instalado: pip install asyncpg")
+
+        def _handler(_conn, _pid, _channel, payload):
+            callback(parse_price_change_payload(payload))
+
+        conn = await asyncpg.connect(self._dsn)
+        try:
+            await conn.add_listener(PRICE_CHANGES_CHANNEL, _handler)
+        except Exception:
+            await conn.close()
+            raise
+        return conn
+
     async def save_broker_fills(
         self,
         fills: list[BrokerFill],
@@ -2867,7 +3698,8 @@ class PortfolioDatabase:
                 await conn.execute(
                     """
                     UPDATE broker_movements
-                    SET external_movement_id = $2
+                    SET external_movement_id = $2,
+                        updated_at = NOW()
                     WHERE id = (
                         SELECT id
                         FROM broker_movements
@@ -2938,7 +3770,8 @@ class PortfolioDatabase:
                     detail          = EXCLUDED.detail,
                     label           = EXCLUDED.label,
                     balance         = EXCLUDED.balance,
-                    raw_payload     = EXCLUDED.raw_payload
+                    raw_payload     = EXCLUDED.raw_payload,
+                    updated_at      = NOW()
                 """,
                 rows,
             )
@@ -3611,196 +4444,108 @@ class PortfolioDatabase:
             logger.error(f"save_trade_decision: {e}", exc_info=True)
             return None
 
-    async def _compute_directional_outcomes(
+    async def _compute_outcome_batch(
         self,
+        rows: Sequence[Mapping[str, Any]],
         *,
-        entry_price: float,
-        decided_at: datetime,
-        direction: str,
         now: datetime,
-        candles: list[dict],
-    ) -> dict[str, float]:
-        outcomes: dict[str, float] = {}
-        decided_day = decided_at.astimezone(ART_TZ).date()
-
-        for horizon, col in [
-            (5, "outcome_5d"),
-            (10, "outcome_10d"),
-            (20, "outcome_20d"),
-            (40, "outcome_40d"),
-        ]:
-            target_day = decided_day + timedelta(days=horizon)
-            if target_day > now.astimezone(ART_TZ).date():
-                continue
-            eligible = [
-                candle for candle in candles
-                if candle["ts"].date() >= target_day
-            ]
-            if not eligible:
-                continue
-            price_at_horizon = float(eligible[0]["close_price"])
-            # CONVENTION: SELL returns are positive-up.
-            outcomes[col] = directional_return(
-                entry_price,
-                price_at_horizon,
-                direction,
-            )
-
-        return outcomes
-
-    def _next_executable_reference(
-        self,
-        *,
-        entry_price: float,
-        decided_at: datetime,
-        candles: list[dict],
-    ) -> tuple[datetime | None, float | None, date | None]:
+        log_prefix: str,
+    ) -> list[DecisionOutcome]:
         """
-        Returns the first realistically executable reference.
-
-        If a decision is generated after the local close, the first executable
-        reference is the next candle's open (or close fallback). Intraday
-        decisions keep price_at_decision as the executable reference.
+        Agrupa decisiones por ticker y calcula outcomes con una sola carga de
+        velas y de versiones de ajuste por batch. Los corporate actions solo se
+        cargan para series con saltos que todavia no tienen version persistida.
         """
-        decided_art = decided_at.astimezone(ART_TZ)
-        decided_day = decided_art.date()
-        after_close = decided_art.hour > 17 or (decided_art.hour == 17 and decided_art.minute >= 0)
-
-        if not after_close:
-            return decided_at, float(entry_price), decided_day
-
-        eligible = [
-            candle for candle in candles
-            if candle["ts"].date() > decided_day
-            and (candle.get("open_price") is not None or candle.get("close_price") is not None)
-        ]
-        if not eligible:
-            return None, None, None
-
-        candle = eligible[0]
-        px = candle.get("open_price")
-        if px is None or float(px) <= 0:
-            px = candle.get("close_price")
-        if px is None or float(px) <= 0:
-            return None, None, None
-        return candle["ts"], float(px), candle["ts"].date()
-
-    async def _compute_executable_outcomes(
-        self,
-        *,
-        entry_price: float,
-        start_day: date,
-        direction: str,
-        now: datetime,
-        candles: list[dict],
-    ) -> dict[str, float]:
-        outcomes: dict[str, float] = {}
-
-        for horizon, col in [
-            (5, "executable_outcome_5d"),
-            (10, "executable_outcome_10d"),
-            (20, "executable_outcome_20d"),
-            (40, "executable_outcome_40d"),
-        ]:
-            target_day = start_day + timedelta(days=horizon)
-            if target_day > now.astimezone(ART_TZ).date():
-                continue
-            eligible = [
-                candle for candle in candles
-                if candle["ts"].date() >= target_day
-                and candle.get("close_price") is not None
-            ]
-            if not eligible:
+        by_ticker: dict[str, list[PendingOutcome]] = {}
+        for row in rows:
+            ticker = str(row["ticker"]).upper()
+            entry = row["price_at_decision"]
+            if not entry or float(entry) <= 0:
+                logger.debug(
+                    "%s SKIP %s id=%s: sin precio de entrada",
+                    log_prefix,
+                    ticker,
+                    row["id"],
+                )
                 continue
-            price_at_horizon = float(eligible[0]["close_price"])
-            outcomes[col] = directional_return(
-                entry_price,
-                price_at_horizon,
-                direction,
+            by_ticker.setdefault(ticker, []).append(
+                PendingOutcome(
+                    decision_id=int(row["id"]),
+                    ticker=ticker,
+                    entry_price=float(entry),
+                    decided_at=row["decided_at"],
+                    direction=str(row["decision"]).upper(),
+                )
             )
+        if not by_ticker:
+            return []
 
-        return outcomes
-
-    def _assess_outcome_basis(
-        self,
-        *,
-        entry_price: float,
-        decided_at: datetime,
-        candles: list[dict],
-    ) -> tuple[str, Optional[float]]:
-        """
-        Decide whether decision_log and market_candles use the same price basis.
-
-        Current production candles are Cocos/BYMA prices. Some historical rows
-        were persisted with legacy external prices in another unit; those rows
-        stay traceable, but must not feed canonical metrics.
-        """
-        decided_day = decided_at.astimezone(ART_TZ).date()
-        eligible = [
-            candle
-            for candle in candles
-            if candle["ts"].date() >= decided_day and candle.get("close_price") is not None
-        ]
-        if not eligible or entry_price <= 0:
-            return LEGACY_EXTERNAL_OUTCOME_BASIS, None
-
-        reference_price = float(eligible[0]["close_price"])
-        ratio = reference_price / float(entry_price)
-        asset_type = str(eligible[0].get("asset_type") or "").upper()
-        min_ratio = MIN_COMPATIBLE_PRICE_RATIO
-        max_ratio = MAX_COMPATIBLE_PRICE_RATIO
-        if asset_type == "CEDEAR":
-            min_ratio = CEDEAR_MIN_COMPATIBLE_PRICE_RATIO
-            max_ratio = CEDEAR_MAX_COMPATIBLE_PRICE_RATIO
-
-        if min_ratio <= ratio <= max_ratio:
-            return CANONICAL_OUTCOME_BASIS, ratio
-
-        return LEGACY_EXTERNAL_OUTCOME_BASIS, ratio
-
-    async def _corporate_action_adjusted_outcome_inputs(
-        self,
-        *,
-        ticker: str,
-        entry_price: float,
-        decided_at: datetime,
-        candles: list[dict],
-        as_of: datetime,
-    ) -> tuple[float, list[dict], float]:
-        closes = []
-        for candle in candles:
-            try:
-                close = float(candle.get("close_price"))
-            except (TypeError, ValueError):
-                continue
-            if close > 0:
-                closes.append(close)
-        has_discontinuity = any(
-            abs((current / previous) - 1.0) >= MIN_ANOMALY_RETURN
-            for previous, current in zip(closes, closes[1:])
-            if previous > 0
-        )
-        if not has_discontinuity:
-            return entry_price, candles, 1.0
-
-        effects = await self.get_corporate_action_effects(
-            tickers=[ticker],
-            since=decided_at - timedelta(days=7),
-            until=as_of,
-        )
-        if not effects:
-            return entry_price, candles, 1.0
-        adjusted_entry, adjustment_factor = rebase_reference_price(
-            entry_price,
-            reference_at=decided_at,
-            as_of=as_of,
-            effects=effects,
-        )
-        return (
-            float(adjusted_entry or entry_price),
-            normalize_candle_rows(candles, effects),
-            float(adjustment_factor),
+        candles_by_ticker = await self.get_market_candle_rows_bulk(
+            list(by_ticker),
+            None,
+            OUTCOME_CANDLE_LIMIT,
         )
+        try:
+            adjustments = await self.get_candle_adjustments(list(by_ticker))
+        except Exception as exc:
+            logger.warning("%s sin versiones de ajuste persistidas: %s", log_prefix, exc)
+            adjustments = {}
+        jumpy = [
+            ticker
+            for ticker in by_ticker
+            if ticker not in adjustments
+            and has_price_discontinuity(candles_by_ticker.get(ticker, []))
+        ]
+        effects_for: dict[str, list[CorporateActionEffect]] = {}
+        if jumpy:
+            since = min(
+                decision.decided_at
+                for ticker in jumpy
+                for decision in by_ticker[ticker]
+            ) - CORPORATE_EFFECT_LOOKBACK
+            for effect in await self.get_corporate_action_effects(
+                tickers=jumpy,
+                since=since,
+                until=now,
+            ):
+                effects_for.setdefault(str(effect.ticker).upper(), []).append(effect)
+
+        results: list[DecisionOutcome] = []
+        for ticker, decisions in by_ticker.items():
+            computed = compute_ticker_outcomes(
+                decisions,
+                candles_by_ticker.get(ticker, []),
+                now=now,
+                effects=effects_for.get(ticker, ()),
+                adjustment=adjustments.get(ticker),
+            )
+            for outcome in computed:
+                if not outcome.has_candles:
+                    logger.warning(
+                        "%s SKIP %s id=%s: sin velas canonicas",
+                        log_prefix,
+                        ticker,
+                        outcome.decision_id,
+                    )
+                elif not outcome.is_canonical:
+                    logger.warning(
+                        "%s SKIP %s id=%s: basis=%s ratio=%s",
+                        log_prefix,
+                        ticker,
+                        outcome.decision_id,
+                        outcome.outcome_basis,
+                        outcome.outcome_basis_ratio,
+                    )
+                elif outcome.corporate_adjustment_factor != 1.0:
+                    logger.info(
+                        "%s %s id=%s corporate price factor=%.8f",
+                        log_prefix,
+                        ticker,
+                        outcome.decision_id,
+                        outcome.corporate_adjustment_factor,
+                    )
+            results.extend(computed)
+        return results
 
     async def update_outcomes(
         self,
@@ -3812,6 +4557,9 @@ class PortfolioDatabase:
         outcome_5d / outcome_10d / outcome_20d / outcome_40d / was_correct usando la serie
         canonica de market_candles.
 
+        Procesa todas las pendientes de la ventana en un batch: una carga de
+        velas por ticker y dos UPDATE ... FROM unnest(...) para toda la muestra.
+
         price_at_decision y market_candles usan la misma unidad operativa
         proveniente de Cocos, por lo que no se aplica guardia USD/ARS.
         """
@@ -3824,259 +4572,140 @@ class PortfolioDatabase:
 
             async with self._pool.acquire() as conn:
                 await self._ensure_outcome_horizon_columns(conn)
-                if owner_chat_id is None:
-                    rows = await conn.fetch(
-                        """
-                        SELECT id, ticker, price_at_decision, decided_at, decision
-                        FROM decision_log
-                        WHERE (
-                              outcome_5d IS NULL
-                           OR executable_outcome_5d IS NULL
-                           OR (
-                                decided_at <= NOW() - INTERVAL '10 days'
-                                AND (outcome_10d IS NULL OR executable_outcome_10d IS NULL)
-                              )
-                           OR (
-                                decided_at <= NOW() - INTERVAL '20 days'
-                                AND (outcome_20d IS NULL OR executable_outcome_20d IS NULL)
-                              )
-                           OR (
-                                decided_at <= NOW() - INTERVAL '40 days'
-                                AND (outcome_40d IS NULL OR executable_outcome_40d IS NULL)
-                              )
-                        )
-                          AND COALESCE(outcome_basis, '') <> 'legacy_external'
-                          AND price_at_decision IS NOT NULL
-                          AND price_at_decision > 0
-                          AND decided_at <= $1
-                          AND decided_at >= $2
-                          AND decision != 'HOLD'
-                        ORDER BY decided_at DESC
-                        LIMIT 200
-                        """,
-                        maturity_cutoff,
-                        lookback_cutoff,
-                    )
-                else:
-                    rows = await conn.fetch(
-                        """
-                        SELECT id, ticker, price_at_decision, decided_at, decision
-                        FROM decision_log
-                        WHERE (
-                              outcome_5d IS NULL
-                           OR executable_outcome_5d IS NULL
-                           OR (
-                                decided_at <= NOW() - INTERVAL '10 days'
-                                AND (outcome_10d IS NULL OR executable_outcome_10d IS NULL)
-                              )
-                           OR (
-                                decided_at <= NOW() - INTERVAL '20 days'
-                                AND (outcome_20d IS NULL OR executable_outcome_20d IS NULL)
-                              )
-                           OR (
-                                decided_at <= NOW() - INTERVAL '40 days'
-                                AND (outcome_40d IS NULL OR executable_outcome_40d IS NULL)
-                              )
-                        )
-                          AND owner_chat_id = $3
-                          AND COALESCE(outcome_basis, '') <> 'legacy_external'
-                          AND price_at_decision IS NOT NULL
-                          AND price_at_decision > 0
-                          AND decided_at <= $1
-                          AND decided_at >= $2
-                          AND decision != 'HOLD'
-                        ORDER BY decided_at DESC
-                        LIMIT 200
-                        """,
-                        maturity_cutoff,
-                        lookback_cutoff,
-                        owner_chat_id,
+                rows = await conn.fetch(
+                    """
+                    SELECT id, ticker, price_at_decision, decided_at, decision
+                    FROM decision_log
+                    WHERE (
+                          outcome_5d IS NULL
+                       OR executable_outcome_5d IS NULL
+                       OR (
+                            decided_at <= NOW() - INTERVAL '10 days'
+                            AND (outcome_10d IS NULL OR executable_outcome_10d IS NULL)
+                          )
+                       OR (
+                            decided_at <= NOW() - INTERVAL '20 days'
+                            AND (outcome_20d IS NULL OR executable_outcome_20d IS NULL)
+                          )
+                       OR (
+                            decided_at <= NOW() - INTERVAL '40 days'
+                            AND (outcome_40d IS NULL OR executable_outcome_40d IS NULL)
+                          )
                     )
+                      AND ($3::bigint IS NULL OR owner_chat_id = $3)
+                      AND COALESCE(outcome_basis, '') <> 'legacy_external'
+                      AND price_at_decision IS NOT NULL
+                      AND price_at_decision > 0
+                      AND decided_at <= $1
+                      AND decided_at >= $2
+                      AND decision != 'HOLD'
+                    ORDER BY decided_at DESC
+                    """,
+                    maturity_cutoff,
+                    lookback_cutoff,
+                    owner_chat_id,
+                )
 
             if not rows:
                 logger.info("update_outcomes: sin decisiones pendientes")
                 return 0
 
-            updated = 0
-            now     = datetime.now(timezone.utc)
-
-            for row in rows:
-                ticker     = str(row["ticker"]).upper()
-                entry      = row["price_at_decision"]
-                decided_at = row["decided_at"]
-                direction  = str(row["decision"]).upper()
-
-                if not entry or float(entry) <= 0:
-                    logger.debug(
-                        f"update_outcomes SKIP {ticker} id={row['id']}: sin precio de entrada"
-                    )
-                    continue
-
-                entry_f = float(entry)
-
-                candles = await self.get_market_candles(ticker, limit=260)
-                if not candles:
-                    async with self._pool.acquire() as conn:
-                        await conn.execute(
-                            """
-                            UPDATE decision_log SET
-                                outcome_basis       = $2,
-                                outcome_basis_ratio = NULL
-                            WHERE id = $1
-                            """,
-                            row["id"],
-                            LEGACY_EXTERNAL_OUTCOME_BASIS,
-                        )
-                    logger.warning(
-                        "update_outcomes SKIP %s id=%s: sin velas canonicas",
-                        ticker,
-                        row["id"],
-                    )
-                    continue
-
-                entry_f, candles, corporate_adjustment_factor = (
-                    await self._corporate_action_adjusted_outcome_inputs(
-                        ticker=ticker,
-                        entry_price=entry_f,
-                        decided_at=decided_at,
-                        candles=candles,
-                        as_of=now,
-                    )
-                )
-                if corporate_adjustment_factor != 1.0:
-                    logger.info(
-                        "update_outcomes %s id=%s corporate price factor=%.8f",
-                        ticker,
-                        row["id"],
-                        corporate_adjustment_factor,
-                    )
+            results = await self._compute_outcome_batch(
+                rows,
+                now=datetime.now(timezone.utc),
+                log_prefix="update_outcomes",
+            )
+            basis_only = [outcome for outcome in results if not outcome.is_canonical]
+            filled = [
+                outcome
+                for outcome in results
+                if outcome.is_canonical
+                and (outcome.outcomes or outcome.executable_outcomes)
+            ]
 
-                outcome_basis, basis_ratio = self._assess_outcome_basis(
-                    entry_price=entry_f,
-                    decided_at=decided_at,
-                    candles=candles,
-                )
-                if outcome_basis != CANONICAL_OUTCOME_BASIS:
-                    async with self._pool.acquire() as conn:
+            async with self._pool.acquire() as conn:
+                async with conn.transaction():
+                    if basis_only:
                         await conn.execute(
                             """
-                            UPDATE decision_log SET
-                                outcome_basis       = $2,
-                                outcome_basis_ratio = $3
-                            WHERE id = $1
+                            UPDATE decision_log d SET
+                                outcome_basis       = v.outcome_basis,
+                                outcome_basis_ratio = v.outcome_basis_ratio
+                            FROM unnest($1::bigint[], $2::text[], $3::float8[])
+                                AS v(id, outcome_basis, outcome_basis_ratio)
+                            WHERE d.id = v.id
                             """,
-                            row["id"],
-                            outcome_basis,
-                            basis_ratio,
+                            [outcome.decision_id for outcome in basis_only],
+                            [outcome.outcome_basis for outcome in basis_only],
+                            [outcome.outcome_basis_ratio for outcome in basis_only],
                         )
-                    logger.warning(
-                        "update_outcomes SKIP %s id=%s: basis=%s ratio=%s",
-                        ticker,
-                        row["id"],
-                        outcome_basis,
-                        basis_ratio,
-                    )
-                    continue
-
-                outcomes = await self._compute_directional_outcomes(
-                    entry_price=entry_f,
-                    decided_at=decided_at,
-                    direction=direction,
-                    now=now,
-                    candles=candles,
-                )
-
-                (
-                    next_executable_at,
-                    next_executable_price,
-                    executable_start_day,
-                ) = self._next_executable_reference(
-                    entry_price=entry_f,
-                    decided_at=decided_at,
-                    candles=candles,
-                )
-                executable_outcomes: dict[str, float] = {}
-                if next_executable_price is not None and executable_start_day is not None:
-                    executable_outcomes = await self._compute_executable_outcomes(
-                        entry_price=float(next_executable_price),
-                        start_day=executable_start_day,
-                        direction=direction,
-                        now=now,
-                        candles=candles,
-                    )
-
-                if not outcomes and not executable_outcomes:
-                    continue
-
-                primary = outcomes.get("outcome_5d", outcomes.get("outcome_10d"))
-                was_correct = primary > 0 if primary is not None else None
-                executable_primary = executable_outcomes.get(
-                    "executable_outcome_5d",
-                    executable_outcomes.get("executable_outcome_10d"),
-                )
-                executable_was_correct = (
-                    executable_primary > 0
-                    if executable_primary is not None
-                    else None
-                )
-
-                try:
-                    async with self._pool.acquire() as conn:
+                    if filled:
                         await conn.execute(
                             """
-                            UPDATE decision_log SET
-                                outcome_5d        = COALESCE($2, outcome_5d),
-                                outcome_10d       = COALESCE($3, outcome_10d),
-                                outcome_20d       = COALESCE($4, outcome_20d),
-                                outcome_40d       = COALESCE($14, outcome_40d),
-                                was_correct       = COALESCE($5, was_correct),
+                            UPDATE decision_log d SET
+                                outcome_5d        = COALESCE(v.outcome_5d, d.outcome_5d),
+                                outcome_10d       = COALESCE(v.outcome_10d, d.outcome_10d),
+                                outcome_20d       = COALESCE(v.outcome_20d, d.outcome_20d),
+                                outcome_40d       = COALESCE(v.outcome_40d, d.outcome_40d),
+                                was_correct       = COALESCE(v.was_correct, d.was_correct),
                                 outcome_filled_at = NOW(),
-                                outcome_basis       = $6,
-                                outcome_basis_ratio = $7,
-                                next_executable_at     = COALESCE($8, next_executable_at),
-                                next_executable_price  = COALESCE($9, next_executable_price),
-                                executable_outcome_5d  = COALESCE($10, executable_outcome_5d),
-                                executable_outcome_10d = COALESCE($11, executable_outcome_10d),
-                                executable_outcome_20d = COALESCE($12, executable_outcome_20d),
-                                executable_outcome_40d = COALESCE($15, executable_outcome_40d),
-                                executable_was_correct = COALESCE($13, executable_was_correct)
-                            WHERE id = $1
+                                outcome_basis       = v.outcome_basis,
+                                outcome_basis_ratio = v.outcome_basis_ratio,
+                                next_executable_at     = COALESCE(v.next_executable_at, d.next_executable_at),
+                                next_executable_price  = COALESCE(v.next_executable_price, d.next_executable_price),
+                                executable_outcome_5d  = COALESCE(v.executable_outcome_5d, d.executable_outcome_5d),
+                                executable_outcome_10d = COALESCE(v.executable_outcome_10d, d.executable_outcome_10d),
+                                executable_outcome_20d = COALESCE(v.executable_outcome_20d, d.executable_outcome_20d),
+                                executable_outcome_40d = COALESCE(v.executable_outcome_40d, d.executable_outcome_40d),
+                                executable_was_correct = COALESCE(v.executable_was_correct, d.executable_was_correct)
+                            FROM unnest(
+                                $1::bigint[], $2::float8[], $3::float8[], $4::float8[],
+                                $5::float8[], $6::bool[], $7::text[], $8::float8[],
+                                $9::timestamptz[], $10::float8[], $11::float8[],
+                                $12::float8[], $13::float8[], $14::float8[], $15::bool[]
+                            ) AS v(
+                                id, outcome_5d, outcome_10d, outcome_20d, outcome_40d,
+                                was_correct, outcome_basis, outcome_basis_ratio,
+                                next_executable_at, next_executable_price,
+                                executable_outcome_5d, executable_outcome_10d,
+                                executable_outcome_20d, executable_outcome_40d,
+                                executable_was_correct
+                            )
+                            WHERE d.id = v.id
                             """,
-                            row["id"],
-                            outcomes.get("outcome_5d"),
-                            outcomes.get("outcome_10d"),
-                            outcomes.get("outcome_20d"),
-                            was_correct,
-                            outcome_basis,
-                            basis_ratio,
-                            next_executable_at,
-                            next_executable_price,
-                            executable_outcomes.get("executable_outcome_5d"),
-                            executable_outcomes.get("executable_outcome_10d"),
-                            executable_outcomes.get("executable_outcome_20d"),
-                            executable_was_correct,
-                            outcomes.get("outcome_40d"),
-                            executable_outcomes.get("executable_outcome_40d"),
+                            [outcome.decision_id for outcome in filled],
+                            *_outcome_columns(filled, "outcome"),
+                            [outcome.was_correct for outcome in filled],
+                            [outcome.outcome_basis for outcome in filled],
+                            [outcome.outcome_basis_ratio for outcome in filled],
+                            [outcome.next_executable_at for outcome in filled],
+                            [outcome.next_executable_price for outcome in filled],
+                            *_outcome_columns(filled, "executable_outcome"),
+                            [outcome.executable_was_correct for outcome in filled],
                         )
-                    updated += 1
-                    logger.debug(f"outcome actualizado: {ticker} id={row['id']} {outcomes}")
-                except Exception as e:
-                    logger.warning(f"update_outcomes write error {ticker}: {e}")
 
-            logger.info(f"update_outcomes: {updated}/{len(rows)} decisiones actualizadas")
-            return updated
+            logger.info(f"update_outcomes: {len(filled)}/{len(rows)} decisiones actualizadas")
+            return len(filled)
 
         except Exception as e:
             logger.error(f"update_outcomes: {e}", exc_info=True)
             return 0
 
-    async def recompute_outcomes(self, lookback_days: Optional[int] = None) -> int:
+    async def recompute_outcomes(
+        self,
+        lookback_days: Optional[int] = None,
+        *,
+        tickers: Optional[Sequence[str]] = None,
+    ) -> int:
         """
         Recalcula outcomes ya persistidos desde la serie canónica de market_candles.
 
         Se usa para migraciones de convención o backfills de historia. A diferencia
         de update_outcomes(), sobrescribe valores existentes para dejar toda la
-        muestra bajo las mismas reglas actuales.
+        muestra bajo las mismas reglas actuales. Toda la muestra se escribe con
+        dos UPDATE masivos, por lo que un backfill post corporate action corre
+        en una sola pasada; `tickers` lo acota a los que cambiaron de version
+        de ajuste. Un error de escritura se loguea y se propaga.
         """
         if not self._pool:
             raise RuntimeError("Llamar connect() primero")
@@ -4097,152 +4726,96 @@ class PortfolioDatabase:
                 WHERE decided_at <= $1
                   AND decided_at >= $2
                   AND decision IN ('BUY', 'SELL')
+                  AND ($3::text[] IS NULL OR UPPER(ticker) = ANY($3::text[]))
                 ORDER BY decided_at ASC
                 """,
                 maturity_cutoff,
                 lookback_cutoff,
+                sorted({str(ticker).upper().strip() for ticker in tickers}) if tickers is not None else None,
             )
 
         if not rows:
             logger.info("recompute_outcomes: sin decisiones elegibles")
             return 0
 
-        updated = 0
-        now = datetime.now(timezone.utc)
-
-        for row in rows:
-            ticker = str(row["ticker"]).upper()
-            entry = row["price_at_decision"]
-            decided_at = row["decided_at"]
-            direction = str(row["decision"]).upper()
-
-            if not entry or float(entry) <= 0:
-                logger.debug(
-                    "recompute_outcomes SKIP %s id=%s: sin precio de entrada",
-                    ticker,
-                    row["id"],
-                )
-                continue
-
-            candles = await self.get_market_candles(ticker, limit=260)
-            if not candles:
-                async with self._pool.acquire() as conn:
-                    await conn.execute(
-                        """
-                        UPDATE decision_log SET
-                            outcome_5d          = NULL,
-                            outcome_10d         = NULL,
-                            outcome_20d         = NULL,
-                            outcome_40d         = NULL,
-                            was_correct         = NULL,
-                            outcome_filled_at   = NULL,
-                            outcome_basis       = $2,
-                            outcome_basis_ratio = NULL
-                        WHERE id = $1
-                        """,
-                        row["id"],
-                        LEGACY_EXTERNAL_OUTCOME_BASIS,
-                    )
-                logger.warning(
-                    "recompute_outcomes CLEAR %s id=%s: sin velas canonicas",
-                    ticker,
-                    row["id"],
-                )
-                continue
-
-            adjusted_entry, candles, corporate_adjustment_factor = (
-                await self._corporate_action_adjusted_outcome_inputs(
-                    ticker=ticker,
-                    entry_price=float(entry),
-                    decided_at=decided_at,
-                    candles=candles,
-                    as_of=now,
-                )
-            )
-            if corporate_adjustment_factor != 1.0:
-                logger.info(
-                    "recompute_outcomes %s id=%s corporate price factor=%.8f",
-                    ticker,
-                    row["id"],
-                    corporate_adjustment_factor,
-                )
-
-            outcome_basis, basis_ratio = self._assess_outcome_basis(
-                entry_price=adjusted_entry,
-                decided_at=decided_at,
-                candles=candles,
-            )
-            if outcome_basis != CANONICAL_OUTCOME_BASIS:
-                async with self._pool.acquire() as conn:
-                    await conn.execute(
-                        """
-                        UPDATE decision_log SET
-                            outcome_5d          = NULL,
-                            outcome_10d         = NULL,
-                            outcome_20d         = NULL,
-                            outcome_40d         = NULL,
-                            was_correct         = NULL,
-                            outcome_filled_at   = NULL,
-                            outcome_basis       = $2,
-                            outcome_basis_ratio = $3
-                        WHERE id = $1
-                        """,
-                        row["id"],
-                        outcome_basis,
-                        basis_ratio,
-                    )
-                logger.warning(
-                    "recompute_outcomes CLEAR %s id=%s: basis=%s ratio=%s",
-                    ticker,
-                    row["id"],
-                    outcome_basis,
-                    basis_ratio,
-                )
-                continue
+        results = await self._compute_outcome_batch(
+            rows,
+            now=datetime.now(timezone.utc),
+            log_prefix="recompute_outcomes",
+        )
+        cleared = [outcome for outcome in results if not outcome.is_canonical]
+        recomputed = [
+            outcome
+            for outcome in results
+            if outcome.is_canonical and outcome.outcomes
+        ]
 
-            outcomes = await self._compute_directional_outcomes(
-                entry_price=adjusted_entry,
-                decided_at=decided_at,
-                direction=direction,
-                now=now,
-                candles=candles,
+        try:
+            async with self._pool.acquire() as conn:
+                async with conn.transaction():
+                    if cleared:
+                        await conn.execute(
+                            """
+                            UPDATE decision_log d SET
+                                outcome_5d          = NULL,
+                                outcome_10d         = NULL,
+                                outcome_20d         = NULL,
+                                outcome_40d         = NULL,
+                                was_correct         = NULL,
+                                outcome_filled_at   = NULL,
+                                outcome_basis       = v.outcome_basis,
+                                outcome_basis_ratio = v.outcome_basis_ratio
+                            FROM unnest($1::bigint[], $2::text[], $3::float8[])
+                                AS v(id, outcome_basis, outcome_basis_ratio)
+                            WHERE d.id = v.id
+                            """,
+                            [outcome.decision_id for outcome in cleared],
+                            [outcome.outcome_basis for outcome in cleared],
+                            [outcome.outcome_basis_ratio for outcome in cleared],
+                        )
+                    if recomputed:
+                        await conn.execute(
+                            """
+                            UPDATE decision_log d SET
+                                outcome_5d        = v.outcome_5d,
+                                outcome_10d       = v.outcome_10d,
+                                outcome_20d       = v.outcome_20d,
+                                outcome_40d       = v.outcome_40d,
+                                was_correct       = v.was_correct,
+                                outcome_filled_at = NOW(),
+                                outcome_basis       = v.outcome_basis,
+                                outcome_basis_ratio = v.outcome_basis_ratio
+                            FROM unnest(
+                                $1::bigint[], $2::float8[], $3::float8[], $4::float8[],
+                                $5::float8[], $6::bool[], $7::text[], $8::float8[]
+                            ) AS v(
+                                id, outcome_5d, outcome_10d, outcome_20d, outcome_40d,
+                                was_correct, outcome_basis, outcome_basis_ratio
+                            )
+                            WHERE d.id = v.id
+                            """,
+                            [outcome.decision_id for outcome in recomputed],
+                            *_outcome_columns(recomputed, "outcome"),
+                            [outcome.was_correct for outcome in recomputed],
+                            [outcome.outcome_basis for outcome in recomputed],
+                            [outcome.outcome_basis_ratio for outcome in recomputed],
+                        )
+        except Exception:
+            # Un 0 silencioso se confunde con "nada para recalcular" y deja
+            # outcomes viejos contra una version de ajuste nueva.
+            logger.error(
+                "recompute_outcomes: fallo la escritura de %d decisiones",
+                len(cleared) + len(recomputed),
+                exc_info=True,
             )
-            if not outcomes:
-                continue
-
-            primary = outcomes.get("outcome_5d", outcomes.get("outcome_10d"))
-            was_correct = primary > 0 if primary is not None else None
-
-            try:
-                async with self._pool.acquire() as conn:
-                    await conn.execute(
-                        """
-                        UPDATE decision_log SET
-                            outcome_5d        = $2,
-                            outcome_10d       = $3,
-                            outcome_20d       = $4,
-                            outcome_40d       = $8,
-                            was_correct       = $5,
-                            outcome_filled_at = NOW(),
-                            outcome_basis       = $6,
-                            outcome_basis_ratio = $7
-                        WHERE id = $1
-                        """,
-                        row["id"],
-                        outcomes.get("outcome_5d"),
-                        outcomes.get("outcome_10d"),
-                        outcomes.get("outcome_20d"),
-                        was_correct,
-                        outcome_basis,
-                        basis_ratio,
-                        outcomes.get("outcome_40d"),
-                    )
-                updated += 1
-            except Exception as e:
-                logger.warning("recompute_outcomes write error %s: %s", ticker, e)
+            raise
 
-        logger.info("recompute_outcomes: %s/%s decisiones recalculadas", updated, len(rows))
-        return updated
+        logger.info(
+            "recompute_outcomes: %s/%s decisiones recalculadas",
+            len(recomputed),
+            len(rows),
+        )
+        return len(recomputed)
 
     async def get_performance_stats(
         self,
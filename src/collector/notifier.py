@@ -16,6 +16,7 @@ from typing import Optional
 
 import requests
 
+from src.collector.telegram_delivery import get_telegram_delivery
 from src.core.telegram_format import html_text, validate_telegram_html
 
 logger = logging.getLogger(__name__)
@@ -151,10 +152,7 @@ class TelegramNotifier:
             "<i>Revisar logs si se repite. No implica ejecución de órdenes.</i>"
         )
 
-    def send_raw(self, text: str) -> bool:
-        if not text:
-            return True
-
+    def _chunks(self, text: str) -> list[str]:
         max_len = self._max_message_len
         lines = text.split("\n")
         chunks = []
@@ -170,11 +168,14 @@ class TelegramNotifier:
                 current_len += line_len
         if current:
             chunks.append("\n".join(current))
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def send_raw(self, text: str) -> bool:
+        if not text:
+            return True
 
         ok_all = True
-        for chunk in chunks:
-            if not chunk.strip():
-                continue
+        for chunk in self._chunks(text):
             valid_html, errors = validate_telegram_html(chunk)
             if not valid_html:
                 logger.warning("Telegram HTML potencialmente inválido: %s", errors[:3])
@@ -183,7 +184,33 @@ class TelegramNotifier:
                 logger.warning("HTML parse falló, reintentando como texto plano")
                 ok = self._send(chunk, parse_mode=None)
             ok_all = ok_all and ok
-        return ok_all   
+        return ok_all
+
+    async def send_raw_async(self, text: str, *, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Versión para código async: encola en la cola de entrega (Redis) y no
+        bloquea el event loop. Con `coalesce_key`, un mensaje pendiente con la
+        misma clave se reemplaza por este en vez de mandar ambos.
+        """
+        if not text:
+            return True
+        if not self._enabled:
+            logger.debug("Telegram deshabilitado (faltan token/chat_id)")
+            return False
+
+        delivery = get_telegram_delivery(self._token)
+        chunks = self._chunks(text)
+        ok_all = True
+        for index, chunk in enumerate(chunks):
+            valid_html, errors = validate_telegram_html(chunk)
+            if not valid_html:
+                logger.warning("Telegram HTML potencialmente inválido: %s", errors[:3])
+            key = None
+            if coalesce_key:
+                key = coalesce_key if len(chunks) == 1 else f"{coalesce_key}:{index}"
+            ok = await delivery.deliver(self._chat_id, chunk, coalesce_key=key)
+            ok_all = ok_all and ok
+        return ok_all
 
     def send_with_inline_keyboard(
         self,
@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
 
 EXECUTION_TIMESTAMP_META_SQL = """
 ALTER TABLE broker_fills
@@ -8,7 +14,13 @@ ALTER TABLE broker_fills
 
 ALTER TABLE broker_movements
     ADD COLUMN IF NOT EXISTS executed_at_precision TEXT NOT NULL DEFAULT 'date_only',
-    ADD COLUMN IF NOT EXISTS executed_at_source    TEXT NOT NULL DEFAULT 'cocos_movements.execution_date';
+    ADD COLUMN IF NOT EXISTS executed_at_source    TEXT NOT NULL DEFAULT 'cocos_movements.execution_date',
+    ADD COLUMN IF NOT EXISTS updated_at            TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- Watermark del sync incremental de atribuciones: los upserts reescriben
+-- precio/fecha/ticker sin cambiar el id.
+CREATE INDEX IF NOT EXISTS idx_broker_movements_updated_at
+    ON broker_movements(updated_at);
 
 UPDATE broker_movements
 SET executed_at_precision = 'date_only'
@@ -133,6 +145,24 @@ CREATE TABLE IF NOT EXISTS plan_execution_attribution_movements (
 
 CREATE INDEX IF NOT EXISTS idx_plan_execution_attribution_movements_attribution
     ON plan_execution_attribution_movements(attribution_id);
+
+-- Watermark del sync incremental: ids maximos de broker_movements y
+-- decision_log, y el instante (clock_timestamp) desde el que se buscan
+-- movimientos con updated_at posterior. full_rebuild_at fuerza un sync
+-- completo periodico.
+CREATE TABLE IF NOT EXISTS plan_execution_attribution_sync (
+    matching_version           TEXT PRIMARY KEY,
+    match_window_sessions      INTEGER NOT NULL,
+    movement_id_watermark      BIGINT NOT NULL,
+    decision_id_watermark      BIGINT NOT NULL,
+    changes_watermark          TIMESTAMPTZ,
+    full_rebuild_at            TIMESTAMPTZ,
+    synced_at                  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE plan_execution_attribution_sync
+    ADD COLUMN IF NOT EXISTS changes_watermark TIMESTAMPTZ,
+    ADD COLUMN IF NOT EXISTS full_rebuild_at   TIMESTAMPTZ;
 """
 
 
@@ -200,13 +230,515 @@ CREATE INDEX IF NOT EXISTS idx_order_intents_ticker_created_at
 """
 
 
+_CANDLE_SOURCE_PRIORITY_SQL = (
+    "CASE mc.source WHEN 'COCOS' THEN 0 WHEN 'TRADINGVIEW_BYMA' THEN 1 "
+    "WHEN 'internal_snapshot' THEN 2 ELSE 3 END"
+)
+
+
+def _canonical_candle_upsert_sql(scope_sql: str) -> str:
+    """One winning market_candles row per ticker/interval/UTC day, upserted."""
+    return f"""
+INSERT INTO market_candles_canonical (
+    ticker, interval, candle_day, ts, long_ticker, asset_type, currency, venue,
+    open_price, high_price, low_price, close_price, volume,
+    source, source_priority, source_scraped_at, refreshed_at
+)
+SELECT DISTINCT ON (mc.ticker, mc.interval, (mc.ts AT TIME ZONE 'UTC')::date)
+    mc.ticker,
+    mc.interval,
+    (mc.ts AT TIME ZONE 'UTC')::date,
+    mc.ts,
+    mc.long_ticker,
+    mc.asset_type,
+    mc.currency,
+    mc.venue,
+    mc.open_price,
+    mc.high_price,
+    mc.low_price,
+    mc.close_price,
+    mc.volume,
+    mc.source,
+    {_CANDLE_SOURCE_PRIORITY_SQL},
+    mc.scraped_at,
+    NOW()
+FROM market_candles mc
+{scope_sql.strip()}
+ORDER BY
+    mc.ticker,
+    mc.interval,
+    (mc.ts AT TIME ZONE 'UTC')::date,
+    {_CANDLE_SOURCE_PRIORITY_SQL},
+    mc.scraped_at DESC,
+    mc.ts DESC
+ON CONFLICT (ticker, interval, candle_day) DO UPDATE SET
+    ts                = EXCLUDED.ts,
+    long_ticker       = EXCLUDED.long_ticker,
+    asset_type        = EXCLUDED.asset_type,
+    currency          = EXCLUDED.currency,
+    venue             = EXCLUDED.venue,
+    open_price        = EXCLUDED.open_price,
+    high_price        = EXCLUDED.high_price,
+    low_price         = EXCLUDED.low_price,
+    close_price       = EXCLUDED.close_price,
+    volume            = EXCLUDED.volume,
+    source            = EXCLUDED.source,
+    source_priority   = EXCLUDED.source_priority,
+    source_scraped_at = EXCLUDED.source_scraped_at,
+    refreshed_at      = EXCLUDED.refreshed_at
+"""
+
+
+_MARKET_CANDLES_CANONICAL_SEED_SQL = _canonical_candle_upsert_sql(
+    "WHERE NOT EXISTS (SELECT 1 FROM market_candles_canonical)"
+)
+
+
+# Se siembra desde market_candles solo cuando la tabla esta vacia; despues la
+# mantienen save_market_candles (incremental) y rebuild_market_candles_canonical.
+#
+# La clave ignora asset_type a proposito: en BYMA el ticker corto es unico
+# entre tipos (un CEDEAR, una accion local y un bono nunca comparten simbolo;
+# el tipo/plazo vive en long_ticker), y decision_log, positions y
+# broker_movements identifican el instrumento solo por ticker. Los lectores
+# legacy ya rankeaban por ticker+dia; asset_type queda como columna para
+# filtrar (idx_market_candles_canonical_type_day). Si igual aparece un ticker
+# con dias ganados por otro tipo, filtrar la canonica perderia esos dias: los
+# lectores detectan el caso y rankean ese ticker con
+# MARKET_CANDLES_TYPED_RANKED_SQL.
+MARKET_CANDLES_CANONICAL_SQL = f"""
+CREATE TABLE IF NOT EXISTS market_candles_canonical (
+    ticker             TEXT        NOT NULL,
+    interval           TEXT        NOT NULL,
+    candle_day         DATE        NOT NULL,
+    ts                 TIMESTAMPTZ NOT NULL,
+    long_ticker        TEXT        NOT NULL,
+    asset_type         TEXT        NOT NULL,
+    currency           TEXT        NOT NULL,
+    venue              TEXT        NOT NULL,
+    open_price         NUMERIC(20,4),
+    high_price         NUMERIC(20,4),
+    low_price          NUMERIC(20,4),
+    close_price        NUMERIC(20,4),
+    volume             NUMERIC(20,4),
+    source             TEXT        NOT NULL,
+    source_priority    SMALLINT    NOT NULL,
+    source_scraped_at  TIMESTAMPTZ NOT NULL,
+    refreshed_at       TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (ticker, interval, candle_day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_type_day
+    ON market_candles_canonical(ticker, interval, asset_type, candle_day DESC);
+
+-- Lecturas incrementales por watermark (src/collector/candle_store.py).
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_refreshed
+    ON market_candles_canonical(interval, refreshed_at);
+
+-- Cobertura por dia (monitor, run_confidence_audit, run_performance).
+CREATE INDEX IF NOT EXISTS idx_market_candles_canonical_day
+    ON market_candles_canonical(interval, candle_day);
+
+{_MARKET_CANDLES_CANONICAL_SEED_SQL};
+"""
+
+
+# $1 tickers, $2 intervals, $3 UTC candle days (arrays alineados).
+MARKET_CANDLES_CANONICAL_REFRESH_SQL = _canonical_candle_upsert_sql(
+    """
+JOIN unnest($1::text[], $2::text[], $3::date[]) AS k(ticker, interval, candle_day)
+  ON mc.ticker = k.ticker
+ AND mc.interval = k.interval
+ AND mc.ts >= (k.candle_day::timestamp AT TIME ZONE 'UTC')
+ AND mc.ts < ((k.candle_day + 1)::timestamp AT TIME ZONE 'UTC')
+"""
+)
+
+
+# $1 tickers (NULL = todos), $2 primer dia UTC (NULL = todo el historico).
+MARKET_CANDLES_CANONICAL_REBUILD_SQL = _canonical_candle_upsert_sql(
+    """
+WHERE ($1::text[] IS NULL OR mc.ticker = ANY($1::text[]))
+  AND ($2::date IS NULL OR mc.ts >= ($2::date::timestamp AT TIME ZONE 'UTC'))
+"""
+)
+
+
+# Lectura canonica filtrada por asset_type. $1 tickers, $2 asset_types
+# alineados (NULL = cualquiera), $3 interval, $4 limite por ticker (NULL = todo).
+# `mixed_types` marca los tickers con dias canonicos ganados por otro tipo:
+# para esos no se leen filas (van por MARKET_CANDLES_TYPED_RANKED_SQL). Los dos
+# EXISTS con < y > son rangos sobre idx_market_candles_canonical_type_day, asi
+# que un ticker de un solo tipo no recorre su serie.
+MARKET_CANDLES_CANONICAL_READ_SQL = """
+WITH requested AS (
+    SELECT
+        r.ticker,
+        r.asset_type,
+        r.asset_type IS NOT NULL AND (
+            EXISTS (
+                SELECT 1 FROM market_candles_canonical x
+                WHERE x.ticker = r.ticker AND x.interval = $3 AND x.asset_type < r.asset_type
+            )
+            OR EXISTS (
+                SELECT 1 FROM market_candles_canonical x
+                WHERE x.ticker = r.ticker AND x.interval = $3 AND x.asset_type > r.asset_type
+            )
+        ) AS mixed_types
+    FROM unnest($1::text[], $2::text[]) AS r(ticker, asset_type)
+)
+SELECT
+    c.ts, r.ticker, c.long_ticker, c.asset_type, c.currency, c.venue,
+    c.interval, c.open_price, c.high_price, c.low_price,
+    c.close_price, c.volume, c.source, r.mixed_types
+FROM requested r
+LEFT JOIN LATERAL (
+    SELECT *
+    FROM market_candles_canonical mcc
+    WHERE NOT r.mixed_types
+      AND mcc.ticker = r.ticker
+      AND mcc.interval = $3
+      AND (r.asset_type IS NULL OR mcc.asset_type = r.asset_type)
+    ORDER BY mcc.candle_day DESC
+    LIMIT $4::int
+) c ON TRUE
+ORDER BY r.ticker, c.ts
+"""
+
+
+# Misma eleccion por dia que la canonica, restringida al asset_type pedido.
+# $1 tickers, $2 asset_types alineados, $3 interval, $4 limite por ticker.
+MARKET_CANDLES_TYPED_RANKED_SQL = f"""
+WITH ranked AS (
+    SELECT
+        mc.ts, mc.ticker, mc.long_ticker, mc.asset_type, mc.currency,
+        mc.venue, mc.interval, mc.open_price, mc.high_price,
+        mc.low_price, mc.close_price, mc.volume, mc.source,
+        ROW_NUMBER() OVER (
+            PARTITION BY mc.ticker, (mc.ts AT TIME ZONE 'UTC')::date
+            ORDER BY {_CANDLE_SOURCE_PRIORITY_SQL}, mc.scraped_at DESC, mc.ts DESC
+        ) AS day_rank
+    FROM market_candles mc
+    JOIN unnest($1::text[], $2::text[]) AS r(ticker, asset_type)
+      ON r.ticker = mc.ticker
+     AND mc.asset_type = r.asset_type
+    WHERE mc.interval = $3
+),
+recent AS (
+    SELECT
+        ts, ticker, long_ticker, asset_type, currency, venue, interval,
+        open_price, high_price, low_price, close_price, volume, source,
+        ROW_NUMBER() OVER (PARTITION BY ticker ORDER BY ts DESC) AS recency_rank
+    FROM ranked
+    WHERE day_rank = 1
+)
+SELECT
+    ts, ticker, long_ticker, asset_type, currency, venue, interval,
+    open_price, high_price, low_price, close_price, volume, source
+FROM recent
+WHERE $4::int IS NULL OR recency_rank <= $4::int
+ORDER BY ticker, ts
+"""
+
+
+# Ultimo precio por ticker y cobertura diaria de market_prices, mantenidos por
+# save_market_prices en la misma transaccion. Se siembran desde market_prices
+# solo cuando estan vacias.
+MARKET_PRICES_LATEST_SQL = """
+CREATE TABLE IF NOT EXISTS market_prices_latest (
+    ticker             TEXT        PRIMARY KEY,
+    asset_type         TEXT,
+    currency           TEXT,
+    last_price         NUMERIC(20,4),
+    change_pct_1d      NUMERIC(10,6),
+    ts                 TIMESTAMPTZ NOT NULL,
+    price_day          DATE        NOT NULL,
+    previous_close     NUMERIC(20,4),
+    updated_at         TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS market_prices_day_coverage (
+    market_date        DATE        NOT NULL,
+    ticker             TEXT        NOT NULL,
+    PRIMARY KEY (market_date, ticker)
+);
+
+INSERT INTO market_prices_latest (
+    ticker, asset_type, currency, last_price, change_pct_1d, ts, price_day, previous_close
+)
+SELECT
+    latest.ticker, latest.asset_type, latest.currency, latest.last_price,
+    latest.change_pct_1d, latest.ts, latest.ts::date,
+    (
+        SELECT prev.last_price
+        FROM market_prices prev
+        WHERE prev.ticker = latest.ticker
+          AND prev.ts < latest.ts::date
+          AND prev.last_price > 0
+        ORDER BY prev.ts DESC
+        LIMIT 1
+    )
+FROM (
+    SELECT DISTINCT ON (ticker)
+        ticker, asset_type, currency, last_price, change_pct_1d, ts
+    FROM market_prices
+    WHERE last_price > 0
+      AND NOT EXISTS (SELECT 1 FROM market_prices_latest)
+    ORDER BY ticker, ts DESC
+) latest;
+
+-- Filas sembradas antes de filtrar precios no positivos (ticks sin cotizacion
+-- en 0): se descartan y el proximo tick valido las vuelve a crear.
+DELETE FROM market_prices_latest
+WHERE last_price IS NULL OR last_price <= 0;
+
+UPDATE market_prices_latest
+SET previous_close = NULL
+WHERE previous_close <= 0;
+
+INSERT INTO market_prices_day_coverage (market_date, ticker)
+SELECT DISTINCT ts::date, ticker
+FROM market_prices
+WHERE last_price IS NOT NULL
+  AND last_price > 0
+  AND NOT EXISTS (SELECT 1 FROM market_prices_day_coverage)
+ON CONFLICT DO NOTHING;
+"""
+
+
+# $1 ts, $2 tickers, $3 asset_types, $4 currencies, $5 last_prices,
+# $6 change_pct_1d (arrays alineados). El previous_close pasa a ser el ultimo
+# precio guardado cuando el tick nuevo cae en un dia posterior. Los ticks con
+# precio nulo o <= 0 (instrumento sin operar) no tocan la tabla, asi que
+# last_price y previous_close siempre son precios validos.
+MARKET_PRICES_LATEST_UPSERT_SQL = """
+INSERT INTO market_prices_latest AS cur (
+    ticker, asset_type, currency, last_price, change_pct_1d, ts, price_day,
+    previous_close, updated_at
+)
+SELECT DISTINCT ON (r.ticker)
+    r.ticker, r.asset_type, r.currency, r.last_price, r.change_pct_1d,
+    r.ts, r.ts::date, NULL, NOW()
+FROM unnest(
+    $1::timestamptz[], $2::text[], $3::text[], $4::text[],
+    $5::numeric[], $6::numeric[]
+) AS r(ts, ticker, asset_type, currency, last_price, change_pct_1d)
+WHERE r.last_price IS NOT NULL AND r.last_price > 0
+ORDER BY r.ticker, r.ts DESC
+ON CONFLICT (ticker) DO UPDATE SET
+    asset_type     = EXCLUDED.asset_type,
+    currency       = EXCLUDED.currency,
+    last_price     = EXCLUDED.last_price,
+    change_pct_1d  = EXCLUDED.change_pct_1d,
+    previous_close = CASE
+        WHEN EXCLUDED.price_day > cur.price_day AND cur.last_price > 0 THEN cur.last_price
+        ELSE cur.previous_close
+    END,
+    ts             = EXCLUDED.ts,
+    price_day      = EXCLUDED.price_day,
+    updated_at     = NOW()
+WHERE EXCLUDED.ts >= cur.ts
+RETURNING ticker, asset_type, currency, last_price, change_pct_1d, ts, previous_close
+"""
+
+
+# $1 ts, $2 tickers, $3 last_prices (arrays alineados).
+MARKET_PRICES_DAY_COVERAGE_SQL = """
+INSERT INTO market_prices_day_coverage (market_date, ticker)
+SELECT DISTINCT r.ts::date, r.ticker
+FROM unnest($1::timestamptz[], $2::text[], $3::numeric[]) AS r(ts, ticker, last_price)
+WHERE r.last_price IS NOT NULL AND r.last_price > 0
+ON CONFLICT DO NOTHING
+"""
+
+
+# Indices para los watermarks del cache de respuestas del monitor: MAX() de
+# estas columnas se resuelve por indice en vez de recorrer decision_log.
+MONITOR_WATERMARK_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_decision_log_outcome_filled_at
+    ON decision_log(outcome_filled_at)
+    WHERE outcome_filled_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_decision_log_closed_at
+    ON decision_log(closed_at)
+    WHERE closed_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_position_hold_updated_at
+    ON position_hold_observations(updated_at);
+
+CREATE INDEX IF NOT EXISTS idx_shadow_causal_analyzed_at
+    ON shadow_thesis_causal_analysis(analyzed_at);
+"""
+
+
+# ── Fase de migracion al arranque ────────────────────────────────────────────
+# Cada bloque idempotente de arriba (y los que viven junto a su modulo) es una
+# version registrada en schema_migrations con el checksum de su SQL. Los
+# procesos largos (scheduler, bot, monitor) y los scripts de reporte corren
+# apply_schema_migrations() una vez al iniciar; despues los ensure_* consultan
+# schema_ready() en memoria y no vuelven a emitir DDL en los read paths. El
+# resto de los procesos marca al conectar (PortfolioDatabase.connect) las
+# versiones ya registradas con mark_recorded_schema_ready(), sin tomar el lock.
+SCHEMA_MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     TEXT PRIMARY KEY,
+    checksum    TEXT NOT NULL,
+    applied_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+# pg_advisory_lock: scheduler, bot y monitor arrancan juntos en docker compose.
+SCHEMA_MIGRATIONS_LOCK_ID = 7_420_025
+
+MIGRATION_EXECUTION_TIMESTAMP_META = "0001_execution_timestamp_meta"
+MIGRATION_OUTCOME_HORIZON = "0002_outcome_horizon"
+MIGRATION_DECISION_AUDIT_SCOPE = "0003_decision_audit_scope"
+MIGRATION_EXECUTION_PLAN_PERSISTENCE = "0004_execution_plan_persistence"
+MIGRATION_PLAN_EXECUTION_ATTRIBUTION = "0005_plan_execution_attribution"
+MIGRATION_POSITION_HOLD_AUDIT = "0006_position_hold_audit"
+MIGRATION_MANUAL_MARKET_EVENTS = "0007_manual_market_events"
+MIGRATION_CORPORATE_ACTIONS = "0008_corporate_actions"
+MIGRATION_ISSUER_EVENTS = "0009_issuer_events"
+MIGRATION_PRECLOSE_ALERTS = "0010_preclose_alerts"
+MIGRATION_MARKET_CANDLES_CANONICAL = "0011_market_candles_canonical"
+MIGRATION_MARKET_PRICES_LATEST = "0012_market_prices_latest"
+MIGRATION_MONITOR_WATERMARK_INDEXES = "0013_monitor_watermark_indexes"
+
+
+@dataclass(frozen=True)
+class SchemaMigration:
+    version: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.strip().encode("utf-8")).hexdigest()
+
+
+def registered_migrations() -> tuple[SchemaMigration, ...]:
+    """Versiones en orden de aplicacion."""
+    # Import local: los modulos duenos de estos SQL importan este archivo.
+    from src.analysis.audit_scope import DECISION_AUDIT_SCOPE_MIGRATION_SQL
+    from src.analysis.corporate_actions import CORPORATE_ACTIONS_SCHEMA_SQL
+    from src.analysis.issuer_events import ISSUER_EVENTS_SCHEMA_SQL
+    from src.analysis.manual_market_events import MANUAL_MARKET_EVENTS_SCHEMA_SQL
+    from src.analysis.position_hold_audit import POSITION_HOLD_AUDIT_SCHEMA_SQL
+    from src.analysis.preclose_alerts import PRE_CLOSE_ALERTS_SCHEMA_SQL
+
+    return (
+        SchemaMigration(MIGRATION_EXECUTION_TIMESTAMP_META, EXECUTION_TIMESTAMP_META_SQL),
+        SchemaMigration(MIGRATION_OUTCOME_HORIZON, OUTCOME_HORIZON_SQL),
+        SchemaMigration(MIGRATION_DECISION_AUDIT_SCOPE, DECISION_AUDIT_SCOPE_MIGRATION_SQL),
+        SchemaMigration(MIGRATION_EXECUTION_PLAN_PERSISTENCE, EXECUTION_PLAN_PERSISTENCE_SQL),
+        SchemaMigration(MIGRATION_PLAN_EXECUTION_ATTRIBUTION, PLAN_EXECUTION_ATTRIBUTION_SQL),
+        SchemaMigration(MIGRATION_POSITION_HOLD_AUDIT, POSITION_HOLD_AUDIT_SCHEMA_SQL),
+        SchemaMigration(MIGRATION_MANUAL_MARKET_EVENTS, MANUAL_MARKET_EVENTS_SCHEMA_SQL),
+        SchemaMigration(MIGRATION_CORPORATE_ACTIONS, CORPORATE_ACTIONS_SCHEMA_SQL),
+        SchemaMigration(MIGRATION_ISSUER_EVENTS, ISSUER_EVENTS_SCHEMA_SQL),
+        SchemaMigration(MIGRATION_PRECLOSE_ALERTS, PRE_CLOSE_ALERTS_SCHEMA_SQL),
+        SchemaMigration(MIGRATION_MARKET_CANDLES_CANONICAL, MARKET_CANDLES_CANONICAL_SQL),
+        SchemaMigration(MIGRATION_MARKET_PRICES_LATEST, MARKET_PRICES_LATEST_SQL),
+        SchemaMigration(MIGRATION_MONITOR_WATERMARK_INDEXES, MONITOR_WATERMARK_INDEXES_SQL),
+    )
+
+
+_READY_VERSIONS: set[str] = set()
+
+
+def schema_ready(version: str) -> bool:
+    """True si este proceso ya verifico/aplico `version`; sin ida a la base."""
+    return version in _READY_VERSIONS
+
+
+async def _recorded_checksums(conn) -> dict[str, str]:
+    if await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL") is not True:
+        return {}
+    rows = await conn.fetch("SELECT version, checksum FROM schema_migrations")
+    return {row["version"]: row["checksum"] for row in rows}
+
+
+def _pending(migrations, recorded: dict[str, str]) -> list[SchemaMigration]:
+    return [m for m in migrations if recorded.get(m.version) != m.checksum]
+
+
+async def mark_recorded_schema_ready(conn) -> list[str]:
+    """
+    Lectura sin lock de schema_migrations: marca listas las versiones cuyo
+    checksum coincide, asi los procesos que no corren la fase de arranque
+    (scripts de reportes, shadow, outcomes) no repiten el DDL de cada
+    ensure_*. Las que faltan o cambiaron quedan para su ensure_* o para
+    apply_schema_migrations().
+    """
+    migrations = registered_migrations()
+    if all(schema_ready(m.version) for m in migrations):
+        return []
+    recorded = await _recorded_checksums(conn)
+    matched = [m.version for m in migrations if recorded.get(m.version) == m.checksum]
+    _READY_VERSIONS.update(matched)
+    return matched
+
+
+async def apply_schema_migrations(conn) -> list[str]:
+    """
+    Aplica las versiones pendientes (nuevas o con SQL cambiado) y marca el
+    proceso como listo. Con todo aplicado cuesta dos lecturas y ningun DDL.
+    """
+    migrations = registered_migrations()
+    if all(schema_ready(m.version) for m in migrations):
+        return []
+    applied: list[str] = []
+    if _pending(migrations, await _recorded_checksums(conn)):
+        await conn.execute("SELECT pg_advisory_lock($1)", SCHEMA_MIGRATIONS_LOCK_ID)
+        try:
+            await conn.execute(SCHEMA_MIGRATIONS_TABLE_SQL)
+            # Releer bajo el lock: otro proceso pudo aplicarlas mientras tanto.
+            for migration in _pending(migrations, await _recorded_checksums(conn)):
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await conn.execute(
+                        """
+                        INSERT INTO schema_migrations (version, checksum)
+                        VALUES ($1, $2)
+                        ON CONFLICT (version) DO UPDATE SET
+                            checksum = EXCLUDED.checksum,
+                            applied_at = NOW()
+                        """,
+                        migration.version,
+                        migration.checksum,
+                    )
+                applied.append(migration.version)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", SCHEMA_MIGRATIONS_LOCK_ID)
+    _READY_VERSIONS.update(m.version for m in migrations)
+    if applied:
+        logger.info("Schema migrations aplicadas: %s", ", ".join(applied))
+    return applied
+
+
 async def ensure_execution_plan_persistence(conn) -> None:
+    if schema_ready(MIGRATION_EXECUTION_PLAN_PERSISTENCE):
+        return
     await conn.execute(EXECUTION_PLAN_PERSISTENCE_SQL)
 
 
 __all__ = [
+    "SCHEMA_MIGRATIONS_TABLE_SQL",
+    "SchemaMigration",
+    "apply_schema_migrations",
+    "mark_recorded_schema_ready",
+    "registered_migrations",
+    "schema_ready",
     "EXECUTION_TIMESTAMP_META_SQL",
     "EXECUTION_PLAN_PERSISTENCE_SQL",
+    "MARKET_CANDLES_CANONICAL_READ_SQL",
+    "MARKET_CANDLES_CANONICAL_REBUILD_SQL",
+    "MARKET_CANDLES_CANONICAL_REFRESH_SQL",
+    "MARKET_CANDLES_CANONICAL_SQL",
+    "MARKET_CANDLES_TYPED_RANKED_SQL",
+    "MARKET_PRICES_DAY_COVERAGE_SQL",
+    "MARKET_PRICES_LATEST_SQL",
+    "MARKET_PRICES_LATEST_UPSERT_SQL",
+    "MONITOR_WATERMARK_INDEXES_SQL",
     "OUTCOME_HORIZON_SQL",
     "PLAN_EXECUTION_ATTRIBUTION_SQL",
     "ensure_execution_plan_persistence",
@@ -0,0 +1,356 @@
+"""
+src/collector/telegram_delivery.py — Cola de salida async para Telegram.
+
+El código async (scheduler, loops intradía) encola mensajes en Redis y un
+único worker por proceso los entrega con un `httpx.AsyncClient` compartido:
+
+- La cola (`cocos:telegram:outbox:*`) sobrevive reinicios: un ZSET con el
+  próximo intento de cada mensaje y un HASH con el payload.
+- Mensajes con `coalesce_key` usan un id estable por chat: si llega una
+  versión nueva antes de entregarse, reemplaza el texto y conserva el turno.
+- Rate limit por chat (1 msg/s en privados, 1 cada 3s en grupos) más un
+  tope global de ~30 msg/s; un 429 respeta `retry_after` para ese chat.
+- Chats distintos se entregan en paralelo, así el fan-out multiusuario no
+  queda serializado detrás de la red; el mismo chat mantiene el orden.
+- Latencia encolado -> entrega en `cocos_telegram_delivery_seconds`.
+
+Si Redis no responde, `deliver()` manda directo por el mismo cliente (sin
+persistencia, pero sin bloquear el event loop).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from typing import Any, Optional
+
+import httpx
+
+from src.core.metrics import REGISTRY as METRICS, TELEGRAM_DELIVERY_SECONDS
+from src.core.redis_client import client as redis_client
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DUE_KEY = "cocos:telegram:outbox:due"
+OUTBOX_MESSAGES_KEY = "cocos:telegram:outbox:messages"
+
+TELEGRAM_DELIVERY_ENABLED = os.getenv("TELEGRAM_DELIVERY_ENABLED", "true").lower() == "true"
+TELEGRAM_DELIVERY_MAX_ATTEMPTS = int(os.getenv("TELEGRAM_DELIVERY_MAX_ATTEMPTS", "8"))
+TELEGRAM_DELIVERY_CONCURRENCY = int(os.getenv("TELEGRAM_DELIVERY_CONCURRENCY", "8"))
+TELEGRAM_DELIVERY_POLL_SECONDS = 1.0
+TELEGRAM_DELIVERY_BATCH = 100
+PRIVATE_CHAT_INTERVAL_SECONDS = 1.0
+GROUP_CHAT_INTERVAL_SECONDS = 3.0
+GLOBAL_INTERVAL_SECONDS = 1.0 / 30
+
+
+def _chat_interval(chat_id: str) -> float:
+    return GROUP_CHAT_INTERVAL_SECONDS if str(chat_id).startswith("-") else PRIVATE_CHAT_INTERVAL_SECONDS
+
+
+class ChatRateLimiter:
+    """Próximo envío permitido por chat y global (reloj de pared, segundos)."""
+
+    def __init__(self) -> None:
+        self._next_chat: dict[str, float] = {}
+        self._next_global = 0.0
+
+    def ready_at(self, chat_id: str) -> float:
+        return max(self._next_chat.get(str(chat_id), 0.0), self._next_global)
+
+    def record_send(self, chat_id: str, now: float) -> None:
+        self._next_chat[str(chat_id)] = now + _chat_interval(chat_id)
+        self._next_global = max(self._next_global, now + GLOBAL_INTERVAL_SECONDS)
+
+    def block(self, chat_id: str, until: float) -> None:
+        chat_id = str(chat_id)
+        self._next_chat[chat_id] = max(self._next_chat.get(chat_id, 0.0), until)
+
+
+class TelegramDelivery:
+    """Worker de entrega; una instancia por proceso/event loop."""
+
+    def __init__(
+        self,
+        bot_token: str,
+        *,
+        client: Optional[httpx.AsyncClient] = None,
+        clock=time.time,
+    ) -> None:
+        self.bot_token = bot_token
+        self._client = client
+        self._clock = clock
+        self._limiter = ChatRateLimiter()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max(1, TELEGRAM_DELIVERY_CONCURRENCY))
+        self._task: Optional[asyncio.Task] = None
+        self._last_score = 0.0
+
+    # ── HTTP ──────────────────────────────────────────────────────────────
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=f"https://api.telegram.org/bot{self.bot_token}",
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                limits=httpx.Limits(max_connections=TELEGRAM_DELIVERY_CONCURRENCY),
+            )
+        return self._client
+
+    async def _post(self, message: dict[str, Any]) -> tuple[str, float]:
+        """Un intento de envío. Devuelve (resultado, retry_after)."""
+        data = {
+            "chat_id": message["chat_id"],
+            "text": message["text"],
+            "disable_web_page_preview": True,
+        }
+        if message.get("parse_mode"):
+            data["parse_mode"] = message["parse_mode"]
+        try:
+            response = await self._http().post("/sendMessage", data=data)
+        except httpx.HTTPError as exc:
+            logger.warning("Telegram delivery error de red: %s", exc)
+            return "retry", 0.0
+        if response.status_code == 200:
+            return "sent", 0.0
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code == 429:
+            retry_after = float((payload.get("parameters") or {}).get("retry_after") or 1)
+            return "rate_limited", retry_after
+        description = str(payload.get("description") or response.text)
+        if response.status_code == 400 and message.get("parse_mode") and "parse" in description.lower():
+            return "plain_text", 0.0
+        logger.warning("Telegram delivery error %s: %s", response.status_code, description)
+        if response.status_code in (400, 403, 404):
+            return "rejected", 0.0
+        return "retry", 0.0
+
+    async def send_now(self, message: dict[str, Any]) -> bool:
+        """Entrega directa (sin cola) respetando el rate limit del chat."""
+        chat_id = str(message["chat_id"])
+        for _ in range(max(1, TELEGRAM_DELIVERY_MAX_ATTEMPTS)):
+            wait = self._limiter.ready_at(chat_id) - self._clock()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._limiter.record_send(chat_id, self._clock())
+            outcome, retry_after = await self._post(message)
+            if outcome == "sent":
+                self._observe(message, "sent")
+                return True
+            if outcome == "plain_text":
+                message = {**message, "parse_mode": None}
+            elif outcome == "rate_limited":
+                self._limiter.block(chat_id, self._clock() + retry_after)
+            elif outcome == "rejected":
+                break
+            else:
+                await asyncio.sleep(1.0)
+        self._observe(message, "dropped")
+        return False
+
+    # ── Cola persistente ──────────────────────────────────────────────────
+
+    async def enqueue(
+        self,
+        chat_id: str,
+        text: str,
+        *,
+        parse_mode: Optional[str] = "HTML",
+        coalesce_key: Optional[str] = None,
+    ) -> str:
+        """Persiste el mensaje; un `coalesce_key` repetido reemplaza al pendiente."""
+        message_id = (
+            f"coalesce:{chat_id}:{coalesce_key}" if coalesce_key else f"msg:{uuid.uuid4().hex}"
+        )
+        now = self._clock()
+        # Redis desempata scores iguales por id: se fuerza el orden de llegada.
+        score = self._last_score = max(now, self._last_score + 1e-6)
+        message = {
+            "id": message_id,
+            "chat_id": str(chat_id),
+            "text": text,
+            "parse_mode": parse_mode,
+            "enqueued_at": now,
+            "attempts": 0,
+        }
+        await redis_client.hset(OUTBOX_MESSAGES_KEY, mapping={message_id: json.dumps(message)})
+        await redis_client.zadd(OUTBOX_DUE_KEY, {message_id: score}, nx=True)
+        self._wakeup.set()
+        return message_id
+
+    async def deliver(
+        self,
+        chat_id: str,
+        text: str,
+        *,
+        parse_mode: Optional[str] = "HTML",
+        coalesce_key: Optional[str] = None,
+    ) -> bool:
+        """Encola; si Redis no está disponible entrega directo."""
+        if TELEGRAM_DELIVERY_ENABLED:
+            try:
+                await self.enqueue(chat_id, text, parse_mode=parse_mode, coalesce_key=coalesce_key)
+                self.ensure_running()
+                return True
+            except Exception as exc:
+                logger.warning("Telegram outbox no disponible, envío directo: %s", exc)
+        return await self.send_now({
+            "chat_id": str(chat_id),
+            "text": text,
+            "parse_mode": parse_mode,
+            "enqueued_at": self._clock(),
+        })
+
+    async def drain_once(self) -> int:
+        """Procesa los mensajes vencidos; devuelve cuántos se entregaron."""
+        # +1ms cubre el desempate de orden que suma enqueue() al score.
+        due_ids = await redis_client.zrangebyscore(
+            OUTBOX_DUE_KEY, "-inf", self._clock() + 1e-3, start=0, num=TELEGRAM_DELIVERY_BATCH,
+        )
+        if not due_ids:
+            return 0
+        by_chat: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        for message_id in due_ids:
+            raw = await redis_client.hget(OUTBOX_MESSAGES_KEY, message_id)
+            if raw is None:
+                await redis_client.zrem(OUTBOX_DUE_KEY, message_id)
+                continue
+            by_chat[json.loads(raw)["chat_id"]].append((message_id, raw))
+        results = await asyncio.gather(*(
+            self._drain_chat(chat_id, items) for chat_id, items in by_chat.items()
+        ))
+        return sum(results)
+
+    async def _drain_chat(self, chat_id: str, items: list[tuple[str, str]]) -> int:
+        delivered = 0
+        async with self._semaphore:
+            for index, (message_id, raw) in enumerate(items):
+                ready_at = self._limiter.ready_at(chat_id)
+                now = self._clock()
+                if ready_at > now:
+                    if ready_at - now > TELEGRAM_DELIVERY_POLL_SECONDS:
+                        # Bloqueado (retry_after): se reprograma el resto del chat.
+                        for offset, (pending_id, _) in enumerate(items[index:], start=1):
+                            await redis_client.zadd(
+                                OUTBOX_DUE_KEY, {pending_id: ready_at + offset * 1e-3}, xx=True,
+                            )
+                        break
+                    await asyncio.sleep(ready_at - now)
+                if await self._deliver_queued(message_id, raw):
+                    delivered += 1
+        return delivered
+
+    async def _deliver_queued(self, message_id: str, raw: str) -> bool:
+        message = json.loads(raw)
+        chat_id = message["chat_id"]
+        self._limiter.record_send(chat_id, self._clock())
+        outcome, retry_after = await self._post(message)
+        if outcome == "plain_text":
+            message["parse_mode"] = None
+            self._limiter.record_send(chat_id, self._clock())
+            outcome, retry_after = await self._post(message)
+
+        if outcome == "sent":
+            await self._finish(message_id, raw)
+            self._observe(message, "sent")
+            return True
+        if outcome == "rate_limited":
+            until = self._clock() + retry_after
+            self._limiter.block(chat_id, until)
+            await redis_client.zadd(OUTBOX_DUE_KEY, {message_id: until}, xx=True)
+            return False
+        message["attempts"] = int(message.get("attempts") or 0) + 1
+        if outcome == "rejected" or message["attempts"] >= TELEGRAM_DELIVERY_MAX_ATTEMPTS:
+            logger.warning(
+                "Telegram outbox: descartado %s tras %d intento(s)",
+                message_id,
+                message["attempts"],
+            )
+            await self._finish(message_id, raw)
+            self._observe(message, "dropped")
+            return False
+        if await redis_client.hget(OUTBOX_MESSAGES_KEY, message_id) == raw:
+            await redis_client.hset(OUTBOX_MESSAGES_KEY, mapping={message_id: json.dumps(message)})
+        backoff = min(300.0, 2.0 ** message["attempts"])
+        await redis_client.zadd(OUTBOX_DUE_KEY, {message_id: self._clock() + backoff}, xx=True)
+        return False
+
+    async def _finish(self, message_id: str, raw: str) -> None:
+        # Si mientras se enviaba llegó una versión nueva (coalesce), queda en
+        # cola para el próximo turno en vez de borrarse.
+        if await redis_client.hget(OUTBOX_MESSAGES_KEY, message_id) == raw:
+            await redis_client.hdel(OUTBOX_MESSAGES_KEY, message_id)
+            await redis_client.zrem(OUTBOX_DUE_KEY, message_id)
+        else:
+            await redis_client.zadd(OUTBOX_DUE_KEY, {message_id: self._clock()})
+
+    def _observe(self, message: dict[str, Any], outcome: str) -> None:
+        enqueued_at = float(message.get("enqueued_at") or self._clock())
+        METRICS.observe(TELEGRAM_DELIVERY_SECONDS, self._clock() - enqueued_at, outcome=outcome)
+
+    # ── Worker ────────────────────────────────────────────────────────────
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Telegram outbox worker error: %s", exc)
+                delivered = 0
+            if delivered:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), TELEGRAM_DELIVERY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self.run(), name="telegram_delivery",
+            )
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Clave por objeto loop (no id(loop), que se recicla): los clientes httpx
+# quedan atados al loop y se liberan con él.
+_deliveries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, TelegramDelivery]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_telegram_delivery(bot_token: str) -> TelegramDelivery:
+    """Worker compartido por bot y event loop."""
+    per_loop = _deliveries.setdefault(asyncio.get_running_loop(), {})
+    delivery = per_loop.get(bot_token)
+    if delivery is None:
+        delivery = per_loop[bot_token] = TelegramDelivery(bot_token)
+    return delivery
+
+
+__all__ = [
+    "ChatRateLimiter",
+    "OUTBOX_DUE_KEY",
+    "OUTBOX_MESSAGES_KEY",
+    "TelegramDelivery",
+    "get_telegram_delivery",
+]
@@ -0,0 +1,271 @@
+"""
+src/core/compute_executor.py — Etapas CPU fuera del event loop.
+
+El scheduler corre el risk guard, los loops intradía y los jobs EOD en un
+único event loop. Indicadores, optimizer, auditorías y charts son síncronos
+y, si corren inline, congelan todo lo demás mientras duran: una alerta de
+riesgo queda esperando a que termine el reporte de las 17:00.
+
+`run_cpu(stage, fn, *args)` manda la etapa a un pool de hilos (o de
+procesos con `kind="process"`, para cálculos puros y picklables) y registra
+su duración por etapa. `LoopLagWatchdog` mide cuánto se atrasa un sleep
+periódico: ese atraso es el tiempo que el loop estuvo bloqueado.
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+import multiprocessing as mp
+import pickle
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from src.core.config import get_config
+from src.core.logger import get_logger
+from src.core.metrics import COMPUTE_STAGE_SECONDS, LOOP_LAG_SECONDS, REGISTRY
+from src.core.output_perf import StageTiming, percentile
+
+logger = get_logger(__name__)
+
+RECENT_TIMINGS = 200
+RECENT_LAG_SAMPLES = 240
+LAG_WARN_EVERY_SECONDS = 60.0
+# Módulos que el forkserver importa una vez para las etapas en proceso.
+PROCESS_PRELOAD = (
+    "numpy",
+    "pandas",
+    "src.analysis.technical",
+)
+
+
+@dataclass
+class StageStats:
+    runs: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    last_kind: str = "thread"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.runs, 2) if self.runs else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2),
+            "last_kind": self.last_kind,
+        }
+
+
+def _picklable(call: Callable[..., Any]) -> bool:
+    # Se valida antes de encolar: un error de pickle dentro del feeder del
+    # pool deja colgado su shutdown en algunas versiones de CPython 3.12.
+    try:
+        pickle.dumps(call)
+    except Exception:
+        return False
+    return True
+
+
+class ComputeExecutor:
+    """Pools perezosos para etapas síncronas + timings por etapa."""
+
+    def __init__(self, *, thread_workers: int = 4, process_workers: int = 1) -> None:
+        self.thread_workers = max(1, int(thread_workers))
+        self.process_workers = max(0, int(process_workers))
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self.stats: dict[str, StageStats] = {}
+        self.recent: deque[StageTiming] = deque(maxlen=RECENT_TIMINGS)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self.thread_workers,
+                thread_name_prefix="compute",
+            )
+        return self._threads
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers <= 0:
+            return None
+        if self._processes is None:
+            if "forkserver" in mp.get_all_start_methods():
+                context = mp.get_context("forkserver")
+                context.set_forkserver_preload(list(PROCESS_PRELOAD))
+            else:
+                context = mp.get_context("spawn")
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=context,
+            )
+        return self._processes
+
+    def _record(self, stage: str, kind: str, elapsed_ms: float, *, failed: bool) -> None:
+        stats = self.stats.setdefault(stage, StageStats())
+        stats.runs += 1
+        stats.errors += int(failed)
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.last_ms = elapsed_ms
+        stats.last_kind = kind
+        REGISTRY.observe(COMPUTE_STAGE_SECONDS, elapsed_ms / 1000.0, stage=stage, kind=kind)
+        self.recent.append(
+            StageTiming(name=stage, elapsed_ms=elapsed_ms, metadata={"kind": kind, "failed": failed})
+        )
+
+    async def run(
+        self,
+        stage: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        kind: str = "thread",
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Corre `fn(*args, **kwargs)` fuera del loop y devuelve su resultado.
+
+        Con `kind="process"` la función y sus argumentos deben ser picklables;
+        si no lo son, o el pool de procesos se rompe, la etapa cae a un hilo.
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        executor: Optional[Executor] = None
+        if kind == "process":
+            if _picklable(call):
+                executor = self._process_pool()
+            else:
+                logger.debug("Etapa %s no picklable, corre en hilo", stage)
+        if executor is None:
+            kind = "thread"
+            executor = self._thread_pool()
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            try:
+                return await loop.run_in_executor(executor, call)
+            except BrokenProcessPool as exc:
+                if kind != "process":
+                    raise
+                logger.warning("Etapa %s sin pool de procesos, sigo en hilo: %s", stage, exc)
+                self._shutdown_processes()
+                kind = "thread"
+                return await loop.run_in_executor(self._thread_pool(), call)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self._record(stage, kind, elapsed_ms, failed=failed)
+            logger.debug("Etapa %s [%s]: %.1f ms", stage, kind, elapsed_ms)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {stage: stats.as_dict() for stage, stats in sorted(self.stats.items())}
+
+    def _shutdown_processes(self) -> None:
+        processes, self._processes = self._processes, None
+        if processes is not None:
+            processes.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        self._shutdown_processes()
+        threads, self._threads = self._threads, None
+        if threads is not None:
+            threads.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class LoopLagWatchdog:
+    """Muestrea el atraso del event loop con un sleep periódico."""
+
+    interval_seconds: float = 0.5
+    warn_ms: float = 250.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_LAG_SAMPLES))
+    max_ms: float = 0.0
+    over_threshold: int = 0
+    _last_warning: float = 0.0
+
+    def record(self, lag_ms: float) -> None:
+        lag_ms = max(0.0, lag_ms)
+        self.samples.append(lag_ms)
+        self.max_ms = max(self.max_ms, lag_ms)
+        REGISTRY.observe(LOOP_LAG_SECONDS, lag_ms / 1000.0)
+        if lag_ms < self.warn_ms:
+            return
+        self.over_threshold += 1
+        now = time.monotonic()
+        if now - self._last_warning >= LAG_WARN_EVERY_SECONDS:
+            self._last_warning = now
+            logger.warning(
+                "Event loop bloqueado %.0f ms (umbral %.0f ms); etapas: %s",
+                lag_ms,
+                self.warn_ms,
+                get_compute_executor().snapshot(),
+            )
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.record((loop.time() - expected) * 1000.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        samples = list(self.samples)
+        return {
+            "last_ms": round(samples[-1], 2) if samples else 0.0,
+            "p95_ms": round(percentile(samples, 95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "over_threshold": self.over_threshold,
+            "warn_ms": self.warn_ms,
+        }
+
+
+_executor: Optional[ComputeExecutor] = None
+
+
+def get_compute_executor() -> ComputeExecutor:
+    global _executor
+    if _executor is None:
+        cfg = get_config().compute
+        _executor = ComputeExecutor(
+            thread_workers=cfg.thread_workers,
+            process_workers=cfg.process_workers,
+        )
+    return _executor
+
+
+def build_loop_lag_watchdog() -> LoopLagWatchdog:
+    cfg = get_config().compute
+    return LoopLagWatchdog(
+        interval_seconds=max(0.05, cfg.loop_lag_interval_seconds),
+        warn_ms=cfg.loop_lag_warn_ms,
+    )
+
+
+async def run_cpu(
+    stage: str,
+    fn: Callable[..., Any],
+    *args: Any,
+    kind: str = "thread",
+    **kwargs: Any,
+) -> Any:
+    """Atajo sobre el executor compartido del proceso."""
+    return await get_compute_executor().run(stage, fn, *args, kind=kind, **kwargs)
+
+
+def shutdown_compute_executor() -> None:
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+atexit.register(shutdown_compute_executor)
@@ -45,12 +45,36 @@ class ScraperConfig:
 @dataclass
 class DatabaseConfig:
     url: str = ""
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    statement_cache_size: int = 256
+
+
+@dataclass
+class AnalysisConfig:
+    # Procesos para el screening del universo; 0 = automático (núcleos - 1, máx. 4), 1 = serie.
+    radar_workers: int = 0
+    # Debajo de este tamaño de universo no conviene pagar el IPC del pool.
+    radar_parallel_min_tickers: int = 120
+
+
+@dataclass
+class ComputeConfig:
+    # Hilos para etapas CPU/IO síncronas que no deben correr en el event loop.
+    thread_workers: int = 4
+    # Procesos para etapas CPU puras (indicadores); 0 = todo en hilos.
+    process_workers: int = 1
+    # Watchdog del event loop: intervalo de muestreo y umbral de warning.
+    loop_lag_interval_seconds: float = 0.5
+    loop_lag_warn_ms: float = 250.0
 
 
 @dataclass
 class AppConfig:
     scraper: ScraperConfig = field(default_factory=ScraperConfig)
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
+    analysis: AnalysisConfig = field(default_factory=AnalysisConfig)
+    compute: ComputeConfig = field(default_factory=ComputeConfig)
     multiuser_enabled: bool = False
 
 
@@ -94,7 +118,20 @@ def get_config() -> AppConfig:
             url=os.environ.get(
                 "DATABASE_URL",
                 "postgresql+asyncpg://portfolio:change_me_local_db_password@db:5432/portfolio",
-            )
+            ),
+            pool_min_size=int(os.environ.get("DATABASE_POOL_MIN_SIZE", "1")),
+            pool_max_size=int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+            statement_cache_size=int(os.environ.get("DATABASE_STATEMENT_CACHE_SIZE", "256")),
+        ),
+        analysis=AnalysisConfig(
+            radar_workers=int(os.environ.get("RADAR_WORKERS", "0")),
+            radar_parallel_min_tickers=int(os.environ.get("RADAR_PARALLEL_MIN_TICKERS", "120")),
+        ),
+        compute=ComputeConfig(
+            thread_workers=int(os.environ.get("COMPUTE_THREAD_WORKERS", "4")),
+            process_workers=int(os.environ.get("COMPUTE_PROCESS_WORKERS", "1")),
+            loop_lag_interval_seconds=float(os.environ.get("LOOP_LAG_INTERVAL_SECONDS", "0.5")),
+            loop_lag_warn_ms=float(os.environ.get("LOOP_LAG_WARN_MS", "250")),
         ),
         multiuser_enabled=os.environ.get("MULTIUSER_ENABLED", "false").lower() == "true",
     )
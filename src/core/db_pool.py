@@ -0,0 +1,163 @@
+"""
+src/core/db_pool.py — pool asyncpg compartido por proceso.
+
+Reportes, auditorías y PortfolioDatabase piden conexiones acá en vez de abrir
+un `asyncpg.connect()` por consulta. El pool se crea lazy la primera vez que
+se usa en cada event loop (los pools de asyncpg quedan atados a su loop) y se
+cierra solo cuando ese loop termina, así un `asyncio.run(main())` de un
+script no deja conexiones colgadas y el scheduler/bot/API reusan un único
+pool caliente durante toda su vida.
+
+Los registros se indexan por el objeto loop (WeakKeyDictionary), no por
+`id(loop)`: un loop nuevo que reciba la dirección de uno ya cerrado nunca
+hereda un pool atado al loop muerto.
+
+El statement cache de asyncpg reusa los prepared statements por conexión,
+por lo que las consultas repetidas entre reportes no se vuelven a planificar.
+`create_private_pool` queda para quien necesita un pool propio que cierra
+explícitamente (p.ej. PortfolioDatabase(shared_pool=False)).
+"""
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+try:
+    import asyncpg
+
+    HAS_ASYNCPG = True
+except ImportError:
+    asyncpg = None
+    HAS_ASYNCPG = False
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncpg.Pool]]" = (
+    weakref.WeakKeyDictionary()
+)
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+_keepers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def normalize_dsn(dsn: str) -> str:
+    return str(dsn).replace("postgresql+asyncpg://", "postgresql://")
+
+
+def _default_dsn() -> str:
+    from src.core.config import get_config
+
+    return get_config().database.url
+
+
+def _pool_settings() -> dict[str, int]:
+    from src.core.config import get_config
+
+    database = get_config().database
+    max_size = max(1, int(database.pool_max_size))
+    return {
+        "min_size": max(0, min(int(database.pool_min_size), max_size)),
+        "max_size": max_size,
+        "statement_cache_size": max(0, int(database.statement_cache_size)),
+    }
+
+
+async def _create_pool(dsn: str) -> "asyncpg.Pool":
+    settings = _pool_settings()
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=settings["min_size"],
+        max_size=settings["max_size"],
+        statement_cache_size=settings["statement_cache_size"],
+    )
+    logger.info(
+        "db_pool: pool creado (min=%s max=%s)",
+        settings["min_size"],
+        settings["max_size"],
+    )
+    return pool
+
+
+def _forget_closed_loops() -> None:
+    # Un loop cerrado sin pasar por asyncio.run() (loop.close() directo) nunca
+    # corre su keeper; sus pools ya no se pueden cerrar, sólo soltar.
+    for loop in [loop for loop in list(_pools.keys()) if loop.is_closed()]:
+        _pools.pop(loop, None)
+        _locks.pop(loop, None)
+        _keepers.pop(loop, None)
+
+
+async def _close_loop_pools(loop: asyncio.AbstractEventLoop) -> None:
+    pools = _pools.pop(loop, {})
+    _locks.pop(loop, None)
+    for pool in pools.values():
+        try:
+            await pool.close()
+        except Exception as exc:
+            logger.warning("db_pool: cierre de pool falló: %s", exc)
+    _keepers.pop(loop, None)
+
+
+async def _keep_until_loop_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    # asyncio.run() cancela las tasks pendientes antes de cerrar el loop: ese
+    # es el punto en el que se cierran los pools del loop.
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await _close_loop_pools(loop)
+
+
+async def get_pool(dsn: Optional[str] = None) -> "asyncpg.Pool":
+    """Pool compartido para `dsn` (por defecto DATABASE_URL) en el loop actual."""
+    if not HAS_ASYNCPG:
+        raise ImportError("asyncpg no instalado: pip install asyncpg")
+    loop = asyncio.get_running_loop()
+    target = normalize_dsn(dsn or _default_dsn())
+    pool = _pools.get(loop, {}).get(target)
+    if pool is not None:
+        return pool
+    _forget_closed_loops()
+    lock = _locks.setdefault(loop, {}).setdefault(target, asyncio.Lock())
+    async with lock:
+        pool = _pools.get(loop, {}).get(target)
+        if pool is not None:
+            return pool
+        pool = await _create_pool(target)
+        _pools.setdefault(loop, {})[target] = pool
+        if loop not in _keepers:
+            _keepers[loop] = loop.create_task(
+                _keep_until_loop_shutdown(loop),
+                name="db_pool_keeper",
+            )
+    return pool
+
+
+async def create_private_pool(dsn: Optional[str] = None) -> "asyncpg.Pool":
+    """Pool no compartido con los mismos settings; el caller lo cierra."""
+    if not HAS_ASYNCPG:
+        raise ImportError("asyncpg no instalado: pip install asyncpg")
+    return await _create_pool(normalize_dsn(dsn or _default_dsn()))
+
+
+@asynccontextmanager
+async def connection(dsn: Optional[str] = None) -> AsyncIterator[Any]:
+    """Conexión prestada del pool compartido; se devuelve al salir del bloque."""
+    pool = await get_pool(dsn)
+    async with pool.acquire() as conn:
+        yield conn
+
+
+async def close_pools() -> None:
+    """Cierra los pools del loop actual (shutdown explícito de servicios)."""
+    loop = asyncio.get_running_loop()
+    keeper = _keepers.get(loop)
+    await _close_loop_pools(loop)
+    if keeper is not None and keeper is not asyncio.current_task():
+        keeper.cancel()
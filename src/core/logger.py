@@ -51,6 +51,7 @@ def get_logger(name: str) -> logging.Logger:
 
 import functools
 import time as _time
+from src.core.metrics import REGISTRY, TIMED_SECONDS
 
 def timed(label: str):
     """Decorator que loguea el tiempo de ejecución de una coroutine."""
@@ -61,10 +62,12 @@ def timed(label: str):
             try:
                 result = await fn(*args, **kwargs)
                 elapsed = _time.monotonic() - t0
+                REGISTRY.observe(TIMED_SECONDS, elapsed, label=label, status="ok")
                 logging.getLogger(__name__).debug(f"{label} OK ({elapsed:.2f}s)")
                 return result
             except Exception as e:
                 elapsed = _time.monotonic() - t0
+                REGISTRY.observe(TIMED_SECONDS, elapsed, label=label, status="error")
                 logging.getLogger(__name__).warning(f"{label} ERROR ({elapsed:.2f}s): {e}")
                 raise
         return wrapper
@@ -0,0 +1,98 @@
+"""Redis mirror of market_prices_latest (one hash field per ticker).
+
+Each field carries `cached_at` (when it was mirrored). Readers that pass
+`max_age_seconds` drop older fields and fall back to the table, so a mirror
+that stopped being written (Redis restarted mid-session, writer failing
+silently) is never trusted indefinitely.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Mapping, Optional
+
+from src.core.redis_client import client as redis_client
+
+logger = logging.getLogger(__name__)
+
+MARKET_PRICES_LATEST_CACHE_KEY = "cocos:market:prices:latest"
+MARKET_PRICES_CACHE_MAX_AGE_SECONDS = float(
+    os.getenv("MARKET_PRICES_CACHE_MAX_AGE_SECONDS", "180")
+)
+
+_FLOAT_FIELDS = ("last_price", "change_pct_1d", "previous_close")
+
+
+def _encode(row: Mapping, cached_at: datetime) -> str:
+    payload = {
+        "ticker": str(row.get("ticker") or "").upper(),
+        "asset_type": row.get("asset_type"),
+        "currency": row.get("currency"),
+        "ts": row["ts"].isoformat() if row.get("ts") is not None else None,
+        "cached_at": cached_at.isoformat(),
+    }
+    for field in _FLOAT_FIELDS:
+        value = row.get(field)
+        payload[field] = float(value) if value is not None else None
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _decode(raw: str) -> dict:
+    row = json.loads(raw)
+    for field in ("ts", "cached_at"):
+        if row.get(field):
+            row[field] = datetime.fromisoformat(row[field])
+    return row
+
+
+def _is_fresh(row: Mapping, *, max_age_seconds: float, now: datetime) -> bool:
+    cached_at = row.get("cached_at")
+    if not isinstance(cached_at, datetime):
+        return False
+    return (now - cached_at).total_seconds() <= max_age_seconds
+
+
+async def cache_latest_market_prices(rows: Iterable[Mapping]) -> bool:
+    cached_at = datetime.now(timezone.utc)
+    mapping = {
+        str(row.get("ticker") or "").upper(): _encode(row, cached_at)
+        for row in rows
+        if str(row.get("ticker") or "").strip()
+    }
+    if not mapping:
+        return False
+    try:
+        await redis_client.hset(MARKET_PRICES_LATEST_CACHE_KEY, mapping=mapping)
+        return True
+    except Exception as exc:
+        logger.debug("Redis market price cache set ignorado: %s", exc)
+        return False
+
+
+async def get_cached_latest_market_prices(
+    tickers: Optional[Iterable[str]] = None,
+    *,
+    max_age_seconds: Optional[float] = None,
+) -> Optional[list[dict]]:
+    """Filas del mirror (todas o solo `tickers`); None si Redis no responde.
+
+    Con `max_age_seconds` se omiten las filas espejadas hace mas de ese tiempo.
+    """
+    try:
+        if tickers is None:
+            values = list((await redis_client.hgetall(MARKET_PRICES_LATEST_CACHE_KEY)).values())
+        else:
+            wanted = sorted({str(t or "").upper() for t in tickers if str(t or "").strip()})
+            if not wanted:
+                return []
+            values = await redis_client.hmget(MARKET_PRICES_LATEST_CACHE_KEY, wanted)
+        rows = [_decode(raw) for raw in values if raw]
+    except Exception as exc:
+        logger.debug("Redis market price cache get ignorado: %s", exc)
+        return None
+    if max_age_seconds is None:
+        return rows
+    now = datetime.now(timezone.utc)
+    return [row for row in rows if _is_fresh(row, max_age_seconds=max_age_seconds, now=now)]
@@ -0,0 +1,219 @@
+"""
+src/core/metrics.py — Histogramas en proceso con salida en formato Prometheus.
+
+Cada proceso (scheduler, monitor API) mantiene su propio `REGISTRY`. Las
+series son acumulativas desde el arranque: buckets fijos + suma + conteo,
+más una ventana de las últimas observaciones para p50/p95/p99 sin tener que
+calcularlos en Prometheus.
+
+El scheduler no expone HTTP: publica `REGISTRY.snapshot()` en Redis junto al
+heartbeat y `/api/metrics` lo renderiza al lado de las series del monitor.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import inspect
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Mapping
+
+SCHEDULER_METRICS_KEY = "cocos:metrics:scheduler"
+
+JOB_SECONDS = "cocos_scheduler_job_duration_seconds"
+LOOP_ITERATION_SECONDS = "cocos_intraday_loop_iteration_seconds"
+DB_QUERY_SECONDS = "cocos_db_query_duration_seconds"
+LOOP_LAG_SECONDS = "cocos_event_loop_lag_seconds"
+COMPUTE_STAGE_SECONDS = "cocos_compute_stage_duration_seconds"
+HTTP_REQUEST_SECONDS = "cocos_monitor_request_duration_seconds"
+HTTP_CACHE_LOOKUP_SECONDS = "cocos_monitor_cache_lookup_seconds"
+TIMED_SECONDS = "cocos_timed_duration_seconds"
+TELEGRAM_DELIVERY_SECONDS = "cocos_telegram_delivery_seconds"
+
+HELP = {
+    JOB_SECONDS: "Duracion de cada job de APScheduler.",
+    LOOP_ITERATION_SECONDS: "Duracion de cada iteracion de trabajo de los loops intradia.",
+    DB_QUERY_SECONDS: "Latencia por metodo de PortfolioDatabase.",
+    LOOP_LAG_SECONDS: "Atraso del event loop medido con un sleep periodico.",
+    COMPUTE_STAGE_SECONDS: "Duracion de etapas CPU corridas fuera del event loop.",
+    HTTP_REQUEST_SECONDS: "Duracion de requests del monitor API.",
+    HTTP_CACHE_LOOKUP_SECONDS: "Cache de respuestas del monitor por resultado (hit/miss/shared/not_modified).",
+    TIMED_SECONDS: "Duracion de coroutines decoradas con @timed.",
+    TELEGRAM_DELIVERY_SECONDS: "Latencia encolado -> entrega de mensajes Telegram.",
+}
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+QUANTILES: tuple[float, ...] = (0.5, 0.95, 0.99)
+QUANTILE_WINDOW = 1024
+
+
+class Histogram:
+    """Buckets acumulativos + ventana reciente para cuantiles."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.window: deque[float] = deque(maxlen=QUANTILE_WINDOW)
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, float(value))
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.window.append(value)
+
+    def quantiles(self) -> dict[str, float]:
+        ordered = sorted(self.window)
+        if not ordered:
+            return {}
+        last = len(ordered) - 1
+        return {
+            str(q): ordered[min(last, max(0, int(round(q * last))))]
+            for q in QUANTILES
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative: list[int] = []
+        running = 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "le": list(self.buckets),
+            "buckets": cumulative,
+            "sum": self.total,
+            "count": self.count,
+            "quantiles": self.quantiles(),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, process: str = "python") -> None:
+        self.process = process
+        self._series: dict[str, dict[tuple[tuple[str, str], ...], Histogram]] = {}
+
+    def observe(self, family: str, seconds: float, **labels: Any) -> None:
+        key = tuple(sorted((name, str(value)) for name, value in labels.items()))
+        series = self._series.setdefault(family, {})
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, family: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(family, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "process": self.process,
+            "families": {
+                family: [
+                    {"labels": dict(key), **histogram.snapshot()}
+                    for key, histogram in sorted(series.items())
+                ]
+                for family, series in sorted(self._series.items())
+            },
+        }
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def set_process_name(name: str) -> None:
+    REGISTRY.process = name
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Mapping[str, str], **extra: str) -> str:
+    merged = {**labels, **extra}
+    if not merged:
+        return ""
+    body = ",".join(f'{name}="{_escape(str(value))}"' for name, value in merged.items())
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus(snapshots: Iterable[Mapping[str, Any]]) -> str:
+    """
+    Texto de exposición Prometheus (0.0.4) para uno o más snapshots.
+
+    Cada familia sale como histogram y, aparte, como `<familia>_quantile`
+    (gauge con label `quantile`) calculado sobre la ventana reciente.
+    """
+    families: dict[str, list[tuple[str, Mapping[str, Any]]]] = {}
+    for snapshot in snapshots:
+        process = str(snapshot.get("process") or "unknown")
+        for family, series in (snapshot.get("families") or {}).items():
+            families.setdefault(family, []).extend((process, item) for item in series)
+
+    lines: list[str] = []
+    for family in sorted(families):
+        help_text = HELP.get(family, family)
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} histogram")
+        for process, item in families[family]:
+            labels = {"process": process, **item.get("labels", {})}
+            bounds = [*item["le"], float("inf")]
+            for bound, cumulative in zip(bounds, item["buckets"]):
+                lines.append(f"{family}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+            lines.append(f"{family}_sum{_labels(labels)} {_number(item['sum'])}")
+            lines.append(f"{family}_count{_labels(labels)} {item['count']}")
+        quantile_lines = [
+            f"{family}_quantile"
+            f"{_labels({'process': process, **item.get('labels', {})}, quantile=q)} {_number(v)}"
+            for process, item in families[family]
+            for q, v in (item.get("quantiles") or {}).items()
+        ]
+        if quantile_lines:
+            lines.append(f"# HELP {family}_quantile {help_text} Cuantiles de la ventana reciente.")
+            lines.append(f"# TYPE {family}_quantile gauge")
+            lines.extend(quantile_lines)
+    return "\n".join(lines) + "\n"
+
+
+def instrument_methods(family: str, *, label: str = "method", exclude: Iterable[str] = ()):
+    """Decorador de clase: cronometra cada coroutine pública con `label=<nombre>`."""
+    skipped = set(exclude)
+
+    def decorator(cls):
+        for name, fn in list(vars(cls).items()):
+            if name.startswith("_") or name in skipped or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, name, _timed_method(fn, family, label, name))
+        return cls
+
+    return decorator
+
+
+def _timed_method(fn, family: str, label: str, name: str):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            REGISTRY.observe(family, time.perf_counter() - started, **{label: name})
+
+    return wrapper
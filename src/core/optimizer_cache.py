@@ -0,0 +1,55 @@
+"""Redis-backed store for the last optimizer weights, used as solver warm start."""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.core.redis_client import client as redis_client
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZER_WEIGHTS_KEY = "cocos:optimizer:weights"
+OPTIMIZER_WEIGHTS_TTL_SECONDS = 14 * 24 * 3600
+
+
+def _weights_key(owner_chat_id: Optional[int] = None) -> str:
+    if owner_chat_id is None:
+        return OPTIMIZER_WEIGHTS_KEY
+    return f"{OPTIMIZER_WEIGHTS_KEY}:{int(owner_chat_id)}"
+
+
+async def get_optimizer_warm_start(
+    *,
+    owner_chat_id: Optional[int] = None,
+) -> Optional[dict[str, float]]:
+    try:
+        raw = await redis_client.get(_weights_key(owner_chat_id))
+        if not raw:
+            return None
+        weights = json.loads(raw).get("weights") or {}
+        return {str(ticker): float(value) for ticker, value in weights.items()}
+    except Exception as exc:
+        logger.debug("Redis optimizer warm start ignorado: %s", exc)
+        return None
+
+
+async def cache_optimizer_weights(
+    weights: dict[str, float],
+    *,
+    method: str,
+    owner_chat_id: Optional[int] = None,
+    ttl_seconds: int = OPTIMIZER_WEIGHTS_TTL_SECONDS,
+) -> bool:
+    payload = {
+        "method": method,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+        "weights": {ticker: float(value) for ticker, value in weights.items()},
+    }
+    try:
+        await redis_client.set(_weights_key(owner_chat_id), json.dumps(payload), ex=ttl_seconds)
+        return True
+    except Exception as exc:
+        logger.debug("Redis optimizer weights set ignorado: %s", exc)
+        return False
@@ -10,6 +10,8 @@ from typing import Any
 
 import asyncpg
 
+from src.core.db_pool import connection
+
 
 REPORT_ARTIFACT_VERSION = os.getenv(
     "TELEGRAM_REPORT_ARTIFACT_VERSION",
@@ -83,11 +85,8 @@ def _runner_fingerprint(report_type: str) -> str:
 
 
 async def ensure_report_artifacts_schema(dsn: str) -> None:
-    conn = await asyncpg.connect(_db_url(dsn))
-    try:
+    async with connection(_db_url(dsn)) as conn:
         await conn.execute(REPORT_ARTIFACTS_SCHEMA_SQL)
-    finally:
-        await conn.close()
 
 
 async def read_report_inputs(
@@ -96,8 +95,7 @@ async def read_report_inputs(
     report_type: str,
     owner_chat_id: int,
 ) -> ReportInputs:
-    conn = await asyncpg.connect(_db_url(dsn))
-    try:
+    async with connection(_db_url(dsn)) as conn:
         row = await conn.fetchrow(
             """
             WITH latest_portfolio AS (
@@ -125,8 +123,6 @@ async def read_report_inputs(
             """,
             int(owner_chat_id),
         )
-    finally:
-        await conn.close()
 
     values = dict(row or {})
     payload = {
@@ -165,27 +161,25 @@ async def load_report_artifact(
         report_type=report_type,
         owner_chat_id=owner_chat_id,
     )
-    conn = await asyncpg.connect(_db_url(dsn))
-    try:
-        row = await conn.fetchrow(
-            """
-            SELECT report_text, generated_at, portfolio_at, market_data_at,
-                   candle_data_at, metadata
-            FROM telegram_report_artifacts
-            WHERE report_type = $1
-              AND owner_chat_id = $2
-              AND artifact_version = $3
-              AND input_fingerprint = $4
-            """,
-            str(report_type),
-            int(owner_chat_id),
-            REPORT_ARTIFACT_VERSION,
-            inputs.fingerprint,
-        )
-    except asyncpg.UndefinedTableError:
-        return None
-    finally:
-        await conn.close()
+    async with connection(_db_url(dsn)) as conn:
+        try:
+            row = await conn.fetchrow(
+                """
+                SELECT report_text, generated_at, portfolio_at, market_data_at,
+                       candle_data_at, metadata
+                FROM telegram_report_artifacts
+                WHERE report_type = $1
+                  AND owner_chat_id = $2
+                  AND artifact_version = $3
+                  AND input_fingerprint = $4
+                """,
+                str(report_type),
+                int(owner_chat_id),
+                REPORT_ARTIFACT_VERSION,
+                inputs.fingerprint,
+            )
+        except asyncpg.UndefinedTableError:
+            return None
 
     if not row:
         return None
@@ -210,8 +204,7 @@ async def save_report_artifact(
         report_type=report_type,
         owner_chat_id=owner_chat_id,
     )
-    conn = await asyncpg.connect(_db_url(dsn))
-    try:
+    async with connection(_db_url(dsn)) as conn:
         await conn.execute(
             """
             INSERT INTO telegram_report_artifacts (
@@ -242,8 +235,6 @@ async def save_report_artifact(
             inputs.candle_data_at,
             json.dumps(metadata or {}, ensure_ascii=True),
         )
-    finally:
-        await conn.close()
 
 
 __all__ = [
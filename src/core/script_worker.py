@@ -0,0 +1,399 @@
+"""
+Worker caliente para ejecutar scripts de reportes sin pagar el arranque del
+intérprete en cada comando.
+
+El bot de Telegram lanza un proceso `python -m src.core.script_worker` que
+importa una sola vez pandas/scipy/statsmodels/PyPortfolioOpt/matplotlib/
+yfinance y los módulos del proyecto. Cada comando se ejecuta ahí con
+`runpy.run_path(..., run_name="__main__")`, capturando stdout/stderr y el
+código de salida igual que un subprocess.
+
+Protocolo: una línea JSON por request en stdin (`{"script", "args"}`); el
+worker contesta en el stdout original del proceso con un ack (`{"ack": true}`)
+antes de empezar a correr el script y después con una línea JSON de
+respuesta. El fd 1 se redirige a stderr para que prints de librerías nunca
+rompan el protocolo.
+
+Si el worker muere antes del ack el request nunca empezó y el caller lo
+repite aislado en subprocess. Si muere después del ack, o el script termina
+con una excepción no controlada, el worker se descarta pero la corrida no se
+repite: el script pudo haber escrito en la base o mandado mensajes y
+reintentarlo duplicaría esos efectos.
+"""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+WORKER_START_TIMEOUT_SECONDS = 120
+MAX_CAPTURE_CHARS = 200_000
+STREAM_LIMIT_BYTES = 16 * 1024 * 1024
+
+# Módulos que dominan el arranque de los scripts de reportes.
+WARM_MODULES: tuple[str, ...] = (
+    "numpy",
+    "pandas",
+    "scipy.optimize",
+    "statsmodels.api",
+    "pypfopt",
+    "matplotlib.pyplot",
+    "yfinance",
+    "asyncpg",
+    "httpx",
+    "src.collector.db",
+    "src.analysis.technical",
+    "src.analysis.optimizer",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ScriptRun:
+    returncode: int
+    stdout: str
+    stderr: str
+    elapsed: float
+    crashed: bool = False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lado worker
+# ─────────────────────────────────────────────────────────────────────────────
+
+def preload_modules(modules: Sequence[str] = WARM_MODULES) -> list[str]:
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    loaded: list[str] = []
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception as exc:
+            logger.warning("[WORKER] no pude precargar %s: %s", name, exc)
+            continue
+        loaded.append(name)
+    return loaded
+
+
+class PersistentLoopRunner:
+    """
+    Reemplazo de `asyncio.run` dentro del worker: todas las corridas usan el
+    mismo event loop, así el pool de src.core.db_pool sigue caliente entre
+    comandos. Al terminar cada corrida se cancelan las tasks que dejó el
+    script (salvo las del pool), igual que haría asyncio.run.
+    """
+
+    KEEP_TASK_NAMES = frozenset({"db_pool_keeper"})
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._original_run = asyncio.run
+
+    def run(self, main, *, debug=None, **kwargs):
+        if (
+            threading.current_thread() is not threading.main_thread()
+            or self.loop.is_running()
+            or kwargs
+        ):
+            return self._original_run(main, debug=debug, **kwargs)
+        asyncio.set_event_loop(self.loop)
+        try:
+            return self.loop.run_until_complete(main)
+        finally:
+            self._cancel_leftover_tasks()
+
+    def _cancel_leftover_tasks(self) -> None:
+        leftovers = [
+            task
+            for task in asyncio.all_tasks(self.loop)
+            if not task.done() and task.get_name() not in self.KEEP_TASK_NAMES
+        ]
+        for task in leftovers:
+            task.cancel()
+        if leftovers:
+            self.loop.run_until_complete(asyncio.gather(*leftovers, return_exceptions=True))
+
+    def close(self) -> None:
+        pending = list(asyncio.all_tasks(self.loop))
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+
+
+def _exit_code(code: object, stderr: io.StringIO) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    stderr.write(f"{code}\n")
+    return 1
+
+
+def run_script_in_process(
+    script: str,
+    args: Sequence[str] = (),
+    *,
+    cwd: Path = PROJECT_ROOT,
+    runner: Optional[PersistentLoopRunner] = None,
+) -> ScriptRun:
+    """Ejecuta `script` como `__main__` con el mismo contrato que un subprocess."""
+    script_path = Path(script)
+    if not script_path.is_absolute():
+        script_path = cwd / script_path
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    rc = 0
+    crashed = False
+    t0 = time.time()
+    saved_asyncio_run = asyncio.run
+    sys.argv = [str(script), *args]
+    if runner is not None:
+        asyncio.run = runner.run
+    try:
+        os.chdir(cwd)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            runpy.run_path(str(script_path), run_name="__main__")
+    except SystemExit as exc:
+        rc = _exit_code(exc.code, stderr)
+    except Exception:
+        stderr.write(traceback.format_exc())
+        rc = 1
+        crashed = True
+    finally:
+        asyncio.run = saved_asyncio_run
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    return ScriptRun(
+        returncode=rc,
+        stdout=stdout.getvalue()[-MAX_CAPTURE_CHARS:],
+        stderr=stderr.getvalue()[-MAX_CAPTURE_CHARS:],
+        elapsed=time.time() - t0,
+        crashed=crashed,
+    )
+
+
+def serve(*, preload: bool = True) -> int:
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+    loaded = preload_modules() if preload else []
+    runner = PersistentLoopRunner()
+    protocol.write(json.dumps({"ready": True, "pid": os.getpid(), "preloaded": loaded}) + "\n")
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        protocol.write(json.dumps({"ack": True}) + "\n")
+        result = run_script_in_process(
+            str(request["script"]),
+            [str(arg) for arg in request.get("args") or []],
+            cwd=Path(request.get("cwd") or os.getcwd()),
+            runner=runner,
+        )
+        protocol.write(
+            json.dumps(
+                {
+                    "rc": result.returncode,
+                    "stdout": result.stdout,
+                    "stderr": result.stderr,
+                    "elapsed": result.elapsed,
+                    "crashed": result.crashed,
+                }
+            )
+            + "\n"
+        )
+    runner.close()
+    return 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lado bot
+# ─────────────────────────────────────────────────────────────────────────────
+
+class WarmScriptWorker:
+    """Un proceso worker; ejecuta una corrida por vez."""
+
+    def __init__(
+        self,
+        *,
+        cwd: Path = PROJECT_ROOT,
+        python: str = sys.executable,
+        preload: bool = True,
+    ) -> None:
+        self.cwd = Path(cwd)
+        self.python = python
+        self.preload = preload
+        self._proc: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self) -> None:
+        if self.alive:
+            return
+        args = [self.python, "-m", "src.core.script_worker"]
+        if not self.preload:
+            args.append("--no-preload")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            part for part in (str(PROJECT_ROOT), env.get("PYTHONPATH", "")) if part
+        )
+        self._proc = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=str(self.cwd),
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT_BYTES,
+        )
+        assert self._proc.stdout is not None
+        try:
+            ready = await asyncio.wait_for(
+                self._proc.stdout.readline(),
+                timeout=WORKER_START_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            await self.close()
+            raise RuntimeError("worker caliente no respondió al iniciar")
+        if not ready:
+            await self.close()
+            raise RuntimeError("worker caliente terminó al iniciar")
+        logger.info("[WORKER] listo pid=%s", self._proc.pid)
+
+    async def run(self, script: str, args: Sequence[str], *, timeout: float) -> Optional[ScriptRun]:
+        """
+        Devuelve None si el worker murió antes de confirmar el request (es
+        seguro reintentarlo); si muere después del ack devuelve una corrida
+        `crashed` que no debe repetirse. Levanta asyncio.TimeoutError (con el
+        worker ya terminado) si se pasa del timeout.
+        """
+        await self.start()
+        assert self._proc is not None and self._proc.stdin and self._proc.stdout
+        t0 = time.time()
+        deadline = t0 + timeout
+        request = {"script": script, "args": list(args), "cwd": str(self.cwd)}
+        try:
+            self._proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            await self._proc.stdin.drain()
+            ack = await asyncio.wait_for(self._proc.stdout.readline(), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            await self.close()
+            raise
+        except (BrokenPipeError, ConnectionResetError, ValueError):
+            await self.close()
+            return None
+        if not ack:
+            await self.close()
+            return None
+        try:
+            line = await asyncio.wait_for(
+                self._proc.stdout.readline(),
+                timeout=max(0.0, deadline - time.time()),
+            )
+            payload = json.loads(line) if line else None
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            await self.close()
+            raise
+        except (ConnectionResetError, ValueError):
+            payload = None
+        if not isinstance(payload, dict):
+            await self.close()
+            return ScriptRun(
+                returncode=1,
+                stdout="",
+                stderr="worker caliente murió durante la corrida; no se reintenta para no duplicar efectos",
+                elapsed=time.time() - t0,
+                crashed=True,
+            )
+        return ScriptRun(
+            returncode=int(payload.get("rc") or 0),
+            stdout=str(payload.get("stdout") or ""),
+            stderr=str(payload.get("stderr") or ""),
+            elapsed=time.time() - t0,
+            crashed=bool(payload.get("crashed")),
+        )
+
+    async def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None or proc.returncode is not None:
+            return
+        proc.kill()
+        await proc.wait()
+
+
+class WarmScriptPool:
+    """Pool chico de workers calientes; cada comando toma uno libre."""
+
+    def __init__(self, size: int, **worker_kwargs) -> None:
+        self.size = max(1, int(size))
+        self._worker_kwargs = worker_kwargs
+        self._workers = [WarmScriptWorker(**worker_kwargs) for _ in range(self.size)]
+        self._idle: Optional[asyncio.Queue[WarmScriptWorker]] = None
+
+    def _queue(self) -> asyncio.Queue[WarmScriptWorker]:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+        return self._idle
+
+    async def start(self) -> None:
+        results = await asyncio.gather(
+            *(worker.start() for worker in self._workers),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("[WORKER] no pude iniciar worker caliente: %s", result)
+
+    async def run(self, script: str, args: Sequence[str], *, timeout: float) -> Optional[ScriptRun]:
+        """
+        Corre el script en un worker libre. Devuelve None (worker reciclado)
+        sólo si el worker no llegó a aceptar el request y hay que reintentar
+        aislado; las corridas `crashed` se devuelven tal cual. Los timeouts
+        vuelven como rc=124 igual que en subprocess.
+        """
+        idle = self._queue()
+        worker = await idle.get()
+        t0 = time.time()
+        try:
+            result = await worker.run(script, args, timeout=timeout)
+        except asyncio.TimeoutError:
+            elapsed = time.time() - t0
+            return ScriptRun(124, "", f"Timeout luego de {elapsed:.1f}s", elapsed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[WORKER] %s falló en worker caliente: %s", script, exc)
+            await worker.close()
+            return None
+        finally:
+            idle.put_nowait(worker)
+        if result is None or result.crashed:
+            await worker.close()
+        return result
+
+    async def close(self) -> None:
+        await asyncio.gather(*(worker.close() for worker in self._workers))
+
+
+if __name__ == "__main__":
+    sys.exit(serve(preload="--no-preload" not in sys.argv[1:]))
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import hmac
+import json
 import os
 import re
 import time as time_module
@@ -15,7 +17,6 @@ import asyncpg
 import pyotp
 from aiohttp import web
 
-from src.analysis.audit_scope import ensure_decision_audit_scope_columns
 from src.analysis.corporate_actions import (
     CorporateActionEffect,
     corporate_action_effect_from_row,
@@ -37,10 +38,10 @@ from src.analysis.override_classification import (
     override_opposite_ratio as _override_opposite_ratio,
     override_same_ratio as _override_same_ratio,
 )
-from src.analysis.plan_follow_attribution import ensure_plan_execution_attribution_schema
-from src.analysis.position_hold_audit import ensure_position_hold_audit_schema
 from src.analysis.thesis_shadow_store import MAX_ABS_REALIZED_RETURN_FOR_METRICS
+from src.core.compute_executor import build_loop_lag_watchdog
 from src.core.config import get_config
+from src.core.db_pool import close_pools, get_pool
 from src.core.logger import get_logger, redact_secrets
 from src.core.market_calendar import (
     is_settlement_day,
@@ -48,8 +49,17 @@ from src.core.market_calendar import (
     market_closed_reason,
     market_session_note,
 )
+from src.core.metrics import (
+    HTTP_CACHE_LOOKUP_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    REGISTRY as METRICS,
+    SCHEDULER_METRICS_KEY,
+    render_prometheus,
+    set_process_name,
+)
 from src.core.redis_client import client as redis_client
-from src.collector.schema_migrations import ensure_execution_plan_persistence
+from src.collector.schema_migrations import apply_schema_migrations
+from src.monitor.response_cache import ResponseCache, etag_matches
 
 
 ART_TZ = ZoneInfo("America/Argentina/Buenos_Aires")
@@ -71,6 +81,66 @@ AUTH_WINDOW_SECONDS = int(os.getenv("MONITOR_AUTH_WINDOW_SECONDS", "60"))
 AUTH_MAX_FAILURES = int(os.getenv("MONITOR_AUTH_MAX_FAILURES", "8"))
 TRUST_PROXY_HEADERS = os.getenv("MONITOR_TRUST_PROXY_HEADERS", "false").lower() in {"1", "true", "yes", "y"}
 AUTH_FAILURES: dict[str, deque[float]] = defaultdict(deque)
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("MONITOR_RESPONSE_CACHE_TTL_SECONDS", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("MONITOR_RESPONSE_CACHE_MAX_ENTRIES", "128"))
+
+# Watermarks de las fuentes de cada vista analitica: MIN/MAX resueltos por
+# indice (o tablas chicas), una sola ida a la base por request. Las ediciones
+# in-place que no mueven ninguno (p.ej. status en decision_log) las cubre el
+# TTL de RESPONSE_CACHE_TTL_SECONDS.
+RESPONSE_CACHE_WATERMARKS = {
+    "decisions": "SELECT concat_ws('/', MAX(id), MAX(closed_at)) FROM decision_log",
+    "outcomes": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(outcome_filled_at) FROM decision_log),
+            (SELECT MAX(matured_at) FROM shadow_thesis_outcomes)
+        )
+    """,
+    "broker": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(updated_at) FROM broker_movements),
+            (SELECT MAX(id) FROM broker_fills),
+            (SELECT MAX(synced_at) FROM plan_execution_attribution_sync)
+        )
+    """,
+    # MAX(id) cubre inserts; updated_at/analyzed_at cubren las reescrituras
+    # in-place (outcomes de los HOLD, upsert del analisis causal).
+    "hold_observations": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(id) FROM position_hold_observations),
+            (SELECT MAX(updated_at) FROM position_hold_observations)
+        )
+    """,
+    "shadow_causal": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(id) FROM shadow_thesis_causal_analysis),
+            (SELECT MAX(analyzed_at) FROM shadow_thesis_causal_analysis)
+        )
+    """,
+    "snapshots": "SELECT MAX(scraped_at)::text FROM portfolio_snapshots",
+    # Efectos y eventos se reescriben por upsert: updated_at cubre ambos.
+    "corporate_effects": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(updated_at) FROM corporate_event_instrument_effects),
+            (SELECT MAX(updated_at) FROM corporate_events)
+        )
+    """,
+    "candles": "SELECT MAX(refreshed_at)::text FROM market_candles_canonical WHERE interval = '1d'",
+    "prices": "SELECT MAX(ts)::text FROM market_prices_latest",
+    "learning_shadow": "SELECT MAX(captured_at)::text FROM learning_shadow_runs",
+    "shadow_calibration": """
+        SELECT concat_ws(
+            '/',
+            (SELECT MAX(trained_at) FROM shadow_calibration_runs),
+            (SELECT MAX(id) FROM shadow_calibration_gate_events)
+        )
+    """,
+}
 
 
 def _now_art() -> datetime:
@@ -367,12 +437,30 @@ async def auth_middleware(request: web.Request, handler):
     return await handler(request)
 
 
+def _route_label(request: web.Request) -> str:
+    # Label acotado: la ruta registrada, nunca el path crudo con query/ids.
+    route = request.match_info.route
+    resource = getattr(route, "resource", None)
+    return resource.canonical if resource is not None else "unmatched"
+
+
+def _observe_request(request: web.Request, started: float, status: int) -> None:
+    METRICS.observe(
+        HTTP_REQUEST_SECONDS,
+        time_module.perf_counter() - started,
+        route=_route_label(request),
+        method=request.method,
+        status=str(status),
+    )
+
+
 @web.middleware
 async def request_metrics_middleware(request: web.Request, handler):
     started = time_module.perf_counter()
     try:
         response = await handler(request)
     except web.HTTPException as exc:
+        _observe_request(request, started, exc.status)
         elapsed_ms = (time_module.perf_counter() - started) * 1000
         logger.info(
             "[API] method=%s path=%s status=%s duration_ms=%.1f bytes=%s",
@@ -384,6 +472,7 @@ async def request_metrics_middleware(request: web.Request, handler):
         )
         raise
     except Exception:
+        _observe_request(request, started, 500)
         elapsed_ms = (time_module.perf_counter() - started) * 1000
         logger.exception(
             "[API] method=%s path=%s status=500 duration_ms=%.1f",
@@ -393,6 +482,7 @@ async def request_metrics_middleware(request: web.Request, handler):
         )
         raise
 
+    _observe_request(request, started, response.status)
     elapsed_ms = (time_module.perf_counter() - started) * 1000
     response_body = getattr(response, "body", None)
     response_bytes = (
@@ -656,6 +746,72 @@ async def _load_ingestion_payload(pool: asyncpg.Pool) -> dict:
     }
 
 
+async def _data_watermark(pool: asyncpg.Pool, sources: tuple[str, ...]) -> tuple:
+    columns = ", ".join(
+        f"({RESPONSE_CACHE_WATERMARKS[name].strip()}) AS {name}" for name in sources
+    )
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(f"SELECT {columns}")
+    return tuple(row[name] for name in sources)
+
+
+def cached_response(*sources: str):
+    """Sirve la vista desde `app["response_cache"]` mientras sus watermarks no cambien.
+
+    Requests concurrentes con el mismo endpoint + query comparten una sola
+    computacion; `If-None-Match` con el ETag vigente responde 304 sin body.
+    """
+    unknown = set(sources) - RESPONSE_CACHE_WATERMARKS.keys()
+    if unknown:
+        raise ValueError(f"watermarks desconocidos: {sorted(unknown)}")
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request: web.Request) -> web.Response:
+            cache: ResponseCache | None = request.app.get("response_cache")
+            if cache is None:
+                return await handler(request)
+            started = time_module.perf_counter()
+            try:
+                watermark = await _data_watermark(request.app["pool"], sources)
+            except (asyncpg.PostgresError, OSError) as exc:
+                logger.warning("[API] cache sin watermark path=%s: %s", request.path, exc)
+                return await handler(request)
+
+            async def compute() -> tuple[int, bytes]:
+                response = await handler(request)
+                return response.status, response.body
+
+            key = (request.path, tuple(sorted(request.query.items())))
+            cached, outcome = await cache.get_or_compute(key, watermark, compute)
+            if cached.status == 200 and etag_matches(request.headers.get("If-None-Match", ""), cached.etag):
+                outcome = "not_modified"
+                response = web.Response(status=304)
+            else:
+                response = web.Response(
+                    body=cached.body,
+                    status=cached.status,
+                    content_type="application/json",
+                    charset="utf-8",
+                )
+                response.enable_compression()
+            response.headers["ETag"] = cached.etag
+            # security_headers_middleware pone no-store; aca el browser puede
+            # guardar la respuesta pero debe revalidarla con If-None-Match.
+            response.headers["Cache-Control"] = "private, no-cache"
+            METRICS.observe(
+                HTTP_CACHE_LOOKUP_SECONDS,
+                time_module.perf_counter() - started,
+                route=_route_label(request),
+                outcome=outcome,
+            )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
 async def candles(request: web.Request) -> web.Response:
     pool: asyncpg.Pool = request.app["pool"]
     now = _now_art()
@@ -672,10 +828,10 @@ async def candles(request: web.Request) -> web.Response:
                 WHERE (ts AT TIME ZONE 'America/Argentina/Buenos_Aires')::date = latest_price_day.day
             ),
             candle_assets AS (
-                SELECT COUNT(DISTINCT ticker) AS n
-                FROM market_candles, latest_price_day
-                WHERE (ts AT TIME ZONE 'UTC')::date = latest_price_day.day
-                  AND source = 'internal_snapshot'
+                SELECT COUNT(*) AS n
+                FROM market_candles_canonical, latest_price_day
+                WHERE interval = '1d'
+                  AND candle_day = latest_price_day.day
             )
             SELECT
                 latest_price_day.day AS business_day,
@@ -686,14 +842,14 @@ async def candles(request: web.Request) -> web.Response:
         """)
         recent = await conn.fetch("""
             SELECT
-                (ts AT TIME ZONE 'UTC')::date AS business_day,
+                candle_day AS business_day,
                 COUNT(*) AS rows,
                 COUNT(DISTINCT ticker) AS tickers,
                 MIN(ts) AS min_ts,
                 MAX(ts) AS max_ts
-            FROM market_candles
-            WHERE ts >= NOW() - INTERVAL '14 days'
-              AND source = 'internal_snapshot'
+            FROM market_candles_canonical
+            WHERE interval = '1d'
+              AND candle_day >= CURRENT_DATE - 14
             GROUP BY 1
             ORDER BY 1 DESC
             LIMIT 10
@@ -718,7 +874,6 @@ async def decisions(request: web.Request) -> web.Response:
     days = max(1, min(int(request.query.get("days", "90")), 365))
     pool: asyncpg.Pool = request.app["pool"]
     async with pool.acquire() as conn:
-        await ensure_decision_audit_scope_columns(conn)
         summary = await conn.fetchrow("""
             SELECT
                 COUNT(*) AS total,
@@ -892,14 +1047,11 @@ async def portfolio_view(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("decisions", "outcomes", "broker", "hold_observations", "shadow_causal")
 async def performance_view(request: web.Request) -> web.Response:
     days = max(7, min(int(request.query.get("days", "180")), 365))
     pool: asyncpg.Pool = request.app["pool"]
     async with pool.acquire() as conn:
-        await ensure_decision_audit_scope_columns(conn)
-        await ensure_plan_execution_attribution_schema(conn)
-        await ensure_execution_plan_persistence(conn)
-        await ensure_position_hold_audit_schema(conn)
         perf_base_cte = """
             WITH fill_link AS (
                 SELECT
@@ -1625,12 +1777,12 @@ async def performance_view(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("decisions", "broker", "prices", "snapshots", "corporate_effects")
 async def override_audit(request: web.Request) -> web.Response:
     days = max(7, min(int(request.query.get("days", "90")), 365))
     match_window_days = max(1, min(int(request.query.get("match_window_days", "2")), 10))
     pool: asyncpg.Pool = request.app["pool"]
     async with pool.acquire() as conn:
-        await ensure_decision_audit_scope_columns(conn)
         rows = await conn.fetch("""
             WITH decision_base AS (
                 SELECT
@@ -1850,6 +2002,7 @@ async def override_audit(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("decisions", "outcomes", "broker", "candles", "prices")
 async def decision_ledger(request: web.Request) -> web.Response:
     days = max(7, min(int(request.query.get("days", "90")), 365))
     match_window_days = max(1, min(int(request.query.get("match_window_days", "2")), 10))
@@ -1901,11 +2054,11 @@ async def audit_timeline(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("decisions", "candles")
 async def radar_audit(request: web.Request) -> web.Response:
     days = max(7, min(int(request.query.get("days", "90")), 365))
     pool: asyncpg.Pool = request.app["pool"]
     async with pool.acquire() as conn:
-        await ensure_decision_audit_scope_columns(conn)
         rows = await conn.fetch("""
             WITH radar AS (
                 SELECT
@@ -2001,16 +2154,16 @@ async def radar_audit(request: web.Request) -> web.Response:
             LEFT JOIN LATERAL (
                 WITH candles AS (
                     SELECT
-                        ts::date AS day,
+                        candle_day AS day,
                         close_price::float AS close_price,
                         high_price::float AS high_price,
                         low_price::float AS low_price
-                    FROM market_candles
+                    FROM market_candles_canonical
                     WHERE ticker = r.ticker
-                      AND ts::date >= r.audit_start_day
-                      AND ts::date <= r.audit_start_day + 20
+                      AND interval = '1d'
+                      AND candle_day BETWEEN r.audit_start_day AND r.audit_start_day + 20
                       AND close_price IS NOT NULL
-                    ORDER BY ts ASC
+                    ORDER BY candle_day ASC
                 )
                 SELECT
                     (SELECT close_price FROM candles WHERE day >= r.audit_start_day + 2 LIMIT 1) AS price_2d,
@@ -2611,6 +2764,7 @@ async def learning_shadow_view(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("learning_shadow")
 async def learning_shadow_v2_view(request: web.Request) -> web.Response:
     """Population-separated counterfactual evidence; never feeds analysis."""
     days = max(30, min(int(request.query.get("days", "365")), 730))
@@ -2891,7 +3045,7 @@ async def learning_shadow_v2_view(request: web.Request) -> web.Response:
         ),
         "boundary": {
             "reads": [
-                "decision_log", "market_candles",
+                "decision_log", "market_candles_canonical",
                 "shadow_thesis_forecasts", "shadow_thesis_outcomes",
             ],
             "writes": [
@@ -3048,6 +3202,7 @@ async def shadow_view(request: web.Request) -> web.Response:
     })
 
 
+@cached_response("shadow_calibration", "outcomes")
 async def shadow_calibration_view(request: web.Request) -> web.Response:
     """Read-only v3 calibration gates and out-of-sample evidence."""
     try:
@@ -3244,6 +3399,21 @@ SECRET_PATTERNS: list[tuple[re.Pattern[str], str]] = [
 ]
 
 
+async def metrics(_request: web.Request) -> web.Response:
+    """Histogramas del monitor y del último snapshot publicado por el scheduler."""
+    snapshots = [METRICS.snapshot()]
+    raw = await _redis_get(SCHEDULER_METRICS_KEY)
+    if raw:
+        try:
+            snapshots.append(json.loads(raw.decode() if isinstance(raw, bytes) else raw))
+        except (TypeError, ValueError) as exc:
+            logger.warning("Snapshot de métricas del scheduler ilegible: %s", exc)
+    return web.Response(
+        body=render_prometheus(snapshots).encode("utf-8"),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+    )
+
+
 def _redact(line: str) -> str:
     out = redact_secrets(line)
     for pattern, replacement in SECRET_PATTERNS:
@@ -3276,11 +3446,8 @@ async def logs_recent(request: web.Request) -> web.Response:
 
 async def create_app() -> web.Application:
     cfg = get_config()
-    pool = await asyncpg.create_pool(
-        cfg.database.url.replace("postgresql+asyncpg://", "postgresql://"),
-        min_size=1,
-        max_size=4,
-    )
+    pool = await get_pool(cfg.database.url)
+    set_process_name("monitor_api")
 
     app = web.Application(
         middlewares=[
@@ -3293,6 +3460,10 @@ async def create_app() -> web.Application:
     app["pool"] = pool
     app["ingestion_cache"] = {}
     app["ingestion_cache_lock"] = asyncio.Lock()
+    app["response_cache"] = ResponseCache(
+        ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+        max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    )
     app["index_html"] = (STATIC_DIR / "index.html").read_text(encoding="utf-8")
     app.router.add_get("/", index)
     app.router.add_get("/api/auth/status", auth_status)
@@ -3313,10 +3484,30 @@ async def create_app() -> web.Application:
     app.router.add_get("/api/corporate-actions", corporate_actions_view)
     app.router.add_get("/api/fills", fills)
     app.router.add_get("/api/logs/recent", logs_recent)
+    app.router.add_get("/api/metrics", metrics)
+
+    async def start_loop_watchdog(app_: web.Application) -> None:
+        app_["loop_watchdog_task"] = asyncio.create_task(
+            build_loop_lag_watchdog().run(),
+            name="monitor_loop_lag_watchdog",
+        )
+
+    async def stop_loop_watchdog(app_: web.Application) -> None:
+        task = app_.get("loop_watchdog_task")
+        if task is not None:
+            task.cancel()
 
     async def close_pool(app_: web.Application) -> None:
-        await app_["pool"].close()
+        await close_pools()
+
+    async def run_schema_migrations(app_: web.Application) -> None:
+        # Unico punto con DDL: los handlers de lectura asumen el schema listo.
+        async with app_["pool"].acquire() as conn:
+            await apply_schema_migrations(conn)
 
+    app.on_startup.append(run_schema_migrations)
+    app.on_startup.append(start_loop_watchdog)
+    app.on_cleanup.append(stop_loop_watchdog)
     app.on_cleanup.append(close_pool)
     return app
 
@@ -0,0 +1,95 @@
+"""Cache de respuestas del monitor invalidado por watermarks de datos.
+
+Cada entrada se indexa por endpoint + query y guarda el watermark con el que
+se calculó (máximos baratos de decision_log, outcomes, movimientos y velas).
+Si el watermark no cambió y la entrada no venció el TTL de seguridad, se
+sirve el body ya serializado; requests concurrentes con la misma clave
+comparten una sola computación (single-flight).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    status: int
+    body: bytes
+    etag: str
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Hashable, float, CachedBody]] = OrderedDict()
+        self._inflight: dict[tuple[Hashable, Hashable], asyncio.Task] = {}
+
+    def lookup(self, key: Hashable, watermark: Hashable) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_watermark, stored_at, cached = entry
+        if stored_watermark != watermark or self._clock() - stored_at >= self.ttl_seconds:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return cached
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        watermark: Hashable,
+        compute: Callable[[], Awaitable[tuple[int, bytes]]],
+    ) -> tuple[CachedBody, str]:
+        """Devuelve (body, outcome) con outcome en hit | miss | shared."""
+        cached = self.lookup(key, watermark)
+        if cached is not None:
+            return cached, "hit"
+
+        flight = (key, watermark)
+        task = self._inflight.get(flight)
+        if task is not None:
+            return await asyncio.shield(task), "shared"
+
+        # La computación corre en su propia task: si el cliente que la disparó
+        # corta la conexión, los demás tabs siguen esperando el mismo resultado.
+        task = asyncio.ensure_future(self._compute(key, watermark, compute))
+        self._inflight[flight] = task
+        task.add_done_callback(lambda _t: self._inflight.pop(flight, None))
+        return await asyncio.shield(task), "miss"
+
+    async def _compute(self, key, watermark, compute) -> CachedBody:
+        status, body = await compute()
+        cached = CachedBody(status=status, body=body, etag=make_etag(body))
+        if status == 200:
+            self._entries[key] = (watermark, self._clock(), cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {item.strip() for item in (if_none_match or "").split(",") if item.strip()}
+    # Los proxies con compresión pueden reescribir el ETag como débil.
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -43,6 +43,11 @@ from typing import Any
 from zoneinfo import ZoneInfo
 
 try:
+    from apscheduler.events import (
+        EVENT_JOB_ERROR,
+        EVENT_JOB_EXECUTED,
+        EVENT_JOB_SUBMITTED,
+    )
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
     from apscheduler.triggers.cron import CronTrigger
     from apscheduler.triggers.interval import IntervalTrigger
@@ -50,9 +55,27 @@ try:
 except ImportError:
     HAS_APSCHEDULER = False
 
+from src.core.compute_executor import (
+    LoopLagWatchdog,
+    build_loop_lag_watchdog,
+    get_compute_executor,
+    run_cpu,
+)
 from src.core.config import get_config
 from src.core.logger import get_logger
 from src.core.market_calendar import is_trading_day, market_closed_reason
+from src.core.metrics import (
+    JOB_SECONDS,
+    LOOP_ITERATION_SECONDS,
+    REGISTRY as METRICS,
+    SCHEDULER_METRICS_KEY,
+    set_process_name,
+)
+from src.core.market_price_cache import (
+    MARKET_PRICES_CACHE_MAX_AGE_SECONDS,
+    cache_latest_market_prices,
+    get_cached_latest_market_prices,
+)
 from src.core.portfolio_cache import (
     cache_live_portfolio,
     cache_portfolio_snapshot,
@@ -70,7 +93,6 @@ from src.collector.cocos_scraper import (
     CocosAuthenticationError,
     CocosCapitalScraper,
 )
-from src.collector.cocos_history import candles_to_frame
 from src.collector.db import PortfolioDatabase
 from src.collector.broker_movements import BrokerMovement, broker_fills_from_movements
 from src.collector.live_portfolio import (
@@ -81,6 +103,7 @@ from src.collector.live_portfolio import (
     select_portfolio_move_alerts,
 )
 from src.collector.notifier import TelegramNotifier
+from src.collector.telegram_delivery import get_telegram_delivery
 from src.core.telegram_format import header as tg_header, note as tg_note, section as tg_section
 from src.analysis.manual_market_events import active_event_risk_by_ticker
 from src.analysis.corporate_actions import (
@@ -91,6 +114,8 @@ from src.analysis.corporate_actions import (
 )
 from src.analysis.preclose_alerts import build_preclose_alerts, render_preclose_alerts
 from src.analysis.signal_aggregator import load_sentiment_contexts
+from src.analysis.stats_cache import advance_rolling_moments, invalidate_analysis_stats
+from src.analysis.streaming_indicators import StreamingIndicatorBook
 
 logger = get_logger(__name__)
 
@@ -104,7 +129,9 @@ BUSINESS_DAY_CRON = "mon-fri"
 MARKET_OPEN_H, MARKET_OPEN_M = 10, 30
 MARKET_CLOSE_H, MARKET_CLOSE_M = 17, 0
 
-RISK_POLL_SECONDS = 60         # frecuencia del risk guard
+RISK_POLL_SECONDS = 60         # poll de respaldo del risk guard (sin NOTIFY)
+RISK_NOTIFY_DEBOUNCE_SECONDS = float(os.getenv("RISK_NOTIFY_DEBOUNCE_SECONDS", "0.25"))
+RISK_REFERENCE_REFRESH_SECONDS = int(os.getenv("RISK_REFERENCE_REFRESH_SECONDS", "300"))
 PORTFOLIO_REFRESH_SECONDS = int(os.getenv("PORTFOLIO_REFRESH_SECONDS", "600"))
 PORTFOLIO_OFFHOURS_REFRESH_SECONDS = 3600
 PORTFOLIO_REFRESH_REQUEST_POLL_SECONDS = float(
@@ -126,6 +153,9 @@ INTRADAY_REVALIDATION_MAX_PRICE_AGE_SECONDS = int(os.getenv("INTRADAY_REVALIDATI
 INTRADAY_REVALIDATION_LOOKBACK_DAYS = int(os.getenv("INTRADAY_REVALIDATION_LOOKBACK_DAYS", "7"))
 INTRADAY_REVALIDATION_TTL_SECONDS = int(os.getenv("INTRADAY_REVALIDATION_TTL_SECONDS", "21600"))
 INTRADAY_REVALIDATION_MAX_PER_MESSAGE = int(os.getenv("INTRADAY_REVALIDATION_MAX_PER_MESSAGE", "3"))
+INTRADAY_STREAMING_INDICATORS_ENABLED = (
+    os.getenv("INTRADAY_STREAMING_INDICATORS_ENABLED", "true").lower() == "true"
+)
 RISK_ALERT_TTL_SECONDS = int(os.getenv("RISK_ALERT_TTL_SECONDS", "21600"))
 RISK_ALERT_MAX_PER_DIGEST = int(os.getenv("RISK_ALERT_MAX_PER_DIGEST", "8"))
 STOP_TRIGGERED_ALERT_TTL_SECONDS = int(os.getenv("STOP_TRIGGERED_ALERT_TTL_SECONDS", "86400"))
@@ -205,6 +235,7 @@ MARKET_HEARTBEAT_KEY = "cocos:monitor:market:last_tick"
 RISK_HEARTBEAT_KEY = "cocos:monitor:risk:last_check"
 MONITOR_STATE_KEY = "cocos:monitor:state"
 SCHEDULER_HEARTBEAT_KEY = "cocos:scheduler:last_heartbeat"
+SCHEDULER_COMPUTE_STATS_KEY = "cocos:scheduler:compute_stats"
 BOT_BUSY_KEY = "cocos:bot:busy"
 PORTFOLIO_ALERT_KEY_PREFIX = "cocos:portfolio:alert"
 INTRADAY_REVALIDATION_KEY_PREFIX = "cocos:intraday:revalidation"
@@ -223,6 +254,8 @@ SEVERE_OFFHOURS_TERMS = {
 _scraper_lock: asyncio.Lock | None = None
 _intraday_manager: "IntradayManager | None" = None
 _last_sentiment_run_at: datetime | None = None
+_loop_watchdog: LoopLagWatchdog | None = None
+_job_started_at: dict[str, float] = {}
 
 
 # ─── Helpers generales ─────────────────────────────────────────────────────────
@@ -443,12 +476,50 @@ async def _heartbeat(key: str) -> None:
     await _redis_set(key, str(int(datetime.now(tz=UTC).timestamp())))
 
 
+def _compute_stats_payload() -> dict[str, Any]:
+    return {
+        "ts": int(datetime.now(tz=UTC).timestamp()),
+        "loop_lag": _loop_watchdog.snapshot() if _loop_watchdog is not None else None,
+        "stages": get_compute_executor().snapshot(),
+    }
+
+
+async def _run_schema_migrations() -> None:
+    """Fase de arranque: despues de esto los ensure_* de los jobs no emiten DDL."""
+    db = PortfolioDatabase(get_config().database.url)
+    try:
+        await db.connect()
+        await db.run_schema_migrations()
+    except Exception as exc:
+        logger.warning("Schema migrations no aplicadas al arranque: %s", exc)
+    finally:
+        await db.close()
+
+
 async def _scheduler_heartbeat_loop() -> None:
     while True:
         await _heartbeat(SCHEDULER_HEARTBEAT_KEY)
+        await _redis_set(SCHEDULER_COMPUTE_STATS_KEY, json.dumps(_compute_stats_payload()))
+        await _redis_set(SCHEDULER_METRICS_KEY, json.dumps(METRICS.snapshot()))
         await asyncio.sleep(30)
 
 
+def _on_job_event(event) -> None:
+    """Listener de APScheduler: duración submit→fin de cada job."""
+    if event.code == EVENT_JOB_SUBMITTED:
+        _job_started_at[event.job_id] = time.perf_counter()
+        return
+    started = _job_started_at.pop(event.job_id, None)
+    if started is None:
+        return
+    METRICS.observe(
+        JOB_SECONDS,
+        time.perf_counter() - started,
+        job=event.job_id,
+        status="error" if getattr(event, "exception", None) else "ok",
+    )
+
+
 async def _set_monitor_state(state: str) -> None:
     await _redis_set(MONITOR_STATE_KEY, state)
 
@@ -523,18 +594,19 @@ async def run_scrape(run_type: str = "SCHEDULED") -> dict:
                 snapshot.confidence_score,
                 f"{snapshot.total_value_ars:,.0f}",
             )
-            notifier.notify_scrape_complete(
+            await asyncio.to_thread(
+                notifier.notify_scrape_complete,
                 total_ars=float(snapshot.total_value_ars),
                 positions_count=len(snapshot.positions),
                 confidence=snapshot.confidence_score,
                 cash_ars=float(snapshot.cash_ars),
             )
             if snapshot.positions:
-                notifier.send_snapshot_json(snapshot.to_dict())
+                await asyncio.to_thread(notifier.send_snapshot_json, snapshot.to_dict())
 
         except Exception as e:
             logger.error("run_scrape [%s] falló: %s", run_type, e, exc_info=True)
-            notifier.notify_critical_error(run_type, str(e))
+            await asyncio.to_thread(notifier.notify_critical_error, run_type, str(e))
             result["error"] = str(e)
         finally:
             await _redis_delete(SCRAPER_LOCK_KEY)
@@ -825,7 +897,7 @@ async def run_full(run_type: str = "FULL") -> dict:
                         run_type,
                         exc_info=True,
                     )
-                    notifier.send_raw(
+                    await notifier.send_raw_async(
                         "⚠️ Cocos portfolio no refrescó tras 2 intentos en "
                         f"{escape(run_type)}. Sigo guardando mercado/fills; no se inventa snapshot nuevo."
                     )
@@ -858,7 +930,7 @@ async def run_full(run_type: str = "FULL") -> dict:
                         )
                         if new_movements:
                             try:
-                                attribution_summary = await db.sync_plan_execution_attributions()
+                                attribution_summary = await db.sync_plan_execution_attributions(incremental=True)
                                 logger.info("run_full: plan-follow=%s", attribution_summary)
                             except Exception as exc:
                                 logger.warning(
@@ -871,7 +943,7 @@ async def run_full(run_type: str = "FULL") -> dict:
                                 db,
                                 [movement.ticker for movement in new_movements],
                             )
-                            notifier.send_raw(
+                            await notifier.send_raw_async(
                                 _render_new_movements_notice(
                                     new_movements,
                                     portfolio_refreshed=snapshot is not None,
@@ -911,14 +983,16 @@ async def run_full(run_type: str = "FULL") -> dict:
                 len(acciones),
                 len(cedears),
             )
-            (snapshot is not None) and notifier.notify_scrape_complete(
-                total_ars=float(snapshot.total_value_ars),
-                positions_count=len(snapshot.positions),
-                confidence=snapshot.confidence_score,
-                cash_ars=float(snapshot.cash_ars),
-            )
-            notifier.send_raw(
-                f"📊 Mercado EOD: {len(acciones)} acciones · {len(cedears)} CEDEARs guardados."
+            if snapshot is not None:
+                await asyncio.to_thread(
+                    notifier.notify_scrape_complete,
+                    total_ars=float(snapshot.total_value_ars),
+                    positions_count=len(snapshot.positions),
+                    confidence=snapshot.confidence_score,
+                    cash_ars=float(snapshot.cash_ars),
+                )
+            await notifier.send_raw_async(
+                f"📊 Mercado EOD: {len(acciones)} acciones · {len(cedears)} CEDEARs guardados.",
             )
 
             # Análisis técnico — no crítico, fallo no afecta el resultado principal
@@ -931,27 +1005,34 @@ async def run_full(run_type: str = "FULL") -> dict:
                     from src.analysis.macro import fetch_macro
                     from src.analysis.signal_aggregator import load_top_sentiment_events
                     frames = await _load_canonical_history_frames(db, snapshot.positions)
-                    signals = analyze_portfolio_from_frames(frames)
-                    macro_snapshot = fetch_macro()
+                    signals = await run_cpu(
+                        "eod_indicators",
+                        analyze_portfolio_from_frames,
+                        frames,
+                        kind="process",
+                    )
+                    macro_snapshot = await run_cpu("eod_macro", fetch_macro)
                     sentiment_events = []
                     pool = await db.get_pool()
                     if pool:
                         async with pool.acquire() as conn:
                             sentiment_events = await load_top_sentiment_events(conn, limit=3)
-                    report = build_telegram_report(
+                    report = await run_cpu(
+                        "eod_report",
+                        build_telegram_report,
                         signals,
                         float(snapshot.total_value_ars),
                         macro_snapshot=macro_snapshot,
                         sentiment_events=sentiment_events,
                     )
-                    notifier.send_raw(report)
+                    await notifier.send_raw_async(report)
                     logger.info("Análisis técnico: %d señales enviadas", len(signals))
                 except Exception as e:
                     logger.warning("Análisis técnico falló (no crítico): %s", e)
 
         except Exception as e:
             logger.error("run_full [%s] falló: %s", run_type, e, exc_info=True)
-            notifier.notify_critical_error(run_type, str(e))
+            await asyncio.to_thread(notifier.notify_critical_error, run_type, str(e))
             result["error"] = str(e)
         finally:
             await _redis_delete(SCRAPER_LOCK_KEY)
@@ -1034,7 +1115,7 @@ async def run_opening_portfolio_report(run_type: str = "10:31_OPENING_PORTFOLIO"
                 "APERTURA - PRECIOS AUN NO DISPONIBLES"
                 if warning else "APERTURA DE MERCADO - PORTFOLIO ACTUALIZADO"
             )
-            notifier.send_raw(render_opening_portfolio_report(live_portfolio, title=title))
+            await notifier.send_raw_async(render_opening_portfolio_report(live_portfolio, title=title))
             result.update(
                 success=True,
                 positions=len(snapshot_payload.get("positions") or []),
@@ -1050,7 +1131,7 @@ async def run_opening_portfolio_report(run_type: str = "10:31_OPENING_PORTFOLIO"
             await db.close()
     except Exception as e:
         logger.error("run_opening_portfolio_report [%s] falló: %s", run_type, e, exc_info=True)
-        notifier.notify_critical_error(run_type, str(e))
+        await asyncio.to_thread(notifier.notify_critical_error, run_type, str(e))
         result["error"] = str(e)
 
     return result
@@ -1061,8 +1142,17 @@ async def _latest_prices_with_previous_close(
     tickers: list,
     today: date,
 ) -> list[dict]:
-    latest_prices = await db.get_latest_market_prices()
     wanted = {str(t or "").upper() for t in tickers if str(t or "").strip()}
+    # El mirror Redis de market_prices_latest evita el round-trip a la DB en
+    # cada vuelta del loop live; si esta caido, le faltan tickers o los que
+    # tiene se espejaron hace mas de MARKET_PRICES_CACHE_MAX_AGE_SECONDS, se
+    # lee la tabla (y se re-espeja).
+    latest_prices = await get_cached_latest_market_prices(
+        max_age_seconds=MARKET_PRICES_CACHE_MAX_AGE_SECONDS,
+    )
+    if not latest_prices or not wanted <= {str(row.get("ticker") or "").upper() for row in latest_prices}:
+        latest_prices = await db.get_latest_market_prices()
+        await cache_latest_market_prices(latest_prices)
     previous_closes = await db.get_previous_candle_closes(
         list(wanted),
         before_day=today,
@@ -1264,7 +1354,7 @@ async def run_post_open_portfolio_report(run_type: str = "10:45_POST_OPEN_PORTFO
             "POST OPEN - PRECIOS INSUFICIENTES"
             if warning else "POST OPEN - PORTFOLIO ACTUALIZADO"
         )
-        notifier.send_raw(render_opening_portfolio_report(live_portfolio, title=title))
+        await notifier.send_raw_async(render_opening_portfolio_report(live_portfolio, title=title))
         result.update(
             success=not bool(warning),
             warning=warning,
@@ -1281,7 +1371,7 @@ async def run_post_open_portfolio_report(run_type: str = "10:45_POST_OPEN_PORTFO
         )
     except Exception as e:
         logger.error("run_post_open_portfolio_report [%s] fallo: %s", run_type, e, exc_info=True)
-        notifier.notify_critical_error(run_type, str(e))
+        await asyncio.to_thread(notifier.notify_critical_error, run_type, str(e))
         result["error"] = str(e)
     finally:
         await db.close()
@@ -1338,17 +1428,20 @@ async def _load_canonical_history_frames(
             str(row.get("ticker", "") or "").upper(): row
             for row in await db.get_latest_market_prices()
         }
+    asset_types: dict[str, str | None] = {}
     for position in positions:
         ticker = str(getattr(position, "ticker", "") or "").upper()
-        asset_type = getattr(getattr(position, "asset_type", None), "value", None)
-        if not ticker:
-            continue
-        rows = await db.get_market_candles(
-            ticker,
-            asset_type=asset_type,
-            limit=limit,
-        )
-        frame = candles_to_frame(rows)
+        if ticker:
+            asset_types.setdefault(
+                ticker,
+                getattr(getattr(position, "asset_type", None), "value", None),
+            )
+    if not asset_types:
+        return frames
+    loaded = await db.get_market_candles_bulk(
+        list(asset_types), asset_types, limit, adjusted=True,
+    )
+    for ticker, frame in loaded.items():
         frame = _overlay_latest_market_price(frame, latest_prices.get(ticker))
         if len(frame) >= 60:
             frames[ticker] = frame
@@ -1444,6 +1537,19 @@ async def run_build_daily_candles() -> None:
         await db.connect()
         saved = await db.build_daily_candles_from_market_prices()
         logger.info("build_daily_candles: %s velas internas guardadas", saved)
+        if saved:
+            await advance_rolling_moments(db)
+            await invalidate_analysis_stats("build_daily_candles")
+            # La vela post-evento de un split recien llega aca: nueva version
+            # del ajuste y outcomes de esos tickers recalculados en bloque.
+            changed = await db.refresh_candle_adjustments(reason="build_daily_candles")
+            if changed:
+                recomputed = await db.recompute_outcomes(tickers=list(changed))
+                logger.info(
+                    "build_daily_candles: ajuste de velas versionado %s, %d outcomes recalculados",
+                    changed,
+                    recomputed,
+                )
     except Exception as e:
         logger.error("build_daily_candles fallo: %s", e, exc_info=True)
     finally:
@@ -1520,7 +1626,7 @@ async def run_verify_decision_prices() -> None:
         if total and missing:
             msg = f"decision_price_status: {missing}/{total} decisiones de hoy sin price_at_decision"
             logger.warning(msg)
-            notifier.send_raw(f"ADVERTENCIA: {msg}")
+            await notifier.send_raw_async(f"ADVERTENCIA: {msg}")
         else:
             logger.info(
                 "decision_price_status OK: %s decisiones, %s sin precio",
@@ -1562,7 +1668,8 @@ async def run_daily_analysis() -> None:
                 proc.returncode,
                 err[-2000:],
             )
-            notifier.notify_critical_error(
+            await asyncio.to_thread(
+                notifier.notify_critical_error,
                 "daily_analysis",
                 err[-1200:] or f"run_analysis.py rc={proc.returncode}",
             )
@@ -1636,10 +1743,12 @@ async def run_daily_analysis() -> None:
                 logger.warning("daily_radar prewarm fallo: %s", exc)
     except asyncio.TimeoutError:
         logger.error("daily_analysis timeout")
-        notifier.notify_critical_error("daily_analysis", "Timeout ejecutando run_analysis.py")
+        await asyncio.to_thread(
+            notifier.notify_critical_error, "daily_analysis", "Timeout ejecutando run_analysis.py",
+        )
     except Exception as e:
         logger.error("daily_analysis fallo: %s", e, exc_info=True)
-        notifier.notify_critical_error("daily_analysis", str(e))
+        await asyncio.to_thread(notifier.notify_critical_error, "daily_analysis", str(e))
 
     await run_verify_decision_prices()
 
@@ -1788,7 +1897,7 @@ async def run_preclose_alerts(slot: str = "16:45") -> dict:
         snapshot = await db.get_latest_snapshot()
         if not snapshot:
             logger.warning("preclose_alerts [%s]: sin snapshot de portfolio", slot)
-            notifier.send_raw(
+            await notifier.send_raw_async(
                 f"⚠️ Pre-cierre {escape(slot)}: no hay snapshot de portfolio. No genero alertas."
             )
             result["error"] = "missing_snapshot"
@@ -1801,7 +1910,7 @@ async def run_preclose_alerts(slot: str = "16:45") -> dict:
                 slot,
                 age_seconds,
             )
-            notifier.send_raw(
+            await notifier.send_raw_async(
                 f"⚠️ Pre-cierre {escape(slot)}: portfolio stale/no confiable. "
                 "No genero alertas predictivas con cartera vieja."
             )
@@ -1844,7 +1953,9 @@ async def run_preclose_alerts(slot: str = "16:45") -> dict:
         invested = sum(float(position.get("market_value", 0) or 0) for position in positions)
         cash_ars = max(float(snapshot.get("cash_ars", 0) or 0), 0.0)
         total_ars = invested + cash_ars
-        alerts = build_preclose_alerts(
+        alerts = await run_cpu(
+            "preclose_alerts",
+            build_preclose_alerts,
             positions=positions,
             latest_prices=latest_prices,
             previous_closes=previous_closes,
@@ -1863,7 +1974,7 @@ async def run_preclose_alerts(slot: str = "16:45") -> dict:
             await db.save_price_quality_flags(quality_flags)
         saved = await db.save_preclose_alerts(alerts, alert_ts=now, slot=slot)
         if alerts:
-            notifier.send_raw(render_preclose_alerts(alerts, slot=slot))
+            await notifier.send_raw_async(render_preclose_alerts(alerts, slot=slot))
         logger.info(
             "preclose_alerts [%s]: tickers=%d alerts=%d saved=%d",
             slot,
@@ -1875,7 +1986,7 @@ async def run_preclose_alerts(slot: str = "16:45") -> dict:
         return result
     except Exception as exc:
         logger.error("preclose_alerts [%s] fallo: %s", slot, exc, exc_info=True)
-        notifier.notify_critical_error(f"preclose_alerts {slot}", str(exc))
+        await asyncio.to_thread(notifier.notify_critical_error, f"preclose_alerts {slot}", str(exc))
         result["error"] = str(exc)
         return result
     finally:
@@ -2053,7 +2164,7 @@ async def run_shadow_calibration_job() -> None:
                 cfg.scraper.telegram_chat_id,
             )
             message = _render_shadow_calibration_gate_alert(gate_changes)
-            sent = notifier.send_raw(message)
+            sent = await notifier.send_raw_async(message)
             logger.info(
                 "shadow_calibration_v3 gate alert cambios=%d sent=%s",
                 len(gate_changes),
@@ -2237,7 +2348,7 @@ async def _send_offhours_sentiment_alerts() -> None:
             cfg.scraper.telegram_bot_token,
             cfg.scraper.telegram_chat_id,
         )
-        if notifier.send_raw(_render_offhours_sentiment_alert(unseen)):
+        if await notifier.send_raw_async(_render_offhours_sentiment_alert(unseen)):
             for event in unseen[:3]:
                 key = f"{SENTIMENT_OFFHOURS_ALERT_KEY_PREFIX}:{int(event['raw_id'])}"
                 await _redis_set(
@@ -2279,6 +2390,7 @@ class IntradayRevalidationAlert:
     target_weight: float | None = None
     reason: str | None = None
     price_ts: datetime | None = None
+    technical: dict | None = None
 
 
 # ─── Intraday Manager ──────────────────────────────────────────────────────────
@@ -2293,7 +2405,8 @@ class IntradayManager:
 
     2. _risk_guard_loop:
        Solo lee DB. Sin Playwright. Sin scraper.
-       Emite alertas por Telegram según umbrales de PNL / stop loss.
+       Reacciona a NOTIFY de precios nuevos (poll de respaldo cada
+       RISK_POLL_SECONDS) y emite alertas según umbrales de PNL / stop loss.
     """
 
     def __init__(self) -> None:
@@ -2307,6 +2420,10 @@ class IntradayManager:
         self._portfolio_live_task: asyncio.Task | None = None
         self._running = False
         self._last_alert_sent: dict[str, datetime] = {}
+        self._indicator_book = StreamingIndicatorBook()
+        # Tickers con precios nuevos avisados por NOTIFY; None = recalcular todo.
+        self._risk_pending: set[str] | None = set()
+        self._risk_wakeup = asyncio.Event()
 
     @property
     def running(self) -> bool:
@@ -2330,11 +2447,11 @@ class IntradayManager:
         logger.info("AccountManager: sesion persistente y loops iniciados")
         if _is_market_window():
             try:
-                self.notifier.send_raw(
+                await self.notifier.send_raw_async(
                     "🟢 <b>Monitoreo intradía iniciado</b>\n"
                     f"Mercado 10:40/12:00/16:40/17:02 · Portfolio cada {PORTFOLIO_REFRESH_SECONDS // 60}min · "
                     f"Movimientos cada {FILL_REFRESH_SECONDS}s · Live cache cada {PORTFOLIO_LIVE_POLL_SECONDS}s · "
-                    "Risk guard cada 60s · Sesion Cocos persistente."
+                    f"Risk guard por NOTIFY (respaldo {RISK_POLL_SECONDS}s) · Sesion Cocos persistente."
                 )
             except Exception as e:
                 logger.warning("No se pudo notificar inicio de monitoreo: %s", e)
@@ -2485,6 +2602,7 @@ class IntradayManager:
 
                 db = PortfolioDatabase(self.cfg.database.url)
                 refresh_result: dict | None = None
+                iteration_started = time.perf_counter()
                 try:
                     async with lock:
                         lock_reason = (
@@ -2574,7 +2692,7 @@ class IntradayManager:
 
                             if new_movements:
                                 try:
-                                    attribution_summary = await db.sync_plan_execution_attributions()
+                                    attribution_summary = await db.sync_plan_execution_attributions(incremental=True)
                                     logger.info("Scraper loop: plan-follow=%s", attribution_summary)
                                 except Exception as exc:
                                     logger.warning(
@@ -2586,7 +2704,7 @@ class IntradayManager:
                                     db,
                                     [movement.ticker for movement in new_movements],
                                 )
-                                self.notifier.send_raw(
+                                await self.notifier.send_raw_async(
                                     _render_new_movements_notice(
                                         new_movements,
                                         portfolio_refreshed=portfolio_refreshed,
@@ -2678,6 +2796,11 @@ class IntradayManager:
                         "detail": str(e),
                     }
                 finally:
+                    METRICS.observe(
+                        LOOP_ITERATION_SECONDS,
+                        time.perf_counter() - iteration_started,
+                        loop="scraper",
+                    )
                     await _redis_delete(SCRAPER_LOCK_KEY)
                     try:
                         await db.close()
@@ -2709,68 +2832,141 @@ class IntradayManager:
         """
         Lee DB. Calcula PNL contra entries de decision_log. Envía alertas.
         Sin Playwright. Sin scraper. Sin lock de scraper.
-        """
-        while self._running:
-            if not _is_market_window():
-                await asyncio.sleep(30)
-                continue
 
-            db = PortfolioDatabase(self.cfg.database.url)
-            try:
-                await db.connect()
-                pool = await self._resolve_pool(db)
-                if pool is None:
-                    logger.warning("Risk guard: no se pudo obtener pool DB, reintentando en %ds", RISK_POLL_SECONDS)
-                    await asyncio.sleep(RISK_POLL_SECONDS)
+        Mantiene una sola instancia de DB y una conexion LISTEN: cada NOTIFY de
+        save_market_prices/save_snapshot recalcula solo los tickers tocados.
+        Si no llega nada en RISK_POLL_SECONDS (o el LISTEN se cae) corre un
+        recalculo completo como antes.
+        """
+        db = PortfolioDatabase(self.cfg.database.url)
+        listener = None
+        corporate_effects: list = []
+        blocked_price_tickers: set[str] = set()
+        references_loaded_at: float | None = None
+        tickers: set[str] | None = None
+        try:
+            while self._running:
+                if not _is_market_window():
+                    await asyncio.sleep(30)
+                    tickers = None
                     continue
 
-                bot_busy = await _is_bot_busy()
-                corporate_effects = await db.get_corporate_action_effects()
-                active_quality_flags = await db.get_active_price_quality_flags()
-                blocked_price_tickers = {
-                    str(row.get("ticker") or "").upper()
-                    for row in active_quality_flags
-                    if str(row.get("ticker") or "").strip()
-                }
-                alerts = await self._compute_risk_alerts(
-                    pool,
-                    corporate_action_effects=corporate_effects,
-                    blocked_price_tickers=blocked_price_tickers,
-                )
-
-                digest_alerts: list[RiskAlert] = []
-                for alert in alerts:
-                    # Silenciar alertas no críticas si el bot está procesando algo manual
-                    if bot_busy and alert.level not in ("CRITICAL", "STOP_TRIGGERED"):
-                        logger.info(
-                            "Risk guard: bot busy, silenciando [%s %s]",
-                            alert.level, alert.ticker,
-                        )
+                iteration_started = time.perf_counter()
+                try:
+                    if await self._resolve_pool(db) is None:
+                        await db.connect()
+                    pool = await self._resolve_pool(db)
+                    if pool is None:
+                        logger.warning("Risk guard: no se pudo obtener pool DB, reintentando en %ds", RISK_POLL_SECONDS)
+                        await asyncio.sleep(RISK_POLL_SECONDS)
                         continue
-                    if await self._should_send_alert(alert):
-                        digest_alerts.append(alert)
+                    if listener is None or listener.is_closed():
+                        listener = await self._open_risk_listener(db)
+
+                    if (
+                        tickers is None
+                        or references_loaded_at is None
+                        or time.monotonic() - references_loaded_at >= RISK_REFERENCE_REFRESH_SECONDS
+                    ):
+                        corporate_effects = await db.get_corporate_action_effects()
+                        active_quality_flags = await db.get_active_price_quality_flags()
+                        blocked_price_tickers = {
+                            str(row.get("ticker") or "").upper()
+                            for row in active_quality_flags
+                            if str(row.get("ticker") or "").strip()
+                        }
+                        references_loaded_at = time.monotonic()
+
+                    bot_busy = await _is_bot_busy()
+                    alerts = await self._compute_risk_alerts(
+                        pool,
+                        corporate_action_effects=corporate_effects,
+                        blocked_price_tickers=blocked_price_tickers,
+                        tickers=tickers,
+                    )
 
-                if digest_alerts:
-                    if self._send_risk_digest(digest_alerts):
-                        for alert in digest_alerts:
-                            await self._mark_alert_sent(alert)
+                    digest_alerts: list[RiskAlert] = []
+                    for alert in alerts:
+                        # Silenciar alertas no críticas si el bot está procesando algo manual
+                        if bot_busy and alert.level not in ("CRITICAL", "STOP_TRIGGERED"):
+                            logger.info(
+                                "Risk guard: bot busy, silenciando [%s %s]",
+                                alert.level, alert.ticker,
+                            )
+                            continue
+                        if await self._should_send_alert(alert):
+                            digest_alerts.append(alert)
 
-                await _heartbeat(RISK_HEARTBEAT_KEY)
+                    if digest_alerts:
+                        if await self._send_risk_digest(digest_alerts):
+                            for alert in digest_alerts:
+                                await self._mark_alert_sent(alert)
 
-                if not alerts:
-                    logger.info("Risk guard: todo dentro de parámetros")
+                    await _heartbeat(RISK_HEARTBEAT_KEY)
 
-            except asyncio.CancelledError:
-                raise
-            except Exception as e:
-                logger.warning("Risk guard error (reintentará en %ds): %s", RISK_POLL_SECONDS, e, exc_info=True)
-            finally:
+                    if not alerts and tickers is None:
+                        logger.info("Risk guard: todo dentro de parámetros")
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Risk guard error (reintentará en %ds): %s", RISK_POLL_SECONDS, e, exc_info=True)
+                    tickers = None
+                finally:
+                    METRICS.observe(
+                        LOOP_ITERATION_SECONDS,
+                        time.perf_counter() - iteration_started,
+                        loop="risk_guard",
+                    )
+
+                tickers = await self._wait_risk_trigger(RISK_POLL_SECONDS)
+        finally:
+            if listener is not None:
                 try:
-                    await db.close()
+                    await listener.close()
                 except Exception:
                     pass
+            try:
+                await db.close()
+            except Exception:
+                pass
+
+    async def _open_risk_listener(self, db: PortfolioDatabase):
+        """LISTEN de precios; None deja al risk guard en modo poll."""
+        try:
+            listener = await db.listen_price_changes(self._on_price_change)
+        except Exception as exc:
+            logger.warning("Risk guard: LISTEN no disponible, sigo con poll: %s", exc)
+            return None
+        logger.info("Risk guard: escuchando NOTIFY de precios")
+        return listener
+
+    def _on_price_change(self, tickers: set[str] | None) -> None:
+        if tickers is None or self._risk_pending is None:
+            self._risk_pending = None
+        else:
+            self._risk_pending.update(tickers)
+        self._risk_wakeup.set()
 
-            await asyncio.sleep(RISK_POLL_SECONDS)
+    async def _wait_risk_trigger(self, timeout: float) -> set[str] | None:
+        """
+        Espera el proximo NOTIFY (agrupando rafagas por
+        RISK_NOTIFY_DEBOUNCE_SECONDS) o el poll de respaldo.
+        Devuelve los tickers a recalcular; None = todos.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._risk_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                self._risk_wakeup.clear()
+                self._risk_pending = set()
+                return None
+            if RISK_NOTIFY_DEBOUNCE_SECONDS > 0:
+                await asyncio.sleep(RISK_NOTIFY_DEBOUNCE_SECONDS)
+            self._risk_wakeup.clear()
+            pending, self._risk_pending = self._risk_pending, set()
+            if pending is None or pending:
+                return pending
 
     async def _portfolio_live_loop(self) -> None:
         """
@@ -2783,6 +2979,7 @@ class IntradayManager:
                 continue
 
             db = PortfolioDatabase(self.cfg.database.url)
+            iteration_started = time.perf_counter()
             try:
                 await db.connect()
                 snapshot = await get_cached_portfolio_snapshot()
@@ -2818,6 +3015,13 @@ class IntradayManager:
                     db,
                     live_portfolio,
                 )
+                intraday_technical = await self._refresh_intraday_technical(
+                    db,
+                    snapshot,
+                    latest_prices,
+                )
+                if intraday_technical:
+                    live_portfolio["intraday_technical"] = intraday_technical
                 await cache_live_portfolio(
                     live_portfolio,
                     ttl_seconds=PORTFOLIO_CACHE_TTL_SECONDS,
@@ -2841,8 +3045,8 @@ class IntradayManager:
                             len(unseen_alerts),
                         )
                     else:
-                        sent = self.notifier.send_raw(
-                            render_live_portfolio_alert(unseen_alerts, live_portfolio)
+                        sent = await self.notifier.send_raw_async(
+                            render_live_portfolio_alert(unseen_alerts, live_portfolio),
                         )
                         if sent:
                             for alert in unseen_alerts:
@@ -2863,6 +3067,7 @@ class IntradayManager:
                             blocked_price_tickers=_open_price_quality_tickers(
                                 live_portfolio
                             ),
+                            technical_by_ticker=intraday_technical,
                         )
                         unseen_revalidations = [
                             alert for alert in revalidations
@@ -2875,8 +3080,8 @@ class IntradayManager:
                                     len(unseen_revalidations),
                                 )
                             else:
-                                sent = self.notifier.send_raw(
-                                    self._render_intraday_revalidations(unseen_revalidations)
+                                sent = await self.notifier.send_raw_async(
+                                    self._render_intraday_revalidations(unseen_revalidations),
                                 )
                                 if sent:
                                     for alert in unseen_revalidations:
@@ -2896,6 +3101,11 @@ class IntradayManager:
                     exc_info=True,
                 )
             finally:
+                METRICS.observe(
+                    LOOP_ITERATION_SECONDS,
+                    time.perf_counter() - iteration_started,
+                    loop="portfolio_live",
+                )
                 try:
                     await db.close()
                 except Exception:
@@ -2903,6 +3113,53 @@ class IntradayManager:
 
             await asyncio.sleep(PORTFOLIO_LIVE_POLL_SECONDS)
 
+    async def _refresh_intraday_technical(
+        self,
+        db: PortfolioDatabase,
+        snapshot: dict,
+        latest_prices: list[dict],
+    ) -> dict[str, dict]:
+        """
+        Señal técnica de cada posición con el último market_prices. Usa el
+        estado incremental de indicadores (sembrado una vez por rueda y
+        checkpointeado en Redis), sin reconstruir frames de 260 velas.
+        """
+        if not INTRADAY_STREAMING_INDICATORS_ENABLED:
+            return {}
+        active_tickers = _active_position_tickers(snapshot)
+        asset_types: dict[str, str | None] = {ticker: None for ticker in active_tickers}
+        for position in snapshot.get("positions") or []:
+            ticker = str(position.get("ticker") or "").upper()
+            if ticker in asset_types and position.get("asset_type"):
+                asset_types[ticker] = str(position.get("asset_type"))
+        if not asset_types:
+            return {}
+        try:
+            from src.analysis.technical import generate_signals
+
+            indicators = await self._indicator_book.refresh(
+                db,
+                asset_types,
+                latest_prices,
+                session=_now_art().date(),
+            )
+        except Exception as exc:
+            logger.warning("Indicadores intradía no disponibles: %s", exc, exc_info=True)
+            return {}
+
+        technical: dict[str, dict] = {}
+        for ticker, ind in indicators.items():
+            signal = generate_signals(ind)
+            technical[ticker] = {
+                "signal": signal.signal,
+                "strength": round(float(signal.strength), 4),
+                "score_raw": round(float(signal.score_raw), 4),
+                "regime": signal.technical_regime,
+                "rsi_14": round(float(ind.rsi_14), 2),
+                "close": float(ind.close),
+            }
+        return technical
+
     async def _compute_intraday_revalidations(
         self,
         pool,
@@ -2911,6 +3168,7 @@ class IntradayManager:
         *,
         corporate_action_effects=None,
         blocked_price_tickers: set[str] | None = None,
+        technical_by_ticker: dict[str, dict] | None = None,
     ) -> list[IntradayRevalidationAlert]:
         active_tickers = {
             str(ticker or "").upper()
@@ -3022,6 +3280,7 @@ class IntradayManager:
                     ),
                     reason=str(row["reason"] or "").strip() or None,
                     price_ts=price_ts,
+                    technical=(technical_by_ticker or {}).get(ticker),
                 )
             )
 
@@ -3097,6 +3356,12 @@ class IntradayManager:
                 f"Estado: <b>{escape(state)}</b>",
                 f"Acción sugerida: <b>{escape(action)}</b>",
             ]
+            if alert.technical:
+                lines.append(
+                    f"Técnico intradía: <b>{escape(str(alert.technical.get('signal') or 'N/A'))}</b> "
+                    f"{float(alert.technical.get('strength') or 0.0):.0%} · "
+                    f"RSI {float(alert.technical.get('rsi_14') or 0.0):.0f}"
+                )
             if alert.reason:
                 lines.append(f"Motivo plan: {escape(self._clean_reason(alert.reason))[:180]}")
             lines.append("")
@@ -3209,7 +3474,9 @@ class IntradayManager:
         corporate_action_effects=None,
         blocked_price_tickers: set[str] | None = None,
         as_of: datetime | None = None,
+        tickers: set[str] | None = None,
     ) -> list[RiskAlert]:
+        """Alertas de las posiciones activas; `tickers` acota a los precios tocados."""
         blocked_price_tickers = {
             str(ticker or "").upper()
             for ticker in (blocked_price_tickers or set())
@@ -3236,6 +3503,9 @@ class IntradayManager:
                 for row in active_rows
                 if str(row["ticker"] or "").strip()
             })
+            if tickers is not None:
+                wanted = {str(ticker or "").upper() for ticker in tickers}
+                active_tickers = [ticker for ticker in active_tickers if ticker in wanted]
             if not active_tickers:
                 return []
 
@@ -3388,7 +3658,7 @@ class IntradayManager:
             return STOP_TRIGGERED_ALERT_TTL_SECONDS
         return RISK_ALERT_TTL_SECONDS
 
-    def _send_risk_digest(self, alerts: list[RiskAlert]) -> bool:
+    async def _send_risk_digest(self, alerts: list[RiskAlert]) -> bool:
         if not alerts:
             return False
 
@@ -3437,7 +3707,10 @@ class IntradayManager:
         ]
 
         try:
-            self.notifier.send_raw("\n".join(lines))
+            # Sin coalesce: cada digest lleva alertas distintas (las ya marcadas
+            # no se repiten), reemplazar uno pendiente perdería las anteriores.
+            if not await self.notifier.send_raw_async("\n".join(lines)):
+                return False
             logger.warning(
                 "Risk digest enviado: %d alerta(s), mostradas=%d, omitidas=%d",
                 len(alerts),
@@ -3449,7 +3722,7 @@ class IntradayManager:
             logger.warning("No se pudo enviar risk digest Telegram: %s", e)
             return False
 
-    def _send_alert(self, alert: RiskAlert) -> bool:
+    async def _send_alert(self, alert: RiskAlert) -> bool:
         pnl = alert.pnl_pct * 100.0
         stop_txt = f"\nStop: <b>${alert.stop_loss_price:,.2f}</b>" if alert.stop_loss_price else ""
         target_txt = f"\nTarget: <b>${alert.target_price:,.2f}</b>" if alert.target_price else ""
@@ -3470,7 +3743,11 @@ class IntradayManager:
             f"{tg_note('Alerta sobre posición ejecutada; no dispara órdenes automáticas.')}"
         )
         try:
-            self.notifier.send_raw(msg)
+            if not await self.notifier.send_raw_async(
+                msg,
+                coalesce_key=f"risk_alert:{alert.ticker}:{alert.level}",
+            ):
+                return False
             logger.warning(
                 "Risk alert enviada: %s %s (PNL %.2f%%)",
                 alert.level, alert.ticker, pnl,
@@ -3549,7 +3826,7 @@ async def run_persistent_eod_refresh(run_type: str = "17:02_FULL") -> dict:
         )
         if not refresh.get("ok"):
             raise RuntimeError(str(refresh.get("error") or "refresh_failed"))
-        notifier.send_raw(
+        await notifier.send_raw_async(
             "📊 <b>Cierre Cocos sincronizado</b>\n"
             f"Portfolio: {int(refresh.get('positions') or 0)} posiciones · "
             f"Mercado: {int(refresh.get('acciones') or 0)} acciones + "
@@ -3559,7 +3836,7 @@ async def run_persistent_eod_refresh(run_type: str = "17:02_FULL") -> dict:
         return {"success": True, "run_type": run_type, **refresh}
     except Exception as exc:
         logger.error("run_persistent_eod_refresh fallo: %s", exc, exc_info=True)
-        notifier.notify_critical_error(run_type, str(exc))
+        await asyncio.to_thread(notifier.notify_critical_error, run_type, str(exc))
         return {"success": False, "run_type": run_type, "error": str(exc)}
 
 
@@ -3567,7 +3844,13 @@ async def _scheduler_main() -> None:
     if not HAS_APSCHEDULER:
         raise ImportError("apscheduler no instalado: pip install apscheduler>=3.10")
 
+    set_process_name("scheduler")
+    await _run_schema_migrations()
     scheduler = AsyncIOScheduler(timezone=TIMEZONE)
+    scheduler.add_listener(
+        _on_job_event,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR,
+    )
 
     scheduler.add_job(
         run_opening_portfolio_report_then_start_intraday,
@@ -3756,10 +4039,19 @@ async def _scheduler_main() -> None:
             replace_existing=True,
         )
 
+    global _loop_watchdog
+    _loop_watchdog = build_loop_lag_watchdog()
+    watchdog_task = asyncio.create_task(_loop_watchdog.run(), name="loop_lag_watchdog")
     heartbeat_task = asyncio.create_task(
         _scheduler_heartbeat_loop(),
         name="scheduler_heartbeat",
     )
+    # Drena la cola de Telegram que haya quedado de un arranque anterior.
+    telegram_delivery = None
+    bot_token = get_config().scraper.telegram_bot_token
+    if bot_token:
+        telegram_delivery = get_telegram_delivery(bot_token)
+        telegram_delivery.ensure_running()
     scheduler.start()
     await start_intraday_loops()
     logger.info(
@@ -3791,7 +4083,10 @@ async def _scheduler_main() -> None:
 
     await stop_event.wait()
     heartbeat_task.cancel()
+    watchdog_task.cancel()
     await stop_intraday_loops()
+    if telegram_delivery is not None:
+        await telegram_delivery.aclose()
     logger.info("Scheduler apagado limpiamente")
 
 
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.corporate_actions import CandleAdjustment, CandleAdjustmentStep
+from src.collector import candle_store
+from src.collector.candle_store import CachedCandleReader, CandleStore, open_candle_reader
+from src.collector.cocos_history import candles_to_frame
+
+
+def _row(ticker, day, close, *, source="COCOS", asset_type="ACCION", refreshed=None):
+    ts = datetime(2026, 1, 1, 20, tzinfo=timezone.utc) + timedelta(days=day)
+    return {
+        "ts": ts,
+        "ticker": ticker,
+        "long_ticker": f"{ticker}-0002-C-CT-ARS",
+        "asset_type": asset_type,
+        "currency": "ARS",
+        "venue": "BYMA",
+        "interval": "1d",
+        "open_price": Decimal(str(close - 1)),
+        "high_price": Decimal(str(close + 2)),
+        "low_price": Decimal(str(close - 2)),
+        "close_price": Decimal(str(close)),
+        "volume": Decimal("1000"),
+        "source": source,
+        "refreshed_at": refreshed or ts + timedelta(hours=1),
+    }
+
+
+class _FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.since_calls = []
+        self.fail = False
+
+    async def get_market_candles_refreshed_since(self, since, *, interval="1d", tickers=None):
+        self.since_calls.append(since)
+        if self.fail:
+            raise TimeoutError("pool busy")
+        return [
+            row for row in self.rows
+            if (since is None or row["refreshed_at"] > since)
+            and (tickers is None or row["ticker"] in tickers)
+        ]
+
+    async def get_market_candles_canonical_summary(self, *, interval="1d"):
+        # Una vela por ticker y dia UTC, como la PK de la canónica.
+        days: dict[str, set] = {}
+        last: dict[str, datetime] = {}
+        for row in self.rows:
+            days.setdefault(row["ticker"], set()).add(row["ts"].date())
+            last[row["ticker"]] = max(last.get(row["ticker"], row["ts"]), row["ts"])
+        return {ticker: {"rows": len(d), "last_ts": last[ticker]} for ticker, d in days.items()}
+
+    async def get_corporate_action_effects(self, tickers):
+        return ["db"]
+
+    async def get_candle_adjustments(self, tickers, *, interval="1d"):
+        return {t: self.adjustments[t] for t in tickers if t in getattr(self, "adjustments", {})}
+
+
+def test_frame_matches_candles_to_frame_and_shares_file_memory(tmp_path):
+    rows = [_row("GGAL", day, 100 + day, source="TRADINGVIEW_BYMA" if day % 3 else "COCOS")
+            for day in range(30)]
+    store = CandleStore(tmp_path)
+    store.apply_rows(rows)
+
+    frame = CandleStore(tmp_path).frame("GGAL", limit=20)
+    expected = candles_to_frame(rows[-20:])
+
+    pd.testing.assert_frame_equal(frame, expected, check_names=False, check_freq=False)
+    assert frame.attrs == expected.attrs
+    base = frame._mgr.blocks[0].values
+    while not isinstance(base, np.memmap):
+        base = base.base
+    assert np.shares_memory(frame["Close"].to_numpy(), base)
+    mapped = np.load(tmp_path / "1d" / "GGAL.npy", mmap_mode="r")
+    frame.loc[frame.index[-1], "Close"] = -1.0
+    assert mapped["ohlcv"][-1][3] == 129.0
+
+
+def test_incremental_refresh_reads_past_watermark_and_replaces_corrected_days(tmp_path):
+    rows = [_row("GGAL", day, 100 + day) for day in range(10)] + [_row("YPFD", 0, 50)]
+    db = _FakeDB(rows)
+    store = CandleStore(tmp_path)
+    assert asyncio.run(store.refresh(db)) == 11
+
+    later = store.watermark + timedelta(days=1)
+    db.rows = rows + [
+        _row("GGAL", 4, 55, refreshed=later),  # split ajustado
+        _row("GGAL", 10, 111, refreshed=later),
+    ]
+    reopened = CandleStore(tmp_path)
+    # La vela del watermark vuelve a leerse por el solapamiento (idempotente).
+    assert asyncio.run(reopened.refresh(db)) == 3
+    assert db.since_calls[-1] == store.watermark - candle_store.WATERMARK_OVERLAP
+
+    closes = [row["close_price"] for row in reopened.rows("GGAL")]
+    assert closes == [100 + day for day in range(4)] + [55] + [105 + i for i in range(5)] + [111]
+    assert reopened.rows("YPFD", asset_type="CEDEAR") == []
+    assert len(reopened.rows("YPFD", asset_type="accion")) == 1
+
+
+def test_reader_serves_candles_from_disk_and_falls_back_when_db_is_busy(tmp_path):
+    db = _FakeDB([_row("GGAL", day, 100 + day) for day in range(5)])
+    reader = asyncio.run(open_candle_reader(db, root=tmp_path))
+    assert isinstance(reader, CachedCandleReader)
+
+    db.fail = True
+    busy = asyncio.run(open_candle_reader(db, root=tmp_path))
+    grouped = asyncio.run(busy.get_market_candle_rows_bulk(["ggal", "NONE"], "ACCION", 3))
+
+    assert [row["close_price"] for row in grouped["GGAL"]] == [102.0, 103.0, 104.0]
+    assert grouped["NONE"] == []
+    assert asyncio.run(busy.get_corporate_action_effects(["GGAL"])) == ["db"]
+    assert asyncio.run(open_candle_reader(db, root=tmp_path / "empty")) is db
+
+
+def test_reader_applies_current_persisted_adjustment_over_the_cache(tmp_path):
+    rows = [_row("GGAL", day, 1000 if day < 3 else 100) for day in range(5)]
+    rows.append(_row("YPFD", 0, 50))
+    db = _FakeDB(rows)
+    split = CandleAdjustmentStep(
+        effect_id=11, event_id=3, effective_at=rows[3]["ts"],
+        application_status="APPLIED", price_factor=0.1, volume_factor=10.0,
+        transition_day=date(2026, 1, 4),
+    )
+    db.adjustments = {"GGAL": CandleAdjustment(ticker="GGAL", steps=(split,), version=2)}
+    reader = asyncio.run(open_candle_reader(db, root=tmp_path))
+
+    adjusted = asyncio.run(reader.get_market_candles("ggal", adjusted=True))
+    frames = asyncio.run(reader.get_market_candles_bulk(["GGAL", "YPFD"], adjusted=True))
+    raw = asyncio.run(reader.get_market_candles("GGAL"))
+
+    assert [row["close_price"] for row in adjusted] == pytest.approx([100.0] * 5)
+    assert adjusted[0]["volume"] == pytest.approx(10_000.0)
+    assert [row["close_price"] for row in raw] == [1000.0] * 3 + [100.0] * 2
+    assert frames["GGAL"]["Close"].tolist() == pytest.approx([100.0] * 5)
+    assert frames["GGAL"].attrs["corporate_action_effect_ids"] == (11,)
+    assert frames["GGAL"].attrs["corporate_adjustment_version"] == 2
+    assert frames["YPFD"]["Close"].tolist() == [50.0]
+
+
+def test_refresh_reloads_tickers_whose_canonical_rows_were_deleted_or_moved(tmp_path):
+    rows = [_row("GGAL", day, 100 + day) for day in range(6)] + [_row("YPFD", 0, 50), _row("ALUA", 0, 9)]
+    db = _FakeDB(rows)
+    store = CandleStore(tmp_path)
+    asyncio.run(store.refresh(db))
+
+    # La canónica pierde las dos últimas velas de GGAL y todo ALUA sin que
+    # ninguna fila nueva mueva refreshed_at.
+    db.rows = [row for row in rows if row["ticker"] != "ALUA" and row["ts"] < rows[4]["ts"]] + [rows[6]]
+    reopened = CandleStore(tmp_path)
+    asyncio.run(reopened.refresh(db))
+
+    assert [row["close_price"] for row in reopened.rows("GGAL")] == [100.0, 101.0, 102.0, 103.0]
+    assert reopened.rows("ALUA") == []
+    assert reopened.tickers() == ["GGAL", "YPFD"]
+    assert reopened.stale_tickers(asyncio.run(db.get_market_candles_canonical_summary())) == []
+
+
+def test_reader_sends_tickers_with_days_won_by_another_type_to_the_db(tmp_path):
+    rows = [_row("GGAL", 0, 100), _row("GGAL", 1, 101, asset_type="CEDEAR"), _row("GGAL", 2, 102)]
+    rows += [_row("YPFD", day, 50 + day) for day in range(3)]
+    db = _FakeDB(rows)
+    remote_calls = []
+
+    async def _rows_bulk(tickers, asset_types, limit, source, *, interval="1d", **adjustment):
+        remote_calls.append((list(tickers), dict(asset_types)))
+        return {"GGAL": [{"close_price": 0.0}] * 3}
+
+    db.get_market_candle_rows_bulk = _rows_bulk
+    reader = asyncio.run(open_candle_reader(db, root=tmp_path))
+
+    grouped = asyncio.run(reader.get_market_candle_rows_bulk(["ggal", "ypfd"], "ACCION"))
+    unfiltered = asyncio.run(reader.get_market_candle_rows_bulk(["ggal"], None))
+
+    assert remote_calls == [(["GGAL"], {"GGAL": "ACCION"})]
+    assert list(grouped) == ["GGAL", "YPFD"]
+    assert len(grouped["GGAL"]) == 3
+    assert [row["close_price"] for row in grouped["YPFD"]] == [50.0, 51.0, 52.0]
+    assert len(unfiltered["GGAL"]) == 3
+    assert reader.store.holds_other_types("GGAL", "ACCION")
+    assert not reader.store.holds_other_types("YPFD", "ACCION")
+    assert reader.store.holds_other_types("YPFD", "CEDEAR")
@@ -49,6 +49,9 @@ def test_get_latest_market_prices_fresh_only_bounds_scan_to_latest_valid_day():
             self.fetch_statement = None
             self.fetch_args = None
 
+        async def execute(self, _statement, *_args):
+            return None
+
         async def fetchrow(self, statement, *_args):
             self.fetchrow_statements.append(statement)
             return {"market_date": date(2026, 6, 22), "ticker_count": 2}
@@ -102,9 +105,10 @@ def test_get_latest_market_prices_fresh_only_bounds_scan_to_latest_valid_day():
         "ts": datetime(2026, 6, 22, 20, 0, tzinfo=timezone.utc),
     }
     assert "ts >= $1::date" in pool.conn.fetch_statement
-    assert "latest_per_ticker" not in pool.conn.fetch_statement
+    assert "FROM market_prices_latest" in pool.conn.fetch_statement
     assert pool.conn.fetch_args == (date(2026, 6, 22),)
     assert "INTERVAL '14 days'" in pool.conn.fetchrow_statements[0]
+    assert "FROM market_prices_day_coverage" in pool.conn.fetchrow_statements[0]
 
 
 def test_get_latest_market_prices_falls_back_when_recent_window_is_empty():
@@ -112,6 +116,9 @@ def test_get_latest_market_prices_falls_back_when_recent_window_is_empty():
         def __init__(self):
             self.fetchrow_calls = 0
 
+        async def execute(self, _statement, *_args):
+            return None
+
         async def fetchrow(self, _statement, *_args):
             self.fetchrow_calls += 1
             if self.fetchrow_calls == 1:
@@ -148,3 +155,300 @@ def test_get_latest_market_prices_falls_back_when_recent_window_is_empty():
 
     assert rows == []
     assert pool.conn.fetchrow_calls == 2
+
+
+def test_get_market_candles_bulk_resolves_universe_in_one_query():
+    class _Connection:
+        def __init__(self):
+            self.fetch_calls = []
+            self.executed = []
+
+        async def execute(self, statement, *args):
+            self.executed.append(statement)
+
+        async def fetch(self, statement, *args):
+            self.fetch_calls.append((statement, args))
+            start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+            return [
+                {
+                    "ts": start.replace(day=day),
+                    "ticker": ticker,
+                    "long_ticker": f"{ticker}-0002-C-CT-ARS",
+                    "asset_type": "CEDEAR",
+                    "currency": "ARS",
+                    "venue": "BYMA",
+                    "interval": "1d",
+                    "open_price": 100.0 + day,
+                    "high_price": 101.0 + day,
+                    "low_price": 99.0 + day,
+                    "close_price": 100.5 + day,
+                    "volume": 10.0,
+                    "source": "COCOS",
+                }
+                for ticker in ("AAPL", "NVDA")
+                for day in (1, 2)
+            ]
+
+    class _Acquire:
+        def __init__(self, conn):
+            self.conn = conn
+
+        async def __aenter__(self):
+            return self.conn
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _Pool:
+        def __init__(self):
+            self.conn = _Connection()
+
+        def acquire(self):
+            return _Acquire(self.conn)
+
+    db = PortfolioDatabase("postgresql://unused")
+    pool = _Pool()
+    db._pool = pool
+
+    frames = asyncio.run(
+        db.get_market_candles_bulk(
+            ["nvda", "aapl", "msft"],
+            {"NVDA": "CEDEAR", "AAPL": "cedear"},
+            260,
+        )
+    )
+
+    assert len(pool.conn.fetch_calls) == 1
+    statement, args = pool.conn.fetch_calls[0]
+    assert "unnest($1::text[], $2::text[])" in statement
+    assert "FROM market_candles_canonical" in statement
+    assert "ROW_NUMBER()" not in statement
+    assert args == (["NVDA", "AAPL", "MSFT"], ["CEDEAR", "CEDEAR", None], "1d", 260)
+    assert list(frames) == ["NVDA", "AAPL", "MSFT"]
+    assert list(frames["AAPL"]["Close"]) == [101.5, 102.5]
+    assert frames["MSFT"].empty
+
+
+def test_typed_candle_read_reranks_tickers_with_days_won_by_another_type():
+    def _candle(ticker, day, asset_type):
+        return {
+            "ts": datetime(2026, 6, day, tzinfo=timezone.utc),
+            "ticker": ticker,
+            "long_ticker": f"{ticker}-0002-C-CT-ARS",
+            "asset_type": asset_type,
+            "currency": "ARS",
+            "venue": "BYMA",
+            "interval": "1d",
+            "open_price": 10.0,
+            "high_price": 11.0,
+            "low_price": 9.0,
+            "close_price": 10.0 + day,
+            "volume": 1.0,
+            "source": "COCOS",
+        }
+
+    class _Connection:
+        def __init__(self):
+            self.fetch_calls = []
+
+        async def execute(self, statement, *args):
+            return None
+
+        async def fetch(self, statement, *args):
+            self.fetch_calls.append((statement, args))
+            if "FROM market_candles_canonical" in statement:
+                # GGAL tiene dias canonicos ganados por el CEDEAR.
+                empty = {key: None for key in _candle("GGAL", 1, "ACCION")}
+                return [
+                    {**empty, "ticker": "GGAL", "mixed_types": True},
+                    {**_candle("YPFD", 1, "ACCION"), "mixed_types": False},
+                ]
+            return [_candle("GGAL", day, "ACCION") for day in (1, 2, 3)]
+
+    class _Acquire:
+        def __init__(self, conn):
+            self.conn = conn
+
+        async def __aenter__(self):
+            return self.conn
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _Pool:
+        def __init__(self):
+            self.conn = _Connection()
+
+        def acquire(self):
+            return _Acquire(self.conn)
+
+    db = PortfolioDatabase("postgresql://unused")
+    pool = _Pool()
+    db._pool = pool
+
+    grouped = asyncio.run(db.get_market_candle_rows_bulk(["ggal", "ypfd"], "accion", 3))
+    single = asyncio.run(db.get_market_candles("ggal", asset_type="accion", limit=3))
+
+    canonical, typed = pool.conn.fetch_calls[:2]
+    assert canonical[1] == (["GGAL", "YPFD"], ["ACCION", "ACCION"], "1d", 3)
+    assert "FROM market_candles mc" in typed[0]
+    assert "mc.asset_type = r.asset_type" in typed[0]
+    assert typed[1] == (["GGAL"], ["ACCION"], "1d", 3)
+    assert [row["close_price"] for row in grouped["GGAL"]] == [11.0, 12.0, 13.0]
+    assert [row["close_price"] for row in grouped["YPFD"]] == [11.0]
+    assert [row["close_price"] for row in single] == [11.0, 12.0, 13.0]
+
+
+def test_save_market_candles_refreshes_canonical_days_in_same_transaction():
+    from src.collector.data.models import AssetType, Currency, MarketCandle
+
+    class _Transaction:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _Connection:
+        def __init__(self):
+            self.executed = []
+            self.executemany_calls = 0
+
+        def transaction(self):
+            return _Transaction()
+
+        async def execute(self, statement, *args):
+            self.executed.append((statement, args))
+
+        async def executemany(self, statement, rows):
+            self.executemany_calls += 1
+
+    class _Acquire:
+        def __init__(self, conn):
+            self.conn = conn
+
+        async def __aenter__(self):
+            return self.conn
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _Pool:
+        def __init__(self):
+            self.conn = _Connection()
+
+        def acquire(self):
+            return _Acquire(self.conn)
+
+    def _candle(ts, source):
+        return MarketCandle(
+            ticker="GGAL",
+            long_ticker=f"{source}:GGAL",
+            asset_type=AssetType.ACCION,
+            currency=Currency.ARS,
+            venue="BYMA",
+            interval="1d",
+            ts=ts,
+            open_price=1.0,
+            high_price=1.0,
+            low_price=1.0,
+            close_price=1.0,
+            volume=1.0,
+            source=source,
+        )
+
+    db = PortfolioDatabase("postgresql://unused")
+    pool = _Pool()
+    db._pool = pool
+
+    saved = asyncio.run(db.save_market_candles([
+        _candle(datetime(2026, 6, 22, 3, 0, tzinfo=timezone.utc), "COCOS"),
+        _candle(datetime(2026, 6, 22, 20, 0, tzinfo=timezone.utc), "internal_snapshot"),
+        _candle(datetime(2026, 6, 23, 0, 0, tzinfo=timezone.utc), "COCOS"),
+    ]))
+
+    assert saved == 3
+    assert pool.conn.executemany_calls == 1
+    statement, args = pool.conn.executed[-1]
+    assert "INSERT INTO market_candles_canonical" in statement
+    assert args == (
+        ["GGAL", "GGAL"],
+        ["1d", "1d"],
+        [date(2026, 6, 22), date(2026, 6, 23)],
+    )
+
+
+def test_save_market_prices_maintains_latest_table_coverage_and_redis_mirror(monkeypatch):
+    from types import SimpleNamespace
+
+    from src.collector import db as db_module
+
+    stored = {
+        "ticker": "GGAL", "asset_type": "ACCION", "currency": "ARS",
+        "last_price": 110.0, "change_pct_1d": 0.01,
+        "ts": datetime(2026, 6, 23, 15, 0, tzinfo=timezone.utc), "previous_close": 100.0,
+    }
+
+    class _Connection:
+        def __init__(self):
+            self.calls = []
+
+        def transaction(self):
+            return _Acquire(self)
+
+        async def executemany(self, statement, rows):
+            self.calls.append(("executemany", statement, rows))
+
+        async def fetch(self, statement, *args):
+            self.calls.append(("fetch", statement, args))
+            return [stored]
+
+        async def execute(self, statement, *args):
+            self.calls.append(("execute", statement, args))
+
+    class _Acquire:
+        def __init__(self, conn):
+            self.conn = conn
+
+        async def __aenter__(self):
+            return self.conn
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    class _Pool:
+        def __init__(self):
+            self.conn = _Connection()
+
+        def acquire(self):
+            return _Acquire(self.conn)
+
+    mirrored = []
+
+    async def fake_cache(rows):
+        mirrored.extend(rows)
+        return True
+
+    monkeypatch.setattr(db_module, "cache_latest_market_prices", fake_cache)
+    db = PortfolioDatabase("postgresql://unused")
+    db._pool = _Pool()
+    ts = datetime(2026, 6, 23, 15, 0, tzinfo=timezone.utc)
+    asset = SimpleNamespace(
+        scraped_at=ts, ticker="GGAL", last_price=110, change_pct_1d=0.01, volume=5,
+        asset_type=SimpleNamespace(value="ACCION"), currency=SimpleNamespace(value="ARS"),
+    )
+
+    assert asyncio.run(db.save_market_prices([asset])) == 1
+
+    statements = [call[1] for call in db._pool.conn.calls]
+    assert "CREATE TABLE IF NOT EXISTS market_prices_latest" in statements[0]
+    (_, upsert_sql, upsert_args), = [c for c in db._pool.conn.calls if c[0] == "fetch"]
+    assert "INSERT INTO market_prices_latest" in upsert_sql
+    assert "THEN cur.last_price" in upsert_sql
+    # Ticks sin cotizacion (precio 0) no pisan el ultimo precio ni el previous_close.
+    assert "WHERE r.last_price IS NOT NULL AND r.last_price > 0" in upsert_sql
+    assert upsert_args == ([ts], ["GGAL"], ["ACCION"], ["ARS"], [110.0], [0.01])
+    coverage = next(c for c in db._pool.conn.calls if "market_prices_day_coverage (market_date" in c[1]
+                    and c[0] == "execute" and "unnest" in c[1])
+    assert coverage[2] == ([ts], ["GGAL"], [110.0])
+    assert mirrored == [stored]
@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.compute_executor import ComputeExecutor, LoopLagWatchdog
+
+
+def _square(value):
+    return value * value
+
+
+def _boom():
+    raise ValueError("boom")
+
+
+def test_run_offloads_stage_and_records_timing():
+    executor = ComputeExecutor(thread_workers=2, process_workers=0)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await executor.run("slow", time.sleep, 0.2)
+        task.cancel()
+        return result, ticks
+
+    try:
+        result, ticks = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert result is None
+    assert ticks >= 5
+    stats = executor.snapshot()["slow"]
+    assert stats["runs"] == 1 and stats["errors"] == 0
+    assert stats["last_ms"] >= 200
+    assert stats["last_kind"] == "thread"
+
+
+def test_stage_errors_propagate_and_are_counted():
+    executor = ComputeExecutor(thread_workers=1, process_workers=0)
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run("bad", _boom))
+    executor.shutdown()
+
+    assert executor.snapshot()["bad"]["errors"] == 1
+
+
+def test_process_stage_falls_back_to_thread_for_unpicklable_calls():
+    executor = ComputeExecutor(thread_workers=1, process_workers=1)
+
+    async def scenario():
+        in_process = await executor.run("square", _square, 7, kind="process")
+        local = await executor.run("local", lambda: 3, kind="process")
+        return in_process, local
+
+    try:
+        in_process, local = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert (in_process, local) == (49, 3)
+    assert executor.snapshot()["square"]["last_kind"] == "process"
+    assert executor.snapshot()["local"]["last_kind"] == "thread"
+
+
+def test_watchdog_measures_blocked_loop():
+    watchdog = LoopLagWatchdog(interval_seconds=0.02, warn_ms=100)
+
+    async def scenario():
+        task = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.05)
+        time.sleep(0.25)  # bloqueo deliberado del loop
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    snapshot = watchdog.snapshot()
+    assert snapshot["max_ms"] >= 150
+    assert snapshot["over_threshold"] >= 1
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import asynccontextmanager
 from dataclasses import replace
 from datetime import datetime, timezone
 
@@ -33,7 +34,7 @@ from src.collector.live_portfolio import (
     render_opening_portfolio_report,
     select_portfolio_move_alerts,
 )
-from src.collector.db import PortfolioDatabase
+from src.collector.db import CANDLE_ADJUSTMENT_LOCK_CLASS, PortfolioDatabase
 
 
 UTC = timezone.utc
@@ -341,6 +342,70 @@ def test_confirmed_split_normalizes_frame_without_mutating_raw_data():
     assert second["Close"].iloc[0] == pytest.approx(9.0)
 
 
+def test_multiple_splits_compose_into_one_factor_series_and_are_memoized(monkeypatch):
+    from src.analysis import corporate_actions
+
+    corporate_actions._ADJUSTMENT_CACHE.clear()
+    index = pd.date_range("2026-07-27 20:00", periods=12, freq="D", tz="UTC")
+    closes = [100.0] * 4 + [50.0] * 4 + [5.0] * 4
+    raw = pd.DataFrame(
+        {"Open": closes, "High": closes, "Low": closes, "Close": closes, "Volume": [10.0] * 12},
+        index=index,
+    )
+    first = replace(_effect(quantity_factor=2.0, price_factor=0.5), effect_id=11,
+                    effective_at=datetime(2026, 7, 31, 3, 0, tzinfo=UTC))
+    second = replace(_effect(quantity_factor=10.0, price_factor=0.1), effect_id=12, event_id=2,
+                     event_key="YPF:YPFD:SPLIT:2026-08-04")
+
+    normalized, applications, block = normalize_frame_for_effects("YPFD", raw, [second, first])
+
+    assert block is None
+    assert [app.instrument_effect_id for app in applications] == [11, 12]
+    assert [app.after_state["rows_adjusted"] for app in applications] == [4, 8]
+    assert normalized["Close"].tolist() == pytest.approx([5.0] * 12)
+    assert normalized["Volume"].tolist() == pytest.approx([200.0] * 4 + [100.0] * 4 + [10.0] * 4)
+    assert normalized.attrs["corporate_action_effect_ids"] == (11, 12)
+
+    def recompute(*args, **kwargs):
+        raise AssertionError("adjustment recomputed for identical candles")
+
+    monkeypatch.setattr(corporate_actions, "_compute_frame_adjustment", recompute)
+    again, again_applications, _ = normalize_frame_for_effects("YPFD", raw.copy(), [first, second])
+    pd.testing.assert_frame_equal(again, normalized)
+    assert again_applications == applications
+
+    moved = raw.copy()
+    moved.iloc[-1, moved.columns.get_loc("Close")] = 5.5
+    with pytest.raises(AssertionError, match="recomputed"):
+        normalize_frame_for_effects("YPFD", moved, [first, second])
+
+
+def test_adjustment_cache_separates_missing_observed_at_and_returns_copies():
+    from src.analysis import corporate_actions
+
+    corporate_actions._ADJUSTMENT_CACHE.clear()
+    raw = _frame(pre_close=9.0, post_close=9.1).iloc[:2]
+    future = replace(
+        _effect(quantity_factor=1.0, price_factor=1.0),
+        cost_basis_factor=1.0,
+        effective_at=datetime(2026, 8, 10, 3, 0, tzinfo=UTC),
+    )
+
+    _, unobserved, _ = normalize_frame_for_effects("YPFD", raw, [future])
+    _, observed, _ = normalize_frame_for_effects(
+        "YPFD", raw, [future], observed_at=datetime(2026, 8, 11, 20, 0, tzinfo=UTC),
+    )
+
+    assert unobserved == []
+    assert [app.application_status for app in observed] == ["ALREADY_ADJUSTED"]
+
+    observed[0].after_state["rows_adjusted"] = 99
+    _, again, _ = normalize_frame_for_effects(
+        "YPFD", raw, [future], observed_at=datetime(2026, 8, 11, 20, 0, tzinfo=UTC),
+    )
+    assert again[0].after_state["rows_adjusted"] == 0
+
+
 def test_confirmed_event_accepts_already_adjusted_source_and_resolves_heuristic():
     result = guard_history_frames(
         {"YPFD": _frame(pre_close=9.0, post_close=9.1)},
@@ -816,35 +881,37 @@ def test_shadow_outcome_across_split_uses_one_price_basis():
     assert outcome.direction_correct is True
 
 
-def test_db_outcome_inputs_query_and_reconcile_only_when_candles_jump():
-    db = PortfolioDatabase("postgresql://unused")
+def test_db_outcome_batch_queries_effects_only_when_candles_jump():
+    decision = {
+        "id": 7,
+        "ticker": "YPFD",
+        "price_at_decision": 90.0,
+        "decided_at": datetime(2026, 8, 3, 15, 0, tzinfo=UTC),
+        "decision": "BUY",
+    }
+    calls = []
 
-    async def effects(**_kwargs):
+    async def effects(**kwargs):
+        calls.append(kwargs["tickers"])
         return [_effect()]
 
+    # Sin version persistida: el salto del split se reconcilia con los effects.
+    db, _, _ = _adjustment_db(_split_candles(), [])
     db.get_corporate_action_effects = effects
-    entry, candles, factor = asyncio.run(
-        db._corporate_action_adjusted_outcome_inputs(
-            ticker="YPFD",
-            entry_price=90.0,
-            decided_at=datetime(2026, 8, 3, 20, 0, tzinfo=UTC),
-            candles=[
-                {
-                    "ts": datetime(2026, 8, 3, 20, 0, tzinfo=UTC),
-                    "close_price": 90.0,
-                },
-                {
-                    "ts": datetime(2026, 8, 4, 20, 0, tzinfo=UTC),
-                    "close_price": 9.0,
-                },
-            ],
-            as_of=datetime(2026, 8, 4, 20, 0, tzinfo=UTC),
-        )
-    )
-
-    assert entry == pytest.approx(9.0)
-    assert candles[0]["close_price"] == pytest.approx(9.0)
-    assert factor == pytest.approx(0.1)
+    (outcome,) = asyncio.run(db._compute_outcome_batch(
+        [decision], now=datetime(2026, 8, 20, tzinfo=UTC), log_prefix="test",
+    ))
+    assert calls == [["YPFD"]]
+    assert outcome.corporate_adjustment_factor == pytest.approx(0.1)
+
+    flat = [{**row, "close_price": 90.0} for row in _split_candles()]
+    db, _, _ = _adjustment_db(flat, [])
+    db.get_corporate_action_effects = effects
+    (outcome,) = asyncio.run(db._compute_outcome_batch(
+        [decision], now=datetime(2026, 8, 20, tzinfo=UTC), log_prefix="test",
+    ))
+    assert calls == [["YPFD"]]
+    assert outcome.corporate_adjustment_factor == 1.0
 
 
 def test_ratio_parser_uses_new_to_old_quantity_convention():
@@ -859,3 +926,232 @@ def test_ratio_parser_allows_identity_effect_for_depositary_ratio_change():
 
     assert factor == 1.0
     assert (numerator, denominator) == (1, 1)
+
+
+class _AdjustmentConn:
+    """In-memory stand-in for the canonical candles and adjustment version tables."""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.versions: list[dict] = []
+        self.steps: list[tuple] = []
+        self.candle_loads = 0
+        self.locks: list[tuple] = []
+        self.on_lock = None
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, sql, *args):
+        if "UNION" in sql:
+            # Candidatos sin version vigente o con velas refrescadas despues de built_at.
+            current = {h["ticker"]: h for h in self.versions if h["status"] == "CURRENT"}
+            tickers = {row["ticker"] for row in self.candles} | set(current)
+            return [
+                {"ticker": ticker}
+                for ticker in sorted(tickers)
+                if ticker not in current
+                or any(
+                    row["ticker"] == ticker
+                    and row.get("refreshed_at", current[ticker]["built_at"]) > current[ticker]["built_at"]
+                    for row in self.candles
+                )
+            ]
+        if "FROM market_candles_canonical mcc" in sql:
+            self.candle_loads += 1
+            return [row for row in self.candles if row["ticker"] in args[0]]
+        assert "FROM corporate_adjustment_versions v" in sql
+        tickers, _interval, version, history = args
+        rows = []
+        for header in self.versions:
+            if header["ticker"] not in tickers:
+                continue
+            if version is not None and header["version"] != version:
+                continue
+            if version is None and not history and header["status"] != "CURRENT":
+                continue
+            steps = [step for step in self.steps if step[0] == header["id"]] or [None]
+            for step in steps:
+                names = (
+                    "instrument_effect_id", "event_id", "effective_at",
+                    "application_status", "transition_day", "price_factor", "volume_factor",
+                )
+                rows.append({**header, **dict(zip(names, step[1:] if step else [None] * 7))})
+        return rows
+
+    async def execute(self, sql, *args):
+        if "pg_advisory_xact_lock" in sql:
+            self.locks.append(args)
+            if self.on_lock is not None:
+                self.on_lock()
+            return
+        assert "SET status = 'SUPERSEDED'" in sql
+        for header in self.versions:
+            if header["ticker"] == args[0] and header["status"] == "CURRENT":
+                header["status"] = "SUPERSEDED"
+
+    async def fetchval(self, sql, *args):
+        assert "status = 'CURRENT'" in sql
+        return next(
+            (h["signature"] for h in self.versions if h["ticker"] == args[0] and h["status"] == "CURRENT"),
+            None,
+        )
+
+    async def fetchrow(self, sql, *args):
+        ticker, _interval, signature, blocking_reason, reason, candle_count, last_day = args
+        header = {
+            "id": len(self.versions) + 1,
+            "ticker": ticker,
+            "version": 1 + max((h["version"] for h in self.versions if h["ticker"] == ticker), default=0),
+            "status": "CURRENT",
+            "signature": signature,
+            "blocking_reason": blocking_reason,
+            "reason": reason,
+            "built_at": datetime(2026, 8, 5, tzinfo=UTC),
+            "candle_count": candle_count,
+            "last_candle_day": last_day,
+        }
+        self.versions.append(header)
+        return header
+
+    async def executemany(self, sql, rows):
+        self.steps.extend(rows)
+
+
+def _adjustment_db(candles, effects):
+    conn = _AdjustmentConn(candles)
+
+    class _Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield conn
+
+    db = PortfolioDatabase("postgresql://unused")
+    db._pool = _Pool()
+    recorded = []
+
+    async def _skip_schema(_conn):
+        return None
+
+    async def _effects(**_kwargs):
+        return list(effects)
+
+    async def _record(applications):
+        recorded.extend(applications)
+        return len(applications)
+
+    db._ensure_corporate_actions_schema = _skip_schema
+    db._ensure_market_candles_canonical_schema = _skip_schema
+    db.get_corporate_action_effects = _effects
+    db.record_corporate_action_applications = _record
+    return db, conn, recorded
+
+
+def _split_candles():
+    closes = [88.0, 89.0, 90.0, 9.1, 9.2]
+    days = [(7, 31), (8, 1), (8, 3), (8, 4), (8, 5)]
+    return [
+        {
+            "ts": datetime(2026, month, day, 20, 0, tzinfo=UTC),
+            "ticker": "YPFD",
+            "asset_type": "ACCION",
+            "open_price": close,
+            "high_price": close,
+            "low_price": close,
+            "close_price": close,
+            "volume": 100.0,
+            "source": "COCOS",
+        }
+        for (month, day), close in zip(days, closes)
+    ]
+
+
+def test_adjusted_candles_are_versioned_and_raw_or_old_views_stay_reproducible():
+    candles = _split_candles()
+    effects = [_effect()]
+    db, conn, recorded = _adjustment_db(candles, effects)
+
+    assert asyncio.run(db.refresh_candle_adjustments(["ypfd"], reason="upsert")) == {"YPFD": 1}
+    # Sin effects ni velas nuevas desde built_at el refresh diario no relee historia.
+    loads = conn.candle_loads
+    assert asyncio.run(db.refresh_candle_adjustments(None, reason="daily")) == {}
+    assert conn.candle_loads == loads
+    candles.append({
+        **candles[-1],
+        "ts": datetime(2026, 8, 6, 20, 0, tzinfo=UTC),
+        "refreshed_at": datetime(2026, 8, 6, 21, 0, tzinfo=UTC),
+    })
+    assert asyncio.run(db.refresh_candle_adjustments(None, reason="daily")) == {}
+    assert conn.candle_loads == loads + 1
+    candles.pop()
+    assert {application.component for application in recorded} == {"MARKET_CANDLES_ADJUSTED"}
+
+    frames = asyncio.run(db.get_market_candles_bulk(["YPFD"], adjusted=True))
+    raw_frame = asyncio.run(db.get_market_candles_bulk(["YPFD"]))["YPFD"]
+    expected, _, _ = normalize_frame_for_effects("YPFD", raw_frame, effects)
+    pd.testing.assert_frame_equal(frames["YPFD"], expected, check_freq=False)
+    assert frames["YPFD"].attrs["corporate_action_effect_ids"] == (11,)
+    assert frames["YPFD"].attrs["corporate_adjustment_version"] == 1
+    # The frame guard sees the effect as already applied and leaves it alone.
+    guarded, applications, _ = normalize_frame_for_effects("YPFD", frames["YPFD"], effects)
+    assert applications == []
+    assert guarded["Close"].tolist() == pytest.approx(frames["YPFD"]["Close"].tolist())
+
+    effects.clear()  # split cancelado
+    assert asyncio.run(db.refresh_candle_adjustments(["YPFD"], reason="cancel")) == {"YPFD": 2}
+    history = asyncio.run(db.get_candle_adjustment_history("YPFD"))
+    assert [(item.version, item.status, len(item.steps)) for item in history] == [
+        (1, "SUPERSEDED", 1),
+        (2, "CURRENT", 0),
+    ]
+
+    current = asyncio.run(db.get_market_candle_rows_bulk(["YPFD"], adjusted=True))["YPFD"]
+    audit = asyncio.run(db.get_market_candle_rows_bulk(["YPFD"], adjustment_version=1))["YPFD"]
+    raw = asyncio.run(db.get_market_candle_rows_bulk(["YPFD"]))["YPFD"]
+    assert [row["close_price"] for row in current] == [row["close_price"] for row in raw]
+    assert [row["close_price"] for row in audit] == pytest.approx([8.8, 8.9, 9.0, 9.1, 9.2])
+    assert raw[0]["close_price"] == 88.0
+
+
+def test_db_outcome_batch_uses_persisted_adjustment_without_loading_effects():
+    candles = _split_candles()
+    db, _, _ = _adjustment_db(candles, [_effect()])
+    asyncio.run(db.refresh_candle_adjustments(["YPFD"], reason="upsert"))
+
+    async def _no_effects(**_kwargs):
+        raise AssertionError("effects should come from the persisted version")
+
+    db.get_corporate_action_effects = _no_effects
+    rows = [{
+        "id": 7,
+        "ticker": "YPFD",
+        "price_at_decision": 90.0,
+        "decided_at": datetime(2026, 8, 3, 15, 0, tzinfo=UTC),
+        "decision": "BUY",
+    }]
+    (outcome,) = asyncio.run(db._compute_outcome_batch(
+        rows, now=datetime(2026, 8, 20, tzinfo=UTC), log_prefix="test",
+    ))
+
+    assert outcome.corporate_adjustment_factor == pytest.approx(0.1)
+    assert outcome.is_canonical
+
+
+def test_concurrent_adjustment_refresh_rechecks_current_version_under_ticker_lock():
+    db, conn, _ = _adjustment_db(_split_candles(), [_effect()])
+    other, other_conn, _ = _adjustment_db(_split_candles(), [_effect()])
+
+    assert asyncio.run(other.refresh_candle_adjustments(["YPFD"], reason="daily")) == {"YPFD": 1}
+
+    def _other_run_commits_first():
+        # La otra corrida commiteo la misma version entre la lectura y el lock.
+        conn.on_lock = None
+        conn.versions.extend(other_conn.versions)
+
+    conn.on_lock = _other_run_commits_first
+    changed = asyncio.run(db.refresh_candle_adjustments(["YPFD"], reason="upsert"))
+
+    assert changed == {}
+    assert conn.locks == [(CANDLE_ADJUSTMENT_LOCK_CLASS, "YPFD:1d")]
+    assert [(h["version"], h["status"]) for h in conn.versions] == [(1, "CURRENT")]
@@ -0,0 +1,105 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.core import db_pool
+
+
+class _FakePool:
+    def __init__(self, dsn, **kwargs):
+        self.dsn = dsn
+        self.kwargs = kwargs
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield _FakeConn()
+
+
+class _FakeConn:
+    async def fetchval(self, sql, *args):
+        return False
+
+
+def test_get_pool_is_shared_per_loop_and_closed_with_it(monkeypatch):
+    created: list[_FakePool] = []
+
+    async def _create_pool(dsn, **kwargs):
+        await asyncio.sleep(0)
+        pool = _FakePool(dsn, **kwargs)
+        created.append(pool)
+        return pool
+
+    monkeypatch.setattr(db_pool.asyncpg, "create_pool", _create_pool)
+
+    async def scenario():
+        return await asyncio.gather(
+            db_pool.get_pool("postgresql+asyncpg://u:p@db/portfolio"),
+            db_pool.get_pool("postgresql://u:p@db/portfolio"),
+            db_pool.get_pool("postgresql://u:p@db/portfolio"),
+        )
+
+    first_run = asyncio.run(scenario())
+    second_run = asyncio.run(scenario())
+
+    assert len(created) == 2
+    assert all(pool is first_run[0] for pool in first_run)
+    assert second_run[0] is not first_run[0]
+    assert created[0].dsn == "postgresql://u:p@db/portfolio"
+    assert "statement_cache_size" in created[0].kwargs
+    assert all(pool.closed for pool in created)
+    assert not db_pool._pools
+
+
+def test_pools_are_keyed_by_loop_object_and_closed_loops_are_dropped(monkeypatch):
+    created: list[_FakePool] = []
+
+    async def _create_pool(dsn, **kwargs):
+        pool = _FakePool(dsn, **kwargs)
+        created.append(pool)
+        return pool
+
+    monkeypatch.setattr(db_pool.asyncpg, "create_pool", _create_pool)
+
+    # Loop cerrado sin asyncio.run(): el keeper nunca corre.
+    dead = asyncio.new_event_loop()
+    first = dead.run_until_complete(db_pool.get_pool("postgresql://u:p@db/portfolio"))
+    dead.close()
+    assert dead in db_pool._pools
+
+    second = asyncio.run(db_pool.get_pool("postgresql://u:p@db/portfolio"))
+
+    assert second is not first
+    assert dead not in db_pool._pools
+    assert second.closed and not db_pool._pools
+
+
+def test_portfolio_database_closes_only_a_private_pool(monkeypatch):
+    from src.collector import db as db_module
+
+    created: list[_FakePool] = []
+
+    async def _create_pool(dsn, **kwargs):
+        pool = _FakePool(dsn, **kwargs)
+        created.append(pool)
+        return pool
+
+    monkeypatch.setattr(db_pool.asyncpg, "create_pool", _create_pool)
+
+    async def scenario():
+        shared = db_module.PortfolioDatabase("postgresql://u:p@db/portfolio")
+        private = db_module.PortfolioDatabase("postgresql://u:p@db/portfolio", shared_pool=False)
+        await shared.connect()
+        await private.connect()
+        shared_pool, private_pool = shared._pool, private._pool
+        await shared.close()
+        await private.close()
+        return shared_pool, private_pool, shared_pool.closed, private_pool.closed
+
+    shared_pool, private_pool, shared_closed_early, private_closed_early = asyncio.run(scenario())
+
+    assert shared_pool is not private_pool and len(created) == 2
+    assert not shared_closed_early and private_closed_early
+    assert shared_pool.closed
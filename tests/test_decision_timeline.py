@@ -231,15 +231,7 @@ def test_monitor_registers_read_only_audit_timeline_route():
     assert 'app.router.add_get("/api/audit-timeline", audit_timeline)' in monitor_api
 
 
-def test_pending_marks_lookup_latest_price_per_decision(monkeypatch):
-    async def _schema_ready(_conn):
-        return None
-
-    monkeypatch.setattr(
-        decision_ledger,
-        "ensure_decision_audit_scope_columns",
-        _schema_ready,
-    )
+def test_pending_marks_lookup_latest_price_per_decision():
     conn = _FakeConn()
 
     asyncio.run(decision_ledger.fetch_decision_ledger(conn))
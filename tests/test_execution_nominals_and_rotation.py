@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import json
 from pathlib import Path
@@ -263,20 +264,15 @@ def test_external_radar_order_persists_reference_price(monkeypatch):
 
     conn = _Connection()
 
-    async def _connect(_url):
-        return conn
+    @asynccontextmanager
+    async def _connection(_url):
+        yield conn
 
-    async def _ensure_scope(_conn):
-        return None
+    async def _schema_migrations(_conn):
+        return []
 
-    async def _ensure_plan_tables(_conn):
-        return None
-
-    import asyncpg
-
-    monkeypatch.setattr(asyncpg, "connect", _connect)
-    monkeypatch.setattr(run_analysis, "ensure_decision_audit_scope_columns", _ensure_scope)
-    monkeypatch.setattr(run_analysis, "ensure_execution_plan_persistence", _ensure_plan_tables)
+    monkeypatch.setattr(run_analysis, "connection", _connection)
+    monkeypatch.setattr(run_analysis, "apply_schema_migrations", _schema_migrations)
 
     order = OrderIntent(
         ticker="UPST",
@@ -396,8 +392,9 @@ def test_decision_price_warning_excludes_blocked_rows(monkeypatch):
         def __init__(self, *_args):
             pass
 
-        def send_raw(self, message):
+        async def send_raw_async(self, message):
             sent.append(message)
+            return True
 
     cfg = SimpleNamespace(
         database=SimpleNamespace(url="postgresql://unused"),
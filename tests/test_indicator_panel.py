@@ -0,0 +1,95 @@
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.opportunity_screener import (
+    _compute_screener_metrics,
+    _compute_screener_metrics_panel,
+    screen_universe,
+)
+from src.analysis.technical import (
+    analyze_portfolio_from_frames,
+    compute_indicators,
+    compute_indicators_panel,
+)
+
+
+def _frames(lengths: list[int], *, seed: int = 7) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i, n in enumerate(lengths):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        if i % 3 == 0:
+            # Rally sin pérdidas: el RSI final queda NaN y se toma el último válido.
+            close[-15:] = np.linspace(close[-16], close[-16] * 1.2, 15)
+        frames[f"T{i}"] = pd.DataFrame(
+            {
+                "Open": close,
+                "High": close * (1 + rng.uniform(0, 0.02, n)),
+                "Low": close * (1 - rng.uniform(0, 0.02, n)),
+                "Close": close,
+                "Volume": rng.integers(0, 1_000, n).astype(float),
+            },
+            index=pd.date_range("2025-01-01", periods=n, freq="B", tz="UTC"),
+        )
+    return frames
+
+
+def test_indicator_panel_matches_per_ticker_snapshots():
+    frames = _frames([59, 60, 75, 199, 200, 260])
+    frames["T1"].loc[frames["T1"].index[10], "Volume"] = np.nan
+
+    panel = compute_indicators_panel(frames)
+
+    assert panel["T0"] is None
+    for ticker, frame in frames.items():
+        expected = compute_indicators(frame, ticker)
+        if expected is None:
+            assert panel[ticker] is None
+            continue
+        got = asdict(panel[ticker])
+        for field, value in asdict(expected).items():
+            if field == "ticker":
+                assert got[field] == value
+            else:
+                assert got[field] == pytest.approx(value, rel=1e-9, abs=1e-9), (ticker, field)
+
+
+def test_analyze_portfolio_from_frames_uses_panel_snapshots():
+    frames = _frames([80, 260])
+
+    signals = analyze_portfolio_from_frames(frames)
+
+    assert {signal.ticker for signal in signals} == {"T0", "T1"}
+
+
+def test_screener_panel_matches_per_ticker_metrics():
+    frames = {
+        ticker: frame[["Close", "Volume"]]
+        for ticker, frame in _frames([30, 40, 41, 61, 130, 200, 260], seed=3).items()
+    }
+    asset_types = {ticker: ("ACCION" if i % 2 else "CEDEAR") for i, ticker in enumerate(frames)}
+
+    panel = _compute_screener_metrics_panel(frames, 0.01, 0.02, asset_types)
+
+    for ticker, frame in frames.items():
+        expected = asdict(
+            _compute_screener_metrics(ticker, frame, 0.01, 0.02, asset_type=asset_types[ticker])
+        )
+        got = asdict(panel[ticker])
+        for field, value in expected.items():
+            if isinstance(value, float):
+                assert got[field] == pytest.approx(value, rel=1e-9, abs=1e-12), (ticker, field)
+            else:
+                assert got[field] == value, (ticker, field)
+
+
+def test_screen_universe_keeps_ticker_order_and_missing_history():
+    frames = _frames([260, 260])
+
+    results = screen_universe(["T1", "MISSING", "T0"], history_frames=frames)
+
+    assert [m.ticker for m in results] == ["T1", "MISSING", "T0"]
+    assert results[1].fail_reason == "sin velas Cocos suficientes"
@@ -275,8 +275,9 @@ def test_shadow_match_is_predecision_and_store_cannot_write_operational_tables()
     assert not re.search(r"DELETE\s+FROM\s+decision_log", source, re.I)
     assert not re.search(r"(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+shadow_thesis_", source, re.I)
     assert "dl.status = 'BLOCKED'" in LOAD_BLOCKED_CASE_INPUTS_SQL
-    assert "mc.source = 'COCOS'" in LOAD_BLOCKED_CASE_INPUTS_SQL
-    assert "PARTITION BY mc.ticker" in LOAD_BLOCKED_CASE_INPUTS_SQL
+    # La fuente ganadora por dia ya viene resuelta en la tabla canonica.
+    assert "FROM market_candles_canonical mcc" in LOAD_BLOCKED_CASE_INPUTS_SQL
+    assert "FROM market_candles mc" not in LOAD_BLOCKED_CASE_INPUTS_SQL
     assert "bench.max_abs_gap >= 0.35" in LOAD_BLOCKED_CASE_INPUTS_SQL
     assert "LEAST(0, MIN" in LOAD_BLOCKED_CASE_INPUTS_SQL
     assert "GREATEST(0, MAX" in LOAD_BLOCKED_CASE_INPUTS_SQL
@@ -0,0 +1,48 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from src.core import market_price_cache
+from src.core.market_price_cache import (
+    MARKET_PRICES_LATEST_CACHE_KEY,
+    cache_latest_market_prices,
+    get_cached_latest_market_prices,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+
+def test_mirror_rows_older_than_max_age_are_dropped(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr(market_price_cache, "redis_client", fake)
+    ts = datetime(2026, 10, 16, 15, tzinfo=timezone.utc)
+
+    asyncio.run(cache_latest_market_prices([
+        {"ticker": "ggal", "last_price": 110, "ts": ts},
+        {"ticker": "YPFD", "last_price": 40, "ts": ts},
+    ]))
+    # YPFD quedo espejado hace 10 minutos y nadie lo volvio a escribir.
+    stale = json.loads(fake.hashes[MARKET_PRICES_LATEST_CACHE_KEY]["YPFD"])
+    stale["cached_at"] = (datetime.now(timezone.utc) - timedelta(minutes=10)).isoformat()
+    fake.hashes[MARKET_PRICES_LATEST_CACHE_KEY]["YPFD"] = json.dumps(stale)
+
+    everything = asyncio.run(get_cached_latest_market_prices())
+    fresh = asyncio.run(get_cached_latest_market_prices(max_age_seconds=180))
+    wanted = asyncio.run(get_cached_latest_market_prices(["YPFD"], max_age_seconds=180))
+
+    assert sorted(row["ticker"] for row in everything) == ["GGAL", "YPFD"]
+    assert [row["ticker"] for row in fresh] == ["GGAL"]
+    assert fresh[0]["ts"] == ts and fresh[0]["last_price"] == 110.0
+    assert wanted == []
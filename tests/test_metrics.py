@@ -0,0 +1,92 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.core import metrics
+from src.core.metrics import MetricsRegistry, instrument_methods, render_prometheus
+from src.monitor import api
+from src.scheduler import runner
+
+
+def test_histogram_snapshot_has_cumulative_buckets_and_quantiles():
+    registry = MetricsRegistry("scheduler")
+    for value in (0.002, 0.02, 0.2, 2.0, 2000.0):
+        registry.observe(metrics.JOB_SECONDS, value, job="run_full")
+
+    (series,) = registry.snapshot()["families"][metrics.JOB_SECONDS]
+
+    assert series["labels"] == {"job": "run_full"}
+    assert series["count"] == 5
+    assert series["buckets"][-1] == 5
+    assert series["buckets"] == sorted(series["buckets"])
+    assert series["quantiles"]["0.5"] == 0.2
+    assert series["quantiles"]["0.99"] == 2000.0
+
+
+def test_render_prometheus_merges_processes_and_escapes_labels():
+    scheduler = MetricsRegistry("scheduler")
+    scheduler.observe(metrics.LOOP_LAG_SECONDS, 0.3)
+    monitor = MetricsRegistry("monitor_api")
+    monitor.observe(metrics.LOOP_LAG_SECONDS, 0.01)
+    monitor.observe(metrics.HTTP_REQUEST_SECONDS, 0.05, route='/api/"x"')
+
+    text = render_prometheus([scheduler.snapshot(), json.loads(json.dumps(monitor.snapshot()))])
+
+    assert text.count(f"# TYPE {metrics.LOOP_LAG_SECONDS} histogram") == 1
+    assert f'{metrics.LOOP_LAG_SECONDS}_bucket{{process="scheduler",le="+Inf"}} 1' in text
+    assert f'{metrics.LOOP_LAG_SECONDS}_count{{process="monitor_api"}} 1' in text
+    assert 'route="/api/\\"x\\""' in text
+    assert f'{metrics.LOOP_LAG_SECONDS}_quantile{{process="scheduler",quantile="0.95"}} 0.3' in text
+
+
+def test_instrument_methods_times_public_coroutines(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+
+    @instrument_methods(metrics.DB_QUERY_SECONDS, exclude=("connect",))
+    class FakeDB:
+        async def connect(self):
+            return None
+
+        async def get_rows(self):
+            return [1]
+
+        async def _private(self):
+            return None
+
+    db = FakeDB()
+    assert asyncio.run(db.get_rows()) == [1]
+    asyncio.run(db.connect())
+    asyncio.run(db._private())
+
+    series = registry.snapshot()["families"][metrics.DB_QUERY_SECONDS]
+    assert [item["labels"] for item in series] == [{"method": "get_rows"}]
+
+
+def test_scheduler_job_listener_records_duration_and_status(monkeypatch):
+    registry = MetricsRegistry("scheduler")
+    monkeypatch.setattr(runner, "METRICS", registry)
+
+    runner._on_job_event(SimpleNamespace(code=runner.EVENT_JOB_SUBMITTED, job_id="run_full"))
+    runner._on_job_event(
+        SimpleNamespace(code=runner.EVENT_JOB_ERROR, job_id="run_full", exception=RuntimeError())
+    )
+    runner._on_job_event(SimpleNamespace(code=runner.EVENT_JOB_EXECUTED, job_id="orphan", exception=None))
+
+    series = registry.snapshot()["families"][metrics.JOB_SECONDS]
+    assert [item["labels"] for item in series] == [{"job": "run_full", "status": "error"}]
+
+
+def test_metrics_endpoint_includes_scheduler_snapshot(monkeypatch):
+    scheduler = MetricsRegistry("scheduler")
+    scheduler.observe(metrics.JOB_SECONDS, 1.5, job="run_full", status="ok")
+
+    async def fake_redis_get(key):
+        assert key == metrics.SCHEDULER_METRICS_KEY
+        return json.dumps(scheduler.snapshot()).encode()
+
+    monkeypatch.setattr(api, "_redis_get", fake_redis_get)
+    response = asyncio.run(api.metrics(None))
+
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'job="run_full"' in response.body.decode()
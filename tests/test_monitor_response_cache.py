@@ -0,0 +1,154 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.core.metrics import HTTP_CACHE_LOOKUP_SECONDS, REGISTRY
+from src.monitor import api
+from src.monitor.response_cache import ResponseCache
+
+
+class _Conn:
+    def __init__(self, state):
+        self.state = state
+
+    async def fetchrow(self, sql):
+        self.state["watermark_queries"].append(sql)
+        return {"decisions": self.state["decisions"], "candles": "2026-01-02"}
+
+
+class _Pool:
+    def __init__(self, state):
+        self.state = state
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield _Conn(self.state)
+
+
+def _app(state):
+    @api.cached_response("decisions", "candles")
+    async def view(request):
+        state["computed"] += 1
+        await asyncio.sleep(0.05)
+        if request.query.get("owner_chat_id") == "x":
+            return api._json({"ok": False, "error": "owner_chat_id invalido"}, status=400)
+        return api._json({"ok": True, "computed": state["computed"], "days": request.query.get("days")})
+
+    app = web.Application()
+    app["pool"] = _Pool(state)
+    app["response_cache"] = ResponseCache(ttl_seconds=300)
+    app.router.add_get("/api/radar-audit", view)
+    return app
+
+
+def _run(state, scenario):
+    async def runner():
+        client = TestClient(TestServer(_app(state)))
+        await client.start_server()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(runner())
+
+
+def test_concurrent_tabs_share_one_computation_until_watermark_moves():
+    REGISTRY.clear()
+    state = {"computed": 0, "decisions": "41/", "watermark_queries": []}
+
+    async def scenario(client):
+        first = await asyncio.gather(*(client.get("/api/radar-audit?days=90") for _ in range(4)))
+        bodies = [await r.json() for r in first]
+        again = await (await client.get("/api/radar-audit?days=90")).json()
+        other_params = await (await client.get("/api/radar-audit?days=30")).json()
+        state["decisions"] = "42/"
+        refreshed = await (await client.get("/api/radar-audit?days=90")).json()
+        return bodies, again, other_params, refreshed
+
+    bodies, again, other_params, refreshed = _run(state, scenario)
+
+    assert {b["computed"] for b in bodies} == {1}
+    assert again == bodies[0]
+    assert other_params["computed"] == 2 and other_params["days"] == "30"
+    assert refreshed["computed"] == 3
+    assert state["computed"] == 3
+    assert "FROM decision_log" in state["watermark_queries"][0]
+    assert "market_candles_canonical" in state["watermark_queries"][0]
+    outcomes = {
+        series["labels"]["outcome"]: series["count"]
+        for series in REGISTRY.snapshot()["families"][HTTP_CACHE_LOOKUP_SECONDS]
+    }
+    assert outcomes == {"miss": 3, "shared": 3, "hit": 1}
+
+
+def test_if_none_match_returns_304_and_errors_are_not_cached():
+    state = {"computed": 0, "decisions": "41/", "watermark_queries": []}
+
+    async def scenario(client):
+        first = await client.get("/api/radar-audit")
+        etag = first.headers["ETag"]
+        revalidated = await client.get("/api/radar-audit", headers={"If-None-Match": etag})
+        stale = await client.get("/api/radar-audit", headers={"If-None-Match": '"otro"'})
+        bad = [await client.get("/api/radar-audit?owner_chat_id=x") for _ in range(2)]
+        return first, etag, revalidated, await revalidated.read(), stale, bad
+
+    first, etag, revalidated, revalidated_body, stale, bad = _run(state, scenario)
+
+    assert first.status == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert revalidated.status == 304 and revalidated_body == b""
+    assert revalidated.headers["ETag"] == etag
+    assert stale.status == 200 and stale.headers["ETag"] == etag
+    assert [r.status for r in bad] == [400, 400]
+    assert state["computed"] == 3
+
+
+def test_performance_watermark_covers_hold_and_causal_tables_and_edited_movements():
+    state = {"decisions": "41/", "watermark_queries": []}
+    sources = ("broker", "hold_observations", "shadow_causal")
+
+    class _WatermarkConn(_Conn):
+        async def fetchrow(self, sql):
+            self.state["watermark_queries"].append(sql)
+            return {name: f"{name}-1" for name in sources}
+
+    class _WatermarkPool(_Pool):
+        @asynccontextmanager
+        async def acquire(self):
+            yield _WatermarkConn(self.state)
+
+    watermark = asyncio.run(api._data_watermark(_WatermarkPool(state), sources))
+
+    sql = state["watermark_queries"][0]
+    assert watermark == ("broker-1", "hold_observations-1", "shadow_causal-1")
+    assert "MAX(updated_at) FROM broker_movements" in sql
+    assert "MAX(updated_at) FROM position_hold_observations" in sql
+    assert "MAX(analyzed_at) FROM shadow_thesis_causal_analysis" in sql
+
+
+def test_override_audit_watermark_covers_inferred_activity_sources(monkeypatch):
+    seen = []
+
+    class _Stop(Exception):
+        pass
+
+    async def _record(pool, sources):
+        seen.append(sources)
+        raise _Stop
+
+    monkeypatch.setattr(api, "_data_watermark", _record)
+    request = SimpleNamespace(app={"response_cache": object(), "pool": None}, path="/api/override-audit")
+
+    with pytest.raises(_Stop):
+        asyncio.run(api.override_audit(request))
+
+    assert {"snapshots", "corporate_effects"} <= set(seen[0])
+    assert "FROM portfolio_snapshots" in api.RESPONSE_CACHE_WATERMARKS["snapshots"]
+    corporate_sql = api.RESPONSE_CACHE_WATERMARKS["corporate_effects"]
+    assert "MAX(updated_at) FROM corporate_event_instrument_effects" in corporate_sql
+    assert "MAX(updated_at) FROM corporate_events" in corporate_sql
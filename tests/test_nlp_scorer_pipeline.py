@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from src.analysis import nlp_scorer
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executemany_calls: list[tuple[str, list[tuple]]] = []
+        self.execute_calls: list[tuple[str, tuple]] = []
+
+    async def fetch(self, sql, *args):
+        return self.rows[: args[1]]
+
+    async def executemany(self, sql, args):
+        self.executemany_calls.append((sql, list(args)))
+
+    async def execute(self, sql, *args):
+        self.execute_calls.append((sql, args))
+
+
+def _row(raw_id, headline):
+    return {
+        "id": raw_id,
+        "fetched_at": "2026-06-22T12:00:00Z",
+        "source": "wire",
+        "url": f"https://example.test/{raw_id}",
+        "headline": headline,
+        "body_snippet": "",
+        "published_at": None,
+    }
+
+
+def _ollama(latency=0.05, *, fail=False):
+    """Ollama stand-in: answers single and batch prompts after `latency` seconds."""
+    state = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def handler(request):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+            if fail:
+                raise httpx.ConnectError("ollama down", request=request)
+            prompt = json.loads(request.content)["messages"][-1]["content"]
+            ids = [int(part.split("]")[0]) for part in prompt.split("[id=")[1:]]
+            item = {"ticker": "GGAL", "asset_scope": "ticker", "score": 0.4, "impact": "mid",
+                    "confidence": 0.7, "horizon": "5d", "event_type": "company", "summary": "ok"}
+            content = {"items": [{"id": raw_id, **item} for raw_id in ids]} if ids else item
+            return httpx.Response(200, json={"message": {"content": json.dumps(content)}})
+        finally:
+            state["in_flight"] -= 1
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), state
+
+
+@pytest.fixture(autouse=True)
+def _empty_content_cache():
+    nlp_scorer._CONTENT_CACHE.clear()
+    yield
+    nlp_scorer._CONTENT_CACHE.clear()
+
+
+def test_backlog_is_scored_concurrently_deduplicated_and_saved_in_bulk():
+    rows = [_row(i, f"GGAL headline {i}") for i in range(12)]
+    rows += [_row(100 + i, "  GGAL   Headline 0 ") for i in range(4)]
+    conn = _FakeConn(rows)
+
+    async def scenario():
+        client, state = _ollama()
+        async with client:
+            started = time.perf_counter()
+            stats = await nlp_scorer.score_pending_items(conn, limit=50, concurrency=6, client=client)
+            return stats, state, time.perf_counter() - started
+
+    stats, state, elapsed = asyncio.run(scenario())
+
+    assert stats == {"pending": 16, "scored": 16, "failed": 0, "deduplicated": 4, "cached": 0}
+    assert state["requests"] == 12
+    assert state["max_in_flight"] == 6
+    assert elapsed < 12 * 0.05
+    ((sql, args),) = conn.executemany_calls
+    assert "INSERT INTO sentiment_scored" in sql
+    assert sorted(a[0] for a in args) == sorted(r["id"] for r in rows)
+    assert {a[11] for a in args} == {"ollama"}
+    (update_sql, (ids,)), = conn.execute_calls
+    assert "ANY($1::bigint[])" in update_sql and len(ids) == 16
+
+
+def test_batches_share_prompts_and_content_cache_spans_cycles():
+    rows = [_row(i, f"headline {i}") for i in range(7)]
+
+    async def scenario():
+        client, state = _ollama(latency=0.0)
+        async with client:
+            first = await nlp_scorer.score_pending_items(
+                _FakeConn(rows), batch_size=3, client=client,
+            )
+            second = await nlp_scorer.score_pending_items(
+                _FakeConn([_row(50, "HEADLINE 1")]), batch_size=3, client=client,
+            )
+        return first, second, state
+
+    first, second, state = asyncio.run(scenario())
+
+    assert state["requests"] == 3
+    assert first["scored"] == 7
+    assert second["cached"] == 1 and second["scored"] == 1
+
+
+def test_unavailable_scorer_falls_back_to_heuristic_for_remaining_items(monkeypatch):
+    monkeypatch.setattr(nlp_scorer, "HEURISTIC_FALLBACK_ENABLED", True)
+    rows = [_row(i, f"GGAL sube {i}") for i in range(5)]
+    conn = _FakeConn(rows)
+
+    async def scenario():
+        client, state = _ollama(latency=0.0, fail=True)
+        async with client:
+            stats = await nlp_scorer.score_pending_items(conn, concurrency=1, client=client)
+        return stats, state
+
+    stats, state = asyncio.run(scenario())
+
+    assert state["requests"] == 1
+    assert stats["scored"] == 5
+    ((_, args),) = conn.executemany_calls
+    assert {a[11] for a in args} == {"heuristic"}
+
+
+def test_without_fallback_errored_rows_count_attempts(monkeypatch):
+    monkeypatch.setattr(nlp_scorer, "HEURISTIC_FALLBACK_ENABLED", False)
+    conn = _FakeConn([_row(i, f"headline {i}") for i in range(3)])
+
+    async def scenario():
+        client, _ = _ollama(latency=0.0, fail=True)
+        async with client:
+            return await nlp_scorer.score_pending_items(conn, concurrency=1, client=client)
+
+    stats = asyncio.run(scenario())
+
+    assert stats["failed"] == 1 and stats["scored"] == 0
+    (sql, (ids,)), = conn.execute_calls
+    assert "score_attempts = score_attempts + 1" in sql and ids == [0]
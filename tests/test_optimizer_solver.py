@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+from src.analysis import optimizer
+from src.analysis.optimizer_solver import (
+    minimize_bounded_simplex,
+    negative_sharpe,
+    project_bounded_simplex,
+    risk_parity_gap,
+    variance,
+)
+
+
+def _problem(n: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(size=(250, n)) * 0.02 + rng.normal(size=(250, 1)) * 0.01
+    cov = np.cov(returns.T) * 252
+    mu = returns.mean(axis=0) * 252 + rng.normal(0.1, 0.1, n)
+    lo = np.full(n, 0.02)
+    hi = rng.uniform(0.15, 0.4, n)
+    return mu, cov, lo, hi
+
+
+def test_projection_is_feasible_and_keeps_cash_when_caps_bind():
+    lo = np.full(4, 0.02)
+    hi = np.array([0.5, 0.4, 0.3, 0.3])
+    w = project_bounded_simplex(np.array([0.9, -0.3, 0.2, 0.4]), lo, hi)
+
+    assert w.sum() == pytest.approx(1.0, abs=1e-12)
+    assert np.all(w >= lo) and np.all(w <= hi)
+    capped = project_bounded_simplex(np.ones(3), np.full(3, 0.02), np.full(3, 0.25))
+    assert capped.tolist() == [0.25, 0.25, 0.25]
+
+
+@pytest.mark.parametrize("n", [5, 30])
+@pytest.mark.parametrize("objective", ["sharpe", "variance", "risk_parity"])
+def test_solver_reaches_reference_optimum_and_converges(n, objective):
+    mu, cov, lo, hi = _problem(n)
+    fun = {
+        "sharpe": negative_sharpe(mu, cov, 0.05),
+        "variance": variance(cov),
+        "risk_parity": risk_parity_gap(cov, np.ones(n) / n),
+    }[objective]
+    reference = minimize(
+        lambda w: fun(w)[0],
+        np.ones(n) / n,
+        jac=lambda w: fun(w)[1],
+        bounds=list(zip(lo, hi)),
+        constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0}],
+        method="SLSQP",
+        options={"ftol": 1e-14, "maxiter": 2000},
+    )
+
+    weights, stats = minimize_bounded_simplex(fun, np.ones(n) / n, lo, hi, engine=objective)
+
+    assert stats.converged
+    assert stats.iterations < 200
+    assert stats.objective == pytest.approx(reference.fun, abs=1e-8)
+    assert weights.sum() == pytest.approx(1.0, abs=1e-10)
+
+
+def test_run_optimizer_warm_starts_and_reports_solver_stats(monkeypatch):
+    written = []
+    monkeypatch.setattr(optimizer, "_write_optimizer_diagnostic", lambda payload: written.append(payload))
+    rng = np.random.default_rng(5)
+    tickers = ["AAA", "BBB", "CCC", "DDD"]
+    frames = {
+        ticker: pd.DataFrame(
+            {"Close": 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, 200)))},
+            index=pd.date_range("2025-01-01", periods=200, freq="B"),
+        )
+        for ticker in tickers
+    }
+    positions = [{"ticker": ticker, "market_value": 250.0} for ticker in tickers]
+    results = [
+        SimpleNamespace(ticker=ticker, final_score=0.2, confidence=0.6, conviction=0.6)
+        for ticker in tickers
+    ]
+    kwargs = dict(
+        current_positions=positions,
+        portfolio_value_ars=1_000.0,
+        cash_ars=0.0,
+        macro_regime={"market": "neutral"},
+        vix=27.0,  # MIN_VARIANCE: solver numpy
+        synthesis_results=results,
+        market_assets=[],
+        history_frames=frames,
+    )
+
+    cold = optimizer.run_optimizer(**kwargs)
+    warm = optimizer.run_optimizer(**kwargs, warm_start=cold.optimization.weights)
+
+    assert cold.optimization.method == "MIN_VARIANCE"
+    assert cold.optimization.solver["engine"] == "numpy_min_variance"
+    assert cold.optimization.solver["converged"] is True
+    assert warm.optimization.solver["iterations"] < cold.optimization.solver["iterations"]
+    assert warm.optimization.weights == pytest.approx(cold.optimization.weights, abs=1e-6)
+    assert written[-1]["solver"] == warm.optimization.solver
+    assert written[-1]["error"] is None
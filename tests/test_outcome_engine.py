@@ -0,0 +1,252 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.analysis.corporate_actions import (
+    CorporateActionEffect,
+    EvidenceLevel,
+    plan_candle_adjustment,
+)
+from src.analysis.outcome_engine import (
+    CANONICAL_OUTCOME_BASIS,
+    LEGACY_EXTERNAL_OUTCOME_BASIS,
+    PendingOutcome,
+    compute_ticker_outcomes,
+)
+from src.collector.db import PortfolioDatabase
+
+
+UTC = timezone.utc
+
+
+def _candles(start: datetime, closes: list[float], *, asset_type: str = "ACCION") -> list[dict]:
+    return [
+        {
+            "ts": start + timedelta(days=index),
+            "open_price": close,
+            "close_price": close,
+            "asset_type": asset_type,
+        }
+        for index, close in enumerate(closes)
+    ]
+
+
+def _split_effect(ticker: str = "YPFD") -> CorporateActionEffect:
+    return CorporateActionEffect(
+        event_id=1,
+        effect_id=11,
+        event_key=f"YPF:{ticker}:SPLIT:2026-08-04",
+        issuer_id="YPF",
+        event_type="SPLIT",
+        lifecycle_status="EFFECTIVE",
+        effective_at=datetime(2026, 8, 4, 3, 0, tzinfo=UTC),
+        expires_at=None,
+        source_name="YPF Investors",
+        source_url="https://inversores.ypf.com/",
+        ingestion_method="MANUAL",
+        evidence_level=EvidenceLevel.PRIMARY_OFFICIAL.value,
+        detector_score=None,
+        instrument_id=f"BYMA:ACCION:{ticker}:ARS",
+        ticker=ticker,
+        venue="BYMA",
+        asset_type="ACCION",
+        currency="ARS",
+        quantity_factor=10.0,
+        price_factor=0.1,
+        cost_basis_factor=0.1,
+    )
+
+
+def test_compute_ticker_outcomes_fills_all_horizons_for_every_decision():
+    start = datetime(2026, 1, 1, 20, 0, tzinfo=UTC)
+    candles = _candles(start, [100.0 + index for index in range(60)])
+    decisions = [
+        PendingOutcome(1, "GGAL", 100.0, datetime(2026, 1, 1, 15, 0, tzinfo=UTC), "BUY"),
+        PendingOutcome(2, "GGAL", 100.0, datetime(2026, 1, 1, 15, 0, tzinfo=UTC), "SELL"),
+    ]
+
+    buy, sell = compute_ticker_outcomes(decisions, candles, now=start + timedelta(days=59))
+
+    assert buy.outcome_basis == CANONICAL_OUTCOME_BASIS
+    assert buy.outcomes["outcome_5d"] == pytest.approx(0.05)
+    assert buy.outcomes["outcome_40d"] == pytest.approx(0.40)
+    assert buy.was_correct is True
+    assert sell.outcomes["outcome_5d"] == pytest.approx(-0.05)
+    assert sell.was_correct is False
+    assert buy.next_executable_price == pytest.approx(100.0)
+    assert buy.executable_outcomes["executable_outcome_10d"] == pytest.approx(0.10)
+
+
+def test_compute_ticker_outcomes_only_emits_matured_horizons():
+    start = datetime(2026, 1, 1, 20, 0, tzinfo=UTC)
+    candles = _candles(start, [100.0 + index for index in range(12)])
+    decision = PendingOutcome(1, "GGAL", 100.0, datetime(2026, 1, 1, 15, 0, tzinfo=UTC), "BUY")
+
+    (outcome,) = compute_ticker_outcomes([decision], candles, now=start + timedelta(days=11))
+
+    assert set(outcome.outcomes) == {"outcome_5d", "outcome_10d"}
+
+
+def test_compute_ticker_outcomes_uses_next_session_after_close():
+    start = datetime(2026, 1, 1, 20, 0, tzinfo=UTC)
+    candles = _candles(start, [100.0 + index for index in range(20)])
+    # 21:00 ART: la orden recien se puede ejecutar en la vela siguiente.
+    decided_at = datetime(2026, 1, 2, 0, 0, tzinfo=UTC)
+    decision = PendingOutcome(1, "GGAL", 100.0, decided_at, "BUY")
+
+    (outcome,) = compute_ticker_outcomes([decision], candles, now=start + timedelta(days=19))
+
+    assert outcome.next_executable_at == start + timedelta(days=1)
+    assert outcome.next_executable_price == pytest.approx(101.0)
+
+
+def test_compute_ticker_outcomes_marks_incompatible_units_as_legacy():
+    start = datetime(2026, 1, 1, 20, 0, tzinfo=UTC)
+    decided_at = datetime(2026, 1, 1, 15, 0, tzinfo=UTC)
+    stock = compute_ticker_outcomes(
+        [PendingOutcome(1, "AAPL", 30.0, decided_at, "BUY")],
+        _candles(start, [100.0] * 10),
+        now=start + timedelta(days=9),
+    )[0]
+    cedear = compute_ticker_outcomes(
+        [PendingOutcome(1, "AAPL", 30.0, decided_at, "BUY")],
+        _candles(start, [100.0] * 10, asset_type="CEDEAR"),
+        now=start + timedelta(days=9),
+    )[0]
+    missing = compute_ticker_outcomes(
+        [PendingOutcome(1, "AAPL", 30.0, decided_at, "BUY")],
+        [],
+        now=start,
+    )[0]
+
+    assert stock.outcome_basis == LEGACY_EXTERNAL_OUTCOME_BASIS
+    assert stock.outcomes == {}
+    assert cedear.outcome_basis == CANONICAL_OUTCOME_BASIS
+    assert missing.has_candles is False
+
+
+def test_compute_ticker_outcomes_rebases_entries_across_split():
+    start = datetime(2026, 7, 30, 20, 0, tzinfo=UTC)
+    candles = _candles(start, [90.0] * 5 + [9.0] * 10)
+    decision = PendingOutcome(
+        1, "YPFD", 90.0, datetime(2026, 7, 30, 15, 0, tzinfo=UTC), "BUY"
+    )
+
+    (outcome,) = compute_ticker_outcomes(
+        [decision],
+        candles,
+        now=start + timedelta(days=14),
+        effects=[_split_effect()],
+    )
+
+    assert outcome.corporate_adjustment_factor == pytest.approx(0.1)
+    assert outcome.outcome_basis == CANONICAL_OUTCOME_BASIS
+    assert outcome.outcomes["outcome_5d"] == pytest.approx(0.0)
+
+
+def test_persisted_adjustment_matches_on_the_fly_effects_for_every_decision():
+    start = datetime(2026, 7, 28, 20, 0, tzinfo=UTC)
+    candles = _candles(start, [90.0 + index for index in range(7)] + [9.6 + index / 10 for index in range(20)])
+    decisions = [
+        PendingOutcome(index, "YPFD", 88.0 + index, start + timedelta(days=index, hours=-5), "BUY")
+        for index in range(12)
+    ]
+    now = start + timedelta(days=26)
+    adjustment = plan_candle_adjustment("YPFD", candles, [_split_effect()], observed_at=now)
+
+    persisted = compute_ticker_outcomes(decisions, candles, now=now, adjustment=adjustment)
+    on_the_fly = compute_ticker_outcomes(decisions, candles, now=now, effects=[_split_effect()])
+
+    assert [o.corporate_adjustment_factor for o in persisted] == [
+        o.corporate_adjustment_factor for o in on_the_fly
+    ]
+    for left, right in zip(persisted, on_the_fly):
+        assert left.outcomes == pytest.approx(right.outcomes)
+        assert left.executable_outcomes == pytest.approx(right.executable_outcomes)
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed: list[tuple[str, tuple]] = []
+
+    async def fetch(self, _query, *_args):
+        return self.rows
+
+    async def execute(self, query, *args):
+        self.executed.append((query, args))
+        return "UPDATE 1"
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class _FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def test_update_outcomes_loads_candles_once_and_writes_in_bulk():
+    now = datetime.now(UTC)
+    decided_at = now - timedelta(days=12)
+    rows = [
+        {"id": 1, "ticker": "GGAL", "price_at_decision": 100.0, "decided_at": decided_at, "decision": "BUY"},
+        {"id": 2, "ticker": "GGAL", "price_at_decision": 100.0, "decided_at": decided_at, "decision": "SELL"},
+        {"id": 3, "ticker": "ALUA", "price_at_decision": 100.0, "decided_at": decided_at, "decision": "BUY"},
+    ]
+    conn = _FakeConn(rows)
+    db = PortfolioDatabase("postgresql://unused")
+    db._pool = _FakePool(conn)
+    bulk_calls = []
+
+    async def bulk(tickers, asset_types=None, limit=None, source=None, **_kwargs):
+        bulk_calls.append(list(tickers))
+        start = decided_at.replace(hour=20, minute=0) - timedelta(days=1)
+        return {"GGAL": _candles(start, [100.0 + index for index in range(14)])}
+
+    db.get_market_candle_rows_bulk = bulk
+
+    updated = asyncio.run(db.update_outcomes(lookback_days=30))
+
+    assert bulk_calls == [["GGAL", "ALUA"]]
+    assert updated == 2
+    updates = [item for item in conn.executed if "UPDATE decision_log" in item[0]]
+    assert len(updates) == 2
+    basis_query, basis_args = updates[0]
+    assert "unnest" in basis_query
+    assert basis_args[0] == [3]
+    filled_query, filled_args = updates[1]
+    assert "COALESCE(v.outcome_5d, d.outcome_5d)" in filled_query
+    assert filled_args[0] == [1, 2]
+
+
+def test_recompute_outcomes_surfaces_write_errors_instead_of_returning_zero():
+    decided_at = datetime.now(UTC) - timedelta(days=12)
+    rows = [
+        {"id": 1, "ticker": "GGAL", "price_at_decision": 100.0, "decided_at": decided_at, "decision": "BUY"},
+    ]
+
+    class _FailingConn(_FakeConn):
+        async def execute(self, query, *args):
+            if "FROM unnest" in query:
+                raise RuntimeError("deadlock detected")
+            return await super().execute(query, *args)
+
+    db = PortfolioDatabase("postgresql://unused")
+    db._pool = _FakePool(_FailingConn(rows))
+
+    async def bulk(tickers, asset_types=None, limit=None, source=None, **_kwargs):
+        start = decided_at.replace(hour=20, minute=0) - timedelta(days=1)
+        return {"GGAL": _candles(start, [100.0 + index for index in range(14)])}
+
+    db.get_market_candle_rows_bulk = bulk
+
+    with pytest.raises(RuntimeError, match="deadlock"):
+        asyncio.run(db.recompute_outcomes(tickers=["GGAL"]))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis import parallel_universe
+from src.analysis.opportunity_screener import _compute_screener_metrics_panel
+
+
+def _frames(count: int) -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(11)
+    frames = {}
+    for i in range(count):
+        n = 260 - (i % 5) * 40
+        close = 1_000 * np.exp(np.cumsum(rng.normal(0.001, 0.02, n)))
+        frame = pd.DataFrame(
+            {
+                "Close": close,
+                "Volume": rng.integers(50_000, 500_000, n),
+                "Source": np.where(rng.random(n) < 0.8, "COCOS", "internal_snapshot"),
+            },
+            index=pd.date_range(end="2026-06-19", periods=n, freq="B", tz="UTC", name="ts"),
+        )
+        frame.attrs["candle_sources"] = ("COCOS", "internal_snapshot")
+        frames[f"T{i}"] = frame
+    return frames
+
+
+def _identity(frames, *, tag):
+    return {ticker: (frame, tag.get(ticker)) for ticker, frame in frames.items()}
+
+
+def _screen(frames, asset_types, *, workers, **kwargs):
+    return parallel_universe.map_universe(
+        _compute_screener_metrics_panel,
+        frames,
+        workers=workers,
+        min_tickers=2,
+        per_ticker={"asset_types": asset_types},
+        **kwargs,
+    )
+
+
+def test_shared_memory_round_trip_preserves_frames():
+    frames = _frames(3)
+    frames["T1"].iloc[4, frames["T1"].columns.get_loc("Source")] = None
+    frames["RAW"] = None
+
+    shm, layouts = parallel_universe._pack_frames(frames)
+    try:
+        total = sum(layout.rows * len(layout.columns) for layout in layouts.values())
+        out = parallel_universe._run_shard(
+            _identity,
+            shm.name,
+            total,
+            {ticker: layouts[ticker] for ticker in ("T1", "RAW")},
+            {"tag": {"T1": "x"}},
+        )
+    finally:
+        shm.close()
+        shm.unlink()
+
+    rebuilt, tag = out["T1"]
+    pd.testing.assert_frame_equal(rebuilt, frames["T1"], check_freq=False)
+    assert rebuilt.attrs == frames["T1"].attrs
+    assert tag == "x"
+    assert out["RAW"] == (None, None)
+
+
+def test_map_universe_matches_serial_run_across_processes():
+    frames = _frames(12)
+    kwargs = {"spy_ret_20d": 0.01, "qqq_ret_20d": None}
+    asset_types = {ticker: "CEDEAR" for ticker in frames}
+
+    serial = _screen(frames, asset_types, workers=1, **kwargs)
+    try:
+        parallel = _screen(frames, asset_types, workers=2, **kwargs)
+    finally:
+        parallel_universe.shutdown_executor()
+
+    assert list(parallel) == list(frames)
+    assert parallel == serial
+    assert all(metrics.asset_type == "CEDEAR" for metrics in parallel.values())
@@ -1,9 +1,12 @@
-from datetime import datetime, timezone
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 
 from src.analysis.plan_follow_attribution import (
     canonicalize_movements,
     compute_execution_session_outcomes,
     normalize_plan_execution_attributions,
+    sync_plan_execution_attributions,
 )
 
 
@@ -179,3 +182,183 @@ def test_execution_outcome_rebases_entry_for_confirmed_corporate_action():
     )
 
     assert outcomes["outcome_5d"] == 0.10
+
+
+def test_indexed_matching_is_window_bounded_and_separable_by_ticker_side():
+    base = datetime.now(tz=UTC).replace(hour=15, minute=0, second=0, microsecond=0)
+    plans, movements = [], []
+    for offset, (ticker, side) in enumerate([("GGAL", "BUY"), ("GGAL", "SELL"), ("YPFD", "BUY")]):
+        for day in range(0, 30, 3):
+            plans.append(_plan(1000 * offset + day, base + timedelta(days=day), ticker=ticker, side=side))
+            movements.append(_movement(
+                1000 * offset + day,
+                base + timedelta(days=day, hours=1),
+                ticker=ticker.lower(),
+                side=side,
+                precision="exact",
+            ))
+    # Fuera de la ventana de matcheo de cualquier plan.
+    movements.append(_movement(9999, base + timedelta(days=60), ticker="GGAL", precision="exact"))
+
+    rows = normalize_plan_execution_attributions(plans, movements)
+
+    assert {(r["ticker"], r["side"]) for r in rows} == {("GGAL", "BUY"), ("GGAL", "SELL"), ("YPFD", "BUY")}
+    assert 9999 not in {m["id"] for row in rows for m in row["movement_rows"]}
+    for ticker, side in [("GGAL", "BUY"), ("GGAL", "SELL"), ("YPFD", "BUY")]:
+        subset = normalize_plan_execution_attributions(
+            [p for p in plans if (p["ticker"], p["decision"]) == (ticker, side)],
+            [m for m in movements if (m["ticker"].upper(), m["movement_type"]) == (ticker, side)],
+        )
+        expected = [r for r in rows if (r["ticker"], r["side"]) == (ticker, side)]
+        assert [r["attribution_key"] for r in subset] == [r["attribution_key"] for r in expected]
+
+
+class _SyncConn:
+    def __init__(self, plans, movements, *, watermark=None, touched=(), pending=()):
+        self.plans = plans
+        self.movements = movements
+        self.watermark = watermark
+        self.touched = list(touched)
+        self.pending = list(pending)
+        self.fetch_calls: list[tuple[str, tuple]] = []
+        self.execute_calls: list[tuple[str, tuple]] = []
+        self.fetchval_calls: list[tuple[str, tuple]] = []
+        self.changes_at = datetime.now(tz=UTC)
+        self.next_id = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql, *args):
+        self.execute_calls.append((sql, args))
+
+    async def fetchrow(self, sql, *args):
+        if "MAX(id)" in sql:
+            return {"movement_id": 500, "decision_id": 90, "changes_at": self.changes_at}
+        return self.watermark
+
+    async def fetchval(self, sql, *args):
+        if "to_regclass" in sql:
+            return False
+        self.fetchval_calls.append((sql, args))
+        self.next_id += 1
+        return self.next_id
+
+    async def fetch(self, sql, *args):
+        self.fetch_calls.append((sql, args))
+        if "UNION" in sql:
+            return [{"pair": pair} for pair in self.touched]
+        if "decision_base" in sql:
+            return [p for p in self.plans if args[1] is None or f"{p['ticker']}|{p['decision']}" in args[1]]
+        if "FROM broker_movements bm" in sql:
+            return [
+                m for m in self.movements
+                if args[1] is None or f"{m['ticker']}|{m['movement_type']}" in args[1]
+            ]
+        if "outcome_40d IS NULL" in sql:
+            return self.pending
+        return []
+
+
+def _sync_fixture():
+    at = datetime.now(tz=UTC) - timedelta(days=3)
+    plans = [_plan(1, at, ticker="GGAL"), _plan(2, at, ticker="YPFD", side="SELL")]
+    movements = [
+        _movement(10, at + timedelta(hours=1), ticker="GGAL", precision="exact"),
+        _movement(11, at + timedelta(hours=1), ticker="YPFD", side="SELL", precision="exact"),
+    ]
+    return plans, movements
+
+
+def _recent_watermark(*, rebuilt_hours_ago=1):
+    now = datetime.now(tz=UTC)
+    return {
+        "movement_id_watermark": 10,
+        "decision_id_watermark": 1,
+        "changes_watermark": now - timedelta(minutes=5),
+        "full_rebuild_at": now - timedelta(hours=rebuilt_hours_ago),
+    }
+
+
+def test_incremental_sync_only_reattributes_touched_pairs_and_advances_watermark():
+    plans, movements = _sync_fixture()
+    pending = [{
+        "id": 77, "ticker": "YPFD", "side": "SELL",
+        "executed_at": movements[1]["executed_at"], "execution_price": 100_000.0,
+    }]
+    watermark = _recent_watermark()
+    conn = _SyncConn(
+        plans, movements,
+        watermark=watermark,
+        touched=["YPFD|SELL"],
+        pending=pending,
+    )
+
+    summary = asyncio.run(sync_plan_execution_attributions(conn, incremental=True))
+
+    assert summary["incremental"] == 1 and summary["outcomes_refreshed"] == 1
+    assert summary["plans"] == 1 and summary["attributions"] == 1
+    (pending_sql, pending_args), = [c for c in conn.fetch_calls if "outcome_40d IS NULL" in c[0]]
+    assert pending_args[2] == ["YPFD|SELL"]
+    outcome_ids = [args[0] for sql, args in conn.execute_calls if "outcome_5d = $2" in sql]
+    assert outcome_ids == [1, 77]
+    (delete_sql, delete_args), = [
+        c for c in conn.execute_calls if "DELETE FROM plan_execution_attributions\n" in c[0]
+    ]
+    assert delete_args[3] == ["YPFD|SELL"]
+    (_, watermark_args), = [c for c in conn.execute_calls if "INSERT INTO plan_execution_attribution_sync" in c[0]]
+    assert watermark_args[2:] == (500, 90, conn.changes_at, watermark["full_rebuild_at"])
+    (touched_sql, touched_args), = [c for c in conn.fetch_calls if "UNION" in c[0]]
+    assert "updated_at >= $2" in touched_sql and "plan_execution_attribution_movements" in touched_sql
+    # El margen hacia atras cubre transacciones que commitean tarde.
+    assert touched_args[1] < watermark["changes_watermark"]
+
+
+def test_incremental_sync_reattributes_movement_updated_in_place():
+    plans, movements = _sync_fixture()
+    conn = _SyncConn(plans, movements, watermark=_recent_watermark(), touched=["GGAL|BUY"])
+
+    def ggal_price():
+        (_, args), = [
+            c for c in conn.fetchval_calls
+            if "INSERT INTO plan_execution_attributions" in c[0] and c[1][3] == "GGAL"
+        ]
+        return args[18]
+
+    asyncio.run(sync_plan_execution_attributions(conn, incremental=True))
+    before = ggal_price()
+
+    # El broker reescribe el precio del mismo id (upsert ON CONFLICT DO UPDATE).
+    movements[0] = {**movements[0], "price": 104_000.0, "amount": 104_000.0}
+    conn.fetchval_calls.clear()
+    asyncio.run(sync_plan_execution_attributions(conn, incremental=True))
+
+    assert before == 100_000.0
+    assert ggal_price() == 104_000.0
+
+
+def test_incremental_sync_runs_periodic_full_rebuild():
+    plans, movements = _sync_fixture()
+    conn = _SyncConn(plans, movements, watermark=_recent_watermark(rebuilt_hours_ago=30))
+
+    summary = asyncio.run(sync_plan_execution_attributions(conn, incremental=True))
+
+    assert summary["incremental"] == 0 and summary["attributions"] == 2
+    assert not any("UNION" in sql for sql, _ in conn.fetch_calls)
+    (_, watermark_args), = [c for c in conn.execute_calls if "INSERT INTO plan_execution_attribution_sync" in c[0]]
+    assert watermark_args[5] == conn.changes_at
+
+
+def test_incremental_sync_without_watermark_falls_back_to_full_rebuild():
+    plans, movements = _sync_fixture()
+    conn = _SyncConn(plans, movements)
+
+    summary = asyncio.run(sync_plan_execution_attributions(conn, incremental=True))
+
+    assert summary["incremental"] == 0 and summary["attributions"] == 2
+    assert not any("UNION" in sql or "outcome_40d IS NULL" in sql for sql, _ in conn.fetch_calls)
+    (_, delete_args), = [
+        c for c in conn.execute_calls if "DELETE FROM plan_execution_attributions\n" in c[0]
+    ]
+    assert delete_args[3] is None and len(delete_args[2]) == 2
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from src.collector import db as db_module
+from src.collector.db import (
+    PRICE_CHANGES_CHANNEL,
+    PortfolioDatabase,
+    parse_price_change_payload,
+    price_change_payloads,
+)
+from src.scheduler import runner
+
+
+def test_notify_payloads_are_chunked_and_round_trip():
+    tickers = [f"T{i:05d}" for i in range(2000)] + ["ggal", "GGAL", ""]
+
+    payloads = price_change_payloads(tickers)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= 8000 for payload in payloads)
+    parsed = set().union(*(parse_price_change_payload(p) for p in payloads))
+    assert parsed == {t.upper() for t in tickers if t}
+    assert parse_price_change_payload("*") is None
+
+
+def test_save_market_prices_notifies_changed_tickers_inside_transaction(monkeypatch):
+    class _Conn:
+        def __init__(self):
+            self.calls = []
+            self.in_transaction = False
+
+        @asynccontextmanager
+        async def transaction(self):
+            self.in_transaction = True
+            yield
+            self.in_transaction = False
+
+        async def executemany(self, sql, rows):
+            self.calls.append(("executemany", self.in_transaction, list(rows)))
+
+        async def fetch(self, sql, *args):
+            self.calls.append(("fetch", self.in_transaction, args))
+            return []
+
+        async def execute(self, sql, *args):
+            self.calls.append(("execute", self.in_transaction, args))
+
+    class _Pool:
+        def __init__(self):
+            self.conn = _Conn()
+
+        @asynccontextmanager
+        async def acquire(self):
+            yield self.conn
+
+    def _asset(ticker):
+        return SimpleNamespace(
+            scraped_at=None, ticker=ticker, last_price=10, change_pct_1d=0, volume=None,
+            asset_type=SimpleNamespace(value="ACCION"), currency=SimpleNamespace(value="ARS"),
+        )
+
+    async def _no_cache(_rows):
+        return False
+
+    monkeypatch.setattr(db_module, "cache_latest_market_prices", _no_cache)
+    database = PortfolioDatabase("postgresql://test")
+    database._market_prices_latest_ready = True
+    database._pool = _Pool()
+
+    assert asyncio.run(database.save_market_prices([_asset("GGAL"), _asset("YPFD")])) == 2
+
+    kind, in_tx, args = database._pool.conn.calls[-1]
+    assert kind == "execute" and in_tx is True
+    assert args == (PRICE_CHANGES_CHANNEL, "GGAL,YPFD")
+
+
+def test_compute_risk_alerts_only_queries_notified_tickers():
+    class _Conn:
+        params = None
+
+        async def fetch(self, sql, *params):
+            if "latest_snapshot" in sql:
+                return [{"ticker": "GGAL"}, {"ticker": "YPFD"}, {"ticker": "MU"}]
+            _Conn.params = params
+            return []
+
+    class _Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield _Conn()
+
+    manager = runner.IntradayManager.__new__(runner.IntradayManager)
+
+    assert asyncio.run(manager._compute_risk_alerts(_Pool(), tickers={"ypfd", "AL30"})) == []
+    assert _Conn.params == (["YPFD"],)
+
+
+def test_notify_wakes_risk_guard_within_debounce_and_polling_stays_as_fallback(monkeypatch):
+    monkeypatch.setattr(runner, "RISK_POLL_SECONDS", 30)
+    monkeypatch.setattr(runner, "RISK_NOTIFY_DEBOUNCE_SECONDS", 0.05)
+    monkeypatch.setattr(runner, "_is_market_window", lambda: True)
+    monkeypatch.setattr(runner, "_is_bot_busy", _async_value(False))
+    monkeypatch.setattr(runner, "_heartbeat", _async_value(None))
+    instances = []
+
+    class _Listener:
+        def __init__(self):
+            self.closed = False
+
+        def is_closed(self):
+            return self.closed
+
+        async def close(self):
+            self.closed = True
+
+    class _FakeDB:
+        def __init__(self, dsn):
+            self._pool = object()
+            self.callback = None
+            self.reference_loads = 0
+            instances.append(self)
+
+        async def get_pool(self):
+            return self._pool
+
+        async def listen_price_changes(self, callback):
+            self.callback = callback
+            return _Listener()
+
+        async def get_corporate_action_effects(self):
+            self.reference_loads += 1
+            return []
+
+        async def get_active_price_quality_flags(self):
+            return []
+
+        async def close(self):
+            self._pool = None
+
+    monkeypatch.setattr(runner, "PortfolioDatabase", _FakeDB)
+    manager = runner.IntradayManager.__new__(runner.IntradayManager)
+    manager.cfg = SimpleNamespace(database=SimpleNamespace(url="postgresql://test"))
+    manager._running = True
+    manager._risk_pending = set()
+    manager._risk_wakeup = asyncio.Event()
+    computed = []
+
+    async def _compute(pool, **kwargs):
+        computed.append((time.perf_counter(), kwargs["tickers"]))
+        return []
+
+    manager._compute_risk_alerts = _compute
+
+    async def scenario():
+        task = asyncio.create_task(manager._risk_guard_loop())
+        while not computed:
+            await asyncio.sleep(0.01)
+        notified_at = time.perf_counter()
+        instances[0].callback({"GGAL"})
+        instances[0].callback({"YPFD"})
+        while len(computed) < 2:
+            await asyncio.sleep(0.01)
+        manager._running = False
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return notified_at
+
+    notified_at = asyncio.run(asyncio.wait_for(scenario(), 5))
+
+    assert computed[0][1] is None
+    assert computed[1][1] == {"GGAL", "YPFD"}
+    assert computed[1][0] - notified_at < 1.0
+    assert instances[0].reference_loads == 1
+    assert instances[0]._pool is None
+
+
+def test_wait_risk_trigger_falls_back_to_full_poll_and_escalates_snapshot_notify():
+    manager = runner.IntradayManager.__new__(runner.IntradayManager)
+    manager._risk_pending = set()
+
+    async def scenario():
+        manager._risk_wakeup = asyncio.Event()
+        timed_out = await manager._wait_risk_trigger(0.01)
+        manager._on_price_change({"GGAL"})
+        manager._on_price_change(db_module.parse_price_change_payload("*"))
+        escalated = await manager._wait_risk_trigger(1)
+        return timed_out, escalated
+
+    assert asyncio.run(scenario()) == (None, None)
+    assert manager._risk_pending == set()
+
+
+def _async_value(value):
+    async def _inner(*_args, **_kwargs):
+        return value
+
+    return _inner
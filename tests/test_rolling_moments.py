@@ -0,0 +1,169 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import optimizer, rolling_moments, stats_cache
+from src.analysis.rolling_moments import RollingMoments
+from src.analysis.stats_cache import (
+    ROLLING_HASH_KEY,
+    AnalysisStatsCache,
+    advance_rolling_moments,
+    load_analysis_stats_cache,
+    save_analysis_stats_cache,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    async def get(self, key):
+        return None
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hdel(self, key, *fields):
+        for name in fields:
+            self.hashes.get(key, {}).pop(name, None)
+
+    async def expire(self, key, seconds):
+        return True
+
+
+class _FakeDB:
+    def __init__(self, frames):
+        self.frames = frames
+
+    async def get_market_candles_bulk(self, tickers, asset_types, limit, *, adjusted=False):
+        self.adjusted = adjusted
+        return {t: self.frames[t].tail(limit) for t in tickers if t in self.frames}
+
+
+def _frames(periods, seed=21, gap_ticker=None):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2025-01-01 20:00", periods=periods, freq="B", tz="UTC")
+    frames = {}
+    for ticker in ["AAA", "BBB", "CCC"]:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, periods)))
+        frame = pd.DataFrame({"Close": close}, index=index)
+        if ticker == gap_ticker:
+            frame = frame.drop(index[[40, periods - 2]])
+        frames[ticker] = frame
+    return frames
+
+
+def _window(frames, rows):
+    returns = optimizer._fetch_returns(list(frames), history_frames={
+        t: df.tail(rows + 1) for t, df in frames.items()
+    })
+    return returns
+
+
+def test_rank_one_updates_match_full_recompute_over_many_days(monkeypatch):
+    monkeypatch.setattr(rolling_moments, "REBASE_EVERY", 1_000)
+    frames = _frames(400, gap_ticker="CCC")
+    dates = frames["AAA"].index
+    head = {t: df[df.index <= dates[260]] for t, df in frames.items()}
+    state = RollingMoments.from_returns(_window(head, 259).tail(259))
+
+    for cutoff in dates[261:]:
+        upto = {t: df[df.index <= cutoff].tail(5) for t, df in frames.items()}
+        assert state.advance_from_frames(upto) == 1
+
+    expected = _window(frames, 260).tail(259)
+    assert state.matches(expected)
+    np.testing.assert_allclose(state.cov(), expected.cov().to_numpy(), rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(state.mean, expected.mean().to_numpy(), rtol=1e-9, atol=1e-15)
+    assert state.vol()["AAA"] == pytest.approx(expected["AAA"].std() * 252 ** 0.5, rel=1e-9)
+
+    ewma = RollingMoments.from_returns(expected)
+    np.testing.assert_allclose(state.ewma_cov, ewma.ewma_cov, rtol=1e-3, atol=1e-9)
+
+
+def test_state_that_cannot_reach_previous_close_is_dropped():
+    frames = _frames(120)
+    state = RollingMoments.from_returns(_window(frames, 60).iloc[:-10])
+
+    assert state.advance_from_frames({t: df.tail(3) for t, df in frames.items()}) is None
+
+
+def test_scheduler_advances_persisted_window_used_by_next_optimizer_run(monkeypatch):
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(stats_cache, "redis_client", fake_redis)
+    frames = _frames(300)
+    yesterday = {t: df.iloc[:-1] for t, df in frames.items()}
+
+    cache = AnalysisStatsCache()
+    cov_before = optimizer._annual_covariance(_window(yesterday, 259), "sample", cache)
+    asyncio.run(save_analysis_stats_cache(cache))
+    assert list(fake_redis.hashes[ROLLING_HASH_KEY]) == ["AAA,BBB,CCC"]
+    assert cov_before.to_numpy() == pytest.approx(_window(yesterday, 259).cov().to_numpy() * 252)
+
+    assert asyncio.run(advance_rolling_moments(_FakeDB(frames))) == 1
+
+    loaded = asyncio.run(load_analysis_stats_cache())
+    today_returns = _window(frames, 259)
+    state = loaded.rolling["AAA,BBB,CCC"]
+    assert state.matches(today_returns)
+    cov_after = optimizer._annual_covariance(today_returns, "sample", loaded)
+    assert loaded.rolling["AAA,BBB,CCC"] is state
+    np.testing.assert_allclose(cov_after.to_numpy(), today_returns.cov().to_numpy() * 252, rtol=1e-9)
+    vols = loaded.rolling_vol("AAA", frames["AAA"].index[-1])
+    assert vols["window"] == pytest.approx(today_returns["AAA"].std() * 252 ** 0.5, rel=1e-9)
+
+
+def test_unused_windows_are_pruned(monkeypatch):
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(stats_cache, "redis_client", fake_redis)
+    frames = _frames(200)
+    state = RollingMoments.from_returns(_window({t: df.iloc[:-1] for t, df in frames.items()}, 100))
+    state.last_used = "2020-01-01"
+    fake_redis.hashes[ROLLING_HASH_KEY] = {"AAA,BBB,CCC": json.dumps(state.to_payload())}
+
+    assert asyncio.run(advance_rolling_moments(_FakeDB(frames))) == 0
+    assert fake_redis.hashes[ROLLING_HASH_KEY] == {}
+
+
+def test_window_with_a_gap_ticker_still_matches_after_scheduler_advance(monkeypatch):
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(stats_cache, "redis_client", fake_redis)
+    # CCC no operó en la anteúltima rueda: su ventana de 260 velas arranca
+    # antes que la de los demás.
+    frames = _frames(300, gap_ticker="CCC")
+    yesterday = {t: df.iloc[:-1] for t, df in frames.items()}
+
+    cache = AnalysisStatsCache()
+    optimizer._annual_covariance(_window(yesterday, 259), "sample", cache)
+    asyncio.run(save_analysis_stats_cache(cache))
+
+    db = _FakeDB(frames)
+    assert asyncio.run(advance_rolling_moments(db)) == 1
+    assert db.adjusted is True
+
+    loaded = asyncio.run(load_analysis_stats_cache())
+    today_returns = _window(frames, 259)
+    state = loaded.rolling["AAA,BBB,CCC"]
+    assert len(today_returns) == rolling_moments.WINDOW_ROWS
+    assert state.matches(today_returns)
+    assert loaded.moments_for(today_returns) is state
+
+
+def test_vectorized_ewma_seed_matches_the_row_by_row_recursion():
+    returns = _window(_frames(300, gap_ticker="CCC"), 259)
+    state = RollingMoments.from_returns(returns.iloc[:1])
+    state.rows = np.empty((0, 3))
+    state.ewma_mean, state.ewma_cov = np.zeros(3), np.zeros((3, 3))
+    for row in returns.to_numpy():
+        state._ewma_update(row)
+
+    seeded = RollingMoments.from_returns(returns)
+
+    np.testing.assert_allclose(seeded.ewma_mean, state.ewma_mean, rtol=1e-10, atol=1e-18)
+    np.testing.assert_allclose(seeded.ewma_cov, state.ewma_cov, rtol=1e-10, atol=1e-18)
@@ -42,21 +42,26 @@ class _FakeDatabase:
             {"ticker": "GGAL", "asset_type": "ACCION"},
         ]
 
-    async def get_market_candles(self, ticker, **_kwargs):
-        return _rows(60 if ticker == "T" else 20)
+    async def get_market_candles_bulk(self, tickers, asset_types=None, limit=None, source=None, *, adjusted=False):
+        return {
+            ticker: candles_to_frame(_rows(60 if ticker == "T" else 20))
+            for ticker in tickers
+        }
 
 
 class _VolumeOverlayDatabase(_FakeDatabase):
     calls = []
 
-    async def get_market_candles(self, ticker, **kwargs):
-        self.calls.append((ticker, dict(kwargs)))
-        rows = _rows(60)
-        source = kwargs.get("source")
-        for row in rows:
-            row["source"] = source or "internal_snapshot"
-            row["volume"] = 5_000 if source == "TRADINGVIEW_BYMA" else 0
-        return rows
+    async def get_market_candles_bulk(self, tickers, asset_types=None, limit=None, source=None, *, adjusted=False):
+        self.calls.append((list(tickers), {"source": source, "limit": limit, "adjusted": adjusted}))
+        frames = {}
+        for ticker in tickers:
+            rows = _rows(60)
+            for row in rows:
+                row["source"] = source or "internal_snapshot"
+                row["volume"] = 5_000 if source == "TRADINGVIEW_BYMA" else 0
+            frames[ticker] = candles_to_frame(rows)
+        return frames
 
 
 class _RadarConn:
@@ -153,6 +158,9 @@ def test_load_shadow_history_uses_source_scoped_volume_overlay():
         None,
         "TRADINGVIEW_BYMA",
     ]
+    assert [call[0] for call in _VolumeOverlayDatabase.calls] == [["T"], ["T"]]
+    # La serie canonica lleva el ajuste persistido; el overlay de volumen es crudo.
+    assert [call[1]["adjusted"] for call in _VolumeOverlayDatabase.calls] == [True, False]
     assert frames["T"].tail(20)["Volume"].gt(0).all()
     assert frames["T"].attrs["volume_overlay_rows"] == 60
 
@@ -216,6 +224,53 @@ def test_volume_overlay_rejects_adjusted_or_mismatched_price_series():
     assert result.attrs["volume_overlay_rejected_price_mismatch"] == 1
 
 
+def test_volume_overlay_counts_each_rejection_per_session():
+    start = datetime(2026, 8, 17, 20, tzinfo=timezone.utc)
+    primary = candles_to_frame([
+        {"ts": start + timedelta(days=i), "open_price": 100, "high_price": 101,
+         "low_price": 99, "close_price": 100, "volume": volume, "source": "COCOS"}
+        for i, volume in enumerate([0, 0, 0, 500])
+    ])
+    fallback = candles_to_frame([
+        {"ts": start + timedelta(days=0, hours=-6), "open_price": 1, "high_price": 1,
+         "low_price": 1, "close_price": 101, "volume": 700, "source": "TRADINGVIEW_BYMA"},
+        {"ts": start + timedelta(days=1, hours=-6), "open_price": 1, "high_price": 1,
+         "low_price": 1, "close_price": 150, "volume": 800, "source": "TRADINGVIEW_BYMA"},
+        {"ts": start + timedelta(days=3, hours=-6), "open_price": 1, "high_price": 1,
+         "low_price": 1, "close_price": 100, "volume": 900, "source": "TRADINGVIEW_BYMA"},
+    ])
+
+    result = overlay_compatible_volume(primary, fallback)
+
+    assert result["Volume"].tolist() == [700, 0, 0, 500]
+    assert result.attrs["volume_overlay_rows"] == 1
+    assert result.attrs["volume_overlay_rejected_price_mismatch"] == 1
+    assert result.attrs["volume_overlay_rejected_missing_match"] == 1
+    assert result.attrs["volume_source_counts"] == {"COCOS": 3, "TRADINGVIEW_BYMA": 1}
+
+
+def test_candles_to_frame_reads_record_objects_and_keeps_priority_source_per_day():
+    from decimal import Decimal
+
+    day = datetime(2026, 8, 19, 20, tzinfo=timezone.utc)
+    candles = [
+        SimpleNamespace(ts=day, open_price=Decimal("1"), high_price=Decimal("2"),
+                        low_price=Decimal("1"), close_price=Decimal("1.5"),
+                        volume=Decimal("10"), source=source)
+        for source in ("internal_snapshot", "COCOS", "TRADINGVIEW_BYMA")
+    ] + [
+        SimpleNamespace(ts=day - timedelta(days=1), open_price=1, high_price=2, low_price=1,
+                        close_price=1.25, volume=0, source=None),
+    ]
+
+    frame = candles_to_frame(candles)
+
+    assert frame["Source"].tolist() == ["UNKNOWN", "COCOS"]
+    assert frame["Close"].tolist() == [1.25, 1.5]
+    assert frame.attrs["candle_source_counts"] == {"COCOS": 1, "UNKNOWN": 1}
+    assert frame.attrs["has_reconstructed_candles"] is False
+
+
 def test_intraday_samples_append_provisional_candle_only_on_trading_day():
     from src.collector.cocos_history import candles_to_frame
 
@@ -294,7 +349,12 @@ def test_save_radar_candidates_persists_auditable_signal():
     report = SimpleNamespace(candidates=[candidate])
     macro_snap = SimpleNamespace(vix=18.0)
 
-    with patch("scripts.run_opportunity.PortfolioDatabase", _RadarDatabase):
+    async def _schema_migrations(_conn):
+        return []
+
+    with patch("scripts.run_opportunity.PortfolioDatabase", _RadarDatabase), patch(
+        "scripts.run_opportunity.apply_schema_migrations", _schema_migrations
+    ):
         saved = asyncio.run(
             run_opportunity._save_radar_candidates(
                 cfg,
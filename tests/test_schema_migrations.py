@@ -0,0 +1,139 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.analysis import audit_scope
+from src.analysis.audit_scope import ensure_decision_audit_scope_columns
+from src.collector import schema_migrations
+from src.collector.schema_migrations import (
+    MIGRATION_DECISION_AUDIT_SCOPE,
+    SCHEMA_MIGRATIONS_LOCK_ID,
+    apply_schema_migrations,
+    mark_recorded_schema_ready,
+    registered_migrations,
+    schema_ready,
+)
+
+
+class _Conn:
+    """Postgres stand-in: registra DDL y guarda schema_migrations en memoria."""
+
+    def __init__(self, recorded=None):
+        self.recorded = dict(recorded or {})
+        self.table_exists = recorded is not None
+        self.statements = []
+
+    async def fetchval(self, sql, *args):
+        assert "to_regclass" in sql
+        return self.table_exists
+
+    async def fetch(self, sql, *args):
+        return [{"version": v, "checksum": c} for v, c in self.recorded.items()]
+
+    async def execute(self, sql, *args):
+        if "INSERT INTO schema_migrations" in sql:
+            self.recorded[args[0]] = args[1]
+        elif "CREATE TABLE IF NOT EXISTS schema_migrations" in sql:
+            self.table_exists = True
+        self.statements.append((sql, args))
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_process(monkeypatch):
+    monkeypatch.setattr(schema_migrations, "_READY_VERSIONS", set())
+    monkeypatch.setattr(audit_scope, "_MIGRATION_DONE", False)
+
+
+def test_first_start_applies_every_version_in_order_under_advisory_lock():
+    conn = _Conn()
+
+    applied = asyncio.run(apply_schema_migrations(conn))
+
+    migrations = registered_migrations()
+    assert applied == [m.version for m in migrations]
+    assert conn.recorded == {m.version: m.checksum for m in migrations}
+    assert conn.statements[0] == ("SELECT pg_advisory_lock($1)", (SCHEMA_MIGRATIONS_LOCK_ID,))
+    assert conn.statements[-1] == ("SELECT pg_advisory_unlock($1)", (SCHEMA_MIGRATIONS_LOCK_ID,))
+    ddl = [sql for sql, _ in conn.statements if sql in {m.sql for m in migrations}]
+    assert ddl == [m.sql for m in migrations]
+    assert schema_ready(MIGRATION_DECISION_AUDIT_SCOPE)
+
+    # Ya listo en este proceso: ni siquiera consulta la tabla.
+    conn.statements.clear()
+    assert asyncio.run(apply_schema_migrations(conn)) == []
+    assert conn.statements == []
+
+
+def test_recorded_versions_skip_ddl_and_changed_sql_is_reapplied():
+    migrations = registered_migrations()
+    recorded = {m.version: m.checksum for m in migrations}
+    recorded[MIGRATION_DECISION_AUDIT_SCOPE] = "checksum-viejo"
+    conn = _Conn(recorded)
+
+    applied = asyncio.run(apply_schema_migrations(conn))
+
+    assert applied == [MIGRATION_DECISION_AUDIT_SCOPE]
+    executed_ddl = [sql for sql, _ in conn.statements if sql in {m.sql for m in migrations}]
+    assert executed_ddl == [audit_scope.DECISION_AUDIT_SCOPE_MIGRATION_SQL]
+
+    up_to_date = _Conn(conn.recorded)
+    schema_migrations._READY_VERSIONS.clear()
+    assert asyncio.run(apply_schema_migrations(up_to_date)) == []
+    assert up_to_date.statements == []
+
+
+def test_ensure_helpers_skip_ddl_once_the_startup_phase_ran():
+    asyncio.run(apply_schema_migrations(_Conn()))
+    conn = _Conn()
+
+    asyncio.run(ensure_decision_audit_scope_columns(conn))
+
+    assert conn.statements == []
+
+
+def test_connect_marks_recorded_versions_ready_without_lock_or_ddl():
+    migrations = registered_migrations()
+    recorded = {m.version: m.checksum for m in migrations}
+    recorded[MIGRATION_DECISION_AUDIT_SCOPE] = "checksum-viejo"
+    conn = _Conn(recorded)
+
+    matched = asyncio.run(mark_recorded_schema_ready(conn))
+
+    assert conn.statements == []
+    assert MIGRATION_DECISION_AUDIT_SCOPE not in matched
+    assert all(schema_ready(version) for version in matched)
+    assert len(matched) == len(migrations) - 1
+    # La version cambiada sigue emitiendo su DDL en el ensure_*.
+    asyncio.run(ensure_decision_audit_scope_columns(conn))
+    assert conn.statements
+
+
+def test_portfolio_database_connect_skips_ddl_for_recorded_versions(monkeypatch):
+    from src.collector import db as db_module
+
+    conn = _Conn({m.version: m.checksum for m in registered_migrations()})
+
+    class _Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            yield conn
+
+    async def _get_pool(dsn):
+        return _Pool()
+
+    monkeypatch.setattr(db_module, "get_pool", _get_pool)
+
+    async def scenario():
+        database = db_module.PortfolioDatabase("postgresql://u:p@db/portfolio")
+        await database.connect()
+        await database._ensure_outcome_horizon_columns(conn)
+
+    asyncio.run(scenario())
+
+    assert conn.statements == []
+    assert all(schema_ready(m.version) for m in registered_migrations())
@@ -0,0 +1,115 @@
+import asyncio
+import sys
+
+from src.core.script_worker import WarmScriptPool, run_script_in_process
+
+
+def _write(tmp_path, name: str, body: str) -> str:
+    (tmp_path / name).write_text(body, encoding="utf-8")
+    return name
+
+
+def test_run_script_in_process_matches_subprocess_contract(tmp_path):
+    ok = _write(
+        tmp_path,
+        "ok.py",
+        "import sys\nprint('reporte', *sys.argv[1:])\n",
+    )
+    usage = _write(
+        tmp_path,
+        "usage.py",
+        "import sys\nprint('usage: x', file=sys.stderr)\nsys.exit(2)\n",
+    )
+    boom = _write(tmp_path, "boom.py", "raise ValueError('roto')\n")
+    argv = list(sys.argv)
+
+    ok_run = run_script_in_process(ok, ["--days", "30"], cwd=tmp_path)
+    usage_run = run_script_in_process(usage, cwd=tmp_path)
+    boom_run = run_script_in_process(boom, cwd=tmp_path)
+
+    assert (ok_run.returncode, ok_run.stdout.strip()) == (0, "reporte --days 30")
+    assert usage_run.returncode == 2 and "usage:" in usage_run.stderr
+    assert not usage_run.crashed
+    assert boom_run.returncode == 1 and boom_run.crashed
+    assert "ValueError: roto" in boom_run.stderr
+    assert sys.argv == argv
+
+
+def test_warm_pool_reuses_worker_and_recycles_after_crash(tmp_path):
+    pid = _write(tmp_path, "pid.py", "import os\nprint(os.getpid())\n")
+    boom = _write(tmp_path, "boom.py", "raise RuntimeError('x')\n")
+    slow = _write(tmp_path, "slow.py", "import time\ntime.sleep(5)\n")
+
+    async def scenario():
+        pool = WarmScriptPool(1, cwd=tmp_path, preload=False)
+        try:
+            first = await pool.run(pid, [], timeout=30)
+            second = await pool.run(pid, [], timeout=30)
+            crashed = await pool.run(boom, [], timeout=30)
+            after_crash = await pool.run(pid, [], timeout=30)
+            timed_out = await pool.run(slow, [], timeout=0.5)
+            after_timeout = await pool.run(pid, [], timeout=30)
+        finally:
+            await pool.close()
+        return first, second, crashed, after_crash, timed_out, after_timeout
+
+    first, second, crashed, after_crash, timed_out, after_timeout = asyncio.run(scenario())
+
+    assert first.stdout == second.stdout
+    assert crashed.crashed
+    assert after_crash.stdout != first.stdout
+    assert timed_out.returncode == 124
+    assert after_timeout.returncode == 0
+    assert after_timeout.stdout != after_crash.stdout
+
+
+def test_warm_worker_keeps_one_event_loop_across_runs(tmp_path):
+    loop_id = _write(
+        tmp_path,
+        "loop_id.py",
+        "import asyncio\n"
+        "async def main():\n"
+        "    print(id(asyncio.get_running_loop()))\n"
+        "asyncio.run(main())\n",
+    )
+
+    async def scenario():
+        pool = WarmScriptPool(1, cwd=tmp_path, preload=False)
+        try:
+            return [await pool.run(loop_id, [], timeout=30) for _ in range(2)]
+        finally:
+            await pool.close()
+
+    first, second = asyncio.run(scenario())
+
+    assert first.returncode == 0 and first.stdout.strip()
+    assert first.stdout == second.stdout
+
+
+def test_worker_dying_after_ack_reports_crash_instead_of_retry(tmp_path):
+    effect = tmp_path / "effects.txt"
+    dies = _write(
+        tmp_path,
+        "dies.py",
+        "import os\n"
+        f"with open({str(effect)!r}, 'a') as fh:\n"
+        "    fh.write('enviado\\n')\n"
+        "os._exit(3)\n",
+    )
+    pid = _write(tmp_path, "pid.py", "import os\nprint(os.getpid())\n")
+
+    async def scenario():
+        pool = WarmScriptPool(1, cwd=tmp_path, preload=False)
+        try:
+            died = await pool.run(dies, [], timeout=30)
+            after = await pool.run(pid, [], timeout=30)
+        finally:
+            await pool.close()
+        return died, after
+
+    died, after = asyncio.run(scenario())
+
+    assert died is not None and died.crashed and died.returncode == 1
+    assert "no se reintenta" in died.stderr
+    assert effect.read_text(encoding="utf-8").splitlines() == ["enviado"]
+    assert after.returncode == 0 and after.stdout.strip()
@@ -2,6 +2,8 @@ import asyncio
 from datetime import datetime, timezone
 from urllib.parse import parse_qs, urlparse
 
+import httpx
+
 from src.analysis.sentiment_fetcher import (
     NewsSource,
     SentimentRawItem,
@@ -111,22 +113,70 @@ def test_raw_sentiment_skips_identical_existing_items():
 
     class _Connection:
         executed = False
+        query = ""
+        params = ()
 
-        async def fetch(self, *_args):
-            return [{
-                "source": item.source,
-                "url_hash": item.url_hash,
-                "headline": item.headline,
-                "body_snippet": item.body_snippet,
-                "published_at": item.published_at,
-                "raw_payload": item.raw_payload,
-            }]
+        async def fetch(self, query, *params):
+            self.query, self.params = query, params
+            # Postgres filtra la fila idéntica en el ON CONFLICT ... WHERE.
+            return []
 
         async def executemany(self, *_args):
             self.executed = True
 
     conn = _Connection()
-    saved = asyncio.run(save_raw_sentiment_items(conn, [item]))
+    saved = asyncio.run(save_raw_sentiment_items(conn, [item, item]))
 
     assert saved == 0
     assert conn.executed is False
+    assert "IS DISTINCT FROM" in conn.query
+    assert conn.params[2] == [item.url_hash]
+
+
+def _feed(*titles):
+    items = "".join(
+        f"<item><title>{title}</title><link>https://example.test/{title}</link></item>"
+        for title in titles
+    )
+    return f"<rss><channel>{items}</channel></rss>".encode()
+
+
+def test_feed_state_sends_conditional_requests_and_returns_only_new_items(monkeypatch):
+    from src.analysis import sentiment_fetcher
+
+    source = NewsSource("wire", "https://example.test/feed")
+    feeds = [
+        _feed("a", "b", "c", "d", "e"),
+        _feed("new", "a", "b", "c", "d", "e"),
+    ]
+    requests = []
+
+    def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v2"':
+            return httpx.Response(304)
+        body = feeds[min(len(requests) - 1, 1)]
+        return httpx.Response(200, content=body, headers={"ETag": f'"v{len(requests)}"'})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        sentiment_fetcher.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    states = {}
+
+    def run():
+        return asyncio.run(
+            sentiment_fetcher.fetch_raw_sentiment_items(sources=[source], feed_states=states)
+        )
+
+    first, second, third = run(), run(), run()
+
+    assert [item.headline for item in first] == ["a", "b", "c", "d", "e"]
+    assert [item.headline for item in second] == ["new"]
+    assert third == []
+    assert "if-none-match" not in requests[0]
+    assert requests[1]["if-none-match"] == '"v1"'
+    assert states["wire"].not_modified == 1
+    assert len(states["wire"].seen) == 6
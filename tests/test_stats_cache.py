@@ -0,0 +1,127 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import optimizer, risk, stats_cache
+from src.analysis.stats_cache import (
+    AnalysisStatsCache,
+    invalidate_analysis_stats,
+    load_analysis_stats_cache,
+    save_analysis_stats_cache,
+)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key) or 0) + 1)
+        return int(self.values[key])
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+
+def _frames(tickers, periods=200, seed=11):
+    rng = np.random.default_rng(seed)
+    return {
+        ticker: pd.DataFrame(
+            {"Close": 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, periods)))},
+            index=pd.date_range("2025-01-01", periods=periods, freq="B"),
+        )
+        for ticker in tickers
+    }
+
+
+def _optimizer_kwargs(frames, vix):
+    tickers = list(frames)
+    return dict(
+        current_positions=[{"ticker": t, "market_value": 250.0} for t in tickers],
+        portfolio_value_ars=1_000.0,
+        cash_ars=0.0,
+        macro_regime={"market": "neutral"},
+        vix=vix,
+        synthesis_results=[
+            SimpleNamespace(ticker=t, final_score=0.2, confidence=0.6, conviction=0.6)
+            for t in tickers
+        ],
+        market_assets=[],
+        history_frames=frames,
+    )
+
+
+@pytest.mark.parametrize("vix", [15.0, 27.0])  # BLACK_LITTERMAN / MIN_VARIANCE
+def test_cached_optimizer_run_matches_cold_run_without_recomputing(monkeypatch, vix):
+    monkeypatch.setattr(optimizer, "_write_optimizer_diagnostic", lambda payload: None)
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(stats_cache, "redis_client", fake_redis)
+    frames = _frames(["AAA", "BBB", "CCC", "DDD"])
+
+    async def run(cache):
+        report = optimizer.run_optimizer(**_optimizer_kwargs(frames, vix), stats_cache=cache)
+        await save_analysis_stats_cache(cache)
+        return report
+
+    cold_cache = asyncio.run(load_analysis_stats_cache())
+    cold = asyncio.run(run(cold_cache))
+    warm_cache = asyncio.run(load_analysis_stats_cache())
+
+    def fail(*args, **kwargs):
+        raise AssertionError("retornos recalculados con cache caliente")
+
+    monkeypatch.setattr(pd.DataFrame, "cov", fail)
+    warm = asyncio.run(run(warm_cache))
+
+    assert cold_cache.misses > 0
+    assert warm_cache.misses == 0
+    assert warm_cache.hits == cold_cache.hits + cold_cache.misses
+    assert warm.optimization.weights == cold.optimization.weights
+    assert fake_redis.ttls == {"cocos:analysis:stats:g0": stats_cache.STATS_TTL_SECONDS}
+
+
+def test_risk_stats_are_reused_and_match_uncached_metrics():
+    prices = _frames(["AAA"])["AAA"]["Close"]
+    cache = AnalysisStatsCache()
+
+    plain = risk.compute_asset_risk("AAA", prices, 100.0, 1_000.0, vix=30.0)
+    first = risk.compute_asset_risk("AAA", prices, 100.0, 1_000.0, vix=30.0, stats_cache=cache)
+    second = risk.compute_asset_risk("AAA", prices, 100.0, 1_000.0, vix=40.0, stats_cache=cache)
+
+    assert first == plain
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.volatility_annual == plain.volatility_annual
+    assert second.suggested_pct_adj < plain.suggested_pct_adj
+
+
+def test_new_candles_or_adjusted_prices_miss_and_invalidation_bumps_generation(monkeypatch):
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(stats_cache, "redis_client", fake_redis)
+    frames = _frames(["AAA", "BBB"])
+    build = lambda: optimizer._fetch_returns(["AAA", "BBB"], history_frames=frames)
+    cache = AnalysisStatsCache()
+    cache.returns_matrix(["BBB", "AAA"], frames, build)
+    cache.returns_matrix(["AAA", "BBB"], frames, build)
+
+    adjusted = {**frames, "AAA": frames["AAA"] * 0.5}
+    cache.returns_matrix(["AAA", "BBB"], adjusted, build)
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    asyncio.run(save_analysis_stats_cache(cache))
+    assert asyncio.run(invalidate_analysis_stats("build_daily_candles")) == 1
+    fresh = asyncio.run(load_analysis_stats_cache())
+    assert fresh.generation == 1 and fresh.entries == {}
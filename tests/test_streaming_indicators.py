@@ -0,0 +1,110 @@
+import asyncio
+from dataclasses import asdict
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis import streaming_indicators
+from src.analysis.streaming_indicators import StreamingIndicatorBook, StreamingIndicatorState
+from src.analysis.technical import compute_indicators
+from src.scheduler import runner
+
+SESSION = date(2026, 6, 22)
+NOW = datetime(2026, 6, 22, 14, 0, tzinfo=runner.ART_TZ)
+
+
+def _frame(n: int, *, end: str, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[-16:] = np.linspace(close[-17], close[-17] * 1.1, 16)
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * (1 + rng.uniform(0, 0.02, n)),
+            "Low": close * (1 - rng.uniform(0, 0.02, n)),
+            "Close": close,
+            "Volume": rng.integers(0, 1_000, n).astype(float),
+            "Source": "COCOS",
+        },
+        index=pd.date_range(end=end, periods=n, freq="B", tz="UTC"),
+    )
+
+
+def _assert_same(expected, got):
+    for name, value in asdict(expected).items():
+        if name == "ticker":
+            assert got.ticker == value
+        else:
+            assert getattr(got, name) == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+@pytest.mark.parametrize("n", [60, 150, 260])
+@pytest.mark.parametrize("end", ["2026-06-19 20:00", "2026-06-22 20:00"])
+def test_streaming_snapshot_matches_overlay_recompute(monkeypatch, n, end):
+    monkeypatch.setattr(runner, "_now_art", lambda: NOW)
+    frame = _frame(n, end=end)
+    state = StreamingIndicatorState.seed("GGAL", frame, SESSION)
+
+    _assert_same(compute_indicators(frame, "GGAL"), state.snapshot())
+    for price in (frame["Close"].iloc[-1] * 1.04, frame["Close"].iloc[-1] * 0.85):
+        row = {"ticker": "GGAL", "last_price": price, "ts": NOW}
+        expected = compute_indicators(runner._overlay_latest_market_price(frame, row), "GGAL")
+        _assert_same(expected, state.snapshot(streaming_indicators._tick_price(row, SESSION)))
+
+
+def test_streaming_state_rejects_short_or_gapped_history():
+    short = _frame(40, end="2026-06-19 20:00")
+    gapped = _frame(120, end="2026-06-19 20:00")
+    gapped.iloc[50, gapped.columns.get_loc("Volume")] = np.nan
+
+    assert StreamingIndicatorState.seed("A", short, SESSION) is None
+    assert StreamingIndicatorState.seed("B", gapped, SESSION) is None
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+class _FakeDB:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls: list[list[str]] = []
+
+    async def get_market_candles_bulk(self, tickers, asset_types, limit):
+        self.calls.append(list(tickers))
+        return {ticker: self.frames[ticker] for ticker in tickers if ticker in self.frames}
+
+
+def test_book_seeds_once_and_restores_from_redis_checkpoint(monkeypatch):
+    fake_redis = _FakeRedis()
+    monkeypatch.setattr(streaming_indicators, "redis_client", fake_redis)
+    db = _FakeDB({"GGAL": _frame(260, end="2026-06-19 20:00"), "YPFD": _frame(30, end="2026-06-19 20:00")})
+    prices = [{"ticker": "GGAL", "last_price": 150.0, "ts": NOW}]
+    asset_types = {"GGAL": "ACCION", "YPFD": "ACCION"}
+
+    async def scenario():
+        book = StreamingIndicatorBook()
+        first = await book.refresh(db, asset_types, prices, session=SESSION)
+        second = await book.refresh(db, asset_types, prices, session=SESSION)
+        restarted = await StreamingIndicatorBook().refresh(db, {"GGAL": "ACCION"}, prices, session=SESSION)
+        return first, second, restarted
+
+    first, second, restarted = asyncio.run(scenario())
+
+    assert db.calls == [["GGAL", "YPFD"]]
+    assert set(first) == {"GGAL"}
+    assert first["GGAL"].close == 150.0
+    assert asdict(second["GGAL"]) == asdict(first["GGAL"])
+    assert asdict(restarted["GGAL"]) == asdict(first["GGAL"])
+    assert list(fake_redis.values) == ["cocos:indicators:stream:2026-06-22:GGAL"]
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from src.collector import notifier as notifier_module
+from src.collector import telegram_delivery
+from src.collector.notifier import TelegramNotifier
+from src.collector.telegram_delivery import OUTBOX_DUE_KEY, OUTBOX_MESSAGES_KEY, TelegramDelivery
+from src.core.metrics import REGISTRY, TELEGRAM_DELIVERY_SECONDS
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def zadd(self, key, mapping, nx=False, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if (nx and member in zset) or (xx and member not in zset):
+                continue
+            zset[member] = score
+
+    async def zrangebyscore(self, key, low, high, start=0, num=None):
+        members = sorted(
+            (score, member) for member, score in self.zsets.get(key, {}).items() if score <= high
+        )
+        return [member for _, member in members][start:None if num is None else start + num]
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.zsets.get(key, {}).pop(member, None)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _telegram(responses=None, latency=0.0):
+    """Telegram stand-in: registra cada sendMessage y responde en orden."""
+    sent = []
+    queue = list(responses or [])
+
+    async def handler(request):
+        form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+        if latency:
+            await asyncio.sleep(latency)
+        if queue:
+            status, payload = queue.pop(0)
+            if status != 200:
+                return httpx.Response(status, json=payload)
+        sent.append(form)
+        return httpx.Response(200, json={"ok": True, "result": {"message_id": len(sent)}})
+
+    client = httpx.AsyncClient(base_url="https://telegram.test", transport=httpx.MockTransport(handler))
+    return client, sent
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(telegram_delivery, "redis_client", redis)
+    return redis
+
+
+def test_superseded_messages_coalesce_and_queue_survives_restart(fake_redis):
+    clock = _Clock()
+
+    async def scenario():
+        producer = TelegramDelivery("token", clock=clock)
+        await producer.enqueue("1", "digest v1", coalesce_key="risk_digest")
+        await producer.enqueue("1", "digest v2", coalesce_key="risk_digest")
+        await producer.enqueue("1", "movimientos")
+        # Reinicio: otra instancia drena lo persistido.
+        client, sent = _telegram()
+        worker = TelegramDelivery("token", client=client, clock=clock)
+        first = await worker.drain_once()
+        clock.now += 1.0
+        second = await worker.drain_once()
+        await client.aclose()
+        return first + second, sent
+
+    delivered, sent = asyncio.run(scenario())
+
+    assert delivered == 2
+    assert [m["text"] for m in sent] == ["digest v2", "movimientos"]
+    assert sent[0]["parse_mode"] == "HTML"
+    assert fake_redis.hashes[OUTBOX_MESSAGES_KEY] == {}
+    assert fake_redis.zsets[OUTBOX_DUE_KEY] == {}
+
+
+def test_flood_limit_retry_after_blocks_only_that_chat(fake_redis):
+    clock = _Clock()
+    REGISTRY.clear()
+
+    async def scenario():
+        client, sent = _telegram([(429, {"ok": False, "parameters": {"retry_after": 7}})])
+        worker = TelegramDelivery("token", client=client, clock=clock)
+        await worker.enqueue("1", "stop GGAL")
+        await worker.enqueue("1", "stop YPFD")
+        await worker.enqueue("2", "otro usuario")
+        await worker.drain_once()
+        blocked_until = dict(fake_redis.zsets[OUTBOX_DUE_KEY])
+        clock.now += 7.0
+        await worker.drain_once()
+        clock.now += 1.0
+        await worker.drain_once()
+        await client.aclose()
+        return sent, blocked_until
+
+    sent, blocked_until = asyncio.run(scenario())
+
+    assert len(blocked_until) == 2
+    assert all(1_007.0 <= due < 1_007.1 for due in blocked_until.values())
+    assert sorted(m["text"] for m in sent) == ["otro usuario", "stop GGAL", "stop YPFD"]
+    assert [m["text"] for m in sent if m["chat_id"] == "1"] == ["stop GGAL", "stop YPFD"]
+    (series,) = REGISTRY.snapshot()["families"][TELEGRAM_DELIVERY_SECONDS]
+    assert series["labels"] == {"outcome": "sent"} and series["count"] == 3
+
+
+def test_fan_out_to_many_chats_does_not_serialize_and_html_falls_back(fake_redis):
+    async def scenario():
+        client, sent = _telegram(
+            [(400, {"ok": False, "description": "Bad Request: can't parse entities"})],
+            latency=0.05,
+        )
+        worker = TelegramDelivery("token", client=client)
+        for chat in range(6):
+            await worker.enqueue(str(chat), f"<b>alerta {chat}")
+        started = time.perf_counter()
+        delivered = await worker.drain_once()
+        elapsed = time.perf_counter() - started
+        await client.aclose()
+        return delivered, elapsed, sent
+
+    delivered, elapsed, sent = asyncio.run(scenario())
+
+    assert delivered == 6
+    assert elapsed < 6 * 0.05
+    assert sum(1 for m in sent if "parse_mode" not in m) == 1
+
+
+def test_notifier_send_raw_async_enqueues_chunks_without_blocking(fake_redis, monkeypatch):
+    def _blocking_post(*_args, **_kwargs):
+        raise AssertionError("send_raw_async no debe usar requests")
+
+    monkeypatch.setattr(notifier_module.requests, "post", _blocking_post)
+    notifier = TelegramNotifier("token", "42")
+    notifier._max_message_len = 20
+    text = "\n".join(f"linea {i:02d}" for i in range(4))
+
+    async def scenario():
+        ok = await notifier.send_raw_async(text, coalesce_key="risk_digest")
+        delivery = telegram_delivery.get_telegram_delivery("token")
+        await delivery.aclose()
+        return ok
+
+    assert asyncio.run(scenario()) is True
+    messages = [json.loads(raw) for raw in fake_redis.hashes[OUTBOX_MESSAGES_KEY].values()]
+    assert sorted(m["id"] for m in messages) == [
+        "coalesce:42:risk_digest:0",
+        "coalesce:42:risk_digest:1",
+    ]
+    assert {m["chat_id"] for m in messages} == {"42"}
+
+
+def test_risk_digests_with_different_alerts_are_both_delivered(fake_redis, monkeypatch):
+    from src.scheduler import runner
+
+    monkeypatch.setattr(telegram_delivery, "TELEGRAM_DELIVERY_ENABLED", True)
+    monkeypatch.setattr(TelegramDelivery, "ensure_running", lambda self: None)
+    manager = runner.IntradayManager.__new__(runner.IntradayManager)
+    manager.notifier = TelegramNotifier("token", "42")
+    stop = runner.RiskAlert("GGAL", "STOP_TRIGGERED", 900.0, 1000.0, -0.10, stop_loss_price=920.0)
+    warning = runner.RiskAlert("YPFD", "WARNING", 95.0, 100.0, -0.05)
+
+    async def scenario():
+        # Dos pasadas del risk guard antes de que el worker alcance a drenar.
+        assert await manager._send_risk_digest([stop])
+        assert await manager._send_risk_digest([warning])
+        clock = _Clock()
+        clock.now = time.time() + 10
+        client, sent = _telegram()
+        worker = TelegramDelivery("token", client=client, clock=clock)
+        await worker.drain_once()
+        clock.now += 1.0
+        await worker.drain_once()
+        await client.aclose()
+        return sent
+
+    sent = asyncio.run(scenario())
+
+    assert len(sent) == 2
+    assert "GGAL" in sent[0]["text"] and "STOP_TRIGGERED" in sent[0]["text"]
+    assert "YPFD" in sent[1]["text"]
@@ -105,11 +105,12 @@ def test_monitor_ingestion_cache_is_mutated_without_replacing_app_state():
     assert 'request.app["ingestion_cache"] =' not in source
 
 
-def test_history_loads_are_bounded_to_five_concurrent_queries():
+def test_history_loads_use_one_bulk_candle_query():
     analysis = (ROOT / "scripts" / "run_analysis.py").read_text(encoding="utf-8")
     radar = (ROOT / "scripts" / "run_opportunity.py").read_text(encoding="utf-8")
+    scheduler = (ROOT / "src" / "scheduler" / "runner.py").read_text(encoding="utf-8")
 
-    assert "semaphore = asyncio.Semaphore(5)" in analysis
-    assert "semaphore = asyncio.Semaphore(5)" in radar
-    assert "await asyncio.gather" in analysis
-    assert "await asyncio.gather" in radar
+    for source in (analysis, radar, scheduler):
+        assert "db.get_market_candles_bulk(" in source
+    assert "semaphore = asyncio.Semaphore(5)" not in analysis
+    assert "semaphore = asyncio.Semaphore(5)" not in radar
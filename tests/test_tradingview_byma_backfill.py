@@ -16,8 +16,8 @@ class _FakeDb:
         assert recent_exit_days == 0
         return [{"ticker": "NVS", "asset_type": "CEDEAR"}]
 
-    async def get_market_candles(self, ticker, **kwargs):
-        return []
+    async def get_market_candle_rows_bulk(self, tickers, asset_types=None, limit=None, source=None, **kwargs):
+        return {ticker: [] for ticker in tickers}
 
 
 def test_targets_include_current_position_missing_from_daily_universe():
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import asynccontextmanager
 
 import pandas as pd
 
@@ -298,10 +299,11 @@ def test_viability_loader_excludes_decisions_backed_only_by_superseded_fills(mon
 
     conn = _Connection()
 
-    async def _connect(_dsn):
-        return conn
+    @asynccontextmanager
+    async def _connection(_dsn):
+        yield conn
 
-    monkeypatch.setattr("src.analysis.viability_audit.asyncpg.connect", _connect)
+    monkeypatch.setattr("src.analysis.viability_audit.connection", _connection)
 
     frame = asyncio.run(
         load_viability_decision_log(
@@ -353,10 +355,11 @@ def test_viability_loader_uses_fill_lineage_to_exclude_followed_manual_rows(monk
 
     conn = _Connection()
 
-    async def _connect(_dsn):
-        return conn
+    @asynccontextmanager
+    async def _connection(_dsn):
+        yield conn
 
-    monkeypatch.setattr("src.analysis.viability_audit.asyncpg.connect", _connect)
+    monkeypatch.setattr("src.analysis.viability_audit.connection", _connection)
 
     asyncio.run(
         load_viability_decision_log(